@@ -10,7 +10,11 @@ Purpose:
       - requirements.txt
 
 Usage:
-    main.py [ -V | -v | -q | -Q ] [--hello]
+    main.py [ -V | -v | -q | -Q ] [--hello] [options]
+    main.py [ -V | -v | -q | -Q ] --serve [--socket=<path>] [options]
+    main.py [ -V | -v | -q | -Q ] --batch=<file> [options]
+    main.py [ -V | -v | -q | -Q ] --loadgen [--rate=<n>] [--duration=<s>] [--threads=<n>] [--levels=<mix>] [--sizes=<list>] [options]
+    main.py [ -V | -v | -q | -Q ] --replay=<file> [--speed=<x>] [options]
 
 Options:
     -v              verbose, increase verbosity to log on INFO level (default is WARNING)
@@ -18,10 +22,61 @@ Options:
     -q              quiet, decrease verbosity to log on ERROR level (default is WARNING)
     -Q              more quiet, decrease verbosity to log on EXCEPTION level (default is WARNING)
     --hello         [TEST CASE OF THE TEMPLATE], log "Hello World!"
+    --buffered-console  buffer console output if stderr is not a TTY (e.g. piped to a collector),
+                    ...line-buffered and colourised if it is a TTY
+    --shed-on-overload  temporarily drop DEBUG/INFO records while log handlers cannot keep up,
+                    ...number of dropped records is reported at program end
+    --compact-records  log via compact, slot-based records that only hold the fields the
+                    ...formatters need (less memory and time per record)
+    --mmap-log      write log files via preallocated, memory-mapped segments (no write syscall
+                    ...per record), their tail is truncated at program end
+    --introspect=<port>  serve logging backlog and handler state, exception counts, thread stacks
+                    ...and tracemalloc top allocations of the running process on http://127.0.0.1:<port>
+                    ...(0: any free port), see src/utils/introspect.py
+    --profile-startup   output per-phase timing breakdown of startup (imports, CLI parse,
+                    ...config I/O, handler creation, rotation) to stderr
+    --profile-cpu   run commands under cProfile, write log/profile_cpu.pstats and log top functions
+                    ...at program end
+    --profile-mem   trace memory allocations of commands via tracemalloc, write log/profile_mem.tracemalloc
+                    ...and log peak and top allocation sites at program end
+    --profile-sample=<ms>  sample stacks of all threads every <ms> ms (low overhead), write
+                    ...log/profile_samples.collapsed and log top functions at program end
+    --serve         run as daemon: setup once, then accept jobs (cli input args like --hello -v)
+                    ...over a Unix socket, submit jobs via `python -m src.utils.daemon_client`
+    --socket=<path>  path of Unix socket of daemon (default: log/daemon.sock)
+    --batch=<file>  run every line of file (- for stdin) as a job (cli input args like --hello -v)
+                    ...within this process, stream job results to stdout as JSON lines
+    --async         run commands on an asyncio event loop, log via a queue that never blocks the loop
+    --concurrency=<n>  max. number of tasks the async task runner runs at once (default: 100)
+    --pool=<kind>   run commands concurrently on a pool of kind thread or process (see src/utils/executor.py),
+                    ...failures of commands are reported in the roundup at program end
+    --workers=<n>   max. number of workers of --pool (default: one per CPU)
+    --metrics-file=<path>  write metrics (e.g. log records per level) in Prometheus text format
+                    ...to file at program end, a summary of metrics is always logged at program end
+    --loadgen       log synthetic records via a logger of configure_logger (written to log/loadgen.log),
+                    ...report achieved rate, dropped records and handler latencies to stdout as JSON
+    --rate=<n>      records/sec of --loadgen over all threads (default: unthrottled)
+    --duration=<s>  seconds --loadgen runs [default: 10]
+    --threads=<n>   threads of --loadgen [default: 1]
+    --levels=<mix>  weights of levels of --loadgen records [default: DEBUG:10,INFO:60,WARNING:25,ERROR:5]
+    --sizes=<list>  message sizes in characters of --loadgen records [default: 64,256,1024]
+    --replay=<file>  like --loadgen, but log the records of a log file (e.g. log/app.log)
+                    ...with their original timing
+    --speed=<x>     factor by which --replay speeds up the original timing, 0 for no delays [default: 1]
+    --trace-file=<path>  export finished tracing spans (program, jobs, commands) as JSON lines to file,
+                    ...log records carry the ids of their span in any case
 """
-from docopt import docopt
-import logging
-import logging.handlers
+# must be imported first, as it records the start of the program #
+from src.utils import startup_profile
+
+with startup_profile.phase("imports"):
+    from docopt import docopt, DocoptExit
+    import functools
+    import logging
+    import logging.handlers
+    from pathlib import Path
+    import re
+    import sys
 
 logging.basicConfig(level=logging.NOTSET)
 """
@@ -35,54 +90,251 @@ that do not set a less verbose level.
 
 # only import modules that do not include custom logging, #
 # as custom logging has not been configured yet #
-from src.utils.cli_input_args import CLI
-from src.log import log
+with startup_profile.phase("imports"):
+    from src.utils.cli_input_args import CLI
+    from src.log import log
+
+
+def _get_number(
+        docopt_args: dict,
+        option: str,
+        type_: type[int] | type[float],
+        minimum: float | None = None,
+        exclusive: bool = False,
+    ) -> int | float | None:
+    """return value of numeric option, None if it is not passed
 
+    Args:
+        docopt_args (dict): parsed cli input args
+        option (str): option, e.g. "--concurrency"
+        type_ (type[int] | type[float]): type of value
+        minimum (float | None, optional): min. value. Defaults to None meaning no minimum.
+        exclusive (bool, optional): value must be greater than minimum. Defaults to False.
 
-def _evaluate_cli_input_args():
+    Raises:
+        DocoptExit: if value is not a number of type_ or below minimum (output with usage, like docopt)
+
+    Returns:
+        int | float | None: value
+    """
+    value: str | None = docopt_args[option]
+    if value is None:
+        return None
+    kind: str = "an integer" if type_ is int else "a number"
+    try:
+        number: int | float = type_(value)
+    except ValueError:
+        raise DocoptExit(f"{option} must be {kind}, but is '{value}'.") from None
+    if minimum is not None and (number <= minimum if exclusive else number < minimum):
+        bound: str = "greater than" if exclusive else "of at least"
+        raise DocoptExit(f"{option} must be {kind} {bound} {minimum}, but is '{value}'.")
+    return number
+
+
+def _evaluate_cli_input_args(argv: list[str] | None = None):
     """evalute cli input args via docopt
     - save input to class CLI
+
+    Args:
+        argv (list[str] | None, optional): cli input args. Defaults to None meaning sys.argv[1:].
+
+    Raises:
+        DocoptExit: if cli input args do not match the usage or values of options are invalid
     """
-    docopt_args: dict = docopt(__doc__)
+    docopt_args: dict = docopt(__doc__, argv=argv)
+    # pool kinds of src.utils.executor.POOL_KINDS (not imported here, to keep startup fast) #
+    if docopt_args["--pool"] not in (None, "thread", "process"):
+        raise DocoptExit(f"--pool must be thread or process, but is '{docopt_args['--pool']}'.")
     CLI.set_cli_input_args(
         v=docopt_args["-v"],
         V=docopt_args["-V"],
         q=docopt_args["-q"],
         Q=docopt_args["-Q"],
         hello=docopt_args["--hello"],
+        buffered_console=docopt_args["--buffered-console"],
+        shed_on_overload=docopt_args["--shed-on-overload"],
+        compact_records=docopt_args["--compact-records"],
+        mmap_log=docopt_args["--mmap-log"],
+        introspect=_get_number(docopt_args, "--introspect", int, minimum=0),
+        pool=docopt_args["--pool"],
+        workers=_get_number(docopt_args, "--workers", int, minimum=1),
+        profile_startup=docopt_args["--profile-startup"],
+        profile_cpu=docopt_args["--profile-cpu"],
+        profile_mem=docopt_args["--profile-mem"],
+        profile_sample=_get_number(docopt_args, "--profile-sample", float, minimum=0),
+        serve=docopt_args["--serve"],
+        socket=docopt_args["--socket"],
+        batch=docopt_args["--batch"],
+        run_async=docopt_args["--async"],
+        concurrency=_get_number(docopt_args, "--concurrency", int, minimum=1),
+        metrics_file=docopt_args["--metrics-file"],
+        trace_file=docopt_args["--trace-file"],
+        loadgen=docopt_args["--loadgen"],
+        replay=docopt_args["--replay"],
+        load_rate=_get_number(docopt_args, "--rate", float, minimum=0, exclusive=True),
+        load_duration=_get_number(docopt_args, "--duration", float, minimum=0),
+        load_threads=_get_number(docopt_args, "--threads", int, minimum=1),
+        load_levels=docopt_args["--levels"],
+        load_sizes=docopt_args["--sizes"],
+        replay_speed=_get_number(docopt_args, "--speed", float, minimum=0),
     )
 
 
+JOB_USAGE: str = """
+Usage:
+    job [ -V | -v | -q | -Q ] [--hello]
+
+Options:
+    -v              verbose, increase verbosity to log on INFO level (default is WARNING)
+    -V              more verbose, increase verbosity to log on DEBUG level (default is WARNING)
+    -q              quiet, decrease verbosity to log on ERROR level (default is WARNING)
+    -Q              more quiet, decrease verbosity to log on EXCEPTION level (default is WARNING)
+    --hello         [TEST CASE OF THE TEMPLATE], log "Hello World!"
+"""
+"""usage of jobs of --serve and --batch: verbosity and commands only, all other cli input args are
+process-level and keep the values of the process"""
+
+PROCESS_OPTIONS: frozenset[str] = frozenset(
+    re.findall(r"^\s+(--[\w-]+)", __doc__.split("Options:")[1], re.MULTILINE)
+) - frozenset(re.findall(r"^\s+(--[\w-]+)", JOB_USAGE, re.MULTILINE))
+"""long options of main.py that jobs cannot set, e.g. --loadgen"""
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_job_argv(argv: tuple[str, ...]) -> tuple[tuple[str, bool], ...]:
+    """parse cli input args of a job via docopt, results are cached per argv
+
+    Args:
+        argv (tuple[str, ...]): cli input args of job
+
+    Raises:
+        SystemExit: if argv holds process-level cli input args (see PROCESS_OPTIONS)
+        DocoptExit: if argv does not match JOB_USAGE
+
+    Returns:
+        tuple[tuple[str, bool], ...]: ((name of class var of CLI, value), ..)
+    """
+    rejected: list[str] = [arg for arg in argv if arg.split("=")[0] in PROCESS_OPTIONS]
+    if rejected:
+        raise SystemExit(f"Jobs cannot set process-level cli input args: {rejected}.")
+    docopt_args: dict = docopt(JOB_USAGE, argv=list(argv))
+    return (
+        ("v", docopt_args["-v"]),
+        ("V", docopt_args["-V"]),
+        ("q", docopt_args["-q"]),
+        ("Q", docopt_args["-Q"]),
+        ("hello", docopt_args["--hello"]),
+    )
+
+
+def _evaluate_job_args(argv: list[str]):
+    """evaluate cli input args of a job (see JOB_USAGE)
+    - save input to class CLI, process-level cli input args are kept
+
+    Args:
+        argv (list[str]): cli input args of job
+    """
+    CLI.set_cli_input_args(**{**CLI.get_cli_input_args(), **dict(_parse_job_argv(tuple(argv)))})
+
+
 if __name__=="__main__":
     """setup program
     - we need this __name__=="__main__" here because of testing
     - TODO: find a better way to test this
     """
-    _evaluate_cli_input_args()
+    with startup_profile.phase("CLI parse"):
+        _evaluate_cli_input_args()
     log.write_log_level(CLI.get_wanted_log_level())
 
 # configure logger #
 logger: logging.Logger = logging.getLogger(__name__)
 logger = log.configure_logger(logger)
-log.rotate_logs_of_all_rotating_file_handlers(logger)
+# (a replayed log file, e.g. log/app.log, must not be rotated away before it is read) #
+if not CLI.replay:
+    log.rotate_logs_of_all_rotating_file_handlers(logger)
+
 
+# modules of commands (e.g. src.hello_world) are imported lazily, see src.utils.commands #
+with startup_profile.phase("imports"):
+    from src.vars.pretty_print import SEPARATOR
+    from src.utils import exception_handling as exc
+    from src.utils import commands
+    from src.utils import config
+    from src.utils import metrics
+    from src.utils import tracing
 
-from src.vars.pretty_print import SEPARATOR
-from src.utils import exception_handling as exc
-from src.hello_world import hello
+
+def _run():
+    """run what is selected via cli input args (daemon, batch, load or commands) within a tracing span
+    """
+    cfg: config.Config = config.get()
+    with tracing.span("main"):
+        if CLI.serve:
+            from src.utils import daemon
+            daemon.serve(
+                parse_args=_evaluate_job_args,
+                socket_path=Path(CLI.socket) if CLI.socket else daemon.DEFAULT_SOCKET_PATH,
+            )
+        elif CLI.batch:
+            from src.utils import batch
+            batch.run_batch_from_path(CLI.batch, parse_args=_evaluate_job_args)
+        elif CLI.loadgen or CLI.replay:
+            from src.log import loadgen
+            loadgen.run_from_cli()
+        elif cfg.run_async:
+            import asyncio
+            from src.utils import async_runner
+            asyncio.run(async_runner.run_commands(commands.select()))
+        elif cfg.pool:
+            # failed commands are routed into the roundup by run_tasks, exceptions that are #
+            # catched within a command on a process pool stay in the roundup of its worker #
+            from src.utils import executor
+            for _ in executor.run_tasks(
+                commands.run,
+                [(name,) for name in commands.select()],
+                pool=cfg.pool,
+                max_workers=cfg.workers,
+            ):
+                pass
+        else:
+            for name in commands.select():
+                commands.run(name)
 
 
 def main():
     """start program and log possible exceptions on exit
     """
+    # uncaught exceptions (e.g. of threads) are output in the roundup as well #
+    exc.install_hooks()
+    if CLI.profile_startup:
+        print(startup_profile.get_report(), file=sys.stderr)
     logger.debug((
         f"Program execution starts.\n"
         f"Logging and Input Arguments configured successfully.\n"
         f"{SEPARATOR}\n"
         f"{SEPARATOR}\n\n"
     ))
-    hello()
+    cfg: config.Config = config.get()
+    if cfg.trace_file:
+        tracing.set_export_path(cfg.trace_file)
+    if cfg.introspect is not None:
+        from src.utils import introspect
+        introspection: introspect.IntrospectionServer = introspect.start(cfg.introspect)
+    if CLI.profile_cpu or CLI.profile_mem or CLI.profile_sample:
+        from src.utils import profiling
+        with profiling.profile(
+            cpu=CLI.profile_cpu,
+            mem=CLI.profile_mem,
+            sample_interval=CLI.profile_sample / 1e3 if CLI.profile_sample else None,
+        ):
+            _run()
+    else:
+        _run()
     exc.program_end()
+    if cfg.metrics_file:
+        metrics.write_prometheus(cfg.metrics_file)
+    if cfg.introspect is not None:
+        introspection.stop()
 
 
 if __name__=="__main__":
@@ -0,0 +1,266 @@
+"""
+module that provides a buffered console handler
+- interactive use (stream is a TTY): line-buffered, i.e. every record is flushed instantly
+- piped use (stream is not a TTY): block-buffered, i.e. records are collected
+  ...and flushed when the buffer is full or the flush interval has passed
+- all handlers of a stream share one buffer and one flusher thread (see get_stream_buffer),
+  ...so records of different loggers are written in the order they were emitted
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import logging
+import sys
+import threading
+import time
+from typing import TextIO
+
+
+LEVEL_COLOURS: dict[int, tuple[str, str]] = {
+    logging.DEBUG: ("\x1b[36m", "\x1b[0m"),
+    logging.INFO: ("\x1b[32m", "\x1b[0m"),
+    logging.WARNING: ("\x1b[33m", "\x1b[0m"),
+    logging.ERROR: ("\x1b[31m", "\x1b[0m"),
+    logging.CRITICAL: ("\x1b[1;41m", "\x1b[0m"),
+}
+"""precomputed escape strings (prefix, suffix) per log level"""
+
+_NO_COLOUR: tuple[str, str] = ("", "")
+
+
+def is_tty(stream: TextIO) -> bool:
+    """return whether stream is connected to a terminal
+
+    Args:
+        stream (TextIO): stream to check
+
+    Returns:
+        bool: True if stream is a TTY
+    """
+    isatty = getattr(stream, "isatty", None)
+    try:
+        return bool(isatty and isatty())
+    except ValueError:
+        # stream is closed #
+        return False
+
+
+class StreamBuffer():
+    """records of all handlers of a stream that have not been written yet, flushed by one thread
+    """
+    def __init__(self, stream: TextIO):
+        """init empty buffer, the flusher thread is started by the first handler with a flush interval
+
+        Args:
+            stream (TextIO): stream to write to
+        """
+        self.stream: TextIO = stream
+        self.flush_interval: float = 0.0
+        self.lock: threading.RLock = threading.RLock()
+        self.handlers: int = 0
+        """number of open handlers that use the buffer"""
+        self.flusher: threading.Thread | None = None
+        self.closed: threading.Event = threading.Event()
+        self._parts: list[str] = []
+        self._chars: int = 0
+        self._last_flush: float = time.monotonic()
+
+    @property
+    def chars(self) -> int:
+        """return number of buffered characters that have not been written yet
+        """
+        return self._chars
+
+    def start_flusher(self, flush_interval: float) -> None:
+        """flush buffer at least every flush_interval seconds (the shortest interval of all handlers)
+
+        Args:
+            flush_interval (float): max. seconds a record stays in buffer
+        """
+        with self.lock:
+            if not self.flush_interval or flush_interval < self.flush_interval:
+                self.flush_interval = flush_interval
+            if self.flusher is None:
+                self.flusher = threading.Thread(
+                    target=self._flush_periodically,
+                    name=f"{type(self).__name__}-flusher",
+                    daemon=True,
+                )
+                self.flusher.start()
+
+    def _flush_periodically(self) -> None:
+        """flush buffer every flush_interval seconds until buffer gets closed
+        """
+        while not self.closed.wait(self.flush_interval):
+            with self.lock:
+                if self._chars and time.monotonic() - self._last_flush >= self.flush_interval:
+                    self.write()
+
+    def append(self, msg: str, buffer_size: int, force: bool = False) -> None:
+        """append formatted record, write buffer if it holds buffer_size characters or force is set
+
+        Args:
+            msg (str): formatted record incl. terminator
+            buffer_size (int): number of characters that are buffered before writing
+            force (bool, optional): write buffer instantly (e.g. ERROR record). Defaults to False.
+        """
+        with self.lock:
+            self._parts.append(msg)
+            self._chars += len(msg)
+            if force or self._chars >= buffer_size:
+                self.write()
+
+    def write(self) -> None:
+        """write buffer to stream and flush stream
+        """
+        with self.lock:
+            if self._parts:
+                self.stream.write("".join(self._parts))
+                self._parts.clear()
+                self._chars = 0
+            if hasattr(self.stream, "flush"):
+                self.stream.flush()
+            self._last_flush = time.monotonic()
+
+
+_STREAM_BUFFERS: dict[int, StreamBuffer] = {}
+"""buffers of streams that are used by open handlers {id of stream: buffer}"""
+
+_STREAM_BUFFERS_LOCK: threading.Lock = threading.Lock()
+
+
+def get_stream_buffer(stream: TextIO) -> StreamBuffer:
+    """return buffer of stream, create it if no open handler uses it
+    - every call must be paired with release_stream_buffer
+
+    Args:
+        stream (TextIO): stream
+
+    Returns:
+        StreamBuffer: buffer
+    """
+    with _STREAM_BUFFERS_LOCK:
+        buffer: StreamBuffer | None = _STREAM_BUFFERS.get(id(stream))
+        if buffer is None or buffer.stream is not stream:
+            buffer = _STREAM_BUFFERS[id(stream)] = StreamBuffer(stream)
+        buffer.handlers += 1
+        return buffer
+
+
+def release_stream_buffer(buffer: StreamBuffer) -> None:
+    """write buffer, stop its flusher thread and forget it once no open handler uses it
+
+    Args:
+        buffer (StreamBuffer): buffer
+    """
+    with _STREAM_BUFFERS_LOCK:
+        buffer.handlers -= 1
+        if buffer.handlers > 0:
+            return
+        if _STREAM_BUFFERS.get(id(buffer.stream)) is buffer:
+            del _STREAM_BUFFERS[id(buffer.stream)]
+    buffer.closed.set()
+    if buffer.stream:
+        buffer.write()
+
+
+class BufferedConsoleHandler(logging.StreamHandler):
+    """StreamHandler that buffers its output if the stream is not a TTY
+    - handlers of the same stream share their buffer (see StreamBuffer)
+    """
+    def __init__(
+            self,
+            stream: TextIO | None = None,
+            buffer_size: int = 64*1024,
+            flush_interval: float = 1.0,
+            colourise: bool | None = None,
+        ):
+        """init handler
+
+        Args:
+            stream (TextIO | None, optional): stream to write to. Defaults to None
+                ...meaning sys.stderr.
+            buffer_size (int, optional): number of characters that are buffered before
+                ...flushing when stream is not a TTY. Defaults to 64*1024.
+            flush_interval (float, optional): max. seconds a record stays in buffer
+                ...when stream is not a TTY. Defaults to 1.0.
+            colourise (bool | None, optional): colourise levels. Defaults to None
+                ...meaning colourise only if stream is a TTY.
+        """
+        super().__init__(stream if stream is not None else sys.stderr)
+        self.tty: bool = is_tty(self.stream)
+        self.buffer_size: int = buffer_size
+        self.flush_interval: float = flush_interval
+        self.colourise: bool = self.tty if colourise is None else colourise
+        self.shared_buffer: StreamBuffer | None = None
+        if not self.tty:
+            self.shared_buffer = get_stream_buffer(self.stream)
+            if flush_interval > 0:
+                self.shared_buffer.start_flusher(flush_interval)
+
+    @property
+    def backlog(self) -> int:
+        """return number of buffered characters of the stream that have not been written yet
+        """
+        return self.shared_buffer.chars if self.shared_buffer is not None else 0
+
+    def flush(self) -> None:
+        """write all buffered records of the stream
+        """
+        self.acquire()
+        try:
+            if self.stream:
+                if self.shared_buffer is not None:
+                    self.shared_buffer.write()
+                elif hasattr(self.stream, "flush"):
+                    self.stream.flush()
+        finally:
+            self.release()
+
+    def format(self, record: logging.LogRecord) -> str:
+        """format record and colourise it if wanted
+
+        Args:
+            record (logging.LogRecord): log record
+
+        Returns:
+            str: formatted record
+        """
+        msg: str = super().format(record)
+        if self.colourise:
+            prefix, suffix = LEVEL_COLOURS.get(record.levelno, _NO_COLOUR)
+            return prefix + msg + suffix
+        return msg
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """write record to stream (TTY) or shared buffer (no TTY)
+
+        Args:
+            record (logging.LogRecord): log record
+        """
+        try:
+            msg: str = self.format(record) + self.terminator
+            if self.shared_buffer is None:
+                self.stream.write(msg)
+                self.stream.flush()
+                return
+            self.shared_buffer.append(msg, self.buffer_size, force=record.levelno >= logging.ERROR)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        """write and release shared buffer, then close handler
+        """
+        self.acquire()
+        try:
+            shared_buffer: StreamBuffer | None = self.shared_buffer
+            self.shared_buffer = None
+        finally:
+            self.release()
+        try:
+            if shared_buffer is not None:
+                if self.stream:
+                    shared_buffer.write()
+                release_stream_buffer(shared_buffer)
+        finally:
+            super().close()
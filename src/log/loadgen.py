@@ -0,0 +1,449 @@
+"""
+Module to put loggers of configure_logger under reproducible load.
+- generate: threads log synthetic records at a configurable rate (None for unthrottled),
+  ...level mix and message sizes for a fixed duration
+- replay: records of an existing log file (e.g. log/app.log) are logged again with their
+  ...original level, logger name, message and timing (optionally sped up)
+- the records go through all filters and handlers of the logger (overload policy, queue, ...),
+  ...the report holds the achieved rate, the dropped records (shed by the overload policy or
+  ...failed in a handler) and percentiles of the latency of callers and of every handler
+- run via `python main.py --loadgen [--rate=<n>] ..` or `python main.py --replay=log/app.log`,
+  ...records are written to log/loadgen.log (see LOG_FILE) and the report to stdout as JSON
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import json
+import logging
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from array import array
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from src.vars.paths import ROOT
+from src.utils.cli_input_args import CLI
+from src.log import log
+from src.log import overload
+from src.log import queued as queued_handlers
+
+
+LOGGER_NAME: str = "loadgen"
+"""name of logger that is configured when run via main.py"""
+
+LOG_FILE: Path = ROOT / "log" / "loadgen.log"
+"""log file of logger that is configured when run via main.py (app.log is not touched)"""
+
+_LINE_PATTERN: re.Pattern = re.compile(
+    r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \[(\w+)\s*\] (\S+?)(?: \[[0-9a-f]+:[0-9a-f]+\])?: (.*)$"
+)
+"""first line of a record of the basic format, see src.log.log._get_basic_format:
+(asctime, levelname, name, message), the ids of the tracing span are skipped"""
+
+_PREBUILT_RECORDS: int = 1024
+"""number of (level, message) pairs every generator thread draws up front and cycles through"""
+
+
+class LoadReport(NamedTuple):
+    """report of a load run
+    """
+    mode: str
+    """generate or replay"""
+    records: int
+    """records passed to the logger"""
+    elapsed: float
+    """seconds from first record until all handlers wrote their records"""
+    target_rate: float | None
+    """wanted records/sec (None if unthrottled)"""
+    achieved_rate: float
+    """records/sec"""
+    shed: int
+    """records shed by the overload policy of the logger"""
+    failed: int
+    """records a handler failed to write (see logging.Handler.handleError)"""
+    dropped: int
+    """shed + failed"""
+    call_latency: dict[str, float]
+    """percentiles of seconds callers spent per record, see _percentiles"""
+    handler_latency: dict[str, dict[str, float]]
+    """percentiles of seconds spent per emit of every handler: {handler: percentiles}"""
+
+    def to_dict(self) -> dict[str, Any]:
+        """return report as JSON-serializable dict
+        """
+        return self._asdict()
+
+
+def parse_level_mix(spec: str) -> dict[int, float]:
+    """parse weights of levels, e.g. "DEBUG:10,INFO:60,WARNING:25,ERROR:5"
+
+    Args:
+        spec (str): comma-separated pairs of level name and weight
+
+    Raises:
+        ValueError: if spec holds an unknown level, a negative weight or no positive weight
+
+    Returns:
+        dict[int, float]: {level: weight}
+    """
+    mix: dict[int, float] = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition(":")
+        level: int | str = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Invalid level in level mix: '{name}'.")
+        mix[level] = float(weight) if weight else 1.0
+        if mix[level] < 0:
+            raise ValueError(f"Invalid weight in level mix: '{item}'.")
+    if not any(mix.values()):
+        raise ValueError(f"Level mix has no positive weight: '{spec}'.")
+    return mix
+
+
+def parse_sizes(spec: str) -> list[int]:
+    """parse message sizes, e.g. "64,256,1024"
+
+    Args:
+        spec (str): comma-separated sizes in characters
+
+    Raises:
+        ValueError: if a size is not a positive int
+
+    Returns:
+        list[int]: sizes
+    """
+    sizes: list[int] = [int(s) for s in spec.split(",")]
+    if not sizes or min(sizes) < 1:
+        raise ValueError(f"Invalid message sizes: '{spec}'.")
+    return sizes
+
+
+def _percentiles(samples: array) -> dict[str, float]:
+    """return count, p50, p99 and max of latency samples in seconds (0.0 if there are none)
+    """
+    if len(samples) < 2:
+        value: float = samples[0] if samples else 0.0
+        return {"count": len(samples), "p50": value, "p99": value, "max": value}
+    cuts: list[float] = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"count": len(samples), "p50": cuts[49], "p99": cuts[98], "max": max(samples)}
+
+
+class _HandlerProbe():
+    """measures latency and failures of all handlers of a logger (incl. handlers behind a queue)
+    - wraps emit and handleError of the handler instances, restored via close
+    - handlers emit under their lock, so every sample array is appended to by one thread at a time
+    """
+    def __init__(self, logger: logging.Logger):
+        """wrap all handlers of logger and remember the number of records shed so far
+
+        Args:
+            logger (logging.Logger): logger of configure_logger
+        """
+        self.logger: logging.Logger = logger
+        self.policy: overload.OverloadPolicy | None = next(
+            (f for f in logger.filters if isinstance(f, overload.OverloadPolicy)), None
+        )
+        self.shed_before: int = self.policy.total_shed if self.policy is not None else 0
+        self.samples: dict[str, array] = {}
+        self.failed: list[int] = [0]
+        self._restore: list[tuple[logging.Handler, dict[str, Any]]] = []
+        for handler in queued_handlers.iter_handlers(logger):
+            self._wrap(handler)
+
+    def _wrap(self, handler: logging.Handler) -> None:
+        """wrap emit and handleError of handler
+        """
+        label: str = type(handler).__name__
+        while label in self.samples:
+            label += "'"
+        samples: array = self.samples.setdefault(label, array("d"))
+        emit: Callable[[logging.LogRecord], None] = handler.emit
+        handle_error: Callable[[logging.LogRecord], None] = handler.handleError
+        clock: Callable[[], float] = time.perf_counter
+        failed: list[int] = self.failed
+
+        def timed_emit(record: logging.LogRecord) -> None:
+            start: float = clock()
+            emit(record)
+            samples.append(clock() - start)
+
+        def counted_handle_error(record: logging.LogRecord) -> None:
+            failed[0] += 1
+            handle_error(record)
+
+        self._restore.append((handler, {
+            name: handler.__dict__[name] for name in ("emit", "handleError") if name in handler.__dict__
+        }))
+        handler.emit = timed_emit
+        handler.handleError = counted_handle_error
+
+    @property
+    def shed(self) -> int:
+        """return number of records shed since init
+        """
+        return self.policy.total_shed - self.shed_before if self.policy is not None else 0
+
+    def close(self) -> None:
+        """restore wrapped methods of handlers
+        """
+        for handler, attrs in self._restore:
+            for name in ("emit", "handleError"):
+                if name in attrs:
+                    setattr(handler, name, attrs[name])
+                else:
+                    delattr(handler, name)
+        self._restore.clear()
+
+
+def _drain(logger: logging.Logger) -> None:
+    """wait until all handlers of logger wrote their records
+    - listeners of queued handlers are stopped (writing all queued records) and restarted
+    """
+    for h in logger.handlers:
+        if isinstance(h, queued_handlers.ListenerQueueHandler):
+            h.listener.stop()
+            h.listener.start()
+    for h in queued_handlers.iter_handlers(logger):
+        h.flush()
+
+
+def _report(
+        mode: str,
+        probe: _HandlerProbe,
+        records: int,
+        elapsed: float,
+        target_rate: float | None,
+        call_samples: array,
+    ) -> LoadReport:
+    """return report of finished run
+    """
+    shed: int = probe.shed
+    failed: int = probe.failed[0]
+    return LoadReport(
+        mode=mode,
+        records=records,
+        elapsed=elapsed,
+        target_rate=target_rate,
+        achieved_rate=records / elapsed if elapsed > 0 else 0.0,
+        shed=shed,
+        failed=failed,
+        dropped=shed + failed,
+        call_latency=_percentiles(call_samples),
+        handler_latency={label: _percentiles(s) for label, s in probe.samples.items()},
+    )
+
+
+def _generate_thread(
+        logger: logging.Logger,
+        prebuilt: list[tuple[int, str]],
+        start: float,
+        end: float,
+        interval: float,
+        samples: array,
+    ) -> None:
+    """log prebuilt records from start until end, one every interval seconds (0 for unthrottled)
+    - records that are behind schedule are logged at once, so the wanted rate is caught up on
+    """
+    clock: Callable[[], float] = time.perf_counter
+    log_ = logger.log
+    n: int = len(prebuilt)
+    i: int = 0
+    due: float = start
+    while (now := clock()) < end:
+        if interval:
+            if now < due:
+                time.sleep(due - now)
+            due += interval
+        level, msg = prebuilt[i % n]
+        t: float = clock()
+        log_(level, msg, i)
+        samples.append(clock() - t)
+        i += 1
+
+
+def generate(
+        logger: logging.Logger,
+        rate: float | None = None,
+        duration: float = 10.0,
+        threads: int = 1,
+        levels: dict[int, float] | None = None,
+        sizes: list[int] | None = None,
+        seed: int = 0,
+    ) -> LoadReport:
+    """log synthetic records via logger and report how its handlers kept up
+
+    Args:
+        logger (logging.Logger): logger of configure_logger
+        rate (float | None, optional): records/sec over all threads. Defaults to None
+            ...meaning unthrottled.
+        duration (float, optional): seconds to log. Defaults to 10.0.
+        threads (int, optional): number of logging threads. Defaults to 1.
+        levels (dict[int, float] | None, optional): {level: weight} of records, see
+            ...parse_level_mix. Defaults to None meaning CLI.load_levels.
+        sizes (list[int] | None, optional): message sizes in characters, chosen uniformly.
+            ...Defaults to None meaning CLI.load_sizes.
+        seed (int, optional): seed of the random choices, so runs are reproducible. Defaults to 0.
+
+    Raises:
+        ValueError: if threads is less than 1 or rate is not positive
+
+    Returns:
+        LoadReport: report
+    """
+    if threads < 1 or (rate is not None and rate <= 0):
+        raise ValueError(f"Invalid load: rate={rate}, threads={threads}.")
+    if levels is None:
+        levels = parse_level_mix(CLI.load_levels)
+    if sizes is None:
+        sizes = parse_sizes(CLI.load_sizes)
+    # formatted message is 'record <8 digits> xxx..' of passed size #
+    templates: dict[int, str] = {size: "record %08d " + "x" * max(size - 16, 0) for size in sizes}
+    interval: float = threads / rate if rate else 0.0
+
+    prebuilt: list[list[tuple[int, str]]] = []
+    for n in range(threads):
+        rng: random.Random = random.Random(seed + n)
+        prebuilt.append(list(zip(
+            rng.choices(list(levels), weights=list(levels.values()), k=_PREBUILT_RECORDS),
+            (templates[s] for s in rng.choices(sizes, k=_PREBUILT_RECORDS)),
+        )))
+    samples: list[array] = [array("d") for _ in range(threads)]
+
+    probe: _HandlerProbe = _HandlerProbe(logger)
+    try:
+        start: float = time.perf_counter()
+        # threads start with an offset, so throttled records are spread evenly #
+        workers: list[threading.Thread] = [
+            threading.Thread(
+                target=_generate_thread,
+                name=f"loadgen-{n}",
+                args=(
+                    logger, prebuilt[n], start + n * interval / threads, start + duration,
+                    interval, samples[n],
+                ),
+                daemon=True,
+            )
+            for n in range(threads)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        _drain(logger)
+        elapsed: float = time.perf_counter() - start
+    finally:
+        probe.close()
+    call_samples: array = array("d")
+    for s in samples:
+        call_samples.extend(s)
+    return _report("generate", probe, len(call_samples), elapsed, rate, call_samples)
+
+
+def iter_log_file(path: Path) -> Iterator[tuple[float, str, int, str]]:
+    """yield records of log file of the basic format, lines are read lazily
+    - lines that do not start a record (e.g. tracebacks) belong to the message of the record before
+    - lines before the first record are skipped
+
+    Args:
+        path (Path): log file
+
+    Yields:
+        Iterator[tuple[float, str, int, str]]: timestamp, logger name, level, message
+    """
+    current: list | None = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            match: re.Match | None = _LINE_PATTERN.match(line)
+            if match is None:
+                if current is not None:
+                    current[3] += "\n" + line
+                continue
+            if current is not None:
+                yield tuple(current)
+            asctime, levelname, name, msg = match.groups()
+            level: int | str = logging.getLevelName(levelname)
+            current = [
+                datetime.strptime(asctime, "%Y-%m-%d %H:%M:%S,%f").timestamp(),
+                name,
+                level if isinstance(level, int) else logging.INFO,
+                msg,
+            ]
+    if current is not None:
+        yield tuple(current)
+
+
+def replay(logger: logging.Logger, path: Path, speed: float = 1.0) -> LoadReport:
+    """log records of log file via logger with their original timing and report how its
+    handlers kept up
+    - records keep their logger name, level and message
+
+    Args:
+        logger (logging.Logger): logger of configure_logger
+        path (Path): log file of the basic format, e.g. log/app.log
+        speed (float, optional): factor by which the original timing is sped up,
+            ...0 for no delays. Defaults to 1.0.
+
+    Raises:
+        ValueError: if speed is negative
+
+    Returns:
+        LoadReport: report
+    """
+    if speed < 0:
+        raise ValueError(f"Invalid replay speed: {speed}.")
+    clock: Callable[[], float] = time.perf_counter
+    pathname: str = str(path)
+    samples: array = array("d")
+    first: float | None = None
+    last: float = 0.0
+
+    probe: _HandlerProbe = _HandlerProbe(logger)
+    try:
+        start: float = clock()
+        for lineno, (created, name, level, msg) in enumerate(iter_log_file(path), 1):
+            if first is None:
+                first = created
+            last = created
+            if speed:
+                delay: float = start + (created - first) / speed - clock()
+                if delay > 0:
+                    time.sleep(delay)
+            t: float = clock()
+            if logger.isEnabledFor(level):
+                logger.handle(logger.makeRecord(name, level, pathname, lineno, msg, (), None))
+            samples.append(clock() - t)
+        _drain(logger)
+        elapsed: float = clock() - start
+    finally:
+        probe.close()
+    target_rate: float | None = None
+    if speed and first is not None and last > first:
+        target_rate = len(samples) * speed / (last - first)
+    return _report("replay", probe, len(samples), elapsed, target_rate, samples)
+
+
+def run_from_cli() -> LoadReport:
+    """configure logger 'loadgen' and generate or replay records as set via cli input args,
+    write report to stdout as one JSON line
+
+    Returns:
+        LoadReport: report
+    """
+    logger: logging.Logger = log.configure_logger(logging.getLogger(LOGGER_NAME), fh_file_path=LOG_FILE)
+    if CLI.replay:
+        report: LoadReport = replay(logger, Path(CLI.replay), speed=CLI.replay_speed)
+    else:
+        report = generate(
+            logger,
+            rate=CLI.load_rate,
+            duration=CLI.load_duration,
+            threads=CLI.load_threads,
+        )
+    sys.stdout.write(json.dumps(report.to_dict()) + "\n")
+    sys.stdout.flush()
+    return report
@@ -5,13 +5,37 @@ module to handle logging
   - TODO: rework this structure - app should not break if any logger cannot find log.conf etc.
     - logging should be usable, but not custom logger
     - NOTE, this module should not include custom logging (for info, see main.py).
+- optional handlers and record types (buffered console, mmap file, compact records, overload policy)
+  ...are only imported if configure_logger uses them
 """
+import locale
 import logging
 import logging.handlers
 from pathlib import Path
 import re
+import threading
+from typing import TYPE_CHECKING
 
 from src.vars.paths import ROOT
+from src.utils.startup_profile import phase
+from src.utils import config
+from src.utils import metrics
+from src.utils import tracing
+from src.log import queued as queued_handlers
+
+if TYPE_CHECKING:
+    from src.log import overload
+
+
+LOG_RECORDS: metrics.Counter = metrics.counter(
+    "log_records_total", "records handled by the handlers of configured loggers", label="level"
+)
+LOG_BYTES: metrics.Counter = metrics.counter(
+    "log_bytes_written_total", "encoded bytes of formatted records incl. terminator", label="handler"
+)
+LOG_ROTATIONS: metrics.Counter = metrics.counter(
+    "log_rotations_total", "rollovers of rotating file handlers"
+)
 
 
 def _check_path_existence(path: Path):
@@ -31,6 +55,8 @@ def _check_path_existence(path: Path):
 def _get_log_level(log_conf_path: Path = ROOT / "src" / "log" / "log.conf") -> int:
     r"""return log level that is stored in file
     - pattern: "^log_level:\s*(\w+)$", e.g. "log_level: WARNING"
+    - configured loggers take their level from the config snapshot (see src.utils.config),
+      ...which merges log.conf with environment variables and cli input args
 
     Args:
         log_conf_path (Path, optional): Path to log.conf file. Defaults to ROOT/"src"/"log"/"log.conf".
@@ -42,27 +68,13 @@ def _get_log_level(log_conf_path: Path = ROOT / "src" / "log" / "log.conf") -> i
     Returns:
         int: log level
     """
-    _check_path_existence(log_conf_path)
-    with open(log_conf_path) as f:
-        content: str = f.read()
-
-    # Use regex to find the log level from the file content
-    pattern: str = r'^log_level:\s*(\w+)'
-    m: re.Match = re.search(pattern, content)
+    with phase("config I/O"):
+        _check_path_existence(log_conf_path)
+        values: dict[str, str] = config.read_conf(log_conf_path)
 
-    if m:
-        # Extract the log level string from the match
-        log_level_str: str = m.group(1)
+    if "log_level" in values:
         # Convert the log level string to the corresponding logging level integer
-        log_level = getattr(logging, log_level_str.upper(), None)
-
-        if isinstance(log_level, int):
-            return log_level
-        else:
-            raise ValueError(
-                f"Cannot configure logging. Invalid log level: '{log_level_str}'. "
-                f"Only levels from Python's 'logging' library are valid."
-            )
+        return config.parse_log_level(values["log_level"])
 
     raise ValueError(
         "Cannot configure logging. Log level cannot be determined from log.conf file."
@@ -97,7 +109,7 @@ def write_log_level(log_level: int) -> None:
     _check_path_existence(log_conf_path)
 
     # Read, modify, and overwrite the file content
-    with open(log_conf_path, mode='r+') as f:
+    with phase("config I/O"), open(log_conf_path, mode='r+') as f:
         # read content #
         content = f.read()
         # set pointer to file start #
@@ -111,29 +123,45 @@ def write_log_level(log_level: int) -> None:
         ))
         # truncate at the end #
         f.truncate()
+    # next configured logger compiles a snapshot with the new log level #
+    config.invalidate()
 
 
 def rotate_logs_of_all_rotating_file_handlers(logger: logging.Logger) -> None:
     """
     rotate log files of all RotatingFileHandlers of passed logger instance
-    - only if the file is not empty
+    - only if the file exists and is not empty
+    - incl. handlers behind a queue (see src.log.queued)
 
     Args:
         logger (logging.Logger): logger instance
     """
-    for h in logger.handlers:
-        if type(h) == logging.handlers.RotatingFileHandler \
-        and Path(h.baseFilename).stat().st_size != 0:
-            h.doRollover()
+    with phase("rotation"):
+        for h in queued_handlers.iter_handlers(logger):
+            if isinstance(h, logging.handlers.RotatingFileHandler) \
+            and Path(h.baseFilename).exists() \
+            and Path(h.baseFilename).stat().st_size != 0:
+                h.doRollover()
 
 
 def _get_basic_format() -> str:
-    """return basic logging format of program
+    """return basic logging format of program, i.e. log_format of the config snapshot
+    - %(trace)s holds the ids of the current tracing span, if any (see src.utils.tracing)
 
     Returns:
         str: basic logging format
     """
-    return '%(asctime)s [%(levelname)-8s] %(name)s: %(message)s'
+    return config.get().log_format
+
+
+def _get_basic_formatter() -> logging.Formatter:
+    """return formatter of basic logging format
+    - records that have not passed a TraceContextFilter are formatted without trace ids
+
+    Returns:
+        logging.Formatter: formatter
+    """
+    return logging.Formatter(_get_basic_format(), defaults={"trace": ""})
 
 
 def _get_configured_handler(
@@ -151,53 +179,242 @@ def _get_configured_handler(
     return handler
 
 
+class _RecordCounter(logging.Filter):
+    """handler filter that counts records per level and lets all records pass
+    - handler filters only see records that pass the level of the handler
+    - a record is counted once, even if several handlers handle it
+      ...(the handlers of a record are called one after another within one thread)
+    """
+
+    def __init__(self):
+        """init filter
+        """
+        super().__init__()
+        self._last: threading.local = threading.local()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """count record if it is not the last record counted by the current thread
+
+        Args:
+            record (logging.LogRecord): record
+
+        Returns:
+            bool: always True
+        """
+        if getattr(self._last, "record", None) is not record:
+            self._last.record = record
+            LOG_RECORDS.inc(1, record.levelname)
+        return True
+
+
+_count_record: _RecordCounter = _RecordCounter()
+"""filter of handlers of configured loggers that counts records per level"""
+
+
+def _get_encoding(handler: logging.Handler) -> tuple[str, str]:
+    """return encoding and error handling by which handler writes text
+
+    Args:
+        handler (logging.Handler): handler
+
+    Returns:
+        tuple[str, str]: (encoding, errors), e.g. ("utf-8", "strict")
+    """
+    encoding: str | None = getattr(handler, "encoding", None) \
+        or getattr(getattr(handler, "stream", None), "encoding", None)
+    if encoding is None or encoding == "locale":
+        encoding = locale.getpreferredencoding(False)
+    return encoding, getattr(handler, "errors", None) or "strict"
+
+
+def _instrument_handler(handler: logging.Handler) -> logging.Handler:
+    """count written bytes (and rollovers of rotating file handlers) of handler in metrics
+    - wrap format of handler, which is called once per emit
+      ...(rotating file handlers also format in shouldRollover, which is not counted)
+    - messages are only encoded for counting if they are not ASCII or the encoding is not ASCII-compatible
+
+    Args:
+        handler (logging.Handler): handler
+
+    Returns:
+        logging.Handler: same handler
+    """
+    fmt = handler.format
+    label: str = type(handler).__name__
+    encoding, errors = _get_encoding(handler)
+    ascii_compatible: bool = "a".encode(encoding) == b"a"
+    terminator_len: int = len(getattr(handler, "terminator", "").encode(encoding, errors))
+    # handlers emit under their lock, so a flag per handler is sufficient #
+    counting: list[bool] = [True]
+
+    def counted_format(record: logging.LogRecord) -> str:
+        msg: str = fmt(record)
+        if counting[0]:
+            n: int = len(msg) if ascii_compatible and msg.isascii() else len(msg.encode(encoding, errors))
+            LOG_BYTES.inc(n + terminator_len, label)
+        return msg
+
+    handler.format = counted_format
+
+    if isinstance(handler, logging.handlers.RotatingFileHandler):
+        should_rollover = handler.shouldRollover
+
+        def uncounted_should_rollover(record: logging.LogRecord) -> bool:
+            counting[0] = False
+            try:
+                return should_rollover(record)
+            finally:
+                counting[0] = True
+
+        def counted_rollover() -> None:
+            # look up method on class, so it can still be patched #
+            type(handler).doRollover(handler)
+            LOG_ROTATIONS.inc()
+
+        handler.shouldRollover = uncounted_should_rollover
+        handler.doRollover = counted_rollover
+    return handler
+
+
 def configure_logger(
         logger: logging.Logger,
         ch_level: int = -1,
-        ch_formatter: logging.Formatter = logging.Formatter(_get_basic_format()),
+        ch_formatter: logging.Formatter | None = None,
         fh_level: int = -1,
-        fh_formatter: logging.Formatter = logging.Formatter(_get_basic_format()),
-        fh_file_path: Path = ROOT / "log" / "app.log",
+        fh_formatter: logging.Formatter | None = None,
+        fh_file_path: Path | None = None,
         propagate: bool = False,
+        ch_buffered: bool | None = None,
+        overload_policy: "overload.OverloadPolicy | None" = None,
+        queued: bool | None = None,
+        compact_records: bool | None = None,
+        fh_mmap: bool | None = None,
     ) -> logging.Logger:
     """configure logger object
+    - defaults are taken from the config snapshot (see src.utils.config), which merges
+      ...log.conf, environment variables and cli input args once per process
 
     Args:
         logger (logging.Logger): logger
         ch_level (int): log level for console handler (ch). Defaults to -1
-            ...indicating that default value from log.conf should be used.
-        ch_formatter (logging.Formatter): formatter for console handler (ch). Defaults to 
-            ...logging.Formaterr using interal default format
+            ...indicating that log_level of the config snapshot should be used.
+        ch_formatter (logging.Formatter | None): formatter for console handler (ch). Defaults to None
+            ...indicating a logging.Formatter using log_format of the config snapshot.
         fh_level (int): log level for file handler (fh). Defaults to -1
-            ...indicating that default value from log.conf should be used.
-        fh_formatter (logging.Formatter): formatter for file handler (fh). Defaults to 
-            ...logging.Formaterr using interal default format
-        fh_file_path (Path): path to log file. Defaults to project's log.conf file path.
+            ...indicating that log_level of the config snapshot should be used.
+        fh_formatter (logging.Formatter | None): formatter for file handler (fh). Defaults to None
+            ...indicating a logging.Formatter using log_format of the config snapshot.
+        fh_file_path (Path | None): path to log file. Defaults to None
+            ...indicating that log_file of the config snapshot should be used.
         propagate (bool): decides if logs should be propoagated to root logger. Defaults to False.
+        ch_buffered (bool | None): use a BufferedConsoleHandler instead of a StreamHandler, which
+            ...buffers its output if stderr is not a TTY. Defaults to None
+            ...indicating that buffered_console of the config snapshot should be used.
+        overload_policy (overload.OverloadPolicy | None): policy that sheds low-severity records
+            ...while handlers are overloaded. Defaults to None indicating that the process-wide
+            ...overload.DEFAULT_POLICY is used if shed_on_overload of the config snapshot is set.
+        queued (bool | None): move handlers behind a queue, so logging never blocks the caller
+            ...(see src.log.queued). Defaults to None indicating that run_async of the
+            ...config snapshot should be used.
+        compact_records (bool | None): let logger create compact, slot-based records that only
+            ...hold the fields the formatters need, stock formatters are replaced by equivalent
+            ...CompactFormatters (see src.log.record). Defaults to None indicating that
+            ...compact_records of the config snapshot should be used.
+        fh_mmap (bool | None): use a MmapRotatingFileHandler instead of a RotatingFileHandler,
+            ...which writes into memory-mapped segments of maxBytes (see src.log.mmap_handler).
+            ...Defaults to None indicating that mmap_log of the config snapshot should be used.
 
     Returns:
         logging.Logger: configured logger object
     """
+    cfg: config.Config = config.get()
+
     # Check if default log level should be used #
     if ch_level == -1:
-        ch_level = _get_log_level()
+        ch_level = cfg.log_level
     if fh_level == -1:
-        fh_level = _get_log_level()
-
-    # Ensure the logger does not propagate messages to the root logger
-    logger.propagate = propagate
-
-    # add console handler #
-    logger.addHandler(_get_configured_handler(logging.StreamHandler(), ch_level, ch_formatter))
-
-    # add rotating file handler #
-    rotating_fh: logging.handlers.RotatingFileHandler = logging.handlers.RotatingFileHandler(
-            fh_file_path,
-            mode="a",
-            maxBytes=100*1024*1024,
-            backupCount=10,
-    )
-    logger.addHandler(_get_configured_handler(rotating_fh, fh_level, fh_formatter))
+        fh_level = cfg.log_level
+
+    if ch_formatter is None:
+        ch_formatter = _get_basic_formatter()
+    if fh_formatter is None:
+        fh_formatter = _get_basic_formatter()
+    if fh_file_path is None:
+        fh_file_path = cfg.log_file
+    if ch_buffered is None:
+        ch_buffered = cfg.buffered_console
+    if queued is None:
+        queued = cfg.run_async
+    if compact_records is None:
+        compact_records = cfg.compact_records
+    if fh_mmap is None:
+        fh_mmap = cfg.mmap_log
+
+    with phase("handler creation"):
+        # Ensure the logger does not propagate messages to the root logger
+        logger.propagate = propagate
+
+        # add console handler #
+        if ch_buffered:
+            from src.log.buffered_console import BufferedConsoleHandler
+            ch: logging.StreamHandler = BufferedConsoleHandler()
+        else:
+            ch = logging.StreamHandler()
+        logger.addHandler(_get_configured_handler(ch, ch_level, ch_formatter))
+
+        # add rotating file handler #
+        # (log file is opened on first emit, so loggers that never log do not touch it) #
+        if fh_mmap:
+            from src.log.mmap_handler import MmapRotatingFileHandler
+            fh_class: type[logging.handlers.RotatingFileHandler] = MmapRotatingFileHandler
+        else:
+            fh_class = logging.handlers.RotatingFileHandler
+        rotating_fh: logging.handlers.RotatingFileHandler = fh_class(
+                fh_file_path,
+                mode="a",
+                maxBytes=cfg.log_max_bytes,
+                backupCount=cfg.log_backup_count,
+                delay=True,
+        )
+        logger.addHandler(_get_configured_handler(rotating_fh, fh_level, fh_formatter))
+
+        # create compact records (before handlers are moved behind a queue) #
+        if compact_records:
+            from src.log import record as log_record
+            for h in (ch, rotating_fh):
+                h.setFormatter(log_record.compact_formatter(h.formatter))
+            log_record.install(logger, log_record.required_fields((ch.formatter, rotating_fh.formatter)))
+
+        # count written bytes and rollovers #
+        _instrument_handler(ch)
+        _instrument_handler(rotating_fh)
+
+        # inject ids of current tracing span into records #
+        ch.addFilter(tracing.TRACE_CONTEXT_FILTER)
+        rotating_fh.addFilter(tracing.TRACE_CONTEXT_FILTER)
+
+        # move handlers behind a queue #
+        # (ids are injected before records are queued, as the span is bound to the caller) #
+        if queued:
+            queued_handlers.enqueue_handlers(logger)
+            for h in logger.handlers:
+                if isinstance(h, queued_handlers.ListenerQueueHandler):
+                    h.addFilter(tracing.TRACE_CONTEXT_FILTER)
+                    if compact_records:
+                        # formats the message before it is queued #
+                        h.setFormatter(log_record.CompactFormatter())
+
+        # install overload policy #
+        if overload_policy is None and cfg.shed_on_overload:
+            from src.log import overload
+            overload_policy = overload.DEFAULT_POLICY
+        if overload_policy is not None:
+            overload_policy.install(logger)
+
+        # count records per level after the level check of handlers #
+        # (the overload policy filters on the logger, so shed records are not counted) #
+        ch.addFilter(_count_record)
+        rotating_fh.addFilter(_count_record)
 
     # return configured logger #
     return logger
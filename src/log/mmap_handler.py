@@ -0,0 +1,287 @@
+"""
+Module that provides a rotating file handler that writes via a memory-mapped file.
+- the log file is a segment of fixed size (maxBytes) that is preallocated when it is opened,
+  ...records are copied into the mapped region, so writing a record needs no syscall
+- rotation switches to a new segment: the current one is truncated to its records and
+  ...renamed like by RotatingFileHandler, then the next one is preallocated
+- on close, the tail of the segment is truncated, so closed log files hold records only
+- while the handler is open, the file has the size of the segment and ends with NUL bytes
+  ...(readers like `tail -f` see them), after a crash they are skipped when the file is reopened
+- all handlers of the same file within the process share its segment (e.g. the handlers of
+  ...the loggers of configure_logger), a file must not be written by several processes
+- records are visible to other processes as soon as they are copied (page cache),
+  ...they reach the disk when the kernel writes back the pages or on close
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import locale
+import logging
+import logging.handlers
+import mmap
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+
+DEFAULT_SEGMENT_SIZE: int = 1024 * 1024
+"""bytes of a segment if there is no maxBytes, a full segment grows by this size"""
+
+_SCAN_BLOCK: int = 64 * 1024
+"""bytes that are scanned at once for the end of the records of a reopened segment"""
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """allocate size bytes of file on disk, extend the file with NUL bytes if necessary
+    - falls back to ftruncate (sparse file) where posix_fallocate is not available
+    """
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+
+
+def _find_end(mm: mmap.mmap, size: int) -> int:
+    """return end of records of segment, i.e. position after the last byte that is not NUL
+    """
+    end: int = size
+    while end > 0:
+        start: int = max(end - _SCAN_BLOCK, 0)
+        block: bytes = mm[start:end].rstrip(b"\0")
+        if block:
+            return start + len(block)
+        end = start
+    return 0
+
+
+class Segment():
+    """memory-mapped log file, used as stream of MmapRotatingFileHandler
+    - shared by all handlers of the same file within the process (see open_segment),
+      ...writes and rotations are serialized via lock
+    """
+    def __init__(self, path: Path, mode: str = "a", size: int = DEFAULT_SEGMENT_SIZE):
+        """open file, preallocate it to size (at least its current size) and map it
+
+        Args:
+            path (Path): log file
+            mode (str, optional): "a" to append to existing records, "w" to truncate them.
+                ...Defaults to "a".
+            size (int, optional): bytes of segment. Defaults to DEFAULT_SEGMENT_SIZE.
+        """
+        self.path: Path = path
+        self.size: int = max(size, 1)
+        self.lock: threading.RLock = threading.RLock()
+        self.refs: int = 1
+        """number of handlers that use segment"""
+        self._map("w" in mode)
+
+    def _map(self, truncate: bool = False) -> None:
+        """open file, preallocate and map it, find end of records
+        """
+        flags: int = os.O_RDWR | os.O_CREAT | (os.O_TRUNC if truncate else 0)
+        self._fd: int = os.open(self.path, flags, 0o644)
+        try:
+            existing: int = os.fstat(self._fd).st_size
+            self.capacity: int = max(existing, self.size)
+            _preallocate(self._fd, self.capacity)
+            self._mm: mmap.mmap = mmap.mmap(self._fd, self.capacity)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self.pos: int = _find_end(self._mm, existing)
+        """end of records"""
+
+    def _unmap(self) -> None:
+        """unmap segment and truncate its tail, i.e. file holds the records only
+        """
+        self._mm.close()
+        try:
+            os.ftruncate(self._fd, self.pos)
+        finally:
+            os.close(self._fd)
+
+    @property
+    def closed(self) -> bool:
+        """return whether segment is closed
+        """
+        return self._mm.closed
+
+    def write(self, data: bytes) -> None:
+        """copy data behind the records, grow segment if it is full
+        - caller must hold the lock
+
+        Args:
+            data (bytes): encoded record incl. terminator
+        """
+        end: int = self.pos + len(data)
+        if end > self.capacity:
+            self.capacity = max(end, self.capacity + self.size)
+            self._mm.resize(self.capacity)
+        self._mm[self.pos:end] = data
+        self.pos = end
+
+    def rotate(self, rename: Callable[[], None]) -> None:
+        """switch to a new segment: truncate the current one, rename files and map a new one
+
+        Args:
+            rename (Callable[[], None]): function that renames the current file and its backups
+        """
+        with self.lock:
+            self._unmap()
+            try:
+                rename()
+            finally:
+                self._map()
+
+    def flush(self) -> None:
+        """do nothing: records are visible to other processes as soon as they are written
+        """
+
+    def sync(self) -> None:
+        """write records to disk (msync)
+        """
+        with self.lock:
+            self._mm.flush()
+
+    def close(self) -> None:
+        """release segment, the last handler that releases it unmaps it and truncates its tail
+        """
+        with _SEGMENTS_LOCK:
+            self.refs -= 1
+            if self.refs > 0 or self._mm.closed:
+                return
+            if _SEGMENTS.get(str(self.path)) is self:
+                del _SEGMENTS[str(self.path)]
+        with self.lock:
+            self._unmap()
+
+
+_SEGMENTS: dict[str, Segment] = {}
+"""open segments: {absolute path: segment}"""
+
+_SEGMENTS_LOCK: threading.Lock = threading.Lock()
+
+
+def open_segment(path: Path, mode: str = "a", size: int = DEFAULT_SEGMENT_SIZE) -> Segment:
+    """return open segment of file if there is one, else open it
+    - loggers of configure_logger have a handler each, but write to the same file
+
+    Args:
+        path (Path): absolute path of log file
+        mode (str, optional): mode, see Segment. Defaults to "a".
+        size (int, optional): bytes of segment. Defaults to DEFAULT_SEGMENT_SIZE.
+
+    Returns:
+        Segment: segment, close it once it is not used anymore
+    """
+    with _SEGMENTS_LOCK:
+        segment: Segment | None = _SEGMENTS.get(str(path))
+        if segment is not None:
+            segment.refs += 1
+            return segment
+        segment = _SEGMENTS[str(path)] = Segment(path, mode, size)
+        return segment
+
+
+class MmapRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that writes records into preallocated, memory-mapped segments
+    - same arguments and rotation scheme as RotatingFileHandler (backups .1 .. .backupCount)
+    - maxBytes is the size of a segment, DEFAULT_SEGMENT_SIZE if it is 0 (no rotation)
+    - as documented for RotatingFileHandler, there is no rotation if backupCount is 0,
+      ...a full segment grows by maxBytes then (instead of being remapped for every record)
+    """
+    terminator: str = "\n"
+
+    def __init__(
+            self,
+            filename: str | os.PathLike,
+            mode: str = "a",
+            maxBytes: int = 0,
+            backupCount: int = 0,
+            encoding: str | None = None,
+            delay: bool = False,
+            errors: str | None = None,
+        ):
+        """init handler, see logging.handlers.RotatingFileHandler
+        """
+        self._pending: int = 0
+        # segment is opened once maxBytes is set #
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, True, errors)
+        self.delay = delay
+        codec: str = self.encoding or "utf-8"
+        self._codec: str = locale.getpreferredencoding(False) if codec == "locale" else codec
+        if not delay:
+            self.stream = self._open()
+
+    def _open(self) -> Segment:
+        """open segment of log file
+
+        Returns:
+            Segment: segment, used as stream of handler
+        """
+        return open_segment(Path(self.baseFilename), self.mode, self.maxBytes or DEFAULT_SEGMENT_SIZE)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """return whether the record that is being emitted does not fit into the current segment
+        - unlike RotatingFileHandler, the record is not formatted again (see emit)
+        - never if maxBytes or backupCount is 0, as there is nothing to rotate to
+
+        Args:
+            record (logging.LogRecord): record
+
+        Returns:
+            bool: True if segment is full
+        """
+        if self.maxBytes <= 0 or self.backupCount <= 0 or self.stream is None:
+            return False
+        return self.stream.pos > 0 and self.stream.pos + self._pending > self.maxBytes
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """format record and copy it into the current segment, rotate before if it is full
+
+        Args:
+            record (logging.LogRecord): record
+        """
+        try:
+            msg: str = self.format(record) + self.terminator
+            data: bytes = msg.encode(self._codec, self.errors or "strict")
+            if self.stream is None:
+                if self.mode == "w" and self._closed:
+                    return
+                self.stream = self._open()
+            segment: Segment = self.stream
+            with segment.lock:
+                self._pending = len(data)
+                if self.shouldRollover(record):
+                    self.doRollover()
+                segment.write(data)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _rename_files(self) -> None:
+        """rename log file and its backups, same as RotatingFileHandler.doRollover
+        """
+        if self.backupCount <= 0:
+            return
+        for i in range(self.backupCount - 1, 0, -1):
+            sfn: str = self.rotation_filename(f"{self.baseFilename}.{i}")
+            dfn: str = self.rotation_filename(f"{self.baseFilename}.{i + 1}")
+            if os.path.exists(sfn):
+                if os.path.exists(dfn):
+                    os.remove(dfn)
+                os.rename(sfn, dfn)
+        dfn = self.rotation_filename(f"{self.baseFilename}.1")
+        if os.path.exists(dfn):
+            os.remove(dfn)
+        self.rotate(self.baseFilename, dfn)
+
+    def doRollover(self) -> None:
+        """rotate log file, i.e. switch segment of all handlers of the file
+        - if the file is not open (e.g. rotation at startup), it is only renamed
+        """
+        if self.stream is None:
+            self._rename_files()
+        else:
+            self.stream.rotate(self._rename_files)
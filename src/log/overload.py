@@ -0,0 +1,289 @@
+"""
+module that provides an overload policy for logging
+- the policy watches latency and backlog of handlers (of the handlers behind a queue, see src.log.queued)
+  ...and the depth of the queue in records (see watch_queue)
+- under pressure, it temporarily sheds lower-severity records (DEBUG first, then INFO, ...)
+  - ERROR and CRITICAL records are never shed
+- once pressure drops, normal levels are restored step by step
+- the number of records shed by DEFAULT_POLICY is logged at program end
+  ...(registered when a policy sheds its first record, see exception_handling)
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import logging
+import logging.handlers
+import threading
+import time
+from collections.abc import Callable
+
+from src.log import queued as queued_handlers
+
+
+SHED_LEVELS: tuple[int, ...] = (logging.NOTSET, logging.DEBUG, logging.INFO, logging.WARNING)
+"""escalation steps of shedding, records with levelno <= step get shed"""
+
+
+def get_backlog(handler: logging.Handler) -> int:
+    """return backlog of handler, i.e. number of pending items (0 if unknown)
+    - handlers with a `backlog` attribute (e.g. BufferedConsoleHandler)
+    - handlers with a `queue` (e.g. QueueHandler)
+
+    Args:
+        handler (logging.Handler): handler
+
+    Returns:
+        int: backlog
+    """
+    backlog = getattr(handler, "backlog", None)
+    if isinstance(backlog, int):
+        return backlog
+    queue = getattr(handler, "queue", None)
+    if queue is not None and hasattr(queue, "qsize"):
+        try:
+            return queue.qsize()
+        except NotImplementedError:
+            return 0
+    return 0
+
+
+class OverloadPolicy(logging.Filter):
+    """logger filter that sheds low-severity records while handlers are overloaded
+    """
+    def __init__(
+            self,
+            latency_high: float = 0.005,
+            latency_low: float = 0.001,
+            backlog_high: int = 48*1024,
+            backlog_low: int = 8*1024,
+            queue_high: int = 10_000,
+            queue_low: int = 1_000,
+            max_shed_level: int = logging.INFO,
+            cooldown: float = 1.0,
+            smoothing: float = 0.2,
+        ):
+        """init policy
+
+        Args:
+            latency_high (float, optional): smoothed handler latency in seconds above which
+                ...shedding escalates. Defaults to 0.005.
+            latency_low (float, optional): smoothed handler latency in seconds below which
+                ...shedding is relaxed. Defaults to 0.001.
+            backlog_high (int, optional): handler backlog (e.g. buffered characters) above which
+                ...shedding escalates, below the buffer size of BufferedConsoleHandler, which
+                ...flushes at 64 KiB. Defaults to 48*1024.
+            backlog_low (int, optional): handler backlog below which shedding is relaxed.
+                ...Defaults to 8*1024.
+            queue_high (int, optional): number of queued records above which shedding escalates.
+                ...Defaults to 10_000.
+            queue_low (int, optional): number of queued records below which shedding is relaxed.
+                ...Defaults to 1_000.
+            max_shed_level (int, optional): highest level that may be shed, at most WARNING.
+                ...Defaults to logging.INFO.
+            cooldown (float, optional): min. seconds between two level changes. Defaults to 1.0.
+            smoothing (float, optional): weight of the newest latency sample in the
+                ...exponentially weighted moving average. Defaults to 0.2.
+
+        Raises:
+            ValueError: if max_shed_level is not one of DEBUG, INFO, WARNING
+        """
+        super().__init__()
+        if max_shed_level not in SHED_LEVELS[1:]:
+            raise ValueError(
+                f"Invalid max_shed_level: {max_shed_level}. "
+                f"Only DEBUG, INFO and WARNING records can be shed."
+            )
+        self.latency_high: float = latency_high
+        self.latency_low: float = latency_low
+        self.backlog_high: int = backlog_high
+        self.backlog_low: int = backlog_low
+        self.queue_high: int = queue_high
+        self.queue_low: int = queue_low
+        self.queue_depth: int = 0
+        """number of queued records, last seen by watch_queue"""
+        self.max_step: int = SHED_LEVELS.index(max_shed_level)
+        self.cooldown: float = cooldown
+        self.smoothing: float = smoothing
+        self.latency: float = 0.0
+        self.shed_counts: dict[int, int] = {level: 0 for level in SHED_LEVELS[1:]}
+        self._step: int = 0
+        self._shed_level: int = SHED_LEVELS[0]
+        self._last_change: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def shed_level(self) -> int:
+        """return level up to which records are currently shed (NOTSET if none)
+        """
+        return self._shed_level
+
+    @property
+    def total_shed(self) -> int:
+        """return total number of shed records
+        """
+        return sum(self.shed_counts.values())
+
+    def get_shed_counts(self) -> dict[str, int]:
+        """return number of shed records per level name
+
+        Returns:
+            dict[str, int]: {level name: number of shed records}
+        """
+        return {logging.getLevelName(level): n for level, n in self.shed_counts.items()}
+
+    def _change_step(self, delta: int, now: float) -> None:
+        """escalate (delta > 0) or relax (delta < 0) shedding by one step
+        - caller must hold the lock
+
+        Args:
+            delta (int): +1 or -1
+            now (float): current monotonic time
+        """
+        step: int = min(max(self._step + delta, 0), self.max_step)
+        if step != self._step:
+            self._step = step
+            self._shed_level = SHED_LEVELS[step]
+            self._last_change = now
+
+    def observe(self, latency: float, backlog: int = 0) -> None:
+        """feed a handler latency sample and its current backlog into the policy
+
+        Args:
+            latency (float): seconds a handler needed to emit a record
+            backlog (int, optional): backlog of handler. Defaults to 0.
+        """
+        with self._lock:
+            self.latency += self.smoothing * (latency - self.latency)
+            now: float = time.monotonic()
+            if now - self._last_change < self.cooldown:
+                return
+            if self.latency > self.latency_high or backlog > self.backlog_high \
+            or self.queue_depth > self.queue_high:
+                self._change_step(+1, now)
+            elif self.latency < self.latency_low and backlog < self.backlog_low \
+            and self.queue_depth < self.queue_low:
+                self._change_step(-1, now)
+
+    def observe_queue(self, depth: int) -> None:
+        """feed the number of queued records into the policy
+        - a backed-up queue escalates shedding, relaxing is left to observe (handler latency)
+
+        Args:
+            depth (int): number of queued records
+        """
+        with self._lock:
+            self.queue_depth = depth
+            now: float = time.monotonic()
+            if depth > self.queue_high and now - self._last_change >= self.cooldown:
+                self._change_step(+1, now)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """decide whether record is passed on to handlers
+
+        Args:
+            record (logging.LogRecord): log record
+
+        Returns:
+            bool: False if record gets shed
+        """
+        if record.levelno > self._shed_level:
+            return True
+        with self._lock:
+            # shed records are not observed by handlers, so relax once cooldown passed #
+            # (if pressure persists, the next observed samples escalate again) #
+            now: float = time.monotonic()
+            if now - self._last_change >= self.cooldown:
+                self.latency *= 1 - self.smoothing
+                if self.latency < self.latency_low:
+                    self._change_step(-1, now)
+            if record.levelno > self._shed_level:
+                return True
+            self.shed_counts[record.levelno] = self.shed_counts.get(record.levelno, 0) + 1
+        if not _SUMMARY_REGISTERED:
+            _register_summary()
+        return False
+
+    def watch(self, handler: logging.Handler) -> logging.Handler:
+        """let policy observe latency and backlog of handler
+        - wraps emit of handler instance
+
+        Args:
+            handler (logging.Handler): handler
+
+        Returns:
+            logging.Handler: same handler
+        """
+        emit: Callable[[logging.LogRecord], None] = handler.emit
+        clock: Callable[[], float] = time.perf_counter
+
+        def observed_emit(record: logging.LogRecord) -> None:
+            start: float = clock()
+            emit(record)
+            self.observe(clock() - start, get_backlog(handler))
+
+        handler.emit = observed_emit
+        return handler
+
+    def watch_queue(self, handler: logging.handlers.QueueHandler) -> logging.handlers.QueueHandler:
+        """let policy observe the number of records in the queue of handler after every enqueue
+        - wraps emit of handler instance, its latency is not observed (it only enqueues)
+
+        Args:
+            handler (logging.handlers.QueueHandler): handler
+
+        Returns:
+            logging.handlers.QueueHandler: same handler
+        """
+        emit: Callable[[logging.LogRecord], None] = handler.emit
+
+        def observed_emit(record: logging.LogRecord) -> None:
+            emit(record)
+            self.observe_queue(get_backlog(handler))
+
+        handler.emit = observed_emit
+        return handler
+
+    def install(self, logger: logging.Logger) -> logging.Logger:
+        """install policy as filter of logger and watch all its handlers
+        - handlers behind a queue are watched for latency and backlog, the queue handler
+          ...for the number of queued records (see watch_queue)
+
+        Args:
+            logger (logging.Logger): logger
+
+        Returns:
+            logging.Logger: same logger
+        """
+        logger.addFilter(self)
+        for handler in logger.handlers:
+            if isinstance(handler, queued_handlers.ListenerQueueHandler):
+                self.watch_queue(handler)
+        for handler in queued_handlers.iter_handlers(logger):
+            self.watch(handler)
+        return logger
+
+
+DEFAULT_POLICY: OverloadPolicy = OverloadPolicy()
+"""process-wide policy which is shared by all loggers of configure_logger"""
+
+_SUMMARY_REGISTERED: bool = False
+"""get_summary was registered to be logged at program end"""
+
+
+def get_summary() -> str | None:
+    """return number of records shed by DEFAULT_POLICY, None if none were shed
+
+    Returns:
+        str | None: summary
+    """
+    if DEFAULT_POLICY.total_shed:
+        return f"Records shed due to logging overload (per level): {DEFAULT_POLICY.get_shed_counts()}"
+    return None
+
+
+def _register_summary() -> None:
+    """register get_summary to be logged at program end
+    - imported here, as exception_handling configures its logger via this module
+    """
+    global _SUMMARY_REGISTERED
+    from src.utils import exception_handling as exc
+    exc.register_summary(get_summary)
+    _SUMMARY_REGISTERED = True
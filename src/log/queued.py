@@ -0,0 +1,103 @@
+"""
+module that moves the handlers of a logger behind a queue
+- the logger only keeps a QueueHandler, whose emit puts the record into an unbounded queue
+  ...and never blocks (e.g. the event loop of asyncio)
+- a QueueListener thread per logger passes the records on to the original handlers,
+  ...each handler keeps its own level
+- listeners are stopped (i.e. all queued records are written) at interpreter exit or via stop_all
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+from collections.abc import Iterator
+
+
+class ListenerQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that owns the QueueListener which drains its queue
+    """
+    def __init__(self, handlers: list[logging.Handler]):
+        """init handler and start listener that passes records on to handlers
+
+        Args:
+            handlers (list[logging.Handler]): handlers that write the records
+        """
+        super().__init__(queue.SimpleQueue())
+        self.listener: logging.handlers.QueueListener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        LISTENERS.append(self.listener)
+
+    @property
+    def handlers(self) -> tuple[logging.Handler, ...]:
+        """handlers behind the queue
+        """
+        return self.listener.handlers
+
+    def close(self) -> None:
+        """stop listener, i.e. write all queued records, and close handlers behind the queue
+        """
+        _stop(self.listener)
+        for h in self.handlers:
+            h.close()
+        super().close()
+
+
+LISTENERS: list[logging.handlers.QueueListener] = []
+"""all running listeners"""
+
+
+def _stop(listener: logging.handlers.QueueListener) -> None:
+    """stop listener if it is running
+
+    Args:
+        listener (logging.handlers.QueueListener): listener
+    """
+    if listener in LISTENERS:
+        LISTENERS.remove(listener)
+        listener.stop()
+
+
+def enqueue_handlers(logger: logging.Logger) -> logging.Logger:
+    """move all handlers of logger behind a ListenerQueueHandler
+
+    Args:
+        logger (logging.Logger): logger
+
+    Returns:
+        logging.Logger: same logger
+    """
+    handlers: list[logging.Handler] = list(logger.handlers)
+    if not handlers or any(isinstance(h, ListenerQueueHandler) for h in handlers):
+        return logger
+    for h in handlers:
+        logger.removeHandler(h)
+    logger.addHandler(ListenerQueueHandler(handlers))
+    return logger
+
+
+def iter_handlers(logger: logging.Logger) -> Iterator[logging.Handler]:
+    """yield handlers of logger, handlers behind a queue instead of the queue handler
+
+    Args:
+        logger (logging.Logger): logger
+
+    Yields:
+        Iterator[logging.Handler]: handler
+    """
+    for h in logger.handlers:
+        if isinstance(h, ListenerQueueHandler):
+            yield from h.handlers
+        else:
+            yield h
+
+
+@atexit.register
+def stop_all() -> None:
+    """stop all listeners, i.e. write all queued records
+    - registered to run at interpreter exit (before logging flushes and closes all handlers)
+    """
+    for listener in list(LISTENERS):
+        _stop(listener)
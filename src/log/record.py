@@ -0,0 +1,337 @@
+"""
+Module that provides compact log records for loggers of configure_logger.
+- CompactLogRecord stores its fields in slots instead of an instance dict
+- fields that are expensive to compute (e.g. thread and process names) are only populated if a
+  ...formatter of the logger needs them (see required_fields), fields derived from the path
+  ...(filename, module) and relativeCreated are computed lazily if they are accessed anyway
+- records stay compatible with stock code: they are LogRecords, expose their fields via __dict__
+  ...(e.g. for Formatter and SocketHandler) and are pickled as stock LogRecords
+- CompactFormatter formats records without building a dict of their fields (see compact_formatter)
+- records are created by the logger itself (see install), the process-wide record factory
+  ...(logging.setLogRecordFactory) is not touched, so third-party loggers are not affected
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import collections.abc
+import logging
+import operator
+import os
+import re
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+CORE_FIELDS: tuple[str, ...] = (
+    "name", "msg", "args", "levelname", "levelno", "pathname", "lineno", "funcName",
+    "exc_info", "exc_text", "stack_info", "created", "msecs",
+)
+"""fields that are populated for every record (they are cheap or needed by every formatter)"""
+
+OPTIONAL_FIELDS: tuple[str, ...] = (
+    "filename", "module", "relativeCreated", "thread", "threadName", "process", "processName",
+    "taskName",
+)
+"""fields that are only populated if a formatter needs them"""
+
+_SET_LATER_FIELDS: tuple[str, ...] = ("message", "asctime", "trace", "trace_id", "span_id")
+"""fields that are set after creation, by formatters and filters (e.g. TraceContextFilter)"""
+
+_DERIVED_FIELDS: dict[str, Callable[[logging.LogRecord], Any]] = {
+    "filename": lambda r: os.path.basename(r.pathname),
+    "module": lambda r: os.path.splitext(os.path.basename(r.pathname))[0],
+    "relativeCreated": lambda r: (r.created - logging._startTime) * 1000,
+}
+"""optional fields that can be computed after creation: name -> function of record"""
+
+_FORMAT_FIELD_PATTERNS: tuple[re.Pattern, ...] = (
+    re.compile(r"(?<!%)%\((\w+)\)"),
+    re.compile(r"\{(\w+)"),
+    re.compile(r"\$\{?(\w+)"),
+)
+"""patterns of field names in format strings of all formatter styles (%, {, $)"""
+
+_INSTANCE_DICT = logging.LogRecord.__dict__["__dict__"]
+"""descriptor of the instance dict of LogRecords (shadowed by CompactLogRecord.__dict__)"""
+
+
+class CompactLogRecord(logging.LogRecord):
+    """log record that stores its fields in slots and only populates the fields it is asked for
+    - optional fields are properties, populated ones are stored in one dict
+    - fields passed via extra are stored in the instance dict, which is only created for them
+    """
+    __slots__ = CORE_FIELDS + _SET_LATER_FIELDS + ("_optional", "_has_extra")
+
+    def __init__(
+            self,
+            name: str,
+            level: int,
+            pathname: str,
+            lineno: int,
+            msg: object,
+            args: Any,
+            exc_info: Any,
+            func: str | None = None,
+            sinfo: str | None = None,
+            fields: frozenset[str] = frozenset(),
+        ):
+        """init record, see logging.LogRecord
+
+        Args:
+            fields (frozenset[str], optional): optional fields to populate (see OPTIONAL_FIELDS).
+                ...Defaults to frozenset() meaning no optional fields.
+        """
+        ct: float = time.time()
+        self.name = name
+        self.msg = msg
+        # same as logging.LogRecord: a single mapping is used for %(key)s formatting #
+        if (args and len(args) == 1 and isinstance(args[0], collections.abc.Mapping) and args[0]):
+            args = args[0]
+        self.args = args
+        self.levelname = logging.getLevelName(level)
+        self.levelno = level
+        self.pathname = pathname
+        self.lineno = lineno
+        self.funcName = func
+        self.exc_info = exc_info
+        self.exc_text = None
+        self.stack_info = sinfo
+        self.created = ct
+        self.msecs = int((ct - int(ct)) * 1000) + 0.0
+        self._optional = _populate(self, fields) if fields else None
+        self._has_extra = False
+
+    def set_extra(self, extra: dict[str, Any]) -> None:
+        """set fields passed via extra, same as logging.Logger.makeRecord
+
+        Args:
+            extra (dict[str, Any]): fields
+
+        Raises:
+            KeyError: if a field would be overwritten
+        """
+        for key, value in extra.items():
+            if (key in ("message", "asctime")) or hasattr(self, key):
+                raise KeyError(f"Attempt to overwrite {key!r} in LogRecord")
+            setattr(self, key, value)
+        self._has_extra = True
+
+    @property
+    def __dict__(self) -> dict[str, Any]:
+        """return all fields as new dict (as read by e.g. Formatter and SocketHandler)
+        - fields that third-party code sets directly (neither a known field nor passed via
+          ...extra) are not included
+        """
+        d: dict[str, Any] = dict(zip(CORE_FIELDS, _get_core_fields(self)))
+        for name in OPTIONAL_FIELDS:
+            d[name] = getattr(self, name)
+        for name, slot in _SET_LATER_SLOTS:
+            try:
+                d[name] = slot.__get__(self)
+            except AttributeError:
+                pass
+        if self._has_extra:
+            d.update(_INSTANCE_DICT.__get__(self))
+        return d
+
+    def __copy__(self) -> "CompactLogRecord":
+        """return shallow copy (e.g. of logging.handlers.QueueHandler.prepare)
+        """
+        other: CompactLogRecord = object.__new__(type(self))
+        for name in CORE_FIELDS:
+            setattr(other, name, getattr(self, name))
+        for name, slot in _SET_LATER_SLOTS:
+            try:
+                slot.__set__(other, slot.__get__(self))
+            except AttributeError:
+                pass
+        other._optional = dict(self._optional) if self._optional else None
+        other._has_extra = self._has_extra
+        if self._has_extra:
+            _INSTANCE_DICT.__get__(other).update(_INSTANCE_DICT.__get__(self))
+        return other
+
+    def __reduce__(self) -> tuple:
+        """pickle record as stock LogRecord, so it can be unpickled by any process
+        """
+        return logging.makeLogRecord, (self.__dict__,)
+
+
+def _optional_field(name: str) -> property:
+    """return property of optional field
+    - not populated: derived fields (see _DERIVED_FIELDS) are computed, others are None
+      ...(as if logging.logThreads etc. were disabled)
+    """
+    compute: Callable[[logging.LogRecord], Any] | None = _DERIVED_FIELDS.get(name)
+
+    def fget(self: CompactLogRecord) -> Any:
+        optional: dict[str, Any] | None = self._optional
+        if optional is not None and name in optional:
+            return optional[name]
+        return compute(self) if compute is not None else None
+
+    def fset(self: CompactLogRecord, value: Any) -> None:
+        if self._optional is None:
+            self._optional = {}
+        self._optional[name] = value
+
+    return property(fget, fset, doc=f"optional field '{name}'")
+
+
+for _name in OPTIONAL_FIELDS:
+    setattr(CompactLogRecord, _name, _optional_field(_name))
+
+
+def _populate(record: CompactLogRecord, fields: frozenset[str]) -> dict[str, Any]:
+    """return optional fields of record, computed at creation
+    (thread and process fields cannot be computed later)
+    """
+    optional: dict[str, Any] = {}
+    if "thread" in fields:
+        optional["thread"] = threading.get_ident()
+    if "threadName" in fields:
+        optional["threadName"] = threading.current_thread().name
+    if "process" in fields:
+        optional["process"] = os.getpid()
+    if "processName" in fields:
+        optional["processName"] = "MainProcess"
+        mp = sys.modules.get("multiprocessing")
+        if mp is not None:
+            try:
+                optional["processName"] = mp.current_process().name
+            except Exception:
+                pass
+    if "taskName" in fields:
+        optional["taskName"] = None
+        asyncio = sys.modules.get("asyncio")
+        if asyncio is not None:
+            try:
+                optional["taskName"] = asyncio.current_task().get_name()
+            except Exception:
+                pass
+    for name, compute in _DERIVED_FIELDS.items():
+        if name in fields:
+            optional[name] = compute(record)
+    return optional
+
+
+_get_core_fields: Callable[[CompactLogRecord], tuple] = operator.attrgetter(*CORE_FIELDS)
+"""return values of core fields of record"""
+
+_SET_LATER_SLOTS: tuple[tuple[str, Any], ...] = tuple(
+    (name, CompactLogRecord.__dict__[name]) for name in _SET_LATER_FIELDS
+)
+"""names and slot descriptors of fields that are set after creation (unset slots raise AttributeError)"""
+
+
+class CompactFormatter(logging.Formatter):
+    """formatter of %-style formats that looks up the fields of the format in one go
+    - e.g. '%(name)s: %(message)s' is formatted as '%s: %s' % attrgetter("name", "message")(record)
+    - falls back to logging.Formatter if a field is not set (e.g. one of the defaults)
+    """
+    def __init__(
+            self,
+            fmt: str | None = None,
+            datefmt: str | None = None,
+            validate: bool = True,
+            *,
+            defaults: dict[str, Any] | None = None,
+        ):
+        """init formatter, see logging.Formatter (style is always '%')
+        """
+        super().__init__(fmt, datefmt, "%", validate, defaults=defaults)
+        fmt = self._style._fmt
+        self._positional_fmt: str = _FORMAT_FIELD_PATTERNS[0].sub("%", fmt)
+        names: list[str] = _FORMAT_FIELD_PATTERNS[0].findall(fmt)
+        getter: Callable[[logging.LogRecord], Any] = \
+            operator.attrgetter(*names) if names else lambda r: ()
+        # attrgetter returns a single value (not a tuple) for a single name #
+        self._get_fields: Callable[[logging.LogRecord], tuple] = \
+            getter if len(names) != 1 else lambda r: (getter(r),)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        """format fields of record
+
+        Args:
+            record (logging.LogRecord): record, message and asctime already set by format
+
+        Returns:
+            str: formatted message
+        """
+        try:
+            return self._positional_fmt % self._get_fields(record)
+        except AttributeError:
+            return self._style.format(record)
+
+
+def compact_formatter(formatter: logging.Formatter | None) -> logging.Formatter | None:
+    """return CompactFormatter with same format as stock formatter
+    - other formatters (subclasses, other styles) are returned as they are
+
+    Args:
+        formatter (logging.Formatter | None): formatter
+
+    Returns:
+        logging.Formatter | None: CompactFormatter or passed formatter
+    """
+    if type(formatter) is not logging.Formatter or type(formatter._style) is not logging.PercentStyle:
+        return formatter
+    return CompactFormatter(formatter._fmt, formatter.datefmt, defaults=formatter._style._defaults)
+
+
+def required_fields(formatters: Iterable[logging.Formatter | None]) -> frozenset[str]:
+    """return optional fields that are referenced by the format strings of formatters
+    - None stands for the default format of handlers without formatter
+
+    Args:
+        formatters (Iterable[logging.Formatter | None]): formatters
+
+    Returns:
+        frozenset[str]: optional fields, see OPTIONAL_FIELDS
+    """
+    fields: set[str] = set()
+    for formatter in formatters:
+        fmt: str = (formatter or logging._defaultFormatter)._style._fmt
+        for pattern in _FORMAT_FIELD_PATTERNS:
+            fields.update(pattern.findall(fmt))
+    return frozenset(fields.intersection(OPTIONAL_FIELDS))
+
+
+def install(logger: logging.Logger, fields: frozenset[str] = frozenset()) -> logging.Logger:
+    """let logger create CompactLogRecords instead of stock LogRecords
+
+    Args:
+        logger (logging.Logger): logger
+        fields (frozenset[str], optional): optional fields to populate, see required_fields.
+            ...Defaults to frozenset() meaning no optional fields.
+
+    Returns:
+        logging.Logger: same logger
+    """
+    def make_record(
+            name: str, level: int, fn: str, lno: int, msg: object, args: Any, exc_info: Any,
+            func: str | None = None, extra: dict[str, Any] | None = None, sinfo: str | None = None,
+        ) -> CompactLogRecord:
+        rv: CompactLogRecord = CompactLogRecord(
+            name, level, fn, lno, msg, args, exc_info, func, sinfo, fields
+        )
+        if extra is not None:
+            rv.set_extra(extra)
+        return rv
+
+    logger.makeRecord = make_record
+    return logger
+
+
+def uninstall(logger: logging.Logger) -> logging.Logger:
+    """let logger create stock LogRecords again
+
+    Args:
+        logger (logging.Logger): logger
+
+    Returns:
+        logging.Logger: same logger
+    """
+    logger.__dict__.pop("makeRecord", None)
+    return logger
@@ -0,0 +1,262 @@
+"""
+Module to search a log file and all its backups at once.
+- every passed file is expanded to its rotated set: backups from oldest to newest
+  ...(e.g. app.log.10 .. app.log.1, also compressed as .gz, .bz2 or .xz), then the live file
+- plain files are split into chunks of lines, which are searched on a process pool
+  ...(see src.utils.executor) via memory-mapped reads, compressed backups are streamed as one chunk
+- the regex is compiled once per worker process, not per chunk
+- matching lines are streamed in chronological order (file by file, chunk by chunk): at most one chunk
+  ...per worker is in flight, so memory is bounded independent of the size of the files
+- the size of every file is taken when the search starts, lines appended later are not searched
+- run via `python -m src.log.search <pattern> [<file>...]`, output as grep -H: `<file>:<line>`
+- NOTE, this module should not include custom logging (for info, see main.py).
+
+Usage:
+    search.py [--ignore-case] [--fixed] [--workers=<n>] [--chunk-size=<bytes>] <pattern> [<file>...]
+
+Options:
+    --ignore-case        match case-insensitively
+    --fixed              pattern is a fixed string, not a regex
+    --workers=<n>        number of worker processes (default: number of CPUs)
+    --chunk-size=<bytes>  bytes of plain files that are searched per task [default: 8388608]
+    <file>               log files whose rotated sets are searched (default: log/app.log)
+"""
+import bz2
+import functools
+import gzip
+import lzma
+import mmap
+import re
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO, NamedTuple
+
+from docopt import docopt
+
+from src.vars.paths import ROOT
+from src.utils import exception_handling as exc
+from src.utils import executor
+
+
+DEFAULT_LOG_FILE: Path = ROOT / "log" / "app.log"
+"""live log file whose rotated set is searched if no file is passed"""
+
+COMPRESSED_SUFFIXES: dict[str, Callable[[Path], IO[bytes]]] = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+"""suffixes of compressed backups: {suffix: function that opens file for reading bytes}"""
+
+DEFAULT_CHUNK_SIZE: int = 8 * 1024 * 1024
+"""bytes of plain files that are searched per task"""
+
+_BACKUP_PATTERN: str = r"^{name}\.(\d+)({suffixes})?$"
+"""pattern of file names of backups of a live log file, group 1 is the number of the backup"""
+
+
+class Match(NamedTuple):
+    """line that matches the pattern
+    """
+    path: str
+    """file that holds the line"""
+    offset: int
+    """offset of line in (decompressed) file"""
+    line: str
+    """line without line break"""
+
+
+def rotated_set(path: Path) -> list[Path]:
+    """return backups of live log file from oldest to newest, followed by the live file itself
+    - e.g. [app.log.10, .., app.log.2.gz, app.log.1, app.log]
+    - files that do not exist are left out
+
+    Args:
+        path (Path): live log file (e.g. log/app.log)
+
+    Returns:
+        list[Path]: files in chronological order
+    """
+    pattern: re.Pattern = re.compile(_BACKUP_PATTERN.format(
+        name=re.escape(path.name),
+        suffixes="|".join(re.escape(s) for s in COMPRESSED_SUFFIXES),
+    ))
+    backups: list[tuple[int, Path]] = []
+    if path.parent.is_dir():
+        for p in path.parent.iterdir():
+            match: re.Match | None = pattern.match(p.name)
+            if match is not None and p.is_file():
+                backups.append((int(match.group(1)), p))
+    files: list[Path] = [p for _, p in sorted(backups, key=lambda b: -b[0])]
+    if path.is_file():
+        files.append(path)
+    return files
+
+
+def _plan_chunks(files: list[Path], chunk_size: int) -> Iterator[tuple[str, int, int, int]]:
+    """yield chunks of files in chronological order
+    - a plain file is split into byte ranges of chunk_size (aligned to lines by the workers)
+    - a compressed file is one chunk (start and end are 0)
+
+    Yields:
+        Iterator[tuple[str, int, int, int]]: path, start, end and size of file when planned
+    """
+    for path in files:
+        size: int = path.stat().st_size
+        if path.suffix in COMPRESSED_SUFFIXES:
+            yield str(path), 0, 0, size
+            continue
+        for start in range(0, size, chunk_size):
+            yield str(path), start, min(start + chunk_size, size), size
+
+
+@functools.lru_cache(maxsize=8)
+def _get_regex(pattern: str, flags: int) -> re.Pattern:
+    """return compiled bytes regex, compiled once per process
+    """
+    return re.compile(pattern.encode(), flags | re.MULTILINE)
+
+
+def _align(mm: mmap.mmap, pos: int) -> int:
+    """return start of the first line that starts at or after pos
+    """
+    if pos == 0 or mm[pos - 1] == 0x0A:
+        return pos
+    nl: int = mm.find(b"\n", pos)
+    return len(mm) if nl == -1 else nl + 1
+
+
+def _search_chunk(
+        path: str,
+        start: int,
+        end: int,
+        size: int,
+        pattern: str,
+        flags: int,
+    ) -> list[Match]:
+    """search lines that start within [start, end) of file (the whole file if it is compressed)
+    - a line is reported once even if the pattern matches it several times
+
+    Args:
+        path (str): file
+        start (int): first byte of chunk
+        end (int): byte after chunk
+        size (int): size of file when the search started
+        pattern (str): regex
+        flags (int): flags of regex
+
+    Returns:
+        list[Match]: matching lines
+    """
+    regex: re.Pattern = _get_regex(pattern, flags)
+    matches: list[Match] = []
+    opener: Callable[[Path], IO[bytes]] | None = COMPRESSED_SUFFIXES.get(Path(path).suffix)
+    if opener is not None:
+        offset: int = 0
+        with opener(Path(path)) as f:
+            for raw in f:
+                if regex.search(raw):
+                    line: str = raw.rstrip(b"\r\n").decode("utf-8", "replace")
+                    matches.append(Match(path, offset, line))
+                offset += len(raw)
+        return matches
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+        pos: int = _align(mm, start)
+        end = _align(mm, end)
+        while pos < end:
+            match: re.Match | None = regex.search(mm, pos, end)
+            if match is None:
+                break
+            line_start: int = mm.rfind(b"\n", 0, match.start()) + 1
+            line_end: int = mm.find(b"\n", match.start(), size)
+            if line_end == -1:
+                line_end = size
+            line = mm[line_start:line_end].rstrip(b"\r").decode("utf-8", "replace")
+            matches.append(Match(path, line_start, line))
+            pos = line_end + 1
+    return matches
+
+
+def search(
+        pattern: str,
+        paths: list[Path] | None = None,
+        ignore_case: bool = False,
+        fixed: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int | None = None,
+        pool: str = "process",
+    ) -> Iterator[Match]:
+    """search rotated sets of log files and yield matching lines in chronological order
+    - failed chunks (e.g. a file vanished by rotation) are routed into the exception roundup
+      ...(see src.utils.executor) and skipped
+
+    Args:
+        pattern (str): regex, matched against every line
+        paths (list[Path] | None, optional): live log files, every one is expanded to its
+            ...rotated set. Defaults to None meaning DEFAULT_LOG_FILE.
+        ignore_case (bool, optional): match case-insensitively. Defaults to False.
+        fixed (bool, optional): pattern is a fixed string. Defaults to False.
+        chunk_size (int, optional): bytes of plain files per task. Defaults to DEFAULT_CHUNK_SIZE.
+        workers (int | None, optional): number of workers. Defaults to None
+            ...meaning number of CPUs.
+        pool (str, optional): pool kind, see src.utils.executor.POOL_KINDS. Defaults to "process".
+
+    Raises:
+        ValueError: if chunk_size is smaller than 1
+        re.error: if pattern is not a valid regex
+
+    Yields:
+        Iterator[Match]: matching line
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, but is {chunk_size}.")
+    if fixed:
+        pattern = re.escape(pattern)
+    flags: int = re.IGNORECASE if ignore_case else 0
+    # fail fast on invalid patterns, before any worker is started #
+    _get_regex(pattern, flags)
+
+    files: list[Path] = [f for p in (paths or [DEFAULT_LOG_FILE]) for f in rotated_set(p)]
+    tasks: Iterator[tuple] = ((*chunk, pattern, flags) for chunk in _plan_chunks(files, chunk_size))
+    for result in executor.run_tasks(_search_chunk, tasks, pool=pool, max_workers=workers):
+        if result.ok:
+            yield from result.value
+
+
+def main(argv: list[str] | None = None) -> int:
+    """search and print matching lines as `<file>:<line>`
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv[1:].
+
+    Returns:
+        int: exit code as grep, 0 if a line matched, 1 if none, 2 if a chunk failed
+            ...or the pattern is invalid
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    failed_before: int = len(exc.EXC)
+    found: bool = False
+    try:
+        for match in search(
+            args["<pattern>"],
+            paths=[Path(f) for f in args["<file>"]] or None,
+            ignore_case=args["--ignore-case"],
+            fixed=args["--fixed"],
+            chunk_size=int(args["--chunk-size"]),
+            workers=int(args["--workers"]) if args["--workers"] else None,
+        ):
+            found = True
+            sys.stdout.write(f"{match.path}:{match.line}\n")
+    except re.error as e:
+        print(f"Invalid pattern '{args['<pattern>']}': {e}", file=sys.stderr)
+        return 2
+    sys.stdout.flush()
+    if len(exc.EXC) > failed_before:
+        return 2
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
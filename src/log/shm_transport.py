@@ -0,0 +1,520 @@
+"""
+Module to ship log records of worker processes to the handlers of the main process via shared memory.
+- a transport is a block of shared memory (multiprocessing.shared_memory) that holds one ring
+  ...buffer per worker process: every ring has a single producer and the single consumer,
+  ...so neither side takes a lock per record (a lock is only taken once per process to claim a ring)
+- records are encoded into a compact binary layout by the producer (see encode_record),
+  ...not pickled, and copied into the ring without a pipe or syscall
+- records that do not fit into the free space of a ring are dropped and counted per ring
+  ...(see ShmTransport.dropped), the listener adds them to metric log_transport_dropped_total
+- in workers, ShmHandler replaces the handlers of the loggers (see init_worker, e.g. as initializer
+  ...of a process pool), in the main process ShmListener drains all rings into a logger of
+  ...configure_logger, whose filters and handlers process the records as if they were logged there
+- the consumer polls the rings, it sleeps for poll_interval once all rings are empty
+- Python cannot order stores to shared memory (no memory barriers), so on weakly ordered CPUs (e.g. ARM)
+  ...the consumer may see head before the record: every record carries a commit word (CRC-32 of its
+  ...position, length and bytes), which the consumer checks after copying the record out, a record
+  ...that does not match yet is read again on the next poll
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import logging
+import multiprocessing
+import multiprocessing.context
+import multiprocessing.synchronize
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from multiprocessing import shared_memory
+from typing import Any
+
+from src.utils import metrics
+
+
+LOG_TRANSPORT_DROPPED: metrics.Counter = metrics.counter(
+    "log_transport_dropped_total", "records dropped as the ring of their worker process was full"
+)
+
+DEFAULT_RING_SIZE: int = 1024 * 1024
+"""bytes of data area of every ring"""
+
+_HEADER_SIZE: int = 128
+"""bytes of header of every ring: head and owner in the first cache line (written by the producer),
+tail in the second one (written by the consumer)"""
+
+_HEAD: int = 0
+"""offset of total number of bytes written into ring"""
+_DROPPED: int = 8
+"""offset of number of dropped records"""
+_OWNER: int = 16
+"""offset of pid of producer process (0 if ring is free)"""
+_TAIL: int = 64
+"""offset of total number of bytes read from ring"""
+
+_U64: struct.Struct = struct.Struct("<Q")
+_SLOT: struct.Struct = struct.Struct("<II")
+"""prefix of a record in a ring: length and commit word (see _commit_word)"""
+
+_RECORD: struct.Struct = struct.Struct("<dIHI")
+"""fixed fields of an encoded record: created, lineno, levelno, process"""
+
+_STR_FIELDS: tuple[str, ...] = (
+    "name", "msg", "pathname", "funcName", "threadName", "processName", "exc_text", "stack_info",
+    "trace", "trace_id", "span_id",
+)
+"""str fields of an encoded record, stored as utf-8 after their lengths"""
+
+_STR_LENGTHS: struct.Struct = struct.Struct(f"<{len(_STR_FIELDS)}I")
+
+_MISSING_FIELDS: tuple[str, ...] = ("trace", "trace_id", "span_id")
+"""fields that are only set on decoded records if they were set on the original one"""
+
+_FORMATTER: logging.Formatter = logging.Formatter()
+"""formats exceptions of records before they are encoded"""
+
+
+def encode_record(record: logging.LogRecord) -> bytes:
+    """encode record, its message is merged with its args, its exception is formatted
+    (see logging.handlers.QueueHandler.prepare)
+
+    Args:
+        record (logging.LogRecord): record
+
+    Returns:
+        bytes: encoded record
+    """
+    msg: str = record.getMessage()
+    exc_text: str | None = record.exc_text
+    if record.exc_info and not exc_text:
+        exc_text = _FORMATTER.formatException(record.exc_info)
+    values: list[Any] = [getattr(record, f, None) for f in _STR_FIELDS]
+    values[1], values[6] = msg, exc_text
+    parts: list[bytes] = [v.encode("utf-8", "replace") if v is not None else b"" for v in values]
+    # an empty field and a missing field are told apart via the highest bit of the length #
+    lengths: list[int] = [len(p) if v is not None else 0x80000000 for p, v in zip(parts, values)]
+    return b"".join((
+        _RECORD.pack(record.created, record.lineno or 0, record.levelno, record.process or 0),
+        _STR_LENGTHS.pack(*lengths),
+        *parts,
+    ))
+
+
+def decode_record(data: bytes) -> logging.LogRecord:
+    """decode record encoded by encode_record
+
+    Args:
+        data (bytes): encoded record
+
+    Returns:
+        logging.LogRecord: record, without args and exc_info (exc_text holds the exception)
+    """
+    created, lineno, levelno, process = _RECORD.unpack_from(data)
+    lengths: tuple[int, ...] = _STR_LENGTHS.unpack_from(data, _RECORD.size)
+    pos: int = _RECORD.size + _STR_LENGTHS.size
+    fields: dict[str, Any] = {}
+    for name, length in zip(_STR_FIELDS, lengths):
+        if length & 0x80000000:
+            if name not in _MISSING_FIELDS:
+                fields[name] = None
+            continue
+        fields[name] = data[pos:pos + length].decode("utf-8")
+        pos += length
+    record: logging.LogRecord = logging.makeLogRecord(fields)
+    record.created = created
+    record.msecs = int((created - int(created)) * 1000) + 0.0
+    record.relativeCreated = (created - logging._startTime) * 1000
+    record.lineno, record.levelno, record.process = lineno, levelno, process or None
+    record.levelname = logging.getLevelName(levelno)
+    record.args = ()
+    return record
+
+
+def _commit_word(pos: int, data: bytes) -> int:
+    """return commit word of a record: CRC-32 of its position (total bytes written before it),
+    its length and its bytes
+    - a stale record of an earlier lap of the ring or a partly visible record does not match
+    """
+    return zlib.crc32(data, zlib.crc32(_U64.pack(pos) + _U64.pack(len(data))))
+
+
+class Ring():
+    """ring buffer of records in shared memory, one producer and one consumer
+    - every record is prefixed by its length and commit word (written after the record)
+    - the producer only writes head (after the record), the consumer only writes tail
+      ...(after the record was copied out and its commit word matched), both read the index of
+      ...the other side
+    """
+    def __init__(self, buf: memoryview, size: int):
+        """init ring on buffer
+
+        Args:
+            buf (memoryview): header and data area of ring
+            size (int): bytes of data area
+        """
+        self.buf: memoryview = buf
+        self.size: int = size
+        self._data: memoryview = buf[_HEADER_SIZE:_HEADER_SIZE + size]
+        self._head: int = self._read(_HEAD)
+        self._tail: int = self._read(_TAIL)
+
+    def _read(self, offset: int) -> int:
+        """return u64 of header
+        """
+        return _U64.unpack_from(self.buf, offset)[0]
+
+    def _write(self, offset: int, value: int) -> None:
+        """set u64 of header
+        """
+        _U64.pack_into(self.buf, offset, value)
+
+    @property
+    def owner(self) -> int:
+        """return pid of producer (0 if ring is free)
+        """
+        return self._read(_OWNER)
+
+    @property
+    def dropped(self) -> int:
+        """return number of records that did not fit into the ring
+        """
+        return self._read(_DROPPED)
+
+    @property
+    def backlog(self) -> int:
+        """return number of bytes that have not been read yet
+        """
+        return self._read(_HEAD) - self._read(_TAIL)
+
+    def claim(self, pid: int) -> None:
+        """let process be the producer of ring, it continues behind the records written so far
+        """
+        self._head = self._read(_HEAD)
+        self._write(_OWNER, pid)
+
+    def put(self, data: bytes) -> bool:
+        """copy record into ring (producer)
+
+        Args:
+            data (bytes): record
+
+        Returns:
+            bool: False if record was dropped, as there is not enough free space
+        """
+        n: int = _SLOT.size + len(data)
+        head: int = self._head
+        if n > self.size - (head - self._read(_TAIL)):
+            self._write(_DROPPED, self._read(_DROPPED) + 1)
+            return False
+        self._copy_in(head + _SLOT.size, data)
+        self._copy_in(head, _SLOT.pack(len(data), _commit_word(head, data)))
+        # publish record #
+        self._head = head + n
+        self._write(_HEAD, self._head)
+        return True
+
+    def _copy_in(self, pos: int, data: bytes) -> None:
+        """copy data into data area at pos, wrap around its end
+        """
+        pos %= self.size
+        first: int = min(len(data), self.size - pos)
+        self._data[pos:pos + first] = data[:first]
+        if first < len(data):
+            self._data[:len(data) - first] = data[first:]
+
+    def _copy_out(self, pos: int, n: int) -> bytes:
+        """return n bytes of data area at pos, wrap around its end
+        """
+        pos %= self.size
+        first: int = min(n, self.size - pos)
+        if first == n:
+            return bytes(self._data[pos:pos + n])
+        return bytes(self._data[pos:pos + first]) + bytes(self._data[:n - first])
+
+    def get_all(self) -> Iterator[bytes]:
+        """yield records written so far (consumer), space of a record is freed once it is yielded
+        - stops at a record whose bytes are not visible yet (commit word does not match),
+          ...it is yielded by a later call
+
+        Yields:
+            Iterator[bytes]: record
+        """
+        head: int = self._read(_HEAD)
+        tail: int = self._tail
+        while tail < head:
+            length, commit = _SLOT.unpack(self._copy_out(tail, _SLOT.size))
+            if _SLOT.size + length > head - tail:
+                return
+            data: bytes = self._copy_out(tail + _SLOT.size, length)
+            if commit != _commit_word(tail, data):
+                return
+            tail += _SLOT.size + length
+            self._tail = tail
+            self._write(_TAIL, tail)
+            yield data
+
+
+class ShmTransport():
+    """block of shared memory with one ring per worker process
+    - created by the main process, attached by workers when unpickled (e.g. as initarg of a pool)
+    """
+    def __init__(
+            self,
+            rings: int | None = None,
+            ring_size: int = DEFAULT_RING_SIZE,
+            name: str | None = None,
+            lock: multiprocessing.synchronize.Lock | None = None,
+            mp_context: multiprocessing.context.BaseContext | None = None,
+        ):
+        """create shared memory (or attach to it if name is passed)
+
+        Args:
+            rings (int | None, optional): number of rings, i.e. max. number of worker processes.
+                ...Defaults to None meaning number of CPUs.
+            ring_size (int, optional): bytes of data area of every ring. Defaults to DEFAULT_RING_SIZE.
+            name (str | None, optional): name of existing shared memory. Defaults to None
+                ...meaning new shared memory is created.
+            lock (multiprocessing.synchronize.Lock | None, optional): lock that serializes claims of
+                ...rings. Defaults to None meaning a new lock.
+            mp_context (multiprocessing.context.BaseContext | None, optional): context of the
+                ...worker processes, the lock is created in. Defaults to None meaning the default context.
+        """
+        self.rings: int = rings or os.cpu_count() or 1
+        self.ring_size: int = ring_size
+        self._lock: multiprocessing.synchronize.Lock = lock or (mp_context or multiprocessing).Lock()
+        self._owner: bool = name is None
+        self.shm: shared_memory.SharedMemory = shared_memory.SharedMemory(
+            name=name, create=name is None, size=self.rings * (_HEADER_SIZE + ring_size)
+        )
+        if self._owner:
+            self.shm.buf[:] = bytes(self.shm.size)
+        stride: int = _HEADER_SIZE + ring_size
+        self._rings: list[Ring] = [
+            Ring(self.shm.buf[i * stride:(i + 1) * stride], ring_size) for i in range(self.rings)
+        ]
+
+    def __reduce__(self) -> tuple:
+        """pickle transport as reference to its shared memory
+        """
+        return type(self), (self.rings, self.ring_size, self.shm.name, self._lock)
+
+    @property
+    def name(self) -> str:
+        """return name of shared memory
+        """
+        return self.shm.name
+
+    @property
+    def dropped(self) -> int:
+        """return number of records that were dropped as their ring was full
+        """
+        return sum(r.dropped for r in self._rings)
+
+    def claim(self) -> Ring:
+        """claim a free ring for the current process (producer)
+        - rings of processes that do not exist anymore are free
+
+        Raises:
+            RuntimeError: if all rings are claimed
+
+        Returns:
+            Ring: ring
+        """
+        pid: int = os.getpid()
+        with self._lock:
+            for ring in self._rings:
+                if ring.owner in (0, pid) or not _is_alive(ring.owner):
+                    ring.claim(pid)
+                    return ring
+        raise RuntimeError(f"All {self.rings} rings of transport '{self.name}' are claimed.")
+
+    def release(self, ring: Ring) -> None:
+        """release ring claimed by current process
+        """
+        with self._lock:
+            if ring.owner == os.getpid():
+                ring.claim(0)
+
+    def drain(self) -> Iterator[bytes]:
+        """yield all records written so far, ring by ring (consumer)
+
+        Yields:
+            Iterator[bytes]: encoded record
+        """
+        for ring in self._rings:
+            yield from ring.get_all()
+
+    def close(self) -> None:
+        """detach from shared memory, the creating process also removes it
+        """
+        for ring in self._rings:
+            ring._data.release()
+            ring.buf.release()
+        self._rings = []
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _is_alive(pid: int) -> bool:
+    """return whether process exists
+    - on Windows via OpenProcess, as os.kill(pid, 0) would send CTRL_C_EVENT to the process there
+    """
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION #
+        handle: int = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            # access denied: process exists #
+            return ctypes.GetLastError() == 5
+        try:
+            code: ctypes.c_ulong = ctypes.c_ulong()
+            # STILL_ACTIVE #
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class ShmHandler(logging.Handler):
+    """handler of worker processes that writes records into a ring of a transport
+    - the ring is claimed on first emit of every process (i.e. also after a fork)
+    """
+    def __init__(self, transport: ShmTransport, level: int = logging.NOTSET):
+        """init handler
+
+        Args:
+            transport (ShmTransport): transport
+            level (int, optional): level. Defaults to logging.NOTSET.
+        """
+        super().__init__(level)
+        self.transport: ShmTransport = transport
+        self._ring: Ring | None = None
+        self._pid: int = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """encode record and copy it into the ring of the process, drop it if the ring is full
+
+        Args:
+            record (logging.LogRecord): record
+        """
+        try:
+            if self._pid != os.getpid():
+                self._ring = self.transport.claim()
+                self._pid = os.getpid()
+            self._ring.put(encode_record(record))
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        """release ring of process
+        """
+        if self._ring is not None and self._pid == os.getpid():
+            self.transport.release(self._ring)
+            self._ring = None
+        super().close()
+
+
+def init_worker(transport: ShmTransport, level: int = logging.NOTSET) -> ShmHandler:
+    """let all loggers of a worker process write into transport, e.g. as initializer of a pool
+    - the handlers of the root logger and of every logger with handlers (e.g. inherited
+      ...by fork from loggers of configure_logger) are replaced by one ShmHandler,
+      ...they are not closed, as they belong to the main process
+
+    Args:
+        transport (ShmTransport): transport
+        level (int, optional): level of handler. Defaults to logging.NOTSET.
+
+    Returns:
+        ShmHandler: handler
+    """
+    handler: ShmHandler = ShmHandler(transport, level)
+    loggers: list[logging.Logger] = [logging.getLogger()] + [
+        lg for lg in list(logging.Logger.manager.loggerDict.values())
+        if isinstance(lg, logging.Logger) and lg.handlers
+    ]
+    for lg in loggers:
+        for h in list(lg.handlers):
+            lg.removeHandler(h)
+        if lg is loggers[0] or not lg.propagate:
+            lg.addHandler(handler)
+    return handler
+
+
+class ShmListener():
+    """thread of the main process that drains all rings of a transport into a logger
+    """
+    def __init__(self, transport: ShmTransport, logger: logging.Logger, poll_interval: float = 0.001):
+        """init listener
+
+        Args:
+            transport (ShmTransport): transport
+            logger (logging.Logger): logger whose filters and handlers process the records
+                ...(e.g. a logger of configure_logger)
+            poll_interval (float, optional): seconds to sleep once all rings are empty.
+                ...Defaults to 0.001.
+        """
+        self.transport: ShmTransport = transport
+        self.logger: logging.Logger = logger
+        self.poll_interval: float = poll_interval
+        self.records: int = 0
+        """number of records passed to logger"""
+        self._dropped: int = 0
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "ShmListener":
+        """start thread
+
+        Returns:
+            ShmListener: same listener
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shm-listener", daemon=True)
+        self._thread.start()
+        return self
+
+    def drain(self) -> int:
+        """pass all records written so far to logger, account dropped records
+
+        Returns:
+            int: number of records
+        """
+        n: int = 0
+        handle = self.logger.handle
+        for data in self.transport.drain():
+            handle(decode_record(data))
+            n += 1
+        self.records += n
+        dropped: int = self.transport.dropped
+        if dropped > self._dropped:
+            LOG_TRANSPORT_DROPPED.inc(dropped - self._dropped)
+            self._dropped = dropped
+        return n
+
+    def _run(self) -> None:
+        """drain rings until stopped, sleep while they are empty
+        """
+        while not self._stop.is_set():
+            if not self.drain():
+                time.sleep(self.poll_interval)
+
+    def stop(self) -> None:
+        """stop thread and pass remaining records to logger
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.drain()
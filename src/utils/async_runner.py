@@ -0,0 +1,163 @@
+"""
+Module that provides a task runner for asyncio, the async counterpart of src.utils.executor.
+- tasks are started lazily, at most `limit` tasks run at once (bounded concurrency and memory)
+- results are delivered in task order or as they complete
+- every failed task (incl. timeouts) is routed into the exception roundup of exception_handling
+- a timed out task is cancelled
+- commands can be run on the event loop as well, synchronous ones via commands.run in a thread
+  ...of the default executor so they do not block the loop (i.e. traced, timed and cached as without --async)
+"""
+import asyncio
+import inspect
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from typing import Any
+
+from src.utils import commands
+from src.utils import config
+from src.utils import exception_handling as exc
+from src.utils import instrument
+from src.utils import tracing
+from src.utils.executor import TaskResult, log_task_failure
+
+
+async def _run_one(
+        func: Callable[..., Awaitable[Any]],
+        index: int,
+        args: tuple,
+        timeout: float | None,
+    ) -> TaskResult:
+    """await task and catch its exception
+
+    Args:
+        func (Callable[..., Awaitable[Any]]): coroutine function to run
+        index (int): position of task in passed tasks
+        args (tuple): args of task
+        timeout (float | None): seconds after which task is cancelled
+
+    Returns:
+        TaskResult: result of task
+    """
+    try:
+        return TaskResult(index, True, await asyncio.wait_for(func(*args), timeout))
+    except asyncio.TimeoutError:
+        return TaskResult(index, False, error=TimeoutError(
+            f"Task {index} did not finish within {timeout} seconds."
+        ))
+    except Exception as e:
+        return TaskResult(index, False, error=e)
+
+
+async def run_tasks(
+        func: Callable[..., Awaitable[Any]],
+        tasks: Iterable[tuple],
+        limit: int | None = None,
+        timeout: float | None = None,
+        ordered: bool = True,
+    ) -> AsyncIterator[TaskResult]:
+    """run coroutine function once per task on the running event loop and yield the results
+
+    Args:
+        func (Callable[..., Awaitable[Any]]): coroutine function to run
+        tasks (Iterable[tuple]): args per task, consumed lazily
+        limit (int | None, optional): max. number of tasks that run at once. Defaults to None
+            ...meaning config key concurrency.
+        timeout (float | None, optional): seconds per task after which it is cancelled and fails
+            ...with TimeoutError. Defaults to None meaning no timeout.
+        ordered (bool, optional): yield results in task order, else as they complete.
+            ...Defaults to True.
+
+    Raises:
+        ValueError: if limit is smaller than 1
+
+    Yields:
+        AsyncIterator[TaskResult]: result per task
+    """
+    limit = limit or config.get().concurrency
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, but is {limit}.")
+    it: Iterator[tuple[int, tuple]] = enumerate(tasks)
+    pending: set[asyncio.Task] = set()
+    ready: dict[int, TaskResult] = {}
+    next_index: int = 0
+
+    def start_next() -> None:
+        item: tuple[int, tuple] | None = next(it, None)
+        if item is not None:
+            pending.add(asyncio.create_task(_run_one(func, *item, timeout)))
+
+    try:
+        for _ in range(limit):
+            start_next()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                start_next()
+            for result in sorted((task.result() for task in done), key=lambda r: r.index):
+                if not result.ok:
+                    log_task_failure(result, func)
+                if ordered:
+                    ready[result.index] = result
+                else:
+                    yield result
+            while next_index in ready:
+                yield ready.pop(next_index)
+                next_index += 1
+    finally:
+        # e.g. consumer stopped iterating early #
+        for task in pending:
+            task.cancel()
+
+
+async def gather_tasks(
+        func: Callable[..., Awaitable[Any]],
+        tasks: Iterable[tuple],
+        limit: int | None = None,
+        timeout: float | None = None,
+    ) -> list[TaskResult]:
+    """run all tasks (see run_tasks) and return their results in task order
+
+    Args:
+        func (Callable[..., Awaitable[Any]]): coroutine function to run
+        tasks (Iterable[tuple]): args per task
+        limit (int | None, optional): max. number of tasks that run at once. Defaults to None
+            ...meaning config key concurrency.
+        timeout (float | None, optional): seconds per task. Defaults to None meaning no timeout.
+
+    Returns:
+        list[TaskResult]: result per task
+    """
+    return [r async for r in run_tasks(func, tasks, limit=limit, timeout=timeout)]
+
+
+async def run_command(name: str, *args: Any, **kwargs: Any) -> Any:
+    """run command on the running event loop
+    - run other functions via commands.run in a thread of the default executor (span, timing and
+      ...result cache as without --async), await coroutine functions within the same span and timing
+      ...(their results are not cached)
+
+    Args:
+        name (str): name of command
+        *args (Any): positional args passed to command function
+        **kwargs (Any): keyword args passed to command function
+
+    Returns:
+        Any: return value of command function
+    """
+    func: Callable[..., Any] = commands.get_func(name)
+    if inspect.iscoroutinefunction(func):
+        with tracing.span(f"command {name}"), instrument.section(f"command {name}"):
+            return await func(*args, **kwargs)
+    return await asyncio.to_thread(commands.run, name, *args, **kwargs)
+
+
+async def run_commands(names: list[str]) -> None:
+    """run commands one after another on the running event loop
+    - exceptions that no task retrieves are recorded into the exception roundup
+
+    Args:
+        names (list[str]): names of commands
+    """
+    asyncio.get_running_loop().set_exception_handler(exc.loop_exception_handler)
+    for name in names:
+        await run_command(name)
@@ -0,0 +1,114 @@
+"""
+Module to process many jobs within one process.
+- jobs are read line by line from a file or stdin, each line holds the cli input args
+  ...of one job (e.g. `--hello -v`), empty lines and lines starting with '#' are skipped
+- jobs are read lazily and run one after another (see src.utils.jobs.run_job),
+  ...so memory is bounded independent of the number of jobs
+- the result of every job is streamed to stdout as one JSON line as soon as it completes
+- throughput and failures are reported at program end
+"""
+import json
+import shlex
+import sys
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import TextIO
+
+from src.utils import exception_handling as exc
+from src.utils.jobs import JobResult, run_job
+
+
+class BatchStats():
+    """class holds statistics of the batch run of the process
+    """
+    jobs: int = 0
+    failed: int = 0
+    duration: float = 0.0
+
+    @classmethod
+    def reset(cls):
+        """reset class vars
+        """
+        cls.jobs = 0
+        cls.failed = 0
+        cls.duration = 0.0
+
+    @classmethod
+    def get_summary(cls) -> str | None:
+        """return summary of batch run, None if no batch ran
+
+        Returns:
+            str | None: summary
+        """
+        if not cls.jobs:
+            return None
+        throughput: float = cls.jobs / cls.duration if cls.duration else 0.0
+        return (
+            f"Batch: {cls.jobs} jobs in {cls.duration:.3f} s ({throughput:.1f} jobs/s), "
+            f"{cls.jobs - cls.failed} succeeded, {cls.failed} failed."
+        )
+
+
+def read_jobs(source: TextIO) -> Iterator[list[str] | JobResult]:
+    """yield cli input args of jobs line by line
+    - a line that cannot be split (e.g. unbalanced quote) yields a failed JobResult instead,
+      ...its argv is the line
+
+    Args:
+        source (TextIO): file or stdin
+
+    Yields:
+        Iterator[list[str] | JobResult]: cli input args of a job or result of a malformed line
+    """
+    for line in source:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                yield shlex.split(line)
+            except ValueError as e:
+                yield JobResult([line], False, 0, 0.0, f"Cannot split line: {e}")
+
+
+def run_batch(
+        source: TextIO,
+        parse_args: Callable[[list[str]], None],
+        out: TextIO | None = None,
+    ) -> None:
+    """run all jobs of source and stream their results to out
+
+    Args:
+        source (TextIO): file or stdin that holds one job per line
+        parse_args (Callable[[list[str]], None]): function that parses cli input args
+            ...of a job and saves them to CLI (e.g. main._evaluate_job_args)
+        out (TextIO | None, optional): stream the results are written to. Defaults to None
+            ...meaning sys.stdout.
+    """
+    if out is None:
+        out = sys.stdout
+    exc.register_summary(BatchStats.get_summary)
+    start: float = time.perf_counter()
+    try:
+        for job in read_jobs(source):
+            res: JobResult = job if isinstance(job, JobResult) else run_job(job, parse_args)
+            BatchStats.jobs += 1
+            BatchStats.failed += not res.ok
+            out.write(json.dumps(res.to_dict()) + "\n")
+            out.flush()
+    finally:
+        BatchStats.duration += time.perf_counter() - start
+
+
+def run_batch_from_path(path: str, parse_args: Callable[[list[str]], None]) -> None:
+    """run all jobs of file (or stdin if path is '-') and stream their results to stdout
+
+    Args:
+        path (str): path of file or '-' for stdin
+        parse_args (Callable[[list[str]], None]): function that parses cli input args
+            ...of a job and saves them to CLI (e.g. main._evaluate_job_args)
+    """
+    if path == "-":
+        run_batch(sys.stdin, parse_args)
+        return
+    with open(Path(path)) as f:
+        run_batch(f, parse_args)
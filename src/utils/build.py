@@ -0,0 +1,159 @@
+"""
+Module to build a self-contained zipapp of the program.
+- the archive holds main.py (as __main__), src and the runtime dependencies (see RUNTIME_DEPENDENCIES)
+- every module is shipped with precompiled bytecode next to its source (unchecked hash-based .pyc,
+  ...which zipimport loads without compiling or checking the source), so no launch compiles anything
+- the output dir is the ROOT of the program when it runs from the archive (see src.vars.paths):
+  ...it holds the archive, src/log/log.conf and the log dir
+- launch the built program via `python <output>/<name> --hello`
+- NOTE, this module should not include custom logging (for info, see main.py).
+
+Usage:
+    build.py [--output=<dir>] [--name=<file>] [--compress]
+
+Options:
+    --output=<dir>  output dir, i.e. ROOT of the built program [default: dist]
+    --name=<file>   file name of archive [default: app.pyz]
+    --compress      compress files of archive (smaller, but slower imports)
+"""
+import importlib.util
+import py_compile
+import shutil
+import sys
+import tempfile
+import warnings
+import zipapp
+from pathlib import Path
+
+from docopt import docopt
+
+from src.vars.paths import ROOT
+
+
+RUNTIME_DEPENDENCIES: tuple[str, ...] = ("docopt",)
+"""top-level modules/packages of third-party dependencies that are bundled into the archive"""
+
+INTERPRETER: str = "/usr/bin/env python3"
+"""interpreter of shebang line of archive"""
+
+
+def _copy_dependency(name: str, dst: Path) -> None:
+    """copy installed module or package to dst
+
+    Args:
+        name (str): name of top-level module or package
+        dst (Path): dir to copy into
+
+    Raises:
+        ModuleNotFoundError: if dependency is not installed
+    """
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        raise ModuleNotFoundError(f"Dependency '{name}' is not installed.")
+    origin: Path = Path(spec.origin)
+    if spec.submodule_search_locations:
+        shutil.copytree(origin.parent, dst / name, ignore=shutil.ignore_patterns("__pycache__"))
+    else:
+        shutil.copy2(origin, dst / origin.name)
+
+
+def _stage(staging: Path) -> None:
+    """copy sources of program and dependencies into staging dir
+
+    Args:
+        staging (Path): empty dir
+    """
+    shutil.copy2(ROOT / "main.py", staging / "__main__.py")
+    shutil.copytree(
+        ROOT / "src",
+        staging / "src",
+        ignore=shutil.ignore_patterns("__pycache__", "*.pyc", "log.conf"),
+    )
+    for name in RUNTIME_DEPENDENCIES:
+        _copy_dependency(name, staging)
+
+
+def _compile(staging: Path, archive_name: str) -> int:
+    """compile every module of staging dir to a .pyc next to its source (where zipimport looks for it)
+
+    Args:
+        staging (Path): staging dir
+        archive_name (str): file name of archive, used as prefix of file names in tracebacks
+
+    Returns:
+        int: number of compiled modules
+    """
+    sources: list[Path] = sorted(staging.rglob("*.py"))
+    # e.g. invalid escape sequences of dependencies are not ours to fix #
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        warnings.simplefilter("ignore", SyntaxWarning)
+        for source in sources:
+            _compile_module(source, staging, archive_name)
+    return len(sources)
+
+
+def _compile_module(source: Path, staging: Path, archive_name: str) -> None:
+    """compile module to a .pyc next to its source
+
+    Args:
+        source (Path): source file
+        staging (Path): staging dir
+        archive_name (str): file name of archive
+    """
+    py_compile.compile(
+        str(source),
+        cfile=str(source.with_suffix(".pyc")),
+        dfile=f"{archive_name}/{source.relative_to(staging).as_posix()}",
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+
+def build(output: Path = ROOT / "dist", name: str = "app.pyz", compress: bool = False) -> Path:
+    """build zipapp into output dir, which becomes ROOT of the built program
+
+    Args:
+        output (Path, optional): output dir. Defaults to ROOT/"dist".
+        name (str, optional): file name of archive. Defaults to "app.pyz".
+        compress (bool, optional): compress files of archive. Defaults to False.
+
+    Returns:
+        Path: archive
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    archive: Path = output / name
+    with tempfile.TemporaryDirectory() as tmp:
+        staging: Path = Path(tmp)
+        _stage(staging)
+        _compile(staging, name)
+        zipapp.create_archive(staging, archive, interpreter=INTERPRETER, compressed=compress)
+
+    # files that are read and written at runtime live next to the archive #
+    (output / "src" / "log").mkdir(parents=True, exist_ok=True)
+    shutil.copy2(ROOT / "src" / "log" / "log.conf", output / "src" / "log" / "log.conf")
+    (output / "log").mkdir(exist_ok=True)
+    return archive
+
+
+def main(argv: list[str] | None = None) -> int:
+    """build zipapp and print its path
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv[1:].
+
+    Returns:
+        int: exit code
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    archive: Path = build(
+        output=ROOT / args["--output"],
+        name=args["--name"],
+        compress=args["--compress"],
+    )
+    print(f"Archive written to '{archive}' ({archive.stat().st_size / 1024:.0f} KiB).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
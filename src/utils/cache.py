@@ -0,0 +1,306 @@
+"""
+Module that provides in-memory caches with LRU and TTL eviction and a bound on their size in bytes.
+- a cache is split into stripes (shards), every key belongs to one stripe by its hash,
+  ...every stripe has its own lock, LRU order and share of maxsize and max_bytes,
+  ...so threads that access different keys rarely wait for each other
+- LRU eviction is per stripe, i.e. the least recently used entry of the stripe of the new key is evicted
+  ...(an approximation of a global LRU order)
+- entries expire ttl seconds after they were set, expired entries are dropped when they are read
+  ...or when their stripe needs space
+- the size of an entry is measured by sizeof (default: sys.getsizeof, i.e. shallow),
+  ...entries that are larger than the share of max_bytes of a stripe are not cached
+- functions are cached via decorator (memoize), arguments must be hashable,
+  ...concurrent calls with the same arguments may both call the function on a miss
+- hits, misses, evictions and expirations of all caches are logged at program end (see exception_handling)
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, NamedTuple, TypeVar
+
+from src.utils import exception_handling as exc
+
+
+DEFAULT_STRIPES: int = 16
+"""number of stripes of a cache"""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_MISSING: object = object()
+"""sentinel of a missing entry"""
+
+
+class CacheStats(NamedTuple):
+    """statistics of a cache
+    """
+    name: str
+    hits: int
+    misses: int
+    evictions: int
+    """entries evicted to respect maxsize or max_bytes"""
+    expirations: int
+    """entries dropped after their ttl"""
+    entries: int
+    bytes: int
+    """sum of sizes of entries"""
+
+    @property
+    def hit_rate(self) -> float:
+        """return share of lookups that were hits (0.0 if there were none)
+        """
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Stripe():
+    """entries of the keys of a stripe in LRU order (least recently used first) and their statistics
+    """
+    __slots__ = ("lock", "entries", "bytes", "hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.lock: threading.Lock = threading.Lock()
+        self.entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+        """{key: (value, expiry time or inf, size)}"""
+        self.bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+
+class Cache():
+    """thread-safe cache with LRU and TTL eviction and a bound on its size in bytes
+    """
+    def __init__(
+            self,
+            name: str,
+            maxsize: int | None = 1024,
+            ttl: float | None = None,
+            max_bytes: int | None = None,
+            stripes: int = DEFAULT_STRIPES,
+            sizeof: Callable[[Any], int] = sys.getsizeof,
+        ):
+        """init empty cache and register it for the summary at program end
+
+        Args:
+            name (str): name of cache, used in the summary (a cache with the same name is replaced)
+            maxsize (int | None, optional): max. number of entries. Defaults to 1024.
+                ...None means unbounded.
+            ttl (float | None, optional): seconds an entry is valid. Defaults to None meaning forever.
+            max_bytes (int | None, optional): max. sum of sizes of entries. Defaults to None
+                ...meaning unbounded.
+            stripes (int, optional): number of stripes, at most maxsize. Defaults to DEFAULT_STRIPES.
+            sizeof (Callable[[Any], int], optional): function that returns the size of a value
+                ...in bytes. Defaults to sys.getsizeof.
+
+        Raises:
+            ValueError: if a bound, ttl or stripes is smaller than 1 (ttl: not positive)
+        """
+        for arg, value in (("maxsize", maxsize), ("max_bytes", max_bytes), ("stripes", stripes)):
+            if value is not None and value < 1:
+                raise ValueError(f"{arg} must be at least 1, but is {value}.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"ttl must be positive, but is {ttl}.")
+        if maxsize is not None:
+            stripes = min(stripes, maxsize)
+        self.name: str = name
+        self.ttl: float | None = ttl
+        self.sizeof: Callable[[Any], int] = sizeof
+        self._stripes: tuple[_Stripe, ...] = tuple(_Stripe() for _ in range(stripes))
+        # bounds are split evenly across stripes (rounded down) #
+        self._maxsize: float = maxsize // stripes if maxsize is not None else float("inf")
+        self._max_bytes: float = max(max_bytes // stripes, 1) if max_bytes is not None else float("inf")
+        CACHES[name] = self
+        exc.register_summary(get_summary)
+
+    def _stripe(self, key: Hashable) -> _Stripe:
+        """return stripe of key
+        """
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """return value of key and mark it as most recently used
+
+        Args:
+            key (Hashable): key
+            default (Any, optional): returned if key is missing or expired. Defaults to None.
+
+        Returns:
+            Any: value or default
+        """
+        stripe: _Stripe = self._stripe(key)
+        with stripe.lock:
+            entry: tuple[Any, float, int] | None = stripe.entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    stripe.entries.move_to_end(key)
+                    stripe.hits += 1
+                    return entry[0]
+                del stripe.entries[key]
+                stripe.bytes -= entry[2]
+                stripe.expirations += 1
+            stripe.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """set value of key, evict least recently used entries of its stripe if it is full
+
+        Args:
+            key (Hashable): key
+            value (Any): value
+        """
+        size: int = self.sizeof(value)
+        expires: float = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        stripe: _Stripe = self._stripe(key)
+        with stripe.lock:
+            old: tuple[Any, float, int] | None = stripe.entries.pop(key, None)
+            if old is not None:
+                stripe.bytes -= old[2]
+            if size > self._max_bytes:
+                return
+            self._make_space(stripe, size)
+            stripe.entries[key] = (value, expires, size)
+            stripe.bytes += size
+
+    def _make_space(self, stripe: _Stripe, size: int) -> None:
+        """drop expired entries, then least recently used ones until an entry of size fits into stripe
+        - caller must hold the lock of the stripe
+        """
+        entries: OrderedDict[Hashable, tuple[Any, float, int]] = stripe.entries
+        if len(entries) < self._maxsize and stripe.bytes + size <= self._max_bytes:
+            return
+        if self.ttl is not None:
+            now: float = time.monotonic()
+            for key in [k for k, e in entries.items() if e[1] <= now]:
+                stripe.bytes -= entries.pop(key)[2]
+                stripe.expirations += 1
+        while entries and (len(entries) >= self._maxsize or stripe.bytes + size > self._max_bytes):
+            stripe.bytes -= entries.popitem(last=False)[1][2]
+            stripe.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """remove key and return its value
+
+        Args:
+            key (Hashable): key
+            default (Any, optional): returned if key is missing. Defaults to None.
+
+        Returns:
+            Any: value or default
+        """
+        stripe: _Stripe = self._stripe(key)
+        with stripe.lock:
+            entry: tuple[Any, float, int] | None = stripe.entries.pop(key, None)
+            if entry is None:
+                return default
+            stripe.bytes -= entry[2]
+            return entry[0]
+
+    def clear(self) -> None:
+        """remove all entries, statistics are kept
+        """
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.bytes = 0
+
+    def __len__(self) -> int:
+        """return number of entries (incl. expired ones that have not been dropped yet)
+        """
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
+    def stats(self) -> CacheStats:
+        """return statistics summed across stripes
+
+        Returns:
+            CacheStats: statistics
+        """
+        totals: list[int] = [0] * 6
+        for stripe in self._stripes:
+            with stripe.lock:
+                values: tuple[int, ...] = (
+                    stripe.hits, stripe.misses, stripe.evictions, stripe.expirations,
+                    len(stripe.entries), stripe.bytes,
+                )
+            totals = [t + v for t, v in zip(totals, values)]
+        return CacheStats(self.name, *totals)
+
+
+CACHES: dict[str, Cache] = {}
+"""all caches {name: cache} (in order of creation)"""
+
+
+def _make_key(args: tuple, kwargs: dict[str, Any]) -> Hashable:
+    """return key of arguments of a call, keyword arguments are independent of their order
+    """
+    if not kwargs:
+        return args
+    return args, tuple(sorted(kwargs.items()))
+
+
+def memoize(
+        maxsize: int | None = 1024,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        name: str | None = None,
+        stripes: int = DEFAULT_STRIPES,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+    ) -> Callable[[F], F]:
+    """decorator that caches return values of a function per arguments
+    - the cache is available as attribute cache of the decorated function
+    - exceptions are not cached
+
+    Args:
+        maxsize (int | None, optional): see Cache. Defaults to 1024.
+        ttl (float | None, optional): see Cache. Defaults to None.
+        max_bytes (int | None, optional): see Cache. Defaults to None.
+        name (str | None, optional): name of cache. Defaults to None meaning
+            ...module and qualified name of the function.
+        stripes (int, optional): see Cache. Defaults to DEFAULT_STRIPES.
+        sizeof (Callable[[Any], int], optional): see Cache. Defaults to sys.getsizeof.
+
+    Returns:
+        Callable[[F], F]: decorator
+    """
+    def decorator(func: F) -> F:
+        cache: Cache = Cache(
+            name or f"{func.__module__}.{func.__qualname__}",
+            maxsize=maxsize, ttl=ttl, max_bytes=max_bytes, stripes=stripes, sizeof=sizeof,
+        )
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key: Hashable = _make_key(args, kwargs)
+            value: Any = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def get_summary() -> str | None:
+    """return statistics of all caches that were used, None if none was used
+
+    Returns:
+        str | None: summary
+    """
+    used: list[CacheStats] = [
+        s for s in (c.stats() for c in list(CACHES.values())) if s.hits or s.misses
+    ]
+    if not used:
+        return None
+    lines: list[str] = ["Caches:"]
+    for s in used:
+        lines.append(
+            f"  {s.name}: hits={s.hits} misses={s.misses} hit_rate={s.hit_rate:.1%} "
+            f"evictions={s.evictions} expirations={s.expirations} entries={s.entries} bytes={s.bytes}"
+        )
+    return "\n".join(lines)
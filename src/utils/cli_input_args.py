@@ -2,7 +2,9 @@
 Module to persist and handle CLI input args.
 NOTE, this module should not include custom logging (for info, see main.py).
 """
+import inspect
 import logging
+from typing import Any
 
 
 class CLI():
@@ -13,6 +15,32 @@ class CLI():
     q: bool = False
     Q: bool = False
     hello: bool = False
+    buffered_console: bool = False
+    shed_on_overload: bool = False
+    profile_startup: bool = False
+    serve: bool = False
+    socket: str | None = None
+    batch: str | None = None
+    run_async: bool = False
+    concurrency: int | None = None
+    metrics_file: str | None = None
+    trace_file: str | None = None
+    profile_cpu: bool = False
+    profile_mem: bool = False
+    profile_sample: float | None = None
+    compact_records: bool = False
+    loadgen: bool = False
+    replay: str | None = None
+    load_rate: float | None = None
+    load_duration: float = 10.0
+    load_threads: int = 1
+    load_levels: str = "DEBUG:10,INFO:60,WARNING:25,ERROR:5"
+    load_sizes: str = "64,256,1024"
+    replay_speed: float = 1.0
+    mmap_log: bool = False
+    introspect: int | None = None
+    pool: str | None = None
+    workers: int | None = None
 
     @classmethod
     def set_cli_input_args(
@@ -22,6 +50,32 @@ class CLI():
         q: bool = False,
         Q: bool = False,
         hello: bool = False,
+        buffered_console: bool = False,
+        shed_on_overload: bool = False,
+        profile_startup: bool = False,
+        serve: bool = False,
+        socket: str | None = None,
+        batch: str | None = None,
+        run_async: bool = False,
+        concurrency: int | None = None,
+        metrics_file: str | None = None,
+        trace_file: str | None = None,
+        profile_cpu: bool = False,
+        profile_mem: bool = False,
+        profile_sample: float | None = None,
+        compact_records: bool = False,
+        loadgen: bool = False,
+        replay: str | None = None,
+        load_rate: float | None = None,
+        load_duration: float = 10.0,
+        load_threads: int = 1,
+        load_levels: str = "DEBUG:10,INFO:60,WARNING:25,ERROR:5",
+        load_sizes: str = "64,256,1024",
+        replay_speed: float = 1.0,
+        mmap_log: bool = False,
+        introspect: int | None = None,
+        pool: str | None = None,
+        workers: int | None = None,
     ):
         """set class vars
 
@@ -31,12 +85,103 @@ class CLI():
             q (bool, optional): run program with quiet output. Defaults to False.
             Q (bool, optional): run program with more quiet output. Defaults to False.
             hello (bool, optional): hello-world. Defaults to False.
+            buffered_console (bool, optional): buffer console output if stderr is not a TTY.
+                ...Defaults to False.
+            shed_on_overload (bool, optional): shed low-severity records while logging is
+                ...overloaded. Defaults to False.
+            profile_startup (bool, optional): output timing breakdown of startup phases.
+                ...Defaults to False.
+            serve (bool, optional): run as daemon that accepts jobs via a Unix socket.
+                ...Defaults to False.
+            socket (str | None, optional): path of Unix socket of daemon. Defaults to None
+                ...meaning daemon.DEFAULT_SOCKET_PATH.
+            batch (str | None, optional): run every line of file (- for stdin) as a job.
+                ...Defaults to None.
+            run_async (bool, optional): run selected commands on an asyncio event loop and
+                ...log via a queue that never blocks the loop. Defaults to False.
+            concurrency (int | None, optional): max. number of tasks the async task runner runs at once.
+                ...Defaults to None meaning config key concurrency (see src.utils.config).
+            metrics_file (str | None, optional): write metrics in Prometheus text format to file at
+                ...program end. Defaults to None.
+            trace_file (str | None, optional): export finished tracing spans as JSON lines to file.
+                ...Defaults to None.
+            profile_cpu (bool, optional): run commands under cProfile. Defaults to False.
+            profile_mem (bool, optional): trace memory allocations of commands via tracemalloc.
+                ...Defaults to False.
+            profile_sample (float | None, optional): interval in ms of a sampling profiler thread.
+                ...Defaults to None meaning no sampling.
+            compact_records (bool, optional): let configured loggers create compact, slot-based
+                ...log records (see src.log.record). Defaults to False.
+            loadgen (bool, optional): drive configured loggers with synthetic records and report
+                ...achieved rate, dropped records and handler latencies (see src.log.loadgen).
+                ...Defaults to False.
+            replay (str | None, optional): log file whose records are replayed with their
+                ...original timing instead of generating records. Defaults to None.
+            load_rate (float | None, optional): records/sec of the load generator over all threads.
+                ...Defaults to None meaning unthrottled.
+            load_duration (float, optional): seconds the load generator runs. Defaults to 10.0.
+            load_threads (int, optional): threads of the load generator. Defaults to 1.
+            load_levels (str, optional): weights of levels of generated records.
+                ...Defaults to "DEBUG:10,INFO:60,WARNING:25,ERROR:5".
+            load_sizes (str, optional): message sizes in characters of generated records,
+                ...chosen uniformly. Defaults to "64,256,1024".
+            replay_speed (float, optional): factor by which replayed timing is sped up,
+                ...0 for no delays. Defaults to 1.0.
+            mmap_log (bool, optional): let configured loggers write their log files via
+                ...memory-mapped, preallocated segments (see src.log.mmap_handler).
+                ...Defaults to False.
+            introspect (int | None, optional): port of local HTTP endpoint (127.0.0.1) that serves
+                ...logging, exception, thread and memory state of the process (see src.utils.introspect),
+                ...0 for any free port. Defaults to None meaning no endpoint.
+            pool (str | None, optional): pool kind ("thread" or "process") to run selected commands
+                ...on concurrently (see src.utils.executor). Defaults to None meaning serially.
+            workers (int | None, optional): max. number of workers of --pool.
+                ...Defaults to None meaning one per CPU.
         """        
         cls.v = v
         cls.V = V
         cls.q = q
         cls.Q = Q
         cls.hello = hello
+        cls.buffered_console = buffered_console
+        cls.shed_on_overload = shed_on_overload
+        cls.profile_startup = profile_startup
+        cls.serve = serve
+        cls.socket = socket
+        cls.batch = batch
+        cls.run_async = run_async
+        cls.concurrency = concurrency
+        cls.metrics_file = metrics_file
+        cls.trace_file = trace_file
+        cls.profile_cpu = profile_cpu
+        cls.profile_mem = profile_mem
+        cls.profile_sample = profile_sample
+        cls.compact_records = compact_records
+        cls.loadgen = loadgen
+        cls.replay = replay
+        cls.load_rate = load_rate
+        cls.load_duration = load_duration
+        cls.load_threads = load_threads
+        cls.load_levels = load_levels
+        cls.load_sizes = load_sizes
+        cls.replay_speed = replay_speed
+        cls.mmap_log = mmap_log
+        cls.introspect = introspect
+        cls.pool = pool
+        cls.workers = workers
+
+    @classmethod
+    def get_cli_input_args(cls) -> dict[str, Any]:
+        """return current class vars as kwargs of set_cli_input_args
+        - e.g. to restore the current state later on
+
+        Returns:
+            dict[str, Any]: {name of class var: value}
+        """
+        return {
+            name: getattr(cls, name)
+            for name in inspect.signature(cls.set_cli_input_args).parameters
+        }
 
     @classmethod
     def get_wanted_log_level(cls) -> int:
@@ -0,0 +1,174 @@
+"""
+Module that provides the registry of commands of the program.
+- each command is declared with the module path and the name of the function that implements it
+- the module of a command (and with it, its loggers) is only imported when the command is invoked
+  ...so adding more commands does not slow down every launch
+- return values of cacheable commands are cached on disk (see src.utils.result_cache),
+  ...a cache hit neither imports the module nor runs the command
+  ...(the version of the code is a hash of the source file of the module, which is read but not imported)
+NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import functools
+import hashlib
+import importlib
+import importlib.util
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from src.utils.cli_input_args import CLI
+from src.utils import instrument
+from src.utils import result_cache
+from src.utils import tracing
+
+
+class Command(NamedTuple):
+    """declaration of a command
+    """
+    name: str
+    """name of command"""
+    module: str
+    """import path of module that implements the command"""
+    func: str
+    """name of function in module that runs the command"""
+    cli_flag: str | None = None
+    """name of class var of CLI that selects the command (None: command is never selected by CLI)"""
+    description: str = ""
+    """short description of command"""
+    cacheable: bool = False
+    """return value only depends on args, cli_args and content of files passed as args (no side effects)"""
+    cli_args: tuple[str, ...] = ()
+    """names of class vars of CLI the return value of a cacheable command depends on"""
+
+
+COMMANDS: dict[str, Command] = {}
+"""registry of all commands {command name: Command}"""
+
+DEFAULT_COMMAND: str = "hello"
+"""command that runs if no command is selected via cli input args"""
+
+
+def register(
+        name: str,
+        module: str,
+        func: str,
+        cli_flag: str | None = None,
+        description: str = "",
+        cacheable: bool = False,
+        cli_args: tuple[str, ...] = (),
+    ) -> Command:
+    """register a command
+    - the module is not imported
+
+    Args:
+        name (str): name of command
+        module (str): import path of module that implements the command
+        func (str): name of function in module that runs the command
+        cli_flag (str | None, optional): name of class var of CLI that selects the command.
+            ...Defaults to None.
+        description (str, optional): short description of command. Defaults to "".
+        cacheable (bool, optional): cache return values of command (see src.utils.result_cache).
+            ...Defaults to False.
+        cli_args (tuple[str, ...], optional): names of class vars of CLI the return value of a
+            ...cacheable command depends on, part of its cache key. Defaults to ().
+
+    Raises:
+        ValueError: if a command with the same name is already registered
+
+    Returns:
+        Command: registered command
+    """
+    if name in COMMANDS:
+        raise ValueError(f"Command '{name}' is already registered.")
+    COMMANDS[name] = Command(name, module, func, cli_flag, description, cacheable, cli_args)
+    return COMMANDS[name]
+
+
+def get_func(name: str) -> Callable[..., Any]:
+    """return function of command, import its module if needed
+
+    Args:
+        name (str): name of command
+
+    Raises:
+        KeyError: if command is not registered
+
+    Returns:
+        Callable[..., Any]: function that runs the command
+    """
+    if name not in COMMANDS:
+        raise KeyError(f"Command '{name}' is not registered. Known commands: {list(COMMANDS)}")
+    command: Command = COMMANDS[name]
+    return getattr(importlib.import_module(command.module), command.func)
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_version(module: str) -> str:
+    """return hash of the source file of module, without importing it (its parent packages are imported)
+    - "" if the source cannot be found (e.g. of a built-in module)
+
+    Args:
+        module (str): import path of module
+
+    Returns:
+        str: hex digest
+    """
+    try:
+        spec = importlib.util.find_spec(module)
+        origin: str | None = spec.origin if spec is not None else None
+        if origin is None or not spec.has_location:
+            return ""
+        with open(origin, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (ImportError, ValueError, OSError):
+        return ""
+
+
+def run(name: str, *args: Any, **kwargs: Any) -> Any:
+    """run command
+    - traced as span "command <name>" (see src.utils.tracing)
+    - timed as section "command <name>" if instrumentation is enabled (see src.utils.instrument)
+    - return value of cacheable command is taken from the result cache if possible
+
+    Args:
+        name (str): name of command
+        *args (Any): positional args passed to command function
+        **kwargs (Any): keyword args passed to command function
+
+    Returns:
+        Any: return value of command function
+    """
+    with tracing.span(f"command {name}"), instrument.section(f"command {name}"):
+        command: Command | None = COMMANDS.get(name)
+        if command is not None and command.cacheable:
+            return result_cache.call(
+                name,
+                lambda: get_func(name)(*args, **kwargs),
+                args,
+                kwargs,
+                cli_args=command.cli_args,
+                version=get_code_version(command.module),
+            )
+        return get_func(name)(*args, **kwargs)
+
+
+def select() -> list[str]:
+    """return names of commands that are selected via cli input args (see class CLI)
+    - return DEFAULT_COMMAND if no command is selected
+
+    Returns:
+        list[str]: names of selected commands in order of registration
+    """
+    selected: list[str] = [
+        c.name for c in COMMANDS.values()
+        if c.cli_flag is not None and getattr(CLI, c.cli_flag, False)
+    ]
+    return selected or [DEFAULT_COMMAND]
+
+
+register(
+    "hello",
+    "src.hello_world",
+    "hello",
+    cli_flag="hello",
+    description='[TEST CASE OF THE TEMPLATE], log "Hello World!"',
+)
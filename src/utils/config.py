@@ -0,0 +1,303 @@
+"""
+Module to compile the configuration of the program into one immutable snapshot.
+- layers, from lowest to highest precedence:
+  - DEFAULTS
+  - src/log/log.conf, one `<key>: <value>` per line (e.g. `log_level: WARNING`, `log_max_bytes: 1048576`),
+    ...lines starting with # are comments, a missing file is skipped
+  - environment variables ENV_PREFIX + upper-case key (e.g. APP_LOG_LEVEL=DEBUG, APP_MMAP_LOG=1)
+  - cli input args (CLI): -v/-V/-q/-Q set log_level, flags (e.g. --mmap-log) switch on their key,
+    ...options (e.g. --workers) set their key, a cli input arg only overrides lower layers if it is passed
+- the snapshot is compiled once per process on first use (see get) and read by every module
+  ...instead of looking up the layers on every use, invalidate() lets the next get() compile it again
+  ...(e.g. after the log level was written to log.conf)
+- keys of the snapshot are the fields of Config, unknown keys and invalid values raise ValueError
+- the snapshot holds settings of the process, what the process runs (commands, --serve, --batch,
+  ...--loadgen, --replay and their options, profilers) is selected via cli input args and read from CLI
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import logging
+import os
+import re
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from src.vars.paths import ROOT
+from src.utils.cli_input_args import CLI
+from src.utils.startup_profile import phase
+
+
+LOG_CONF_PATH: Path = ROOT / "src" / "log" / "log.conf"
+"""config file, layer above DEFAULTS"""
+
+ENV_PREFIX: str = "APP_"
+"""prefix of environment variables, e.g. APP_LOG_LEVEL for key log_level"""
+
+_CONF_PATTERN: re.Pattern = re.compile(r"^(\w+):[ \t]*(.*?)[ \t]*$", re.MULTILINE)
+"""pattern of a line of log.conf, group 1 is the key, group 2 the value"""
+
+_POOL_KINDS: tuple[str, ...] = ("thread", "process")
+"""valid values of key pool (see src.utils.executor.POOL_KINDS, not imported here to keep startup fast)"""
+
+_TRUE: tuple[str, ...] = ("1", "true", "yes", "on")
+_FALSE: tuple[str, ...] = ("0", "false", "no", "off")
+
+
+class Config(NamedTuple):
+    """immutable snapshot of the configuration
+    """
+    log_level: int
+    """level of the handlers of configured loggers"""
+    log_file: Path
+    """log file of configured loggers, relative paths are relative to ROOT"""
+    log_max_bytes: int
+    """maxBytes of the rotating file handlers"""
+    log_backup_count: int
+    """backupCount of the rotating file handlers"""
+    log_format: str
+    """format of the handlers of configured loggers"""
+    buffered_console: bool
+    """use a BufferedConsoleHandler (cli input arg --buffered-console)"""
+    shed_on_overload: bool
+    """install overload.DEFAULT_POLICY (cli input arg --shed-on-overload)"""
+    run_async: bool
+    """move handlers behind a queue (cli input arg --async)"""
+    compact_records: bool
+    """create compact, slot-based records (cli input arg --compact-records)"""
+    mmap_log: bool
+    """use a MmapRotatingFileHandler (cli input arg --mmap-log)"""
+    result_cache: bool
+    """cache return values of cacheable commands on disk (see src.utils.result_cache)"""
+    result_cache_max_bytes: int
+    """max. sum of sizes of entries of the result cache"""
+    concurrency: int
+    """max. number of tasks the async task runner runs at once (cli input arg --concurrency)"""
+    pool: str | None
+    """pool kind to run selected commands on, None meaning serially (cli input arg --pool)"""
+    workers: int | None
+    """max. number of workers of pool, None meaning one per CPU (cli input arg --workers)"""
+    introspect: int | None
+    """port of the introspection endpoint, None meaning no endpoint (cli input arg --introspect)"""
+    metrics_file: Path | None
+    """file to write metrics to at program end, None meaning no file (cli input arg --metrics-file)"""
+    trace_file: Path | None
+    """file to export finished tracing spans to, None meaning no export (cli input arg --trace-file)"""
+
+
+DEFAULTS: Config = Config(
+    log_level=logging.WARNING,
+    log_file=ROOT / "log" / "app.log",
+    log_max_bytes=100*1024*1024,
+    log_backup_count=10,
+    log_format='%(asctime)s [%(levelname)-8s] %(name)s%(trace)s: %(message)s',
+    buffered_console=False,
+    shed_on_overload=False,
+    run_async=False,
+    compact_records=False,
+    mmap_log=False,
+    result_cache=True,
+    result_cache_max_bytes=256*1024*1024,
+    concurrency=100,
+    pool=None,
+    workers=None,
+    introspect=None,
+    metrics_file=None,
+    trace_file=None,
+)
+"""lowest layer"""
+
+_SNAPSHOT: Config | None = None
+"""compiled snapshot, None if it has not been compiled yet"""
+
+
+def parse_log_level(value: str) -> int:
+    """return level of logging of its name, e.g. "WARNING"
+
+    Raises:
+        ValueError: if value is not a level of logging
+    """
+    level: Any = getattr(logging, value.upper(), None)
+    if not isinstance(level, int):
+        raise ValueError(
+            f"Cannot configure logging. Invalid log level: '{value}'. "
+            f"Only levels from Python's 'logging' library are valid."
+        )
+    return level
+
+
+def _parse_bool(value: str) -> bool:
+    """return bool of value, e.g. "1", "true", "off"
+
+    Raises:
+        ValueError: if value is not a bool
+    """
+    if value.lower() in _TRUE:
+        return True
+    if value.lower() in _FALSE:
+        return False
+    raise ValueError(f"Invalid bool: '{value}'. Valid are {_TRUE + _FALSE}.")
+
+
+def _parse_positive_int(value: str) -> int:
+    """return int of value that is at least 1
+
+    Raises:
+        ValueError: if value is not an int or smaller than 1
+    """
+    number: int = int(value)
+    if number < 1:
+        raise ValueError(f"Invalid number: '{value}'. Must be at least 1.")
+    return number
+
+
+def _parse_port(value: str) -> int:
+    """return port of value, 0 for any free port
+
+    Raises:
+        ValueError: if value is not an int or not in 0..65535
+    """
+    port: int = int(value)
+    if not 0 <= port <= 65535:
+        raise ValueError(f"Invalid port: '{value}'. Must be in 0..65535.")
+    return port
+
+
+def _parse_pool(value: str) -> str:
+    """return pool kind of value
+
+    Raises:
+        ValueError: if value is not a pool kind
+    """
+    if value not in _POOL_KINDS:
+        raise ValueError(f"Invalid pool kind: '{value}'. Valid are {_POOL_KINDS}.")
+    return value
+
+
+_PARSERS: dict[str, Callable[[str], Any]] = {
+    "log_level": parse_log_level,
+    "log_file": lambda v: ROOT / v,
+    "log_max_bytes": _parse_positive_int,
+    "log_backup_count": int,
+    "log_format": str,
+    "buffered_console": _parse_bool,
+    "shed_on_overload": _parse_bool,
+    "run_async": _parse_bool,
+    "compact_records": _parse_bool,
+    "mmap_log": _parse_bool,
+    "result_cache": _parse_bool,
+    "result_cache_max_bytes": _parse_positive_int,
+    "concurrency": _parse_positive_int,
+    "pool": _parse_pool,
+    "workers": _parse_positive_int,
+    "introspect": _parse_port,
+    "metrics_file": lambda v: ROOT / v,
+    "trace_file": lambda v: ROOT / v,
+}
+"""function per key that parses a value of log.conf or of an environment variable"""
+
+
+def read_conf(path: Path) -> dict[str, str]:
+    """return unparsed values of config file, the last line of a key wins
+
+    Args:
+        path (Path): config file, e.g. log.conf
+
+    Raises:
+        FileNotFoundError: if file does not exist
+
+    Returns:
+        dict[str, str]: {key: value}
+    """
+    with open(path) as f:
+        content: str = f.read()
+    return {m.group(1): m.group(2) for m in _CONF_PATTERN.finditer(content)}
+
+
+def _parse_layer(values: Mapping[str, str], source: str) -> dict[str, Any]:
+    """parse unparsed values of a layer
+
+    Args:
+        values (Mapping[str, str]): {key: value}
+        source (str): name of layer, used in error messages
+
+    Raises:
+        ValueError: if a key is unknown or a value is invalid
+
+    Returns:
+        dict[str, Any]: {key: parsed value}
+    """
+    parsed: dict[str, Any] = {}
+    for key, value in values.items():
+        if key not in _PARSERS:
+            raise ValueError(f"Unknown config key '{key}' in {source}. Valid keys are {Config._fields}.")
+        try:
+            parsed[key] = _PARSERS[key](value)
+        except ValueError as e:
+            raise ValueError(f"Invalid value of config key '{key}' in {source}: {e}") from e
+    return parsed
+
+
+def _get_cli_layer() -> dict[str, Any]:
+    """return values of cli input args that were passed
+    """
+    layer: dict[str, Any] = {}
+    if CLI.V or CLI.v or CLI.q or CLI.Q:
+        layer["log_level"] = CLI.get_wanted_log_level()
+    for key in ("buffered_console", "shed_on_overload", "run_async", "compact_records", "mmap_log"):
+        if getattr(CLI, key):
+            layer[key] = True
+    for key in ("concurrency", "pool", "workers", "introspect"):
+        if getattr(CLI, key) is not None:
+            layer[key] = getattr(CLI, key)
+    # (paths of cli input args are relative to the working directory) #
+    for key in ("metrics_file", "trace_file"):
+        if getattr(CLI, key):
+            layer[key] = Path(getattr(CLI, key))
+    return layer
+
+
+def compile_config(conf_path: Path = LOG_CONF_PATH, environ: Mapping[str, str] | None = None) -> Config:
+    """merge all layers into a new snapshot
+
+    Args:
+        conf_path (Path, optional): config file. Defaults to LOG_CONF_PATH.
+        environ (Mapping[str, str] | None, optional): environment variables. Defaults to None
+            ...meaning os.environ.
+
+    Raises:
+        ValueError: if a key of log.conf is unknown or a value of log.conf or
+            ...of an environment variable is invalid
+
+    Returns:
+        Config: snapshot
+    """
+    environ = os.environ if environ is None else environ
+    values: dict[str, Any] = DEFAULTS._asdict()
+    with phase("config I/O"):
+        if conf_path.exists():
+            values.update(_parse_layer(read_conf(conf_path), str(conf_path)))
+    env_names: dict[str, str] = {key: ENV_PREFIX + key.upper() for key in Config._fields}
+    values.update(_parse_layer(
+        {key: environ[name] for key, name in env_names.items() if name in environ}, "environment"
+    ))
+    values.update(_get_cli_layer())
+    return Config(**values)
+
+
+def get() -> Config:
+    """return snapshot, compile it on first use
+
+    Returns:
+        Config: snapshot
+    """
+    global _SNAPSHOT
+    if _SNAPSHOT is None:
+        _SNAPSHOT = compile_config()
+    return _SNAPSHOT
+
+
+def invalidate() -> None:
+    """let the next get() compile a new snapshot, e.g. after log.conf was written
+    """
+    global _SNAPSHOT
+    _SNAPSHOT = None
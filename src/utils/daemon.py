@@ -0,0 +1,103 @@
+"""
+Module to run the program as a long-running daemon.
+- setup (imports, CLI parse, log.conf I/O, handler creation, log rotation) is done once
+- afterwards, jobs are accepted over a local Unix socket and run one after another
+  ...(see src.utils.jobs.run_job), so per-job latency drops from process start time to ms
+- protocol: one JSON object per line
+  - request: {"argv": ["--hello", "-v"]} or {"shutdown": true}
+  - response: JobResult.to_dict() or {"ok": true, "shutdown": true}
+- NOTE, the log level of the daemon is fixed at startup (-v, -q, ... of jobs do not change it)
+- NOTE, Unix sockets are not available on every platform (e.g. older Windows versions)
+"""
+import json
+import logging
+import os
+import socket
+import socketserver
+from collections.abc import Callable
+from pathlib import Path
+
+from src.log.log import configure_logger
+from src.utils.daemon_client import DEFAULT_SOCKET_PATH
+from src.utils.jobs import run_job
+
+logger = logging.getLogger(__name__)
+logger = configure_logger(logger)
+
+
+class _JobRequestHandler(socketserver.StreamRequestHandler):
+    """handle all requests of one client connection
+    """
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        """read requests line by line, run jobs and write responses
+        """
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request: dict = json.loads(line)
+                if request.get("shutdown"):
+                    self.server.stop = True
+                    response: dict = {"ok": True, "shutdown": True}
+                else:
+                    response = run_job(
+                        [str(arg) for arg in request["argv"]], self.server.parse_args
+                    ).to_dict()
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"ok": False, "error": f"Invalid request: {e!r}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+            if self.server.stop:
+                return
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Unix socket server that runs jobs one after another
+    - jobs run serially, as CLI state and exception store are process-wide
+    """
+    def __init__(self, socket_path: Path, parse_args: Callable[[list[str]], None]):
+        """init server and bind socket
+
+        Args:
+            socket_path (Path): path of Unix socket, a stale socket file is replaced
+            parse_args (Callable[[list[str]], None]): function that parses cli input args
+                ...of a job and saves them to CLI
+        """
+        if socket_path.exists():
+            socket_path.unlink()
+        self.parse_args: Callable[[list[str]], None] = parse_args
+        self.stop: bool = False
+        super().__init__(str(socket_path), _JobRequestHandler)
+        self.socket_path: Path = socket_path
+
+    def server_close(self) -> None:
+        """close socket and remove socket file
+        """
+        super().server_close()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+def serve(
+        parse_args: Callable[[list[str]], None],
+        socket_path: Path = DEFAULT_SOCKET_PATH,
+    ) -> None:
+    """run daemon until a shutdown request is received
+
+    Args:
+        parse_args (Callable[[list[str]], None]): function that parses cli input args
+            ...of a job and saves them to CLI (e.g. main._evaluate_job_args)
+        socket_path (Path, optional): path of Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Raises:
+        OSError: if Unix sockets are not supported on this platform
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Daemon mode needs Unix sockets, which are not supported on this platform.")
+    with DaemonServer(socket_path, parse_args) as server:
+        logger.info(f"Daemon (pid {os.getpid()}) accepts jobs on '{socket_path}'.")
+        while not server.stop:
+            server.handle_request()
+        logger.info("Daemon shuts down.")
@@ -0,0 +1,92 @@
+"""
+Thin client to submit jobs to a running daemon (see src.utils.daemon).
+- only imports the standard library and src.vars.paths, so it starts fast
+- run via `python -m src.utils.daemon_client [--socket=<path>] [--shutdown] [<arg>...]`
+  - every <arg> is passed to the daemon as cli input arg of the job, e.g. `--hello -v`
+  - exit code is 0 if the job ran without exceptions, else 1
+NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import json
+import socket
+import sys
+from pathlib import Path
+from typing import Any
+
+from src.vars.paths import ROOT
+
+
+DEFAULT_SOCKET_PATH: Path = ROOT / "log" / "daemon.sock"
+"""path of Unix socket of daemon if no socket path is passed"""
+
+
+def request(payload: dict[str, Any], socket_path: Path = DEFAULT_SOCKET_PATH) -> dict[str, Any]:
+    """send one request to daemon and return its response
+
+    Args:
+        payload (dict[str, Any]): request, see protocol in src.utils.daemon
+        socket_path (Path, optional): path of Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Raises:
+        ConnectionError: if daemon closes the connection without response
+
+    Returns:
+        dict[str, Any]: response
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line: bytes = f.readline()
+    if not line:
+        raise ConnectionError(f"Daemon on '{socket_path}' closed connection without response.")
+    return json.loads(line)
+
+
+def submit(argv: list[str], socket_path: Path = DEFAULT_SOCKET_PATH) -> dict[str, Any]:
+    """submit job to daemon and return its result
+
+    Args:
+        argv (list[str]): cli input args of job
+        socket_path (Path, optional): path of Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        dict[str, Any]: result of job, see JobResult
+    """
+    return request({"argv": argv}, socket_path)
+
+
+def shutdown(socket_path: Path = DEFAULT_SOCKET_PATH) -> dict[str, Any]:
+    """request daemon to shut down
+
+    Args:
+        socket_path (Path, optional): path of Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        dict[str, Any]: response
+    """
+    return request({"shutdown": True}, socket_path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """submit job (or shutdown request) and print result as JSON
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv[1:].
+
+    Returns:
+        int: exit code, 0 if job ran without exceptions
+    """
+    args: list[str] = list(sys.argv[1:] if argv is None else argv)
+    socket_path: Path = DEFAULT_SOCKET_PATH
+    if args and args[0].startswith("--socket="):
+        socket_path = Path(args.pop(0).split("=", 1)[1])
+    if args == ["--shutdown"]:
+        response: dict[str, Any] = shutdown(socket_path)
+    else:
+        response = submit(args, socket_path)
+    print(json.dumps(response))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
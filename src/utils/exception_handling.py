@@ -3,11 +3,24 @@ TODO:
   - work through exception handling
   - log_exc does not log exception, raise_exception does but never enters program_end func
 """
+import asyncio
+import hashlib
+import json
+import os
 import sys
 import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Any
 
 
 from src.log.log import configure_logger
+from src.utils import startup_profile
+from src.vars.paths import ROOT
 from src.vars.pretty_print import SEPARATOR
 
 logger = logging.getLogger(__name__)
@@ -15,7 +28,33 @@ logger = configure_logger(logger)
 
 
 EXC: list[list] = []
-"""stores all occured exception messages [[exc_msg: str, exc_info: tuple[type[BaseException], BaseException, TracebackType]]]"""
+"""stores all occured exception messages [[exc_msg: str, exc_info: tuple[type[BaseException], BaseException, TracebackType] | None, timestamp: float]]
+- exc_info is None for message-only entries, e.g. of event loop errors without exception"""
+
+RUN_ID: str = uuid.uuid4().hex[:16]
+"""id of this run (process), part of every report entry"""
+
+RUN_START: float = time.time() - (time.perf_counter() - startup_profile.START)
+"""start of this run as Unix timestamp, part of every report entry"""
+
+REPORT_FILE: Path = ROOT / "log" / "exceptions.jsonl"
+"""JSON-lines report of catched exceptions, appended at program end (see write_report)"""
+
+REPORT_MAX_BYTES: int = 1024 * 1024
+"""report is rotated before an append would let it grow beyond this size"""
+
+REPORT_BACKUP_COUNT: int = 3
+"""number of rotated reports that are kept (REPORT_FILE.1 is the most recent one)"""
+
+REPORT_MAX_MESSAGE: int = 500
+"""max. number of characters of an exception message in the report"""
+
+SUMMARIES: list[Callable[[], str | None]] = []
+"""functions that return a summary (or None if there is nothing to report), logged at program end
+- modules register their summary on first use (e.g. metrics on the first update of a metric)"""
+
+_PROGRAM_ENDED: bool = False
+"""roundup of program_end was output, later uncaught exceptions of threads go to the original hook"""
 
 
 def clear_catched_exceptions():
@@ -30,32 +69,254 @@ def log_exc(exc_msg: str, exc_info, store_exc_info: bool = True):
 
     Args:
         exc_msg (str): exception message
-        exc_info (_OptExcInfo): exception info
+        exc_info (_OptExcInfo | None): exception info, None for a message-only entry
+            ...(logged via logging.error without traceback)
         store_exc_info (bool): indicates whether to store exc info or not.
             ... Defaults to True.
     """
     if store_exc_info:
         global EXC
-        EXC.append([exc_msg, exc_info])
-    logger.exception(
+        EXC.append([exc_msg, exc_info, time.time()])
+    msg: str = (
         f"\n"
         f"{SEPARATOR}\n"
         f"{SEPARATOR}\n"
         f"{exc_msg}\n"
         f"{SEPARATOR}\n"
-        f"{SEPARATOR}",
-        exc_info=exc_info
+        f"{SEPARATOR}"
     )
+    if exc_info is None:
+        logger.error(msg)
+    else:
+        logger.exception(msg, exc_info=exc_info)
+
+def record_exc(exc_msg: str, exc_info) -> None:
+    """store exception for the roundup without logging it
+    - cheap: the traceback is only rendered when the roundup is output
+
+    Args:
+        exc_msg (str): exception message
+        exc_info (_OptExcInfo | None): exception info, None for a message-only entry
+    """
+    EXC.append([exc_msg, exc_info, time.time()])
+
+def register_summary(func: Callable[[], str | None]) -> Callable[[], str | None]:
+    """register a function whose summary is logged at program end
+    - can be used as decorator
+
+    Args:
+        func (Callable[[], str | None]): function that returns a summary or None
+
+    Returns:
+        Callable[[], str | None]: same function
+    """
+    if func not in SUMMARIES:
+        SUMMARIES.append(func)
+    return func
+
+
+def roundup():
+    """output all catched exceptions as roundup
+    """
+    if EXC:
+        logger.warning(f"Roundup of catched exceptions (ordered by time):\n")
+        for exc in EXC:
+            log_exc(exc[0], exc[1], store_exc_info=False)
+
+
+def _fingerprint(exc_msg: str, exc_info) -> tuple[str, str | None, str]:
+    """return fingerprint, type and location of exception
+    - the location is the innermost frame of the traceback, e.g. 'src/hello_world.py:11 (hello)'
+    - the message is not part of the fingerprint, as it often contains varying data,
+      ...message-only entries (without exception) are fingerprinted by their message
+
+    Args:
+        exc_msg (str): exception message
+        exc_info (_OptExcInfo | None): exception info
+
+    Returns:
+        tuple[str, str | None, str]: fingerprint, type (None for message-only entries) and location
+    """
+    exc_type, tb = (exc_info[0], exc_info[2]) if isinstance(exc_info, tuple) else (None, None)
+    if exc_type is None:
+        return hashlib.sha1(f"None|{exc_msg}".encode()).hexdigest()[:16], None, ""
+    type_name: str = f"{exc_type.__module__}.{exc_type.__qualname__}"
+    location: str = ""
+    if tb is not None:
+        while tb.tb_next is not None:
+            tb = tb.tb_next
+        path: Path = Path(tb.tb_frame.f_code.co_filename)
+        if path.is_relative_to(ROOT):
+            path = path.relative_to(ROOT)
+        location = f"{path.as_posix()}:{tb.tb_lineno} ({tb.tb_frame.f_code.co_name})"
+    return hashlib.sha1(f"{type_name}|{location}".encode()).hexdigest()[:16], type_name, location
+
+
+def _iter_report() -> Iterator[dict[str, Any]]:
+    """yield one report entry per distinct exception (see _fingerprint), ordered by first occurrence
+    - every entry carries the id, pid and start of this run
+
+    Yields:
+        Iterator[dict[str, Any]]: report entry
+    """
+    now: float = time.time()
+    entries: dict[str, dict[str, Any]] = {}
+    for exc in EXC:
+        fingerprint, type_name, location = _fingerprint(exc[0], exc[1])
+        # entries without timestamp, e.g. of older callers, occured at the latest now #
+        timestamp: float = exc[2] if len(exc) > 2 else now
+        entry: dict[str, Any] | None = entries.get(fingerprint)
+        if entry is None:
+            exc_value = exc[1][1] if isinstance(exc[1], tuple) else None
+            entries[fingerprint] = {
+                "run_id": RUN_ID,
+                "pid": os.getpid(),
+                "run_start": RUN_START,
+                "fingerprint": fingerprint,
+                "type": type_name,
+                "message": str(exc_value)[:REPORT_MAX_MESSAGE] if exc_value is not None else "",
+                "context": exc[0],
+                "location": location,
+                "count": 1,
+                "first": timestamp,
+                "last": timestamp,
+            }
+        else:
+            entry["count"] += 1
+            entry["first"] = min(entry["first"], timestamp)
+            entry["last"] = max(entry["last"], timestamp)
+    yield from entries.values()
+
+
+def _rotate_report(path: Path, incoming: int) -> None:
+    """rotate report (path -> path.1 -> .. -> path.REPORT_BACKUP_COUNT) if appending
+    ...incoming bytes would let it grow beyond REPORT_MAX_BYTES
+
+    Args:
+        path (Path): JSON-lines file
+        incoming (int): number of bytes that are appended
+    """
+    if not path.exists() or path.stat().st_size + incoming <= REPORT_MAX_BYTES:
+        return
+    for i in range(REPORT_BACKUP_COUNT - 1, 0, -1):
+        backup: Path = path.with_name(f"{path.name}.{i}")
+        if backup.exists():
+            os.replace(backup, path.with_name(f"{path.name}.{i + 1}"))
+    os.replace(path, path.with_name(f"{path.name}.1"))
+
+
+def write_report(path: Path | None = None) -> int:
+    """append catched exceptions of this run as JSON lines, one line per distinct exception
+    - the lines of a run are appended by one write, so reports of concurrent runs do not interleave
+    - the report is rotated instead of growing without bound (see _rotate_report),
+      ...runs without catched exceptions do not touch it
+
+    Args:
+        path (Path | None, optional): JSON-lines file. Defaults to None meaning REPORT_FILE.
+
+    Returns:
+        int: number of written lines
+    """
+    path = path or REPORT_FILE
+    if not EXC:
+        return 0
+    lines: list[str] = [json.dumps(entry, default=repr) + "\n" for entry in _iter_report()]
+    data: bytes = "".join(lines).encode()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _rotate_report(path, len(data))
+    with open(path, "ab") as f:
+        f.write(data)
+    return len(lines)
+
 
 def program_end():
-    """when program exits, output all catched exceptions as roundup
+    """when program exits, output all registered summaries and catched exceptions as roundup
+    - catched exceptions are written to REPORT_FILE as well (see write_report)
     """        
+    global _PROGRAM_ENDED
     logger.warning((
         f"\n{SEPARATOR}"
         f"\n{SEPARATOR}"
         f"\n\nProgram ends.."
     ))
-    if EXC:
-        logger.warning(f"Roundup of catched exceptions (ordered by time):\n")
-        for exc in EXC:
-            log_exc(exc[0], exc[1], store_exc_info=False)
+    for get_summary in SUMMARIES:
+        summary: str | None = get_summary()
+        if summary:
+            logger.warning(summary)
+    roundup()
+    if write_report():
+        logger.warning(f"Exception report written to '{REPORT_FILE}'.")
+    _PROGRAM_ENDED = True
+
+
+_ORIGINAL_HOOKS: dict[str, Callable] = {}
+"""hooks that were installed before install_hooks {name: hook}"""
+
+
+def _excepthook(
+        exc_type: type[BaseException],
+        exc_value: BaseException,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+    """sys.excepthook: record uncaught exception of main thread and end program with roundup
+    - KeyboardInterrupt is passed on to the original hook
+    """
+    if issubclass(exc_type, KeyboardInterrupt):
+        _ORIGINAL_HOOKS.get("sys", sys.__excepthook__)(exc_type, exc_value, exc_traceback)
+        return
+    record_exc("Uncaught exception in main thread.", (exc_type, exc_value, exc_traceback))
+    program_end()
+
+
+def _threading_excepthook(args: threading.ExceptHookArgs) -> None:
+    """threading.excepthook: record uncaught exception of thread
+    - SystemExit is ignored, as by the default hook
+    - once the roundup was output (e.g. a thread fails during shutdown), the exception is passed on
+      ...to the original hook, as it would not show up anywhere else
+    """
+    if issubclass(args.exc_type, SystemExit):
+        return
+    if _PROGRAM_ENDED:
+        _ORIGINAL_HOOKS.get("threading", threading.__excepthook__)(args)
+        return
+    thread_name: str = args.thread.name if args.thread is not None else "<unknown>"
+    record_exc(
+        f"Uncaught exception in thread '{thread_name}'.",
+        (args.exc_type, args.exc_value, args.exc_traceback),
+    )
+
+
+def loop_exception_handler(loop: asyncio.AbstractEventLoop, context: dict[str, Any]) -> None:
+    """exception handler of asyncio event loops: record exceptions that no task retrieved
+    - e.g. of tasks that were never awaited or of callbacks
+    - install via `loop.set_exception_handler(loop_exception_handler)`
+
+    Args:
+        loop (asyncio.AbstractEventLoop): event loop
+        context (dict[str, Any]): context of exception, see loop.call_exception_handler
+    """
+    e: BaseException | None = context.get("exception")
+    # contexts without exception (e.g. of slow callbacks) are stored as message-only entries #
+    record_exc(
+        f"Uncaught exception in event loop: {context.get('message', 'no message')}",
+        (type(e), e, e.__traceback__) if e is not None else None,
+    )
+
+
+def install_hooks() -> None:
+    """record uncaught exceptions of main thread and of threads into the roundup
+    - see loop_exception_handler for event loops
+    """
+    if not _ORIGINAL_HOOKS:
+        _ORIGINAL_HOOKS["sys"] = sys.excepthook
+        _ORIGINAL_HOOKS["threading"] = threading.excepthook
+    sys.excepthook = _excepthook
+    threading.excepthook = _threading_excepthook
+
+
+def uninstall_hooks() -> None:
+    """restore the hooks that were installed before install_hooks
+    """
+    if _ORIGINAL_HOOKS:
+        sys.excepthook = _ORIGINAL_HOOKS.pop("sys")
+        threading.excepthook = _ORIGINAL_HOOKS.pop("threading")
@@ -0,0 +1,217 @@
+"""
+Module that provides an execution engine that runs tasks on a thread or process pool.
+- tasks are submitted in chunks, at most one chunk per worker is in flight at a time
+  ...(bounded memory, and a submitted chunk starts right away, so its timeout is meaningful)
+- a timed out chunk that is still running keeps its worker busy, so the pool is replaced by a new one
+  ...for the remaining chunks (they do not queue behind it) and the old pool is not waited for
+- results are delivered in task order or as they complete, in task order at most
+  ...READY_PER_WORKER * workers * chunksize results wait behind a slow task (no new chunks are submitted then)
+- every failed task (incl. timeouts) is routed into the exception roundup of exception_handling
+- tasks on thread pools run in a copy of the caller's context, i.e. within its tracing span
+- NOTE, a timed out task cannot be killed: a thread keeps running in the background,
+  ...a process keeps its worker busy until the task returns
+"""
+import concurrent.futures as cf
+import itertools
+import os
+import time
+import traceback
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, NamedTuple
+
+from src.utils import exception_handling as exc
+from src.utils import tracing
+
+
+POOL_KINDS: dict[str, type[cf.Executor]] = {
+    "thread": cf.ThreadPoolExecutor,
+    "process": cf.ProcessPoolExecutor,
+}
+"""available pool kinds {name: executor class}"""
+
+READY_PER_WORKER: int = 4
+"""chunks per worker whose results may wait for an earlier task if results are delivered in task order"""
+
+
+class TaskResult(NamedTuple):
+    """result of a task
+    """
+    index: int
+    """position of task in passed tasks"""
+    ok: bool
+    """task returned without exception"""
+    value: Any = None
+    """return value of task"""
+    error: BaseException | None = None
+    """exception raised by task"""
+    remote_traceback: str | None = None
+    """formatted traceback if task failed in another process"""
+
+
+def _chunked(tasks: Iterable[tuple], chunksize: int) -> Iterator[list[tuple[int, tuple]]]:
+    """yield lists of at most chunksize tasks together with their index, consume tasks lazily
+
+    Args:
+        tasks (Iterable[tuple]): args per task
+        chunksize (int): max. number of tasks per chunk
+
+    Yields:
+        Iterator[list[tuple[int, tuple]]]: [(index of task, args of task)]
+    """
+    it: Iterator[tuple[int, tuple]] = enumerate(tasks)
+    while chunk := list(itertools.islice(it, chunksize)):
+        yield chunk
+
+
+def _run_chunk(
+        func: Callable[..., Any],
+        chunk: list[tuple[int, tuple]],
+        in_process: bool,
+    ) -> list[TaskResult]:
+    """run all tasks of chunk, catch exceptions per task
+
+    Args:
+        func (Callable[..., Any]): function to run
+        chunk (list[tuple[int, tuple]]): [(index of task, args of task)]
+        in_process (bool): chunk runs in another process, i.e. tracebacks get lost on pickling
+
+    Returns:
+        list[TaskResult]: result per task
+    """
+    results: list[TaskResult] = []
+    for index, args in chunk:
+        try:
+            results.append(TaskResult(index, True, func(*args)))
+        except Exception as e:
+            results.append(TaskResult(
+                index, False, error=e, remote_traceback=traceback.format_exc() if in_process else None
+            ))
+    return results
+
+
+def log_task_failure(result: TaskResult, func: Callable[..., Any]) -> None:
+    """route failed task into exception roundup
+
+    Args:
+        result (TaskResult): failed task
+        func (Callable[..., Any]): function of task
+    """
+    msg: str = f"Task {result.index} ({getattr(func, '__qualname__', func)!s}) failed."
+    if result.remote_traceback:
+        msg += f"\nRemote traceback:\n{result.remote_traceback}"
+    exc.log_exc(msg, (type(result.error), result.error, result.error.__traceback__))
+
+
+def run_tasks(
+        func: Callable[..., Any],
+        tasks: Iterable[tuple],
+        pool: str = "thread",
+        max_workers: int | None = None,
+        chunksize: int = 1,
+        timeout: float | None = None,
+        ordered: bool = True,
+    ) -> Iterator[TaskResult]:
+    """run func once per task on a pool and yield the results
+
+    Args:
+        func (Callable[..., Any]): function to run, must be picklable for process pools
+        tasks (Iterable[tuple]): args per task, consumed lazily
+        pool (str, optional): pool kind, see POOL_KINDS. Defaults to "thread".
+        max_workers (int | None, optional): number of workers. Defaults to None
+            ...meaning number of CPUs.
+        chunksize (int, optional): number of tasks that are sent to a worker at once.
+            ...Defaults to 1.
+        timeout (float | None, optional): seconds per task after which it fails with TimeoutError.
+            ...Defaults to None meaning no timeout.
+        ordered (bool, optional): yield results in task order, else as they complete.
+            ...Defaults to True.
+
+    Raises:
+        ValueError: if pool kind is unknown or chunksize is smaller than 1
+
+    Yields:
+        Iterator[TaskResult]: result per task
+    """
+    if pool not in POOL_KINDS:
+        raise ValueError(f"Unknown pool kind '{pool}'. Valid kinds: {list(POOL_KINDS)}")
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, but is {chunksize}.")
+    max_workers = max_workers or os.cpu_count() or 1
+    in_process: bool = pool == "process"
+    run_chunk: Callable[..., list[TaskResult]] = _run_chunk if in_process else tracing.wrap(_run_chunk)
+    chunks: Iterator[list[tuple[int, tuple]]] = _chunked(tasks, chunksize)
+
+    executor: cf.Executor = POOL_KINDS[pool](max_workers=max_workers)
+    abandoned_executors: list[cf.Executor] = []
+    pending: dict[cf.Future, tuple[float | None, list[tuple[int, tuple]]]] = {}
+    ready: dict[int, TaskResult] = {}
+    max_ready: int = READY_PER_WORKER * max_workers * chunksize
+    next_index: int = 0
+    exhausted: bool = False
+
+    def submit() -> None:
+        """submit chunks until every worker has one, unless results that wait in ready are capped
+        """
+        nonlocal exhausted
+        while not exhausted and len(pending) < max_workers and len(ready) < max_ready:
+            chunk: list[tuple[int, tuple]] | None = next(chunks, None)
+            if not chunk:
+                exhausted = True
+                return
+            deadline: float | None = \
+                time.monotonic() + timeout * len(chunk) if timeout is not None else None
+            pending[executor.submit(run_chunk, func, chunk, in_process)] = (deadline, chunk)
+
+    try:
+        submit()
+        while pending:
+            deadlines: list[float] = [d for d, _ in pending.values() if d is not None]
+            wait_for: float | None = \
+                max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+            done, _ = cf.wait(pending, timeout=wait_for, return_when=cf.FIRST_COMPLETED)
+
+            finished: list[TaskResult] = []
+            now: float = time.monotonic()
+            abandoned: bool = False
+            for fut in list(pending):
+                deadline, chunk = pending[fut]
+                if fut in done:
+                    try:
+                        finished.extend(fut.result())
+                    except Exception as e:
+                        # e.g. BrokenProcessPool or unpicklable result #
+                        finished.extend(TaskResult(i, False, error=e) for i, _ in chunk)
+                elif deadline is not None and now >= deadline:
+                    abandoned = abandoned or not fut.cancel()
+                    finished.extend(
+                        TaskResult(i, False, error=TimeoutError(
+                            f"Task {i} did not finish within {timeout} seconds."
+                        ))
+                        for i, _ in chunk
+                    )
+                else:
+                    continue
+                del pending[fut]
+            if abandoned:
+                # worker of abandoned chunk stays busy, chunks still in flight finish on old pool #
+                executor.shutdown(wait=False)
+                abandoned_executors.append(executor)
+                executor = POOL_KINDS[pool](max_workers=max_workers)
+
+            for result in finished:
+                if not result.ok:
+                    log_task_failure(result, func)
+                if ordered:
+                    ready[result.index] = result
+                else:
+                    yield result
+            while next_index in ready:
+                yield ready.pop(next_index)
+                next_index += 1
+            submit()
+    finally:
+        # do not wait for abandoned (timed out) or pending chunks #
+        for e in abandoned_executors:
+            e.shutdown(wait=False, cancel_futures=True)
+        executor.shutdown(wait=not pending, cancel_futures=True)
+
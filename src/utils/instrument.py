@@ -0,0 +1,184 @@
+"""
+Module to measure wall and CPU time of hot code sections.
+- sections are timed via decorator (timed) or context manager (section)
+- every section aggregates into one preallocated, slotted SectionStats object
+  ...(no allocation and no logging per call)
+- instrumentation is switched on via environment variable APP_INSTRUMENT=1,
+  ...which is evaluated at import time: if it is not set, timed returns the undecorated function
+  ...and section returns a shared no-op context manager, so instrumented code runs without overhead
+- a ranked table of the hottest sections is logged at program end (see exception_handling)
+- NOTE, counts of sections that run concurrently in many threads are approximate,
+  ...as aggregates are updated without locking
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import contextlib
+import functools
+import os
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from src.utils import exception_handling as exc
+
+
+ENABLED: bool = os.environ.get("APP_INSTRUMENT", "0") == "1"
+"""instrumentation is enabled, evaluated once at import time"""
+
+TABLE_SIZE: int = 20
+"""max. number of sections in the summary table"""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class SectionStats():
+    """aggregated timings of a section
+    """
+    __slots__ = ("name", "calls", "wall", "cpu", "max_wall")
+
+    def __init__(self, name: str):
+        """init empty aggregates
+
+        Args:
+            name (str): name of section
+        """
+        self.name: str = name
+        self.calls: int = 0
+        self.wall: float = 0.0
+        """total wall time in seconds"""
+        self.cpu: float = 0.0
+        """total CPU time of the calling thread in seconds"""
+        self.max_wall: float = 0.0
+        """max. wall time of one call in seconds"""
+
+    def add(self, wall: float, cpu: float) -> None:
+        """add timing of one call
+
+        Args:
+            wall (float): wall time in seconds
+            cpu (float): CPU time in seconds
+        """
+        self.calls += 1
+        self.wall += wall
+        self.cpu += cpu
+        if wall > self.max_wall:
+            self.max_wall = wall
+
+
+SECTIONS: dict[str, SectionStats] = {}
+"""aggregates per section name (in order of first use)"""
+
+
+def get_stats(name: str) -> SectionStats:
+    """return aggregates of section, create them if needed
+
+    Args:
+        name (str): name of section
+
+    Returns:
+        SectionStats: aggregates
+    """
+    stats: SectionStats | None = SECTIONS.get(name)
+    if stats is None:
+        exc.register_summary(get_summary)
+        stats = SECTIONS.setdefault(name, SectionStats(name))
+    return stats
+
+
+class _Timer():
+    """context manager that adds its runtime to the aggregates of a section
+    """
+    __slots__ = ("stats", "wall", "cpu")
+
+    def __init__(self, stats: SectionStats):
+        self.stats: SectionStats = stats
+
+    def __enter__(self) -> "_Timer":
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        wall: float = time.perf_counter() - self.wall
+        self.stats.add(wall, time.thread_time() - self.cpu)
+
+
+_NOOP: contextlib.nullcontext = contextlib.nullcontext()
+"""shared context manager that is returned by section if instrumentation is disabled"""
+
+
+def section(name: str) -> contextlib.AbstractContextManager:
+    """return context manager that times the wrapped code block as section name
+
+    Args:
+        name (str): name of section
+
+    Returns:
+        contextlib.AbstractContextManager: timer, or a no-op if instrumentation is disabled
+    """
+    if not ENABLED:
+        return _NOOP
+    return _Timer(get_stats(name))
+
+
+def timed(name: str | None = None) -> Callable[[F], F]:
+    """return decorator that times every call of the decorated function as section name
+    - if instrumentation is disabled, the function is returned undecorated
+
+    Args:
+        name (str | None, optional): name of section. Defaults to None
+            ...meaning module and qualified name of the function.
+
+    Returns:
+        Callable[[F], F]: decorator
+    """
+    def decorator(func: F) -> F:
+        if not ENABLED:
+            return func
+        stats: SectionStats = get_stats(name or f"{func.__module__}.{func.__qualname__}")
+        perf_counter: Callable[[], float] = time.perf_counter
+        thread_time: Callable[[], float] = time.thread_time
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cpu: float = thread_time()
+            wall: float = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(perf_counter() - wall, thread_time() - cpu)
+
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def clear() -> None:
+    """clear aggregates of all sections
+    """
+    SECTIONS.clear()
+
+
+def get_summary() -> str | None:
+    """return table of the hottest sections (ranked by total wall time), None if nothing was timed
+
+    Returns:
+        str | None: summary
+    """
+    ranked: list[SectionStats] = sorted(
+        (s for s in list(SECTIONS.values()) if s.calls), key=lambda s: s.wall, reverse=True
+    )
+    if not ranked:
+        return None
+    total_wall: float = sum(s.wall for s in ranked) or 1.0
+    width: int = max(len("section"), *(len(s.name) for s in ranked[:TABLE_SIZE]))
+    lines: list[str] = [
+        f"Hot sections (top {min(len(ranked), TABLE_SIZE)} of {len(ranked)}, by wall time):",
+        f"  {'section':<{width}} {'calls':>10} {'wall ms':>12} {'cpu ms':>12} "
+        f"{'mean us':>12} {'max ms':>10} {'wall %':>7}",
+    ]
+    for s in ranked[:TABLE_SIZE]:
+        lines.append(
+            f"  {s.name:<{width}} {s.calls:>10} {s.wall * 1e3:>12.3f} {s.cpu * 1e3:>12.3f} "
+            f"{s.wall / s.calls * 1e6:>12.3f} {s.max_wall * 1e3:>10.3f} "
+            f"{s.wall / total_wall * 100:>6.1f}%"
+        )
+    return "\n".join(lines)
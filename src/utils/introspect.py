@@ -0,0 +1,265 @@
+"""
+Module to look into a running process via a local HTTP endpoint.
+- opt-in via cli input arg --introspect=<port>, the server only binds 127.0.0.1
+- served from a daemon thread, every request is answered from a new daemon thread
+- state is only collected when it is requested, nothing is hooked into logging or
+  ...other code paths, so the endpoint costs nothing while nobody is querying
+- endpoints (GET, JSON unless stated otherwise):
+  - /logging: loggers with handlers (see configure_logger), their handlers incl. handlers
+    ...behind a queue, backlog of handlers and state of the overload policy
+  - /exceptions: number of catched exceptions and the most recent ones (see exception_handling)
+  - /threads: stack of every thread
+  - /memory?top=<n>&start=1: top allocation sites if tracemalloc is tracing,
+    ...start=1 starts tracing (from then on, allocations are slower)
+  - /metrics: metrics in Prometheus text format (see src.utils.metrics)
+- e.g. `curl http://127.0.0.1:<port>/threads`
+"""
+import http.server
+import json
+import logging
+import os
+import sys
+import threading
+import traceback
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import SplitResult, parse_qs, urlsplit
+
+from src.log.log import configure_logger
+from src.log import overload
+from src.log import queued as queued_handlers
+from src.utils import exception_handling as exc
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+logger = configure_logger(logger)
+
+
+DEFAULT_HOST: str = "127.0.0.1"
+"""host the server binds, local connections only"""
+
+RECENT_EXCEPTIONS: int = 20
+"""max. number of catched exceptions returned by /exceptions"""
+
+DEFAULT_TOP: int = 10
+"""number of allocation sites returned by /memory if top is not passed"""
+
+MEM_FRAMES: int = 10
+"""number of frames tracemalloc stores per allocation, if tracing is started via /memory"""
+
+
+def _get_handler_state(handler: logging.Handler) -> dict[str, Any]:
+    """return state of handler, handlers behind a queue are nested
+    """
+    state: dict[str, Any] = {
+        "type": type(handler).__name__,
+        "level": logging.getLevelName(handler.level),
+        "backlog": overload.get_backlog(handler),
+    }
+    filename: str | None = getattr(handler, "baseFilename", None)
+    if filename is not None:
+        state["file"] = filename
+        try:
+            state["file_size"] = os.stat(filename).st_size
+        except OSError:
+            state["file_size"] = None
+    if isinstance(handler, queued_handlers.ListenerQueueHandler):
+        thread: threading.Thread | None = getattr(handler.listener, "_thread", None)
+        state["listener_alive"] = thread is not None and thread.is_alive()
+        state["handlers"] = [_get_handler_state(h) for h in handler.handlers]
+    return state
+
+
+def get_logging_state() -> dict[str, Any]:
+    """return state of all loggers with handlers and of the overload policy
+
+    Returns:
+        dict[str, Any]: state
+    """
+    loggers: list[logging.Logger] = [logging.getLogger()] + [
+        lg for lg in list(logging.Logger.manager.loggerDict.values())
+        if isinstance(lg, logging.Logger) and lg.handlers
+    ]
+    return {
+        "loggers": {
+            lg.name: {
+                "level": logging.getLevelName(lg.getEffectiveLevel()),
+                "propagate": lg.propagate,
+                "handlers": [_get_handler_state(h) for h in list(lg.handlers)],
+            }
+            for lg in loggers
+        },
+        "overload": {
+            "shed_level": logging.getLevelName(overload.DEFAULT_POLICY.shed_level),
+            "shed": overload.DEFAULT_POLICY.get_shed_counts(),
+        },
+    }
+
+
+def get_exception_state() -> dict[str, Any]:
+    """return number of catched exceptions and the most recent ones
+    - entries without timestamp (e.g. appended by older callers) have time None,
+      ...message-only entries (exc_info None) have type and error None
+
+    Returns:
+        dict[str, Any]: state
+    """
+    catched: list[list] = list(exc.EXC)
+    recent: list[dict[str, Any]] = []
+    for entry in catched[-RECENT_EXCEPTIONS:]:
+        exc_info = entry[1] if len(entry) > 1 and isinstance(entry[1], tuple) else (None, None, None)
+        recent.append({
+            "message": entry[0] if entry else None,
+            "type": exc_info[0].__name__ if exc_info[0] else None,
+            "error": str(exc_info[1]) if exc_info[1] is not None else None,
+            "time": entry[2] if len(entry) > 2 else None,
+        })
+    return {"count": len(catched), "recent": recent}
+
+
+def get_thread_state() -> list[dict[str, Any]]:
+    """return stack of every thread, innermost frame last
+
+    Returns:
+        list[dict[str, Any]]: state per thread
+    """
+    threads: dict[int | None, threading.Thread] = {t.ident: t for t in threading.enumerate()}
+    states: list[dict[str, Any]] = []
+    for ident, frame in sys._current_frames().items():
+        thread: threading.Thread | None = threads.get(ident)
+        states.append({
+            "name": thread.name if thread is not None else None,
+            "ident": ident,
+            "daemon": thread.daemon if thread is not None else None,
+            "stack": [
+                f"{f.filename}:{f.lineno} in {f.name}" for f in traceback.extract_stack(frame)
+            ],
+        })
+    return states
+
+
+def get_memory_state(top: int = DEFAULT_TOP, start: bool = False) -> dict[str, Any]:
+    """return top allocation sites (by size) if tracemalloc is tracing
+
+    Args:
+        top (int, optional): number of allocation sites. Defaults to DEFAULT_TOP.
+        start (bool, optional): start tracing if it is not running. Defaults to False.
+
+    Returns:
+        dict[str, Any]: state
+    """
+    if start and not tracemalloc.is_tracing():
+        tracemalloc.start(MEM_FRAMES)
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    return {
+        "tracing": True,
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "location": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                "size": s.size,
+                "count": s.count,
+            }
+            for s in snapshot.statistics("lineno")[:top]
+        ],
+    }
+
+
+class _IntrospectionRequestHandler(http.server.BaseHTTPRequestHandler):
+    """answer GET requests of the endpoints
+    """
+    def do_GET(self) -> None:
+        """collect requested state and write it as response
+        """
+        url: SplitResult = urlsplit(self.path)
+        query: dict[str, list[str]] = parse_qs(url.query)
+        routes: dict[str, Callable[[], Any]] = {
+            "/logging": get_logging_state,
+            "/exceptions": get_exception_state,
+            "/threads": get_thread_state,
+            "/memory": lambda: get_memory_state(
+                int(query.get("top", [DEFAULT_TOP])[0]), query.get("start", ["0"])[0] == "1"
+            ),
+        }
+        try:
+            if url.path == "/metrics":
+                self._respond(200, metrics.to_prometheus(), "text/plain; version=0.0.4")
+            elif url.path in routes:
+                self._respond(200, json.dumps(routes[url.path](), default=repr), "application/json")
+            else:
+                known: list[str] = [*routes, "/metrics"]
+                self._respond(404, json.dumps({"error": f"Unknown path, known: {known}"}), "application/json")
+        except Exception as e:
+            self._respond(500, json.dumps({"error": repr(e)}), "application/json")
+
+    def _respond(self, status: int, body: str, content_type: str) -> None:
+        """write response
+        """
+        data: bytes = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """do not write requests to stderr
+        """
+
+
+class IntrospectionServer(http.server.ThreadingHTTPServer):
+    """HTTP server of the endpoints, served from a daemon thread
+    """
+    daemon_threads: bool = True
+
+    def __init__(self, port: int = 0, host: str = DEFAULT_HOST):
+        """bind server and start thread
+
+        Args:
+            port (int, optional): port, 0 for any free port. Defaults to 0.
+            host (str, optional): host. Defaults to DEFAULT_HOST.
+        """
+        super().__init__((host, port), _IntrospectionRequestHandler)
+        self._thread: threading.Thread = threading.Thread(
+            target=self.serve_forever, name="introspect", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        """return base url of endpoints
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        """stop thread and close socket
+        """
+        self.shutdown()
+        self._thread.join()
+        self.server_close()
+
+
+def start(port: int = 0, host: str = DEFAULT_HOST) -> IntrospectionServer:
+    """start endpoints of the process
+
+    Args:
+        port (int, optional): port, 0 for any free port. Defaults to 0.
+        host (str, optional): host. Defaults to DEFAULT_HOST.
+
+    Raises:
+        OSError: if port cannot be bound
+
+    Returns:
+        IntrospectionServer: server, stop it via stop()
+    """
+    server: IntrospectionServer = IntrospectionServer(port, host)
+    logger.warning(f"Introspection endpoints (pid {os.getpid()}) listen on {server.url}.")
+    return server
@@ -0,0 +1,114 @@
+"""
+Module to run jobs within an already set up process.
+- a job is a list of cli input args, e.g. ["--hello", "-v"]
+- every job runs with its own CLI state and its own exception roundup
+- the CLI state and the catched exceptions of the process are restored after the job
+- a job may only set JOB_CLI_ARGS and the flags of commands, process-level cli input args
+  ...(e.g. --serve, --loadgen, --profile-cpu) are set once per process and are rejected
+"""
+import sys
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from src.utils import commands
+from src.utils import exception_handling as exc
+from src.utils.cli_input_args import CLI
+from src.utils import tracing
+
+
+JOB_CLI_ARGS: tuple[str, ...] = ("v", "V", "q", "Q")
+"""cli input args (class vars of CLI) a job may set besides the flags of commands"""
+
+
+class JobResult(NamedTuple):
+    """result of a job
+    """
+    argv: list[str]
+    """cli input args of job"""
+    ok: bool
+    """job ran without (catched) exceptions"""
+    exceptions: int
+    """number of catched exceptions"""
+    duration_ms: float
+    """wall time of job in ms"""
+    error: str | None = None
+    """error message if job could not be run (e.g. invalid cli input args)"""
+    results: dict[str, Any] | None = None
+    """return values of commands of job {command name: return value}"""
+
+    def to_dict(self) -> dict[str, Any]:
+        """return result as JSON serialisable dict
+        - non-serialisable return values of commands are represented by their repr
+
+        Returns:
+            dict[str, Any]: result
+        """
+        res: dict[str, Any] = self._asdict()
+        res["results"] = {
+            name: value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)
+            for name, value in (self.results or {}).items()
+        }
+        return res
+
+
+def _get_process_level_changes(process_cli_args: dict[str, Any]) -> list[str]:
+    """return names of process-level cli input args whose values differ from the ones of the process
+
+    Args:
+        process_cli_args (dict[str, Any]): cli input args of the process
+
+    Returns:
+        list[str]: names of class vars of CLI
+    """
+    job_args: set[str] = {*JOB_CLI_ARGS, *(c.cli_flag for c in commands.COMMANDS.values() if c.cli_flag)}
+    return [
+        name for name, value in CLI.get_cli_input_args().items()
+        if name not in job_args and value != process_cli_args.get(name)
+    ]
+
+
+def run_job(argv: list[str], parse_args: Callable[[list[str]], None]) -> JobResult:
+    """run selected commands of job and output its exception roundup
+    - summaries of program end are not output, as the process does not end
+
+    Args:
+        argv (list[str]): cli input args of job
+        parse_args (Callable[[list[str]], None]): function that parses argv and saves it to CLI
+            ...(e.g. main._evaluate_job_args)
+
+    Returns:
+        JobResult: result of job
+    """
+    start: float = time.perf_counter()
+    process_cli_args: dict[str, Any] = CLI.get_cli_input_args()
+    process_exc: list[list] = list(exc.EXC)
+    exc.clear_catched_exceptions()
+    try:
+        try:
+            parse_args(argv)
+        except SystemExit as e:
+            # docopt exits on invalid input args and --help #
+            return JobResult(argv, False, 0, (time.perf_counter() - start) * 1e3, str(e))
+        changed: list[str] = _get_process_level_changes(process_cli_args)
+        if changed:
+            return JobResult(
+                argv, False, 0, (time.perf_counter() - start) * 1e3,
+                f"Jobs cannot set process-level cli input args: {changed}.",
+            )
+
+        results: dict[str, Any] = {}
+        with tracing.span("job", new_trace=True, argv=argv):
+            for name in commands.select():
+                try:
+                    results[name] = commands.run(name)
+                except Exception:
+                    exc.log_exc(f"Command '{name}' of job {argv} failed.", sys.exc_info())
+            exc.roundup()
+        return JobResult(
+            argv, not exc.EXC, len(exc.EXC), (time.perf_counter() - start) * 1e3, None, results,
+        )
+    finally:
+        exc.clear_catched_exceptions()
+        exc.EXC.extend(process_exc)
+        CLI.set_cli_input_args(**process_cli_args)
@@ -0,0 +1,408 @@
+"""
+Module that provides a process-wide metrics registry.
+- counters, gauges and fixed-bucket histograms, optionally with one label (e.g. level="INFO")
+- updates are lock-free: every thread accumulates into its own cell,
+  ...cells are merged when metrics are read (a lock is only taken on the first update per thread)
+- cells of threads that ended are folded into one cell of the metric and dropped
+  ...(when metrics are read or a thread creates its cell), so short-lived threads do not pile up cells
+- metrics are summarised at program end (see exception_handling.program_end),
+  ...the summary is registered on the first update of any metric
+  ...and can be written in Prometheus text format (see write_prometheus)
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import bisect
+import math
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0
+)
+"""default upper bounds of histogram buckets (e.g. latencies in seconds)"""
+
+
+class Metric():
+    """base class of metrics, holds one cell per living thread and one cell of threads that ended
+    """
+    kind: str = "untyped"
+    """metric type in Prometheus text format"""
+
+    def __init__(self, name: str, help: str = "", label: str | None = None):
+        """init metric
+
+        Args:
+            name (str): name of metric, e.g. "log_records_total"
+            help (str, optional): description of metric. Defaults to "".
+            label (str | None, optional): name of label that splits the metric. Defaults to None.
+        """
+        self.name: str = name
+        self.help: str = help
+        self.label: str | None = label
+        self._local: threading.local = threading.local()
+        self._cells: list[tuple[threading.Thread, Any]] = []
+        self._retired: Any = self._new_cell()
+        self._lock: threading.Lock = threading.Lock()
+
+    def _new_cell(self) -> Any:
+        """return new, empty cell of a thread
+        """
+        return {}
+
+    def _merge(self, total: Any, cell: Any) -> None:
+        """add values of cell to total (in place)
+        """
+        for key, value in cell.items():
+            total[key] = total.get(key, 0) + value
+
+    def _fold_dead_cells(self) -> None:
+        """fold cells of threads that ended into the cell of retired threads and drop them
+        - must be called with the lock held
+        """
+        alive: list[tuple[threading.Thread, Any]] = []
+        for thread, cell in self._cells:
+            if thread.is_alive():
+                alive.append((thread, cell))
+            else:
+                self._merge(self._retired, cell)
+        self._cells = alive
+
+    def _cell(self) -> Any:
+        """return cell of current thread, create it on first use
+
+        Returns:
+            Any: cell
+        """
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell: Any = self._new_cell()
+            with self._lock:
+                self._fold_dead_cells()
+                self._cells.append((threading.current_thread(), cell))
+            self._local.cell = cell
+            if not _SUMMARY_REGISTERED:
+                _register_summary()
+            return cell
+
+    def _snapshot(self) -> list[Any]:
+        """return copies of all cells, incl. the cell of threads that ended
+        """
+        with self._lock:
+            self._fold_dead_cells()
+            return [self._retired.copy()] + [cell.copy() for _, cell in self._cells]
+
+    def reset(self) -> None:
+        """reset metric to its initial value
+        - cells of all threads are dropped, threads create new cells on their next update
+        """
+        with self._lock:
+            self._cells = []
+            self._retired = self._new_cell()
+            self._local = threading.local()
+
+
+class Counter(Metric):
+    """monotonically increasing value per label value
+    """
+    kind = "counter"
+
+    def inc(self, amount: float = 1, label_value: str | None = None) -> None:
+        """increase counter
+
+        Args:
+            amount (float, optional): increment. Defaults to 1.
+            label_value (str | None, optional): value of label. Defaults to None.
+        """
+        cell: dict = self._cell()
+        cell[label_value] = cell.get(label_value, 0) + amount
+
+    def get(self) -> dict[str | None, float]:
+        """return value per label value, merged across threads
+
+        Returns:
+            dict[str | None, float]: {label value: value}
+        """
+        values: dict[str | None, float] = {}
+        for cell in self._snapshot():
+            self._merge(values, cell)
+        return values
+
+
+class Gauge(Counter):
+    """value per label value that can go up and down
+    - set overrides the value of all threads, inc/dec accumulate per thread
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str = "", label: str | None = None):
+        """init gauge, see Metric
+        """
+        super().__init__(name, help, label)
+        self._base: dict[str | None, float] = {}
+
+    def dec(self, amount: float = 1, label_value: str | None = None) -> None:
+        """decrease gauge
+
+        Args:
+            amount (float, optional): decrement. Defaults to 1.
+            label_value (str | None, optional): value of label. Defaults to None.
+        """
+        self.inc(-amount, label_value)
+
+    def set(self, value: float, label_value: str | None = None) -> None:
+        """set gauge
+
+        Args:
+            value (float): value
+            label_value (str | None, optional): value of label. Defaults to None.
+        """
+        self._base[label_value] = value - sum(cell.get(label_value, 0) for cell in self._snapshot())
+
+    def get(self) -> dict[str | None, float]:
+        """return value per label value, incl. last set value
+
+        Returns:
+            dict[str | None, float]: {label value: value}
+        """
+        values: dict[str | None, float] = super().get()
+        for label_value, base in list(self._base.items()):
+            values[label_value] = values.get(label_value, 0) + base
+        return values
+
+    def reset(self) -> None:
+        """reset gauge to its initial value
+        """
+        super().reset()
+        self._base = {}
+
+
+class Histogram(Metric):
+    """distribution of observed values in fixed buckets
+    """
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            help: str = "",
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        ):
+        """init histogram
+
+        Args:
+            name (str): name of metric, e.g. "task_duration_seconds"
+            help (str, optional): description of metric. Defaults to "".
+            buckets (tuple[float, ...], optional): sorted upper bounds of buckets.
+                ...Defaults to DEFAULT_BUCKETS.
+
+        Raises:
+            ValueError: if buckets are not sorted
+        """
+        if list(buckets) != sorted(buckets):
+            raise ValueError(f"Buckets of histogram '{name}' must be sorted.")
+        self.buckets: tuple[float, ...] = tuple(buckets)
+        super().__init__(name, help)
+
+    def _new_cell(self) -> list[float]:
+        """return new cell: [count per bucket.., count of values above last bucket, sum]
+        """
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def _merge(self, total: list[float], cell: list[float]) -> None:
+        """add counts and sum of cell to total (in place)
+        """
+        for i, value in enumerate(cell):
+            total[i] += value
+
+    def observe(self, value: float) -> None:
+        """add value to histogram
+
+        Args:
+            value (float): observed value
+        """
+        cell: list[float] = self._cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def get(self) -> tuple[list[int], float]:
+        """return non-cumulative count per bucket (incl. +Inf) and sum, merged across threads
+
+        Returns:
+            tuple[list[int], float]: (counts, sum)
+        """
+        merged: list[float] = self._new_cell()
+        for cell in self._snapshot():
+            self._merge(merged, cell)
+        return [int(c) for c in merged[:-1]], merged[-1]
+
+
+REGISTRY: dict[str, Metric] = {}
+"""all metrics of the process {name: metric}"""
+
+_SUMMARY_REGISTERED: bool = False
+"""get_summary was registered to be logged at program end"""
+
+
+def _register_summary() -> None:
+    """register get_summary to be logged at program end
+    - imported here, as exception_handling imports logging, which creates metrics at import time
+    """
+    global _SUMMARY_REGISTERED
+    from src.utils import exception_handling as exc
+    exc.register_summary(get_summary)
+    _SUMMARY_REGISTERED = True
+
+
+def _get_or_create(cls: type[Metric], name: str, **kwargs: Any) -> Any:
+    """return registered metric, create and register it if needed
+
+    Raises:
+        ValueError: if a metric of another type is registered with the same name
+    """
+    metric: Metric | None = REGISTRY.get(name)
+    if metric is None:
+        metric = REGISTRY.setdefault(name, cls(name, **kwargs))
+    if type(metric) is not cls:
+        raise ValueError(f"Metric '{name}' is already registered as {type(metric).__name__}.")
+    return metric
+
+
+def counter(name: str, help: str = "", label: str | None = None) -> Counter:
+    """return registered counter, create it if needed
+
+    Args:
+        name (str): name of metric
+        help (str, optional): description of metric. Defaults to "".
+        label (str | None, optional): name of label. Defaults to None.
+
+    Returns:
+        Counter: counter
+    """
+    return _get_or_create(Counter, name, help=help, label=label)
+
+
+def gauge(name: str, help: str = "", label: str | None = None) -> Gauge:
+    """return registered gauge, create it if needed
+
+    Args:
+        name (str): name of metric
+        help (str, optional): description of metric. Defaults to "".
+        label (str | None, optional): name of label. Defaults to None.
+
+    Returns:
+        Gauge: gauge
+    """
+    return _get_or_create(Gauge, name, help=help, label=label)
+
+
+def histogram(name: str, help: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """return registered histogram, create it if needed
+
+    Args:
+        name (str): name of metric
+        help (str, optional): description of metric. Defaults to "".
+        buckets (tuple[float, ...], optional): sorted upper bounds of buckets.
+            ...Defaults to DEFAULT_BUCKETS.
+
+    Returns:
+        Histogram: histogram
+    """
+    return _get_or_create(Histogram, name, help=help, buckets=buckets)
+
+
+def reset() -> None:
+    """reset all registered metrics
+    """
+    for metric in REGISTRY.values():
+        metric.reset()
+
+
+def _format_value(value: float) -> str:
+    """return value in Prometheus text format, integers without decimal places
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labelled(metric: Metric, label_value: str | None) -> str:
+    """return name of metric incl. its label, e.g. 'log_records_total{level="INFO"}'
+    """
+    if metric.label is None or label_value is None:
+        return metric.name
+    escaped: str = str(label_value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'{metric.name}{{{metric.label}="{escaped}"}}'
+
+
+def _iter_samples(metric: Metric) -> Iterator[tuple[str, float]]:
+    """yield (name incl. labels, value) of all samples of metric in Prometheus format
+    """
+    if isinstance(metric, Histogram):
+        counts, total = metric.get()
+        cumulative: int = 0
+        for bound, count in zip(metric.buckets + (math.inf,), counts):
+            cumulative += count
+            yield f'{metric.name}_bucket{{le="{_format_value(bound)}"}}', cumulative
+        yield f"{metric.name}_sum", total
+        yield f"{metric.name}_count", cumulative
+    else:
+        values: dict[str | None, float] = metric.get()
+        if not values and metric.label is None:
+            values = {None: 0}
+        for label_value, value in sorted(values.items(), key=lambda kv: str(kv[0])):
+            yield _labelled(metric, label_value), value
+
+
+def to_prometheus() -> str:
+    """return all registered metrics in Prometheus text format
+
+    Returns:
+        str: exposition text
+    """
+    lines: list[str] = []
+    for metric in REGISTRY.values():
+        if metric.help:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{name} {_format_value(value)}" for name, value in _iter_samples(metric))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_prometheus(path: Path) -> None:
+    """write all registered metrics in Prometheus text format to file
+    - atomically, so a scraper never reads a partially written file
+
+    Args:
+        path (Path): output file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path: Path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(to_prometheus())
+    os.replace(tmp_path, path)
+
+
+def get_summary() -> str | None:
+    """return summary of all metrics that have been updated, None if none have been updated
+
+    Returns:
+        str | None: summary
+    """
+    lines: list[str] = []
+    for metric in REGISTRY.values():
+        if isinstance(metric, Histogram):
+            counts, total = metric.get()
+            count: int = sum(counts)
+            if count:
+                lines.append(
+                    f"  {metric.name}: count={count} sum={total:.6g} mean={total / count:.6g}"
+                )
+        else:
+            lines.extend(
+                f"  {_labelled(metric, label_value)}: {_format_value(value)}"
+                for label_value, value in metric.get().items()
+            )
+    return "Metrics:\n" + "\n".join(lines) if lines else None
@@ -0,0 +1,224 @@
+"""
+Module to profile a run of the program.
+- CPU: cProfile of the calling thread, written as pstats file (e.g. for snakeviz or pstats)
+- memory: tracemalloc of all threads, written as snapshot (see tracemalloc.Snapshot.load)
+- sampling: a thread that collects the stacks of all other threads at an interval,
+  ...written in collapsed-stack format (e.g. for flamegraph.pl or speedscope);
+  ...low overhead, as the profiled threads are not instrumented
+- output files are written to ROOT/log, top-N summaries are logged at program end
+"""
+import cProfile
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+
+from src.utils import exception_handling as exc
+from src.vars.paths import ROOT
+
+
+OUTPUT_DIR: Path = ROOT / "log"
+"""dir of output files"""
+
+TOP_N: int = 10
+"""number of entries per profile in summary"""
+
+MEM_FRAMES: int = 10
+"""number of frames tracemalloc stores per allocation"""
+
+SUMMARIES: list[str] = []
+"""summaries of finished profiles"""
+
+
+def _get_summary() -> str | None:
+    """return summaries of finished profiles, None if nothing was profiled
+    """
+    return "\n".join(SUMMARIES) if SUMMARIES else None
+
+
+def _location(filename: str, lineno: int, func: str | None = None) -> str:
+    """return short location of line or function, e.g. 'hello (src/hello_world.py:11)'
+    """
+    path: Path = Path(filename)
+    if path.is_relative_to(ROOT):
+        filename = path.relative_to(ROOT).as_posix()
+    return f"{func} ({filename}:{lineno})" if func else f"{filename}:{lineno}"
+
+
+def _summarise_cpu(profiler: cProfile.Profile, path: Path) -> str:
+    """write pstats file and return top functions by cumulative time
+
+    Args:
+        profiler (cProfile.Profile): finished profiler
+        path (Path): pstats file
+
+    Returns:
+        str: summary
+    """
+    profiler.dump_stats(path)
+    stats: dict = pstats.Stats(profiler).stats
+    ranked: list = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:TOP_N]
+    lines: list[str] = [
+        f"CPU profile (top {len(ranked)} by cumulative time), written to '{path}':",
+        f"  {'cum ms':>10} {'self ms':>10} {'calls':>8}  function",
+    ]
+    for (filename, lineno, func), (_, calls, tottime, cumtime, _) in ranked:
+        lines.append(
+            f"  {cumtime * 1e3:>10.3f} {tottime * 1e3:>10.3f} {calls:>8}  "
+            f"{_location(filename, lineno, func)}"
+        )
+    return "\n".join(lines)
+
+
+def _summarise_mem(snapshot: tracemalloc.Snapshot, peak: int, path: Path) -> str:
+    """write snapshot and return top allocation sites by size
+
+    Args:
+        snapshot (tracemalloc.Snapshot): snapshot at end of run
+        peak (int): peak of traced memory in bytes
+        path (Path): snapshot file
+
+    Returns:
+        str: summary
+    """
+    snapshot.dump(str(path))
+    top: list[tracemalloc.Statistic] = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    )).statistics("lineno")[:TOP_N]
+    lines: list[str] = [
+        f"Memory profile (peak {peak / 1024:.1f} KiB, top {len(top)} allocation sites "
+        f"still allocated at end), written to '{path}':",
+        f"  {'KiB':>10} {'blocks':>8}  location",
+    ]
+    for stat in top:
+        frame: tracemalloc.Frame = stat.traceback[0]
+        lines.append(
+            f"  {stat.size / 1024:>10.1f} {stat.count:>8}  "
+            f"{_location(frame.filename, frame.lineno)}"
+        )
+    return "\n".join(lines)
+
+
+class Sampler(threading.Thread):
+    """daemon thread that collects the stacks of all other threads at an interval
+    """
+    def __init__(self, interval: float):
+        """init sampler
+
+        Args:
+            interval (float): seconds between samples
+        """
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.interval: float = interval
+        self.stacks: Counter[str] = Counter()
+        """number of samples per collapsed stack, e.g. 'main.main;src.hello_world.hello'"""
+        self.samples: int = 0
+        self._stop_event: threading.Event = threading.Event()
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        """return stack of frame in collapsed format (outermost first, separated by ';')
+        """
+        names: list[str] = []
+        while frame is not None:
+            names.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def run(self) -> None:
+        """sample until stopped
+        """
+        own_id: int | None = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        """stop sampling and wait for the thread
+        """
+        self._stop_event.set()
+        self.join()
+
+    def summarise(self, path: Path) -> str:
+        """write collapsed stacks and return functions with most samples on top of the stack
+
+        Args:
+            path (Path): collapsed-stack file
+
+        Returns:
+            str: summary
+        """
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.items()))
+        own: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            own[stack.rsplit(";", 1)[-1]] += count
+        total: int = sum(own.values()) or 1
+        lines: list[str] = [
+            f"Sampling profile ({self.samples} samples every {self.interval * 1e3:g} ms, "
+            f"top {min(len(own), TOP_N)} by own samples), written to '{path}':",
+            f"  {'samples':>8} {'%':>6}  function",
+        ]
+        for func, count in own.most_common(TOP_N):
+            lines.append(f"  {count:>8} {count / total * 100:>5.1f}%  {func}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile(
+        cpu: bool = False,
+        mem: bool = False,
+        sample_interval: float | None = None,
+        output_dir: Path = OUTPUT_DIR,
+    ) -> Iterator[None]:
+    """profile the wrapped code block, write output files and register summaries for program end
+
+    Args:
+        cpu (bool, optional): run cProfile in calling thread. Defaults to False.
+        mem (bool, optional): trace memory allocations. Defaults to False.
+        sample_interval (float | None, optional): seconds between stack samples.
+            ...Defaults to None meaning no sampling.
+        output_dir (Path, optional): dir of output files. Defaults to OUTPUT_DIR.
+
+    Yields:
+        Iterator[None]: nothing
+    """
+    if not (cpu or mem or sample_interval):
+        yield
+        return
+    output_dir.mkdir(parents=True, exist_ok=True)
+    exc.register_summary(_get_summary)
+    profiler: cProfile.Profile | None = cProfile.Profile() if cpu else None
+    sampler: Sampler | None = Sampler(sample_interval) if sample_interval else None
+    if mem:
+        tracemalloc.start(MEM_FRAMES)
+    if sampler:
+        sampler.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        # stop all profilers before writing output, so they do not profile each other #
+        if profiler:
+            profiler.disable()
+        if sampler:
+            sampler.stop()
+        if mem:
+            snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+            peak: int = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        if profiler:
+            SUMMARIES.append(_summarise_cpu(profiler, output_dir / "profile_cpu.pstats"))
+        if sampler:
+            SUMMARIES.append(sampler.summarise(output_dir / "profile_samples.collapsed"))
+        if mem:
+            SUMMARIES.append(_summarise_mem(snapshot, peak, output_dir / "profile_mem.tracemalloc"))
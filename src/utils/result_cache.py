@@ -0,0 +1,344 @@
+"""
+Module that provides a persistent, content-addressed cache of return values of commands.
+- only commands that are registered with cacheable=True are cached (see src.utils.commands),
+  ...i.e. commands whose return value only depends on their inputs and that have no side effects
+- the key is a SHA-256 hash of the name of the command, the version of its code, its arguments,
+  ...the cli input args (CLI) the command declares as relevant and the content of files that are passed
+  ...as arguments (pathlib.Path), so a changed input file or changed code leads to a new key
+- arguments are fingerprinted by value (primitives and containers as is, other objects pickled),
+  ...calls with arguments that cannot be pickled are not cached
+- entries are pickled return values in DEFAULT_DIR (one file per key), they are written atomically
+  ...(temporary file and os.replace) and read memory-mapped
+- the sum of sizes of entries is bounded by result_cache_max_bytes of the config snapshot
+  ...(see src.utils.config), the least recently used entries (by mtime, which is updated on hits)
+  ...are evicted after a write that exceeds it, down to EVICT_TO of the bound
+- the sum of sizes is kept as a running total per process, the dir is only scanned on the first write
+  ...and when the total exceeds the bound (which also corrects the total for writes of other processes)
+- caching is switched off via result_cache of the config snapshot (e.g. APP_RESULT_CACHE=0)
+- hits, misses, stores and evictions are counted in metric result_cache_total and summarised
+  ...at program end (see exception_handling)
+- NOTE, entries are unpickled, i.e. the cache dir must only be writable by the user of the program
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from src.vars.paths import ROOT
+from src.utils.cli_input_args import CLI
+from src.utils import config
+from src.utils import exception_handling as exc
+from src.utils import metrics
+
+
+DEFAULT_DIR: Path = ROOT / ".cache" / "results"
+"""dir of entries"""
+
+RESULT_CACHE: metrics.Counter = metrics.counter(
+    "result_cache_total", "lookups and updates of the result cache", label="outcome"
+)
+
+_SUFFIX: str = ".pickle"
+"""suffix of entries"""
+
+_READ_BLOCK: int = 1024 * 1024
+"""bytes of input files that are hashed at once"""
+
+EVICT_TO: float = 0.9
+"""share of max_bytes down to which entries are evicted, so not every write to a full cache scans the dir"""
+
+_CACHES: dict[tuple[Path, int], "ResultCache"] = {}
+"""caches of call {(dir, max_bytes): cache}, which keep their running total across calls"""
+
+
+def _fingerprint(value: Any) -> Any:
+    """return JSON serialisable fingerprint of an argument
+    - primitives and containers are represented as is, files by their content,
+      ...other objects by a hash of their pickled state (not by their repr, which may hold their id)
+
+    Raises:
+        TypeError: if value cannot be pickled (e.g. a lambda)
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return [type(value).__name__, value]
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__, [_fingerprint(v) for v in value]]
+    if isinstance(value, dict):
+        return ["dict", sorted([repr(k), _fingerprint(v)] for k, v in value.items())]
+    if isinstance(value, Path):
+        digest: hashlib._Hash = hashlib.sha256()
+        try:
+            with open(value, "rb") as f:
+                while block := f.read(_READ_BLOCK):
+                    digest.update(block)
+        except OSError:
+            return {"path": str(value), "sha256": None}
+        return {"path": str(value), "sha256": digest.hexdigest()}
+    try:
+        data: bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        raise TypeError(f"Argument of type {type(value).__name__} cannot be fingerprinted: {e}") from e
+    return [type(value).__qualname__, hashlib.sha256(data).hexdigest()]
+
+
+def make_key(
+        command: str,
+        args: tuple = (),
+        kwargs: dict[str, Any] | None = None,
+        cli_args: tuple[str, ...] = (),
+        version: str = "",
+    ) -> str:
+    """return key of a call of a command
+
+    Args:
+        command (str): name of command
+        args (tuple, optional): positional args of call. Defaults to ().
+        kwargs (dict[str, Any] | None, optional): keyword args of call. Defaults to None.
+        cli_args (tuple[str, ...], optional): names of class vars of CLI the return value depends on.
+            ...Defaults to ().
+        version (str, optional): version of the code of the command. Defaults to "".
+
+    Raises:
+        TypeError: if an argument cannot be fingerprinted (see _fingerprint)
+
+    Returns:
+        str: hex digest
+    """
+    payload: str = json.dumps(
+        [
+            command,
+            version,
+            [_fingerprint(a) for a in args],
+            {k: _fingerprint(v) for k, v in (kwargs or {}).items()},
+            {name: _fingerprint(getattr(CLI, name)) for name in cli_args},
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache():
+    """dir of entries {key: pickled value}, bounded by the sum of their sizes
+    """
+    def __init__(self, directory: Path = DEFAULT_DIR, max_bytes: int = 256 * 1024 * 1024):
+        """init cache, the dir is created on first write
+
+        Args:
+            directory (Path, optional): dir of entries. Defaults to DEFAULT_DIR.
+            max_bytes (int, optional): max. sum of sizes of entries. Defaults to 256 MiB.
+        """
+        self.directory: Path = directory
+        self.max_bytes: int = max_bytes
+        # sum of sizes of entries, None until the dir was scanned (see evict) #
+        self._total: int | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        """return file of entry
+        """
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """return value of key, mark it as most recently used
+        - entries that cannot be unpickled (e.g. of a changed class) are removed and count as miss
+
+        Args:
+            key (str): key, see make_key
+
+        Returns:
+            tuple[bool, Any]: whether key was found and its value (None if not found)
+        """
+        path: Path = self._path(key)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                value: Any = pickle.loads(mm)
+        except FileNotFoundError:
+            RESULT_CACHE.inc(1, "miss")
+            return False, None
+        except Exception:
+            self._remove(path)
+            RESULT_CACHE.inc(1, "miss")
+            return False, None
+        # mtime is the time of last use, see evict #
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        RESULT_CACHE.inc(1, "hit")
+        return True, value
+
+    def _remove(self, path: Path) -> None:
+        """remove entry and subtract its size from the running total
+        """
+        try:
+            size: int = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._total is not None:
+                self._total -= size
+
+    def set(self, key: str, value: Any) -> bool:
+        """write value of key atomically, then evict entries if the running total exceeds max_bytes
+        - values that cannot be pickled or are larger than max_bytes are not cached
+        - errors of the file system (e.g. disk full) are not raised, the value is not cached then
+
+        Args:
+            key (str): key, see make_key
+            value (Any): value
+
+        Returns:
+            bool: whether value was cached
+        """
+        try:
+            data: bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        path: Path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # unique temporary file per write, concurrent writers of a key must not share it #
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                try:
+                    replaced: int = path.stat().st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_name, path)
+            finally:
+                Path(tmp_name).unlink(missing_ok=True)
+            with self._lock:
+                if self._total is not None:
+                    self._total += len(data) - replaced
+                full: bool = self._total is None or self._total > self.max_bytes
+            if full:
+                self.evict()
+        except OSError:
+            # caching is best effort, e.g. disk full or read-only dir #
+            return False
+        RESULT_CACHE.inc(1, "store")
+        return True
+
+    def evict(self) -> int:
+        """scan dir and remove least recently used entries if the sum of sizes of entries exceeds max_bytes
+        - entries are removed until the sum is at most EVICT_TO of max_bytes
+        - the running total is set to the sum of the remaining entries
+
+        Returns:
+            int: number of removed entries
+        """
+        entries: list[tuple[float, int, str]] = []
+        total: int = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if e.name.endswith(_SUFFIX) and not e.name.startswith("."):
+                        try:
+                            st: os.stat_result = e.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((st.st_mtime, st.st_size, e.path))
+                        total += st.st_size
+        except FileNotFoundError:
+            with self._lock:
+                self._total = 0
+            return 0
+        removed: int = 0
+        target: float = self.max_bytes * EVICT_TO if total > self.max_bytes else total
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._total = total
+        if removed:
+            RESULT_CACHE.inc(removed, "evict")
+        return removed
+
+    def clear(self) -> None:
+        """remove all entries
+        """
+        if self.directory.is_dir():
+            for path in self.directory.glob(f"*{_SUFFIX}"):
+                path.unlink(missing_ok=True)
+        with self._lock:
+            self._total = 0
+
+
+def call(
+        command: str,
+        func: Callable[[], Any],
+        args: tuple = (),
+        kwargs: dict[str, Any] | None = None,
+        cli_args: tuple[str, ...] = (),
+        version: str = "",
+    ) -> Any:
+    """return cached value of a call of a command, call it and cache its value on a miss
+    - exceptions are not cached
+    - calls whose arguments cannot be fingerprinted are run without cache
+
+    Args:
+        command (str): name of command
+        func (Callable[[], Any]): function that runs the call (e.g. imports and calls the command)
+        args (tuple, optional): positional args of call, part of the key. Defaults to ().
+        kwargs (dict[str, Any] | None, optional): keyword args of call, part of the key. Defaults to None.
+        cli_args (tuple[str, ...], optional): names of class vars of CLI that are part of the key.
+            ...Defaults to ().
+        version (str, optional): version of the code of the command, part of the key. Defaults to "".
+
+    Returns:
+        Any: return value
+    """
+    cfg: config.Config = config.get()
+    if not cfg.result_cache:
+        return func()
+    exc.register_summary(get_summary)
+    try:
+        key: str = make_key(command, args, kwargs, cli_args, version)
+    except TypeError:
+        return func()
+    cache: ResultCache | None = _CACHES.get((DEFAULT_DIR, cfg.result_cache_max_bytes))
+    if cache is None:
+        cache = _CACHES.setdefault(
+            (DEFAULT_DIR, cfg.result_cache_max_bytes), ResultCache(DEFAULT_DIR, cfg.result_cache_max_bytes)
+        )
+    found, value = cache.get(key)
+    if found:
+        return value
+    value = func()
+    cache.set(key, value)
+    return value
+
+
+def get_summary() -> str | None:
+    """return hits, misses, stores and evictions of the result cache, None if it was not used
+
+    Returns:
+        str | None: summary
+    """
+    counts: dict[str | None, float] = RESULT_CACHE.get()
+    hits: int = int(counts.get("hit", 0))
+    misses: int = int(counts.get("miss", 0))
+    if not hits and not misses:
+        return None
+    return (
+        f"Result cache: hits={hits} misses={misses} hit_rate={hits / (hits + misses):.1%} "
+        f"stores={int(counts.get('store', 0))} evictions={int(counts.get('evict', 0))}"
+    )
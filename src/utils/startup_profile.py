@@ -0,0 +1,89 @@
+"""
+Module to profile the startup latency of the program per phase.
+- phases can be nested, each phase is only charged with its self time
+  ...(e.g. handler creation during an import is not charged to the import phase)
+- every thread has its own stack of running phases, so phases of concurrent threads
+  ...(e.g. imports of a background thread) do not charge each other
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+START: float = time.perf_counter()
+"""time of first import of this module, i.e. start of program"""
+
+PHASES: dict[str, float] = {}
+"""self time in seconds per phase name (in order of first occurrence)"""
+
+_LOCAL: threading.local = threading.local()
+"""holds stack of running phases of each thread (see _stack)"""
+
+_LOCK: threading.Lock = threading.Lock()
+"""serializes updates of PHASES"""
+
+
+def _stack() -> list[list]:
+    """return stack of running phases of current thread [[phase name, time spent in child phases]]
+    """
+    try:
+        return _LOCAL.stack
+    except AttributeError:
+        _LOCAL.stack = []
+        return _LOCAL.stack
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """measure self time of the wrapped code block and add it to phase name
+
+    Args:
+        name (str): name of phase
+
+    Yields:
+        Iterator[None]: nothing
+    """
+    stack: list[list] = _stack()
+    start: float = time.perf_counter()
+    stack.append([name, 0.0])
+    try:
+        yield
+    finally:
+        elapsed: float = time.perf_counter() - start
+        _, child_time = stack.pop()
+        with _LOCK:
+            PHASES[name] = PHASES.get(name, 0.0) + elapsed - child_time
+        if stack:
+            stack[-1][1] += elapsed
+
+
+def clear() -> None:
+    """clear all measured phases
+    """
+    global _LOCAL
+    PHASES.clear()
+    _LOCAL = threading.local()
+
+
+def get_report(end: float | None = None) -> str:
+    """return per-phase timing breakdown of startup
+    - one line per phase: "startup phase <name> <ms> ms <percentage> %"
+    - time not covered by any phase is reported as phase "other"
+
+    Args:
+        end (float | None, optional): end of startup (time.perf_counter()). Defaults to None
+            ...meaning now.
+
+    Returns:
+        str: report
+    """
+    total: float = (time.perf_counter() if end is None else end) - START
+    phases: dict[str, float] = {**PHASES, "other": max(total - sum(PHASES.values()), 0.0)}
+    lines: list[str] = [
+        f"startup phase {name:<20} {seconds*1e3:>9.3f} ms {seconds/total*100 if total else 0:>5.1f} %"
+        for name, seconds in phases.items()
+    ]
+    lines.append(f"startup phase {'total':<20} {total*1e3:>9.3f} ms {100:>5.1f} %")
+    return "\n".join(lines)
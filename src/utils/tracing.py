@@ -0,0 +1,238 @@
+"""
+Module that provides lightweight tracing spans.
+- a span measures one unit of work, it belongs to a trace and may have a parent span
+- the current span is stored in a contextvar, so it propagates into asyncio tasks
+  ...(and asyncio.to_thread) automatically, and into thread pools via wrap
+  ...(see src.utils.executor, which does this for thread pools)
+- TraceContextFilter injects the ids of the current span into log records,
+  ...configure_logger installs it on its handlers
+- finished spans can be exported to a JSON-lines file for latency analysis (see set_export_path)
+- NOTE, this module should not include custom logging (for info, see main.py).
+"""
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TextIO
+
+
+class Span():
+    """unit of work of a trace
+    """
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start", "_start_perf",
+        "duration_ms", "status", "attributes", "log_suffix",
+    )
+
+    def __init__(self, name: str, parent: "Span | None" = None, **attributes: Any):
+        """init and start span
+
+        Args:
+            name (str): name of span
+            parent (Span | None, optional): parent span. Defaults to None meaning a new trace.
+            **attributes (Any): attributes of span, exported as they are (should be JSON-serialisable)
+        """
+        self.name: str = name
+        self.trace_id: str = parent.trace_id if parent else f"{random.getrandbits(64):016x}"
+        self.span_id: str = f"{random.getrandbits(32):08x}"
+        self.parent_id: str | None = parent.span_id if parent else None
+        self.start: float = time.time()
+        self._start_perf: float = time.perf_counter()
+        self.duration_ms: float | None = None
+        self.status: str = "ok"
+        self.attributes: dict[str, Any] = attributes
+        self.log_suffix: str = f" [{self.trace_id}:{self.span_id}]"
+        """ids as appended to the logger name in log records"""
+
+    def finish(self, status: str = "ok") -> None:
+        """end span
+
+        Args:
+            status (str, optional): "ok" or "error". Defaults to "ok".
+        """
+        self.duration_ms = (time.perf_counter() - self._start_perf) * 1e3
+        self.status = status
+
+    def to_dict(self) -> dict[str, Any]:
+        """return span as JSON-serialisable dict
+
+        Returns:
+            dict[str, Any]: span
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_CURRENT: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+"""span of current context"""
+
+
+def get_current() -> Span | None:
+    """return span of current context
+
+    Returns:
+        Span | None: current span, None if no span is open
+    """
+    return _CURRENT.get()
+
+
+class _Exporter():
+    """writes finished spans as JSON lines to a file
+    """
+    def __init__(self, path: Path):
+        """open file in append mode
+
+        Args:
+            path (Path): JSON-lines file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path: Path = path
+        self._file: TextIO = open(path, "a")
+        self._lock: threading.Lock = threading.Lock()
+        self.exported: int = 0
+
+    def export(self, span: Span) -> None:
+        """write span as one JSON line
+
+        Args:
+            span (Span): finished span
+        """
+        line: str = json.dumps(span.to_dict(), default=repr) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.exported += 1
+
+    def close(self) -> None:
+        """flush and close file
+        """
+        with self._lock:
+            self._file.close()
+
+
+_EXPORTER: _Exporter | None = None
+"""exporter of finished spans, None if spans are not exported"""
+
+
+def set_export_path(path: Path | None) -> None:
+    """export all spans that finish from now on to JSON-lines file (None: stop exporting)
+
+    Args:
+        path (Path | None): JSON-lines file, spans are appended
+    """
+    global _EXPORTER
+    close_exporter()
+    if path is not None:
+        # number of exported spans is logged at program end #
+        # (imported here, as exception_handling imports logging, which uses this module) #
+        from src.utils import exception_handling as exc
+        exc.register_summary(get_summary)
+        _EXPORTER = _Exporter(path)
+
+
+@atexit.register
+def close_exporter() -> None:
+    """flush and close export file, registered to run at interpreter exit
+    """
+    global _EXPORTER
+    if _EXPORTER is not None:
+        _EXPORTER.close()
+        _EXPORTER = None
+
+
+@contextmanager
+def span(name: str, new_trace: bool = False, **attributes: Any) -> Iterator[Span]:
+    """open span as child of the current span (or as new trace) for the wrapped code block
+    - status of span is "error" if the block raises
+
+    Args:
+        name (str): name of span
+        new_trace (bool, optional): start a new trace even if a span is open. Defaults to False.
+        **attributes (Any): attributes of span
+
+    Yields:
+        Iterator[Span]: opened span
+    """
+    s: Span = Span(name, None if new_trace else _CURRENT.get(), **attributes)
+    token: contextvars.Token = _CURRENT.set(s)
+    status: str = "error"
+    try:
+        yield s
+        status = "ok"
+    finally:
+        _CURRENT.reset(token)
+        s.finish(status)
+        if _EXPORTER is not None:
+            _EXPORTER.export(s)
+
+
+def wrap(func: Callable[..., Any]) -> Callable[..., Any]:
+    """return function that runs func in a copy of the current context
+    - e.g. to propagate the current span into tasks of a thread pool
+    - every call runs in its own copy, so the function can run in many threads at once
+
+    Args:
+        func (Callable[..., Any]): function
+
+    Returns:
+        Callable[..., Any]: wrapped function
+    """
+    ctx: contextvars.Context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return ctx.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+class TraceContextFilter(logging.Filter):
+    """handler filter that injects the ids of the current span into records and lets all pass
+    - record.trace_id and record.span_id ("" if no span is open)
+    - record.trace, e.g. " [<trace_id>:<span_id>]" ("" if no span is open), see log._get_basic_format
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        """inject ids, keep ids that have already been injected (e.g. by another handler)
+
+        Args:
+            record (logging.LogRecord): record
+
+        Returns:
+            bool: always True
+        """
+        if not hasattr(record, "trace"):
+            s: Span | None = _CURRENT.get()
+            if s is None:
+                record.trace_id = record.span_id = record.trace = ""
+            else:
+                record.trace_id, record.span_id, record.trace = s.trace_id, s.span_id, s.log_suffix
+        return True
+
+
+TRACE_CONTEXT_FILTER: TraceContextFilter = TraceContextFilter()
+"""filter that is shared by all handlers of configure_logger"""
+
+
+def get_summary() -> str | None:
+    """return number of exported spans, None if spans are not exported
+
+    Returns:
+        str | None: summary
+    """
+    if _EXPORTER is None:
+        return None
+    return f"Tracing: {_EXPORTER.exported} spans exported to '{_EXPORTER.path}'."
@@ -5,9 +5,16 @@ NOTE, this module should not include custom logging (for info, see main.py).
 from pathlib import Path
 import os
 import sys
+import zipimport
 
 
+ARCHIVE: Path | None = Path(__loader__.archive).resolve() \
+    if isinstance(__loader__, zipimport.zipimporter) \
+    else None
+"""path of zipapp the program runs from (see src.utils.build), None if it runs from source"""
+
 ROOT: Path = Path(os.path.dirname(sys.executable)) \
     if getattr(sys, 'frozen', False) \
+    else ARCHIVE.parent if ARCHIVE is not None \
     else Path(__file__).resolve().parent.parent.parent
-"""path of root dir of repo"""
+"""path of root dir of repo (dir of executable if frozen, dir of archive if run from a zipapp)"""
@@ -0,0 +1,184 @@
+"""
+Benchmark of event loop latency under heavy logging.
+- a ticker coroutine sleeps for a fixed interval and measures how late it wakes up (loop lag)
+- meanwhile, producer coroutines log as fast as possible via a logger of configure_logger
+- compares blocking handlers (default) with handlers behind a queue (--async, see src.log.queued)
+- a slow sink (e.g. a congested disk or collector) can be simulated by a delay per emit
+- console output goes to os.devnull, file output to a tmp dir
+
+Usage:
+    bench_async_logging.py [--records=<n>] [--producers=<n>] [--interval-ms=<x>]
+                           [--sink-delay-us=<x>] [--output=<file>] [--compare=<file>]
+                           [--tolerance=<x>]
+
+Options:
+    --records=<n>           records per producer [default: 5000]
+    --producers=<n>         number of producer coroutines [default: 4]
+    --interval-ms=<x>       sleep interval of ticker [default: 1]
+    --sink-delay-us=<x>     additional delay per emit of every handler [default: 0]
+    --output=<file>         JSON output file [default: log/bench_async_logging.json]
+    --compare=<file>        JSON file of a previous run, exit with 1 on regressions
+    --tolerance=<x>         allowed relative deterioration of p99 loop lag [default: 0.1]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from docopt import docopt
+
+from src.log import log
+from src.vars.paths import ROOT
+from test.benchmark.bench_utils import compare, get_meta, load_results, percentile, write_results
+
+
+MODES: dict[str, bool] = {
+    "blocking": False,
+    "queued": True,
+}
+"""logging modes: name -> value of configure_logger's queued"""
+
+
+def _make_logger(mode: str, log_dir: Path, sink_delay: float) -> logging.Logger:
+    """return a fresh logger configured by configure_logger in passed mode
+    - every handler sleeps sink_delay seconds per emit
+    """
+    logger: logging.Logger = logging.getLogger(f"bench-async-{mode}")
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
+    logger = log.configure_logger(
+        logger,
+        ch_level=logging.WARNING,
+        fh_level=logging.WARNING,
+        fh_file_path=log_dir / f"{mode}.log",
+        queued=MODES[mode],
+    )
+    if sink_delay:
+        for h in log.queued_handlers.iter_handlers(logger):
+            emit = h.emit
+            h.emit = lambda record, emit=emit: (time.sleep(sink_delay), emit(record))
+    return logger
+
+
+async def _run_case(
+        logger: logging.Logger, records: int, producers: int, interval: float
+    ) -> dict[str, float]:
+    """log records from producers while ticker measures loop lag
+
+    Returns:
+        dict[str, float]: records_per_sec, lag_p50_ms, lag_p99_ms, lag_max_ms
+    """
+    lags: list[float] = []
+    done: asyncio.Event = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start: float = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    async def producer(n: int) -> None:
+        for i in range(records):
+            logger.warning("producer %d record %d", n, i)
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+
+    tick: asyncio.Task = asyncio.create_task(ticker())
+    start: float = time.perf_counter()
+    await asyncio.gather(*(producer(n) for n in range(producers)))
+    elapsed: float = time.perf_counter() - start
+    done.set()
+    await tick
+
+    return {
+        "records_per_sec": records * producers / elapsed,
+        "lag_p50_ms": percentile(lags, 50) * 1e3,
+        "lag_p99_ms": percentile(lags, 99) * 1e3,
+        "lag_max_ms": max(lags, default=0.0) * 1e3,
+    }
+
+
+def run(records: int, producers: int, interval: float, sink_delay: float) -> list[dict[str, Any]]:
+    """run all benchmark cases
+
+    Args:
+        records (int): records per producer
+        producers (int): number of producer coroutines
+        interval (float): sleep interval of ticker in seconds
+        sink_delay (float): additional delay per emit in seconds
+
+    Returns:
+        list[dict[str, Any]]: one result per mode
+    """
+    results: list[dict[str, Any]] = []
+    stderr = sys.stderr
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        sys.stderr = devnull
+        try:
+            for mode in MODES:
+                logger: logging.Logger = _make_logger(mode, Path(tmp), sink_delay)
+                result: dict[str, Any] = {
+                    "mode": mode, **asyncio.run(_run_case(logger, records, producers, interval))
+                }
+                # write queued records before the next mode starts #
+                for h in list(logger.handlers):
+                    logger.removeHandler(h)
+                    h.close()
+                results.append(result)
+                print(
+                    f"{mode:<10} {result['records_per_sec']:>12,.0f} rec/s "
+                    f"lag p50={result['lag_p50_ms']:>8.3f}ms p99={result['lag_p99_ms']:>8.3f}ms "
+                    f"max={result['lag_max_ms']:>8.3f}ms",
+                    file=stderr,
+                )
+        finally:
+            sys.stderr = stderr
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark, write results and compare with baseline if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if regressions were found
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    # load baseline first, as it may be overwritten by output #
+    baseline: list[dict[str, Any]] | None = \
+        load_results(Path(args["--compare"])) if args["--compare"] else None
+
+    results: list[dict[str, Any]] = run(
+        records=int(args["--records"]),
+        producers=int(args["--producers"]),
+        interval=float(args["--interval-ms"]) / 1e3,
+        sink_delay=float(args["--sink-delay-us"]) / 1e6,
+    )
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions: list[str] = compare(
+            baseline,
+            results,
+            keys=("mode",),
+            metric="lag_p99_ms",
+            higher_is_better=False,
+            tolerance=float(args["--tolerance"]),
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Benchmark of console handlers writing to a pipe (non-TTY).
+- compares logging.StreamHandler (console handler of configure_logger)
+  ...with BufferedConsoleHandler (see src.log.buffered_console)
+- records/sec, CPU time per record (time.process_time) and p50/p99 per-call latency
+- records are logged via a logger and formatted with the basic formatter,
+  ...a thread drains the read end of the pipe
+- across message sizes
+
+Usage:
+    bench_console_handler.py [--records=<n>] [--sizes=<list>]
+                             [--output=<file>] [--compare=<file>] [--tolerance=<x>]
+
+Options:
+    --records=<n>       records per case [default: 100000]
+    --sizes=<list>      comma separated message sizes in bytes [default: 64,256,4096]
+    --output=<file>     JSON output file [default: log/bench_console_handler.json]
+    --compare=<file>    JSON file of a previous run, exit with 1 on regressions
+    --tolerance=<x>     allowed relative deterioration of records/sec [default: 0.1]
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TextIO
+
+from docopt import docopt
+
+from src.log import log
+from src.log.buffered_console import BufferedConsoleHandler
+from src.vars.paths import ROOT
+from test.benchmark.bench_utils import compare, get_meta, load_results, percentile, write_results
+
+
+HANDLERS: dict[str, Callable[[TextIO], logging.Handler]] = {
+    "stream": logging.StreamHandler,
+    "buffered": lambda stream: BufferedConsoleHandler(stream=stream),
+}
+"""handler kinds: name -> factory of handler writing to stream"""
+
+
+def _drain(fd: int) -> None:
+    """read from pipe until writer closes it
+
+    Args:
+        fd (int): read end of pipe
+    """
+    while os.read(fd, 1024*1024):
+        pass
+
+
+def _run_case(handler: logging.Handler, msg: str, records: int) -> dict[str, float]:
+    """log records via handler and measure throughput, CPU time and per-call latency
+
+    Returns:
+        dict[str, float]: records_per_sec, cpu_us_per_record, p50_us, p99_us
+    """
+    logger: logging.Logger = logging.getLogger("bench-console")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    samples: list[float] = [0.0] * records
+    clock: Callable[[], float] = time.perf_counter
+    warning: Callable[..., None] = logger.warning
+    cpu_start: float = time.process_time()
+    start: float = clock()
+    for i in range(records):
+        t: float = clock()
+        warning(msg)
+        samples[i] = clock() - t
+    # flushing is part of the cost (e.g. writing the buffer of BufferedConsoleHandler) #
+    handler.flush()
+    elapsed: float = clock() - start
+    cpu: float = time.process_time() - cpu_start
+    logger.removeHandler(handler)
+    handler.close()
+    return {
+        "records_per_sec": records / elapsed,
+        "cpu_us_per_record": cpu / records * 1e6,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+    }
+
+
+def run(records: int, sizes: list[int]) -> list[dict[str, Any]]:
+    """run all benchmark cases
+
+    Args:
+        records (int): records per case
+        sizes (list[int]): message sizes
+
+    Returns:
+        list[dict[str, Any]]: one result per case
+    """
+    results: list[dict[str, Any]] = []
+    for size in sizes:
+        for name, make_handler in HANDLERS.items():
+            r, w = os.pipe()
+            reader: threading.Thread = threading.Thread(target=_drain, args=(r,), daemon=True)
+            reader.start()
+            with os.fdopen(w, "w") as stream:
+                handler: logging.Handler = make_handler(stream)
+                handler.setFormatter(log._get_basic_formatter())
+                result: dict[str, Any] = {
+                    "handler": name, "size": size,
+                    **_run_case(handler, "x" * size, records),
+                }
+            reader.join()
+            os.close(r)
+            results.append(result)
+            print(
+                f"{name:<9} size={size:<6} "
+                f"{result['records_per_sec']:>12,.0f} rec/s "
+                f"cpu={result['cpu_us_per_record']:>7.2f}us/record "
+                f"p50={result['p50_us']:>8.2f}us p99={result['p99_us']:>8.2f}us",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark, write results and compare with baseline if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if regressions were found
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    # load baseline first, as it may be overwritten by output #
+    baseline: list[dict[str, Any]] | None = \
+        load_results(Path(args["--compare"])) if args["--compare"] else None
+
+    results: list[dict[str, Any]] = run(
+        records=int(args["--records"]),
+        sizes=[int(s) for s in args["--sizes"].split(",")],
+    )
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions: list[str] = compare(
+            baseline,
+            results,
+            keys=("handler", "size"),
+            metric="records_per_sec",
+            tolerance=float(args["--tolerance"]),
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Benchmark of how run_tasks of src.utils.executor scales across cores.
+- runs a CPU-bound task on thread and process pools with 1, 2, 4, .. n workers
+- reports tasks/sec and speedup against 1 worker of the same pool kind
+- thread pools are not expected to scale for CPU-bound tasks (GIL), process pools are
+
+Usage:
+    bench_executor.py [--tasks=<n>] [--work=<n>] [--workers=<n>] [--chunksize=<n>]
+                      [--pools=<list>] [--output=<file>] [--compare=<file>] [--tolerance=<x>]
+
+Options:
+    --tasks=<n>         tasks per case [default: 64]
+    --work=<n>          loop iterations per task [default: 200000]
+    --workers=<n>       max. number of workers (default: number of CPUs)
+    --chunksize=<n>     tasks sent to a worker at once [default: 4]
+    --pools=<list>      comma separated pool kinds, see POOL_KINDS (default: all kinds)
+    --output=<file>     JSON output file [default: log/bench_executor.json]
+    --compare=<file>    JSON file of a previous run, exit with 1 on regressions
+    --tolerance=<x>     allowed relative deterioration of tasks/sec [default: 0.1]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from docopt import docopt
+
+from src.utils.executor import POOL_KINDS, run_tasks
+from src.vars.paths import ROOT
+from test.benchmark.bench_logging_throughput import _thread_counts
+from test.benchmark.bench_utils import compare, get_meta, load_results, write_results
+
+
+def cpu_task(work: int) -> int:
+    """CPU-bound task (module level, so it is picklable for process pools)
+
+    Args:
+        work (int): loop iterations
+
+    Returns:
+        int: checksum
+    """
+    acc: int = 0
+    for i in range(work):
+        acc = (acc + i * i) % 1_000_003
+    return acc
+
+
+def _run_case(pool: str, workers: int, tasks: int, work: int, chunksize: int) -> float:
+    """run all tasks and return tasks/sec
+
+    Raises:
+        RuntimeError: if a task failed
+    """
+    start: float = time.perf_counter()
+    for res in run_tasks(
+        cpu_task, ((work,) for _ in range(tasks)), pool=pool, max_workers=workers, chunksize=chunksize
+    ):
+        if not res.ok:
+            raise RuntimeError(f"Task {res.index} failed: {res.error!r}")
+    return tasks / (time.perf_counter() - start)
+
+
+def run(
+        tasks: int,
+        work: int,
+        max_workers: int,
+        chunksize: int,
+        pools: list[str],
+    ) -> list[dict[str, Any]]:
+    """run all benchmark cases
+
+    Args:
+        tasks (int): tasks per case
+        work (int): loop iterations per task
+        max_workers (int): max. number of workers
+        chunksize (int): tasks sent to a worker at once
+        pools (list[str]): pool kinds
+
+    Returns:
+        list[dict[str, Any]]: one result per case
+    """
+    results: list[dict[str, Any]] = []
+    for pool in pools:
+        base: float | None = None
+        for workers in _thread_counts(max_workers):
+            tasks_per_sec: float = _run_case(pool, workers, tasks, work, chunksize)
+            base = base or tasks_per_sec
+            result: dict[str, Any] = {
+                "pool": pool, "workers": workers,
+                "tasks_per_sec": tasks_per_sec, "speedup": tasks_per_sec / base,
+            }
+            results.append(result)
+            print(
+                f"{pool:<8} workers={workers:<3} {tasks_per_sec:>10,.1f} tasks/s "
+                f"speedup={result['speedup']:>5.2f}x"
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark, write results and compare with baseline if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if regressions were found
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    pools: list[str] = args["--pools"].split(",") if args["--pools"] else list(POOL_KINDS)
+    unknown: set[str] = set(pools) - set(POOL_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown pools: {sorted(unknown)}. Valid pools: {list(POOL_KINDS)}")
+    # load baseline first, as it may be overwritten by output #
+    baseline: list[dict[str, Any]] | None = \
+        load_results(Path(args["--compare"])) if args["--compare"] else None
+
+    results: list[dict[str, Any]] = run(
+        tasks=int(args["--tasks"]),
+        work=int(args["--work"]),
+        max_workers=int(args["--workers"] or os.cpu_count() or 1),
+        chunksize=int(args["--chunksize"]),
+        pools=pools,
+    )
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions: list[str] = compare(
+            baseline,
+            results,
+            keys=("pool", "workers"),
+            metric="tasks_per_sec",
+            tolerance=float(args["--tolerance"]),
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
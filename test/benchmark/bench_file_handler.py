@@ -0,0 +1,145 @@
+"""
+Benchmark of the memory-mapped file handler (see src.log.mmap_handler) against RotatingFileHandler.
+- records/sec, CPU time per record (time.process_time) and p50/p99 per-call latency
+- handlers are used directly (no logger), records are formatted with the basic formatter
+- across message sizes and segment sizes (maxBytes), small segments include the cost of rotation
+- files are written to a tmp dir
+
+Usage:
+    bench_file_handler.py [--records=<n>] [--sizes=<list>] [--max-bytes=<list>]
+                          [--output=<file>] [--compare=<file>] [--tolerance=<x>]
+
+Options:
+    --records=<n>       records per case [default: 100000]
+    --sizes=<list>      comma separated message sizes in bytes [default: 64,256,4096]
+    --max-bytes=<list>  comma separated maxBytes of handlers [default: 104857600,1048576]
+    --output=<file>     JSON output file [default: log/bench_file_handler.json]
+    --compare=<file>    JSON file of a previous run, exit with 1 on regressions
+    --tolerance=<x>     allowed relative deterioration of records/sec [default: 0.1]
+"""
+import logging
+import logging.handlers
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from docopt import docopt
+
+from src.log import log
+from src.log.mmap_handler import MmapRotatingFileHandler
+from src.vars.paths import ROOT
+from test.benchmark.bench_utils import compare, get_meta, load_results, percentile, write_results
+
+
+HANDLERS: dict[str, type[logging.handlers.RotatingFileHandler]] = {
+    "rotating": logging.handlers.RotatingFileHandler,
+    "mmap": MmapRotatingFileHandler,
+}
+"""handler kinds: name -> class"""
+
+
+def _run_case(handler: logging.Handler, msg: str, records: int) -> dict[str, float]:
+    """pass records to handler and measure throughput, CPU time and per-call latency
+
+    Returns:
+        dict[str, float]: records_per_sec, cpu_us_per_record, p50_us, p99_us
+    """
+    record: logging.LogRecord = logging.LogRecord("bench", logging.WARNING, __file__, 1, msg, (), None)
+    samples: list[float] = [0.0] * records
+    clock: Callable[[], float] = time.perf_counter
+    handle: Callable[[logging.LogRecord], Any] = handler.handle
+    cpu_start: float = time.process_time()
+    start: float = clock()
+    for i in range(records):
+        t: float = clock()
+        handle(record)
+        samples[i] = clock() - t
+    # closing is part of the cost (e.g. truncating the segment) #
+    handler.close()
+    elapsed: float = clock() - start
+    cpu: float = time.process_time() - cpu_start
+    return {
+        "records_per_sec": records / elapsed,
+        "cpu_us_per_record": cpu / records * 1e6,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+    }
+
+
+def run(records: int, sizes: list[int], max_bytes: list[int]) -> list[dict[str, Any]]:
+    """run all benchmark cases
+
+    Args:
+        records (int): records per case
+        sizes (list[int]): message sizes
+        max_bytes (list[int]): maxBytes of handlers
+
+    Returns:
+        list[dict[str, Any]]: one result per case
+    """
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for segment in max_bytes:
+            for size in sizes:
+                for name, cls in HANDLERS.items():
+                    case_dir: Path = Path(tmp) / f"{name}-{segment}-{size}"
+                    case_dir.mkdir()
+                    handler: logging.Handler = cls(case_dir / "app.log", maxBytes=segment, backupCount=10)
+                    handler.setFormatter(log._get_basic_formatter())
+                    result: dict[str, Any] = {
+                        "handler": name, "size": size, "max_bytes": segment,
+                        **_run_case(handler, "x" * size, records),
+                    }
+                    results.append(result)
+                    print(
+                        f"{name:<9} size={size:<6} max_bytes={segment:<10} "
+                        f"{result['records_per_sec']:>12,.0f} rec/s "
+                        f"cpu={result['cpu_us_per_record']:>7.2f}us/record "
+                        f"p50={result['p50_us']:>8.2f}us p99={result['p99_us']:>8.2f}us",
+                        file=sys.stderr,
+                    )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark, write results and compare with baseline if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if regressions were found
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    # load baseline first, as it may be overwritten by output #
+    baseline: list[dict[str, Any]] | None = \
+        load_results(Path(args["--compare"])) if args["--compare"] else None
+
+    results: list[dict[str, Any]] = run(
+        records=int(args["--records"]),
+        sizes=[int(s) for s in args["--sizes"].split(",")],
+        max_bytes=[int(s) for s in args["--max-bytes"].split(",")],
+    )
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions: list[str] = compare(
+            baseline,
+            results,
+            keys=("handler", "size", "max_bytes"),
+            metric="records_per_sec",
+            tolerance=float(args["--tolerance"]),
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
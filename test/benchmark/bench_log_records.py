@@ -0,0 +1,180 @@
+"""
+Benchmark of compact log records (see src.log.record) against stock LogRecords.
+- memory: bytes per record that is kept alive (e.g. while it waits in a queue), measured via
+  ...tracemalloc before and after the record is formatted
+- throughput: records/sec and p50/p99 per-call latency of a logger of configure_logger
+- console output goes to os.devnull, file output to a tmp dir
+
+Usage:
+    bench_log_records.py [--records=<n>] [--output=<file>] [--compare=<file>] [--tolerance=<x>]
+
+Options:
+    --records=<n>       records per case [default: 20000]
+    --output=<file>     JSON output file [default: log/bench_log_records.json]
+    --compare=<file>    JSON file of a previous run, exit with 1 on regressions
+    --tolerance=<x>     allowed relative deterioration of records/sec [default: 0.1]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from docopt import docopt
+
+from src.log import log
+from src.vars.paths import ROOT
+from test.benchmark.bench_utils import compare, get_meta, load_results, percentile, write_results
+
+
+MODES: dict[str, bool] = {
+    "stock": False,
+    "compact": True,
+}
+"""record modes: name -> value of configure_logger's compact_records"""
+
+
+def _make_logger(mode: str, log_dir: Path) -> logging.Logger:
+    """return a fresh logger configured by configure_logger in passed mode
+    - console handler writes to os.devnull (sys.stderr is replaced by caller)
+    """
+    logger: logging.Logger = logging.getLogger(f"bench-records-{mode}")
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
+    logger.filters.clear()
+    return log.configure_logger(
+        logger,
+        ch_level=logging.WARNING,
+        fh_level=logging.WARNING,
+        fh_file_path=log_dir / f"{mode}.log",
+        compact_records=MODES[mode],
+    )
+
+
+def _measure_memory(logger: logging.Logger, records: int) -> dict[str, float]:
+    """create records via logger (as Logger._log does) and measure the memory they keep alive
+
+    Returns:
+        dict[str, float]: bytes_per_record, bytes_per_formatted_record
+    """
+    formatter: logging.Formatter = logger.handlers[0].formatter
+    make_record: Callable[..., logging.LogRecord] = logger.makeRecord
+    tracemalloc.start()
+    try:
+        start: int = tracemalloc.get_traced_memory()[0]
+        kept: list[logging.LogRecord] = [
+            make_record(logger.name, logging.WARNING, __file__, 1, "record %d", (i,), None, "func")
+            for i in range(records)
+        ]
+        created: int = tracemalloc.get_traced_memory()[0]
+        for record in kept:
+            formatter.format(record)
+        formatted: int = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return {
+        "bytes_per_record": (created - start) / records,
+        "bytes_per_formatted_record": (formatted - start) / records,
+    }
+
+
+def _measure_throughput(logger: logging.Logger, records: int) -> dict[str, float]:
+    """log records and measure throughput and per-call latency
+
+    Returns:
+        dict[str, float]: records_per_sec, p50_us, p99_us
+    """
+    samples: list[float] = [0.0] * records
+    clock: Callable[[], float] = time.perf_counter
+    start: float = clock()
+    for i in range(records):
+        t: float = clock()
+        logger.warning("record %d", i)
+        samples[i] = clock() - t
+    for h in logger.handlers:
+        h.flush()
+    elapsed: float = clock() - start
+    return {
+        "records_per_sec": records / elapsed,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+    }
+
+
+def run(records: int) -> list[dict[str, Any]]:
+    """run all benchmark cases
+
+    Args:
+        records (int): records per case
+
+    Returns:
+        list[dict[str, Any]]: one result per mode
+    """
+    results: list[dict[str, Any]] = []
+    stderr = sys.stderr
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        sys.stderr = devnull
+        try:
+            for mode in MODES:
+                logger: logging.Logger = _make_logger(mode, Path(tmp))
+                result: dict[str, Any] = {
+                    "mode": mode,
+                    **_measure_memory(logger, records),
+                    **_measure_throughput(logger, records),
+                }
+                for h in list(logger.handlers):
+                    logger.removeHandler(h)
+                    h.close()
+                results.append(result)
+                print(
+                    f"{mode:<8} {result['bytes_per_record']:>7.0f} B/record "
+                    f"({result['bytes_per_formatted_record']:>7.0f} B formatted) "
+                    f"{result['records_per_sec']:>12,.0f} rec/s "
+                    f"p50={result['p50_us']:>8.2f}us p99={result['p99_us']:>8.2f}us",
+                    file=stderr,
+                )
+        finally:
+            sys.stderr = stderr
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark, write results and compare with baseline if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if regressions were found
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    # load baseline first, as it may be overwritten by output #
+    baseline: list[dict[str, Any]] | None = \
+        load_results(Path(args["--compare"])) if args["--compare"] else None
+
+    results: list[dict[str, Any]] = run(records=int(args["--records"]))
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions: list[str] = compare(
+            baseline,
+            results,
+            keys=("mode",),
+            metric="records_per_sec",
+            tolerance=float(args["--tolerance"]),
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Benchmark of the shared-memory log transport (see src.log.shm_transport) against the queue-based one.
+- worker processes of a process pool log records, the main process passes them to a logger
+  ...with a counting handler: via QueueHandler, multiprocessing.Queue and QueueListener ("queue")
+  ...or via ShmHandler, the rings of a ShmTransport and ShmListener ("shm")
+- records/sec from the start of logging until all records were passed to the handler,
+  ...p50/p99 latency of a logging call in the workers and number of dropped records
+- across message sizes and numbers of workers, the queue never drops records (it is unbounded)
+
+Usage:
+    bench_log_transport.py [--records=<n>] [--workers=<list>] [--sizes=<list>] [--ring-size=<bytes>]
+                           [--output=<file>] [--compare=<file>] [--tolerance=<x>]
+
+Options:
+    --records=<n>        records per worker [default: 50000]
+    --workers=<list>     comma separated numbers of worker processes [default: 1,4]
+    --sizes=<list>       comma separated message sizes in bytes [default: 64,1024]
+    --ring-size=<bytes>  bytes of every ring of the shm transport [default: 4194304]
+    --output=<file>      JSON output file [default: log/bench_log_transport.json]
+    --compare=<file>     JSON file of a previous run, exit with 1 on regressions
+    --tolerance=<x>      allowed relative deterioration of records/sec [default: 0.1]
+"""
+import concurrent.futures
+import logging
+import logging.handlers
+import multiprocessing
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from docopt import docopt
+
+from src.log import shm_transport
+from src.vars.paths import ROOT
+from test.benchmark.bench_utils import compare, get_meta, load_results, percentile, write_results
+
+
+TRANSPORTS: tuple[str, ...] = ("queue", "shm")
+"""transport kinds"""
+
+
+class CountingHandler(logging.Handler):
+    """handler that counts its records
+    """
+    def __init__(self):
+        super().__init__()
+        self.count: int = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.count += 1
+
+
+def _init_queue_worker(queue: multiprocessing.Queue) -> None:
+    """let root logger of worker process write into queue
+    """
+    root: logging.Logger = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(logging.handlers.QueueHandler(queue))
+
+
+def _log(records: int, size: int) -> tuple[float, float]:
+    """log records in worker process
+
+    Returns:
+        tuple[float, float]: p50 and p99 latency of a logging call in seconds
+    """
+    logger: logging.Logger = logging.getLogger("bench")
+    logger.setLevel(logging.INFO)
+    msg: str = "x" * size
+    samples: list[float] = [0.0] * records
+    clock: Callable[[], float] = time.perf_counter
+    for i in range(records):
+        t: float = clock()
+        logger.info("%d %s", i, msg)
+        samples[i] = clock() - t
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def _run_case(transport: str, workers: int, size: int, records: int, ring_size: int) -> dict[str, float]:
+    """log records in worker processes and pass them to a counting handler in this process
+
+    Returns:
+        dict[str, float]: records_per_sec, p50_us, p99_us, dropped
+    """
+    sink: logging.Logger = logging.getLogger(f"bench-sink-{transport}")
+    sink.propagate = False
+    handler: CountingHandler = CountingHandler()
+    sink.addHandler(handler)
+    context: multiprocessing.context.BaseContext = multiprocessing.get_context()
+
+    if transport == "shm":
+        shm: shm_transport.ShmTransport = shm_transport.ShmTransport(
+            rings=workers, ring_size=ring_size, mp_context=context
+        )
+        listener: Any = shm_transport.ShmListener(shm, sink)
+        initializer: Callable[..., Any] = shm_transport.init_worker
+        initargs: tuple = (shm,)
+    else:
+        queue: multiprocessing.Queue = context.Queue()
+        listener = logging.handlers.QueueListener(queue, handler)
+        initializer, initargs = _init_queue_worker, (queue,)
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=context, initializer=initializer, initargs=initargs
+        ) as pool:
+            # start workers before the clock starts #
+            list(pool.map(_log, [0] * workers, [size] * workers))
+            listener.start()
+            start: float = time.perf_counter()
+            latencies: list[tuple[float, float]] = list(pool.map(_log, [records] * workers, [size] * workers))
+        listener.stop()
+        elapsed: float = time.perf_counter() - start
+        dropped: int = shm.dropped if transport == "shm" else 0
+    finally:
+        if transport == "shm":
+            shm.close()
+        sink.removeHandler(handler)
+    return {
+        "records_per_sec": handler.count / elapsed,
+        "p50_us": max(l[0] for l in latencies) * 1e6,
+        "p99_us": max(l[1] for l in latencies) * 1e6,
+        "dropped": dropped,
+    }
+
+
+def run(records: int, workers: list[int], sizes: list[int], ring_size: int) -> list[dict[str, Any]]:
+    """run all benchmark cases
+
+    Args:
+        records (int): records per worker
+        workers (list[int]): numbers of worker processes
+        sizes (list[int]): message sizes
+        ring_size (int): bytes of every ring of the shm transport
+
+    Returns:
+        list[dict[str, Any]]: one result per case
+    """
+    results: list[dict[str, Any]] = []
+    for n in workers:
+        for size in sizes:
+            for transport in TRANSPORTS:
+                result: dict[str, Any] = {
+                    "transport": transport, "workers": n, "size": size,
+                    **_run_case(transport, n, size, records, ring_size),
+                }
+                results.append(result)
+                print(
+                    f"{transport:<6} workers={n:<3} size={size:<6} "
+                    f"{result['records_per_sec']:>12,.0f} rec/s "
+                    f"p50={result['p50_us']:>8.2f}us p99={result['p99_us']:>8.2f}us "
+                    f"dropped={result['dropped']}",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark, write results and compare with baseline if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if regressions were found
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    # load baseline first, as it may be overwritten by output #
+    baseline: list[dict[str, Any]] | None = \
+        load_results(Path(args["--compare"])) if args["--compare"] else None
+
+    results: list[dict[str, Any]] = run(
+        records=int(args["--records"]),
+        workers=[int(s) for s in args["--workers"].split(",")],
+        sizes=[int(s) for s in args["--sizes"].split(",")],
+        ring_size=int(args["--ring-size"]),
+    )
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions: list[str] = compare(
+            baseline,
+            results,
+            keys=("transport", "workers", "size"),
+            metric="records_per_sec",
+            tolerance=float(args["--tolerance"]),
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Benchmark of what configure_logger costs per record.
+- measures records/sec and p50/p99 per-call latency
+- across handler modes, message sizes, enabled/disabled levels and 1..N threads
+- console output goes to os.devnull, file output to a tmp dir
+
+Usage:
+    bench_logging_throughput.py [--records=<n>] [--threads=<n>] [--sizes=<list>] [--modes=<list>]
+                                [--output=<file>] [--compare=<file>] [--tolerance=<x>]
+
+Options:
+    --records=<n>       records per case (split across threads) [default: 20000]
+    --threads=<n>       max. number of threads, cases run for 1, 2, 4, .., n threads [default: 4]
+    --sizes=<list>      comma separated message sizes in bytes [default: 16,256,4096]
+    --modes=<list>      comma separated handler modes, see MODES (default: all modes)
+    --output=<file>     JSON output file [default: log/bench_logging_throughput.json]
+    --compare=<file>    JSON file of a previous run, exit with 1 on regressions
+    --tolerance=<x>     allowed relative deterioration of records/sec [default: 0.1]
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from docopt import docopt
+
+from src.log import log
+from src.log.overload import OverloadPolicy
+from src.vars.paths import ROOT
+from test.benchmark.bench_utils import compare, get_meta, load_results, percentile, write_results
+
+
+MODES: dict[str, Callable[[], dict[str, Any]]] = {
+    "default": lambda: {},
+    "buffered_console": lambda: {"ch_buffered": True},
+    "overload_policy": lambda: {"overload_policy": OverloadPolicy()},
+    "mmap_file_handler": lambda: {"fh_mmap": True},
+}
+"""handler/formatter modes: name -> factory of additional kwargs for configure_logger"""
+
+
+def _thread_counts(max_threads: int) -> list[int]:
+    """return 1, 2, 4, .. up to max_threads (max_threads always included)
+    """
+    counts: list[int] = []
+    n: int = 1
+    while n < max_threads:
+        counts.append(n)
+        n *= 2
+    return counts + [max_threads]
+
+
+def _make_logger(mode: str, log_dir: Path) -> logging.Logger:
+    """return a fresh logger configured by configure_logger in passed mode
+    - console handler writes to os.devnull (sys.stderr is replaced by caller)
+    """
+    logger: logging.Logger = logging.getLogger(f"bench-{mode}")
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
+    logger.filters.clear()
+    return log.configure_logger(
+        logger,
+        ch_level=logging.WARNING,
+        fh_level=logging.WARNING,
+        fh_file_path=log_dir / f"{mode}.log",
+        **MODES[mode](),
+    )
+
+
+def _run_case(logger: logging.Logger, msg: str, enabled: bool, records: int, threads: int) -> dict:
+    """log records across threads and measure throughput and per-call latency
+
+    Returns:
+        dict: records_per_sec, p50_us, p99_us
+    """
+    log_func: Callable = logger.warning if enabled else logger.debug
+    per_thread: int = max(records // threads, 1)
+    latencies: list[list[float]] = [[0.0] * per_thread for _ in range(threads)]
+    barrier: threading.Barrier = threading.Barrier(threads + 1)
+
+    def worker(samples: list[float]) -> None:
+        clock: Callable[[], float] = time.perf_counter
+        barrier.wait()
+        for i in range(per_thread):
+            start: float = clock()
+            log_func(msg)
+            samples[i] = clock() - start
+
+    workers: list[threading.Thread] = [
+        threading.Thread(target=worker, args=(samples,)) for samples in latencies
+    ]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start: float = time.perf_counter()
+    for t in workers:
+        t.join()
+    for h in logger.handlers:
+        h.flush()
+    elapsed: float = time.perf_counter() - start
+
+    samples: list[float] = [s for thread_samples in latencies for s in thread_samples]
+    return {
+        "records_per_sec": per_thread * threads / elapsed,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+    }
+
+
+def run(
+        records: int,
+        max_threads: int,
+        sizes: list[int],
+        modes: list[str],
+    ) -> list[dict[str, Any]]:
+    """run all benchmark cases
+
+    Args:
+        records (int): records per case
+        max_threads (int): max. number of threads
+        sizes (list[int]): message sizes
+        modes (list[str]): handler modes
+
+    Returns:
+        list[dict[str, Any]]: one result per case
+    """
+    results: list[dict[str, Any]] = []
+    stderr = sys.stderr
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        sys.stderr = devnull
+        try:
+            for mode in modes:
+                logger: logging.Logger = _make_logger(mode, Path(tmp))
+                for size in sizes:
+                    msg: str = "x" * size
+                    for enabled in (True, False):
+                        for threads in _thread_counts(max_threads):
+                            result: dict[str, Any] = {
+                                "mode": mode, "size": size, "enabled": enabled, "threads": threads,
+                                **_run_case(logger, msg, enabled, records, threads),
+                            }
+                            results.append(result)
+                            print(
+                                f"{mode:<18} size={size:<6} enabled={enabled!s:<5} "
+                                f"threads={threads:<3} {result['records_per_sec']:>12,.0f} rec/s "
+                                f"p50={result['p50_us']:>8.2f}us p99={result['p99_us']:>8.2f}us",
+                                file=stderr,
+                            )
+                for h in list(logger.handlers):
+                    logger.removeHandler(h)
+                    h.close()
+        finally:
+            sys.stderr = stderr
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark, write results and compare with baseline if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if regressions were found
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    modes: list[str] = args["--modes"].split(",") if args["--modes"] else list(MODES)
+    unknown: set[str] = set(modes) - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown modes: {sorted(unknown)}. Valid modes: {list(MODES)}")
+    # load baseline first, as it may be overwritten by output #
+    baseline: list[dict[str, Any]] | None = \
+        load_results(Path(args["--compare"])) if args["--compare"] else None
+
+    results: list[dict[str, Any]] = run(
+        records=int(args["--records"]),
+        max_threads=int(args["--threads"]),
+        sizes=[int(s) for s in args["--sizes"].split(",")],
+        modes=modes,
+    )
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions: list[str] = compare(
+            baseline,
+            results,
+            keys=("mode", "size", "enabled", "threads"),
+            metric="records_per_sec",
+            tolerance=float(args["--tolerance"]),
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
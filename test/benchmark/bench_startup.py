@@ -0,0 +1,201 @@
+"""
+Benchmark of cold and warm startup of the program.
+- launches the program many times and reports the distribution of wall time per launch
+- every launch runs in a copy of the sources in a tmp dir
+  ...(so log files and log.conf of the checkout are not touched)
+- cold: every launch runs in a fresh copy, i.e. the sources have to be compiled
+- warm: every launch runs in the same copy, whose bytecode cache has been primed before
+- with --phases, the per-phase breakdown of --profile-startup is averaged over all launches
+- with --zipapp, a zipapp built via src.utils.build (precompiled bytecode) is launched the same way
+  ...and compared with the sources
+
+Usage:
+    bench_startup.py [--runs=<n>] [--target=<cmd>] [--zipapp] [--phases] [--budget-ms=<ms>] [--output=<file>] [--] [<arg>...]
+
+Options:
+    --runs=<n>          launches per mode [default: 20]
+    --target=<cmd>      program to launch, relative to the copy of ROOT [default: main.py]
+    --zipapp            also launch a zipapp of the program (<arg>... are passed to it as well)
+    --phases            pass --profile-startup and average the per-phase breakdown
+    --budget-ms=<ms>    exit with 1 if p50 of warm startup (of any target) exceeds budget
+    --output=<file>     JSON output file [default: log/bench_startup.json]
+"""
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import mean
+from typing import Any
+
+from docopt import docopt
+
+from src.utils import build
+from src.vars.paths import ROOT
+from test.benchmark.bench_utils import get_meta, percentile, write_results
+
+
+PHASE_PATTERN: re.Pattern = re.compile(r"^startup phase (.+?)\s+([\d.]+) ms", re.MULTILINE)
+"""pattern of a line of startup_profile.get_report"""
+
+
+def _copy_sources(dst: Path, dist: Path | None = None) -> Path:
+    """copy sources needed to run the program (without bytecode caches and logs) to dst
+
+    Args:
+        dst (Path): destination dir, must not exist
+        dist (Path | None, optional): output dir of src.utils.build, whose files (archive,
+            ...log.conf, log dir) are copied instead. Defaults to None meaning the sources.
+
+    Returns:
+        Path: dst
+    """
+    if dist is not None:
+        shutil.copytree(dist, dst)
+        return dst
+    dst.mkdir(parents=True)
+    shutil.copy2(ROOT / "main.py", dst / "main.py")
+    shutil.copytree(ROOT / "src", dst / "src", ignore=shutil.ignore_patterns("__pycache__"))
+    (dst / "log").mkdir()
+    return dst
+
+
+def _launch(cmd: list[str], cwd: Path) -> tuple[float, str]:
+    """launch program once
+
+    Args:
+        cmd (list[str]): command
+        cwd (Path): working dir, i.e. copy of sources
+
+    Returns:
+        tuple[float, str]: wall time in seconds, stderr output
+    """
+    start: float = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    elapsed: float = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Launch of {cmd} failed:\n{proc.stderr}")
+    return elapsed, proc.stderr
+
+
+def _run_target(
+        tmp: Path,
+        target: str,
+        runs: int,
+        cmd: list[str],
+        phases: bool,
+        dist: Path | None,
+    ) -> list[dict[str, Any]]:
+    """launch program of one target cold and warm runs times each
+
+    Args:
+        tmp (Path): dir of copies, must not exist
+        target (str): name of target, "source" or "zipapp"
+        runs (int): launches per mode
+        cmd (list[str]): command
+        phases (bool): parse per-phase breakdown of --profile-startup
+        dist (Path | None): output dir of src.utils.build, None for sources
+
+    Returns:
+        list[dict[str, Any]]: one result per mode
+    """
+    results: list[dict[str, Any]] = []
+    warm_dir: Path = _copy_sources(tmp / "warm", dist)
+    for mode in ("cold", "warm"):
+        samples: list[float] = []
+        phase_samples: dict[str, list[float]] = {}
+        if mode == "warm":
+            # prime bytecode cache (and file system cache) #
+            _launch(cmd, warm_dir)
+        for i in range(runs):
+            cwd: Path = warm_dir if mode == "warm" else _copy_sources(tmp / f"cold-{i}", dist)
+            elapsed, stderr = _launch(cmd, cwd)
+            samples.append(elapsed)
+            for name, ms in PHASE_PATTERN.findall(stderr) if phases else ():
+                phase_samples.setdefault(name, []).append(float(ms))
+        result: dict[str, Any] = {
+            "target": target,
+            "mode": mode,
+            "runs": runs,
+            "min_ms": min(samples) * 1e3,
+            "p50_ms": percentile(samples, 50) * 1e3,
+            "p90_ms": percentile(samples, 90) * 1e3,
+            "p99_ms": percentile(samples, 99) * 1e3,
+            "max_ms": max(samples) * 1e3,
+            "mean_ms": mean(samples) * 1e3,
+            "phases_mean_ms": {name: mean(ms) for name, ms in phase_samples.items()},
+        }
+        results.append(result)
+        print(
+            f"{target:<7}{mode:<5} min={result['min_ms']:.1f}ms p50={result['p50_ms']:.1f}ms "
+            f"p90={result['p90_ms']:.1f}ms p99={result['p99_ms']:.1f}ms max={result['max_ms']:.1f}ms"
+        )
+        for name, ms in result["phases_mean_ms"].items():
+            print(f"             {name:<20} {ms:>9.3f} ms (mean)")
+    return results
+
+
+def run(
+        runs: int,
+        cmd: list[str],
+        phases: bool,
+        zipapp_cmd: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+    """launch program cold and warm runs times each, from sources and from a zipapp if wanted
+
+    Args:
+        runs (int): launches per mode
+        cmd (list[str]): command
+        phases (bool): parse per-phase breakdown of --profile-startup
+        zipapp_cmd (list[str] | None, optional): command that launches the archive built via
+            ...src.utils.build. Defaults to None meaning no zipapp.
+
+    Returns:
+        list[dict[str, Any]]: one result per target and mode
+    """
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        targets: list[tuple[str, list[str], Path | None]] = [("source", cmd, None)]
+        if zipapp_cmd is not None:
+            dist: Path = Path(tmp) / "dist"
+            build.build(dist, name=zipapp_cmd[1])
+            targets.append(("zipapp", zipapp_cmd, dist))
+        for target, target_cmd, target_dist in targets:
+            results.extend(_run_target(Path(tmp) / target, target, runs, target_cmd, phases, target_dist))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """run benchmark and check startup budget if wanted
+
+    Args:
+        argv (list[str] | None, optional): cli args. Defaults to None meaning sys.argv.
+
+    Returns:
+        int: exit code, 1 if budget is exceeded
+    """
+    args: dict = docopt(__doc__, argv=argv)
+    cmd: list[str] = [sys.executable, *args["--target"].split(), *args["<arg>"]]
+    zipapp_cmd: list[str] | None = [sys.executable, "app.pyz", *args["<arg>"]] if args["--zipapp"] else None
+    if args["--phases"]:
+        cmd.append("--profile-startup")
+        if zipapp_cmd is not None:
+            zipapp_cmd.append("--profile-startup")
+
+    results: list[dict[str, Any]] = run(int(args["--runs"]), cmd, args["--phases"], zipapp_cmd)
+    output: Path = ROOT / args["--output"]
+    write_results(output, get_meta(**args), results)
+    print(f"Results written to '{output}'.")
+
+    if args["--budget-ms"] is not None:
+        warm_p50: float = max(r["p50_ms"] for r in results if r["mode"] == "warm")
+        if warm_p50 > float(args["--budget-ms"]):
+            print(f"BUDGET EXCEEDED warm p50 {warm_p50:.1f}ms > {args['--budget-ms']}ms")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
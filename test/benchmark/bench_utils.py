@@ -0,0 +1,109 @@
+"""
+Module that provides helpers shared by the benchmarks
+- percentiles of latency samples
+- writing results to JSON and comparing them against a baseline run
+"""
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """return q-th percentile of samples (nearest-rank method)
+
+    Args:
+        samples (list[float]): samples, need not be sorted
+        q (float): percentile in [0, 100]
+
+    Returns:
+        float: percentile, 0.0 if there are no samples
+    """
+    if not samples:
+        return 0.0
+    ordered: list[float] = sorted(samples)
+    rank: int = max(int(round(q / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def get_meta(**args: Any) -> dict[str, Any]:
+    """return meta data describing the benchmark run
+
+    Args:
+        **args (Any): benchmark arguments
+
+    Returns:
+        dict[str, Any]: meta data
+    """
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "args": args,
+    }
+
+
+def write_results(path: Path, meta: dict[str, Any], results: list[dict[str, Any]]) -> None:
+    """write benchmark results to JSON file
+
+    Args:
+        path (Path): output file
+        meta (dict[str, Any]): meta data of run
+        results (list[dict[str, Any]]): one dict per benchmark case
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+
+
+def load_results(path: Path) -> list[dict[str, Any]]:
+    """return results of a JSON file written by write_results
+
+    Args:
+        path (Path): JSON file
+
+    Returns:
+        list[dict[str, Any]]: results
+    """
+    return json.loads(path.read_text())["results"]
+
+
+def compare(
+        baseline_results: list[dict[str, Any]],
+        results: list[dict[str, Any]],
+        keys: tuple[str, ...],
+        metric: str,
+        higher_is_better: bool = True,
+        tolerance: float = 0.1,
+    ) -> list[str]:
+    """compare results against a baseline run and return regressions
+
+    Args:
+        baseline_results (list[dict[str, Any]]): results of baseline run, see load_results
+        results (list[dict[str, Any]]): current results
+        keys (tuple[str, ...]): fields identifying a benchmark case
+        metric (str): field to compare
+        higher_is_better (bool, optional): direction of metric. Defaults to True.
+        tolerance (float, optional): allowed relative deterioration. Defaults to 0.1.
+
+    Returns:
+        list[str]: human readable description per regression
+    """
+    baseline: dict[tuple, dict[str, Any]] = {
+        tuple(r[k] for k in keys): r
+        for r in baseline_results
+    }
+    regressions: list[str] = []
+    for r in results:
+        case: tuple = tuple(r[k] for k in keys)
+        if case not in baseline or not baseline[case][metric]:
+            continue
+        ratio: float = r[metric] / baseline[case][metric]
+        if (higher_is_better and ratio < 1 - tolerance) \
+        or (not higher_is_better and ratio > 1 + tolerance):
+            regressions.append(
+                f"{dict(zip(keys, case))}: {metric} {baseline[case][metric]:.4g} -> {r[metric]:.4g}"
+            )
+    return regressions
@@ -0,0 +1,157 @@
+import io
+import logging
+import pytest
+
+from src.log import buffered_console as bc
+
+
+class FakeTTY(io.StringIO):
+    """StringIO that pretends to be a terminal
+    """
+    def isatty(self) -> bool:
+        return True
+
+
+def _record(level: int = logging.WARNING, msg: str = "test msg") -> logging.LogRecord:
+    """return a log record
+
+    Args:
+        level (int, optional): log level. Defaults to logging.WARNING.
+        msg (str, optional): log message. Defaults to "test msg".
+
+    Returns:
+        logging.LogRecord: log record
+    """
+    return logging.LogRecord("test-logger", level, __file__, 1, msg, None, None)
+
+
+@pytest.fixture
+def handler_piped():
+    """yield BufferedConsoleHandler writing to a non-TTY stream without periodic flushing
+    - close handler on tearDown
+    """
+    h = bc.BufferedConsoleHandler(stream=io.StringIO(), buffer_size=100, flush_interval=0)
+    h.setFormatter(logging.Formatter("%(message)s"))
+    yield h
+    h.close()
+
+
+def test_is_tty():
+    """test function is_tty
+    """
+    assert bc.is_tty(FakeTTY())
+    assert not bc.is_tty(io.StringIO())
+    assert not bc.is_tty(object())
+
+
+def test_handler_tty_writes_instantly():
+    """test that records are written instantly and colourised if stream is a TTY
+    """
+    stream = FakeTTY()
+    h = bc.BufferedConsoleHandler(stream=stream)
+    h.setFormatter(logging.Formatter("%(message)s"))
+
+    h.handle(_record(logging.WARNING))
+
+    prefix, suffix = bc.LEVEL_COLOURS[logging.WARNING]
+    assert stream.getvalue() == f"{prefix}test msg{suffix}\n"
+    assert h.shared_buffer is None
+    h.close()
+
+
+def test_handler_piped_buffers(handler_piped: bc.BufferedConsoleHandler):
+    """test that records are buffered and not colourised if stream is no TTY
+
+    Args:
+        handler_piped (bc.BufferedConsoleHandler): handler writing to a non-TTY stream
+    """
+    handler_piped.handle(_record())
+
+    assert handler_piped.stream.getvalue() == ""
+    assert handler_piped.backlog == len("test msg\n")
+
+    handler_piped.flush()
+    assert handler_piped.stream.getvalue() == "test msg\n"
+    assert handler_piped.backlog == 0
+
+
+@pytest.mark.parametrize(
+    "test_case, records, exp_written",
+    [
+        ("test case 1: buffer size exceeded", [_record(msg="x"*60), _record(msg="y"*60)], True),
+        ("test case 2: ERROR record", [_record(logging.ERROR)], True),
+        ("test case 3: buffer not full", [_record(msg="x"*60)], False),
+    ]
+)
+def test_handler_piped_writes_buffer(
+        handler_piped: bc.BufferedConsoleHandler,
+        test_case: str,
+        records: list[logging.LogRecord],
+        exp_written: bool,
+    ):
+    """test when buffered records are written to stream
+
+    Args:
+        handler_piped (bc.BufferedConsoleHandler): handler writing to a non-TTY stream
+        test_case (str): test case name
+        records (list[logging.LogRecord]): records to handle
+        exp_written (bool): expect records to be written
+    """
+    for record in records:
+        handler_piped.handle(record)
+
+    assert (handler_piped.stream.getvalue() != "") == exp_written, f"{test_case} failed."
+
+
+def test_handler_close_flushes():
+    """test that closing the handler writes the buffer and stops the flusher thread
+    """
+    stream = io.StringIO()
+    h = bc.BufferedConsoleHandler(stream=stream, flush_interval=60)
+    h.setFormatter(logging.Formatter("%(message)s"))
+    h.handle(_record())
+    flusher = h.shared_buffer.flusher
+
+    h.close()
+
+    assert stream.getvalue() == "test msg\n"
+    flusher.join(timeout=1)
+    assert not flusher.is_alive()
+    assert id(stream) not in bc._STREAM_BUFFERS
+
+
+def test_handler_periodic_flush():
+    """test that the flusher thread writes buffered records after flush_interval
+    """
+    stream = io.StringIO()
+    h = bc.BufferedConsoleHandler(stream=stream, flush_interval=0.01)
+    h.setFormatter(logging.Formatter("%(message)s"))
+    h.handle(_record())
+
+    h.shared_buffer.closed.wait(0.2)
+
+    assert stream.getvalue() == "test msg\n"
+    h.close()
+
+
+def test_handlers_share_buffer_of_stream():
+    """test that handlers of a stream write their records in the order they were emitted
+    """
+    stream = io.StringIO()
+    handlers: list[bc.BufferedConsoleHandler] = [
+        bc.BufferedConsoleHandler(stream=stream, flush_interval=60) for _ in range(2)
+    ]
+    for h in handlers:
+        h.setFormatter(logging.Formatter("%(message)s"))
+
+    handlers[0].handle(_record(msg="first"))
+    handlers[1].handle(_record(logging.ERROR, msg="second"))
+
+    assert stream.getvalue() == "first\nsecond\n"
+    assert handlers[0].shared_buffer is handlers[1].shared_buffer
+    flusher = handlers[0].shared_buffer.flusher
+    handlers[0].close()
+    assert flusher.is_alive()
+    handlers[1].close()
+    flusher.join(timeout=1)
+    assert not flusher.is_alive()
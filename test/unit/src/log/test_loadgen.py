@@ -0,0 +1,128 @@
+import logging
+from pathlib import Path
+import pytest
+
+from src.log import loadgen
+from src.log import overload
+
+
+class ListHandler(logging.Handler):
+    """handler that keeps the messages of its records, fails on messages starting with 'fail'
+    """
+    def __init__(self):
+        super().__init__()
+        self.records: list[tuple[str, int, str]] = []
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if record.getMessage().startswith("fail"):
+                raise ValueError("failed record")
+            self.records.append((record.name, record.levelno, record.getMessage()))
+        except Exception:
+            self.handleError(record)
+
+
+@pytest.fixture
+def logger():
+    """yield logger with name 'test-logger' and a ListHandler, remove it on tearDown
+    """
+    logger: logging.Logger = logging.getLogger("test-logger")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(ListHandler())
+
+    yield logger
+
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
+    logger.filters.clear()
+    del logging.root.manager.loggerDict["test-logger"]
+
+
+def test_parse_level_mix():
+    """test that level mixes are parsed and invalid ones are rejected
+    """
+    assert loadgen.parse_level_mix("debug:1, INFO:3,ERROR") == {
+        logging.DEBUG: 1.0, logging.INFO: 3.0, logging.ERROR: 1.0,
+    }
+    for spec in ("LOUD:1", "INFO:-1", "INFO:0"):
+        with pytest.raises(ValueError):
+            loadgen.parse_level_mix(spec)
+    assert loadgen.parse_sizes("64,1024") == [64, 1024]
+    with pytest.raises(ValueError):
+        loadgen.parse_sizes("64,0")
+
+
+def test_generate(logger: logging.Logger):
+    """test that generated records have the wanted levels and sizes, are paced and reported
+
+    Args:
+        logger (logging.Logger): Logger object
+    """
+    handler: ListHandler = logger.handlers[0]
+    emit = handler.emit
+
+    report: loadgen.LoadReport = loadgen.generate(
+        logger, rate=200, duration=0.25, threads=2,
+        levels={logging.INFO: 1, logging.ERROR: 1}, sizes=[32],
+    )
+
+    assert report.mode == "generate"
+    assert report.records == len(handler.records)
+    assert 30 <= report.records <= 60
+    assert {r[1] for r in handler.records} == {logging.INFO, logging.ERROR}
+    assert {len(r[2]) for r in handler.records} == {32}
+    assert report.dropped == 0
+    assert report.handler_latency["ListHandler"]["count"] == report.records
+    assert report.call_latency["p50"] <= report.call_latency["p99"] <= report.call_latency["max"]
+    # wrapped methods are restored #
+    assert handler.emit == emit and "handleError" not in handler.__dict__
+
+
+def test_generate_reports_dropped_records(logger: logging.Logger):
+    """test that records shed by the overload policy are reported as dropped
+
+    Args:
+        logger (logging.Logger): Logger object
+    """
+    policy: overload.OverloadPolicy = overload.OverloadPolicy(latency_high=-1.0, cooldown=0.0)
+    policy.install(logger)
+
+    report: loadgen.LoadReport = loadgen.generate(
+        logger, duration=0.1, levels={logging.DEBUG: 1, logging.ERROR: 1}, sizes=[32],
+    )
+
+    assert report.target_rate is None
+    assert report.shed > 0
+    assert report.dropped == report.shed + report.failed
+    assert report.records == report.dropped + len(logger.handlers[0].records)
+
+
+def test_replay(logger: logging.Logger, tmp_path: Path):
+    """test that records of a log file are replayed with their names, levels, messages and timing
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+    """
+    log_file: Path = tmp_path / "app.log"
+    log_file.write_text(
+        "not a record\n"
+        "2026-10-19 18:29:25,000 [WARNING ] __main__ [0123456789abcdef:01234567]: first: 100%\n"
+        "2026-10-19 18:29:25,100 [ERROR   ] src.hello_world: fail\n"
+        "Traceback (most recent call last):\n"
+        "2026-10-19 18:29:25,200 [DEBUG   ] src.hello_world: last\n"
+    )
+
+    report: loadgen.LoadReport = loadgen.replay(logger, log_file, speed=2.0)
+
+    assert logger.handlers[0].records == [
+        ("__main__", logging.WARNING, "first: 100%"),
+        ("src.hello_world", logging.DEBUG, "last"),
+    ]
+    assert (report.mode, report.records, report.failed) == ("replay", 3, 1)
+    assert report.target_rate == pytest.approx(30.0)
+    assert report.elapsed >= 0.1
+    with pytest.raises(ValueError):
+        loadgen.replay(logger, log_file, speed=-1)
@@ -6,6 +6,12 @@ import shutil
 
 from src.log.log import logging
 from src.log import log
+from src.log.buffered_console import BufferedConsoleHandler
+from src.log.mmap_handler import MmapRotatingFileHandler
+from src.log import overload
+from src.log import queued
+from src.log import record as log_record
+from src.utils import metrics
 
 
 @pytest.fixture
@@ -435,3 +441,218 @@ def test_configure_logger_non_defaults(
 
             assert handler.baseFilename == str(fh_file_path), \
                 f"{test_case}: Expected RotatingFileHandler file path '{fh_file_path}', but got '{handler.baseFilename}'"
+
+
+def test_configure_logger_buffered_console(logger: logging.Logger, tmp_path: Path):
+    """test configure_logger func when a buffered console handler is wanted
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+    """
+    logger = log.configure_logger(
+        logger=logger,
+        ch_level=logging.INFO,
+        fh_file_path=tmp_path / "app.log",
+        ch_buffered=True,
+    )
+
+    console_handlers: list = [
+        h for h in logger.handlers if type(h) == BufferedConsoleHandler
+    ]
+    assert len(console_handlers) == 1
+    assert console_handlers[0].level == logging.INFO
+    assert not any(type(h) == logging.StreamHandler for h in logger.handlers)
+    console_handlers[0].close()
+
+
+def test_configure_logger_overload_policy(logger: logging.Logger, tmp_path: Path):
+    """test configure_logger func when an overload policy is passed
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+    """
+    policy = overload.OverloadPolicy()
+
+    logger = log.configure_logger(
+        logger=logger,
+        fh_file_path=tmp_path / "app.log",
+        overload_policy=policy,
+    )
+
+    assert policy in logger.filters
+    assert all(h.emit.__name__ == "observed_emit" for h in logger.handlers)
+
+
+def test_configure_logger_overload_policy_queued(logger: logging.Logger, tmp_path: Path):
+    """test configure_logger func when an overload policy is passed and handlers are moved behind a queue
+    - check that the handlers behind the queue and the queue handler are observed
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+    """
+    policy = overload.OverloadPolicy(latency_high=-1.0, cooldown=0)
+
+    logger = log.configure_logger(
+        logger=logger,
+        fh_file_path=tmp_path / "app.log",
+        overload_policy=policy,
+        queued=True,
+    )
+    logger.warning("test")
+    logger.handlers[0].close()
+
+    assert policy in logger.filters
+    assert logger.handlers[0].emit.__name__ == "observed_emit"
+    assert all(h.emit.__name__ == "observed_emit" for h in queued.iter_handlers(logger))
+    # observed emits of the handlers behind the queue escalate shedding #
+    assert policy.shed_level > logging.NOTSET
+
+
+def test_configure_logger_queued(logger: logging.Logger, tmp_path: Path, mocker: MockerFixture):
+    """test configure_logger func when handlers should be moved behind a queue
+    - check that handlers behind the queue are rotated as well
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    (tmp_path / "app.log").write_text("not empty")
+    mock_doRollover: MagicMock = mocker.patch.object(
+        logging.handlers.RotatingFileHandler,
+        "doRollover",
+    )
+
+    logger = log.configure_logger(
+        logger=logger,
+        fh_file_path=tmp_path / "app.log",
+        queued=True,
+    )
+    log.rotate_logs_of_all_rotating_file_handlers(logger)
+
+    assert len(logger.handlers) == 1
+    assert type(logger.handlers[0]) == queued.ListenerQueueHandler
+    assert {type(h) for h in queued.iter_handlers(logger)} == \
+        {logging.StreamHandler, logging.handlers.RotatingFileHandler}
+    mock_doRollover.assert_called_once()
+    logger.handlers[0].close()
+
+
+def test_rotate_logs_of_all_rotating_file_handlers_not_existing_file(
+        logger: logging.Logger,
+        tmp_path: Path,
+        mocker: MockerFixture,
+    ):
+    """test function rotate_logs_of_all_rotating_file_handlers
+    - check that a log file that has not been opened yet (delay=True) is not rotated
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mock_doRollover: MagicMock = mocker.patch.object(
+        logging.handlers.RotatingFileHandler,
+        "doRollover",
+    )
+    logger.addHandler(
+        logging.handlers.RotatingFileHandler(tmp_path / "not_existing.log", delay=True)
+    )
+
+    log.rotate_logs_of_all_rotating_file_handlers(logger)
+
+    mock_doRollover.assert_not_called()
+    assert not (tmp_path / "not_existing.log").exists()
+
+
+def test_configure_logger_metrics(logger: logging.Logger, tmp_path: Path):
+    """test that configure_logger counts records per level that handlers handle, written bytes and rollovers
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+    """
+    metrics.reset()
+    logger.setLevel(logging.DEBUG)
+    logger = log.configure_logger(
+        logger=logger,
+        ch_level=logging.CRITICAL,
+        fh_level=logging.INFO,
+        fh_file_path=tmp_path / "app.log",
+    )
+
+    logger.debug("below level of handlers")
+    logger.info("1234")
+    logger.warning("äöü")
+    logger.critical("handled by both handlers, counted once")
+    log.rotate_logs_of_all_rotating_file_handlers(logger)
+
+    assert log.LOG_RECORDS.get() == {"INFO": 1, "WARNING": 1, "CRITICAL": 1}
+    assert log.LOG_BYTES.get()["RotatingFileHandler"] == len((tmp_path / "app.log.1").read_bytes())
+    assert log.LOG_ROTATIONS.get() == {None: 1}
+    for h in logger.handlers:
+        h.close()
+    metrics.reset()
+
+
+@pytest.mark.parametrize("queued_", [False, True])
+def test_configure_logger_compact_records(logger: logging.Logger, tmp_path: Path, queued_: bool):
+    """test that configure_logger creates compact records that are written like stock records
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+        queued_ (bool): move handlers behind a queue
+    """
+    logger.setLevel(logging.INFO)
+    logger = log.configure_logger(
+        logger=logger,
+        ch_level=logging.CRITICAL,
+        fh_level=logging.INFO,
+        fh_file_path=tmp_path / "app.log",
+        queued=queued_,
+        compact_records=True,
+    )
+
+    record = logger.makeRecord(logger.name, logging.INFO, __file__, 1, "msg", (), None)
+    logger.info("compact %s", "record")
+    for h in list(logger.handlers):
+        h.close()
+
+    assert type(record) == log_record.CompactLogRecord
+    assert all(type(h.formatter) == log_record.CompactFormatter for h in queued.iter_handlers(logger))
+    assert (tmp_path / "app.log").read_text().endswith(
+        f"[INFO    ] {logger.name}: compact record\n"
+    )
+
+
+def test_configure_logger_mmap(logger: logging.Logger, tmp_path: Path):
+    """test that configure_logger writes log file via memory-mapped segments and rotates them
+
+    Args:
+        logger (logging.Logger): Logger object
+        tmp_path (Path): pytest tmp path fixture
+    """
+    logger.setLevel(logging.INFO)
+    (tmp_path / "app.log").write_text("old record\n")
+    logger = log.configure_logger(
+        logger=logger,
+        ch_level=logging.CRITICAL,
+        fh_level=logging.INFO,
+        fh_file_path=tmp_path / "app.log",
+        fh_mmap=True,
+    )
+    log.rotate_logs_of_all_rotating_file_handlers(logger)
+
+    logger.info("mmap record")
+    fh: logging.Handler = logger.handlers[1]
+    size: int = (tmp_path / "app.log").stat().st_size
+    fh.close()
+
+    assert type(fh) == MmapRotatingFileHandler
+    assert size == fh.maxBytes
+    assert (tmp_path / "app.log.1").read_text() == "old record\n"
+    assert (tmp_path / "app.log").read_text().endswith(f"[INFO    ] {logger.name}: mmap record\n")
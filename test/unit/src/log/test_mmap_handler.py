@@ -0,0 +1,148 @@
+import logging
+import threading
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+
+from src.log import mmap_handler
+from src.log.mmap_handler import MmapRotatingFileHandler
+
+
+def make_record(msg: str) -> logging.LogRecord:
+    """return record of logger 'test-logger' with passed message
+    """
+    return logging.LogRecord("test-logger", logging.WARNING, __file__, 1, msg, (), None)
+
+
+@pytest.fixture
+def handlers():
+    """yield list that tests add their handlers to, close them on tearDown
+    """
+    handlers: list[logging.Handler] = []
+
+    yield handlers
+
+    for h in handlers:
+        h.close()
+    assert mmap_handler._SEGMENTS == {}
+
+
+def test_segment_is_preallocated_and_truncated(tmp_path: Path, handlers: list[logging.Handler]):
+    """test that the file has the size of the segment while open and holds the records only once closed
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        handlers (list[logging.Handler]): handlers to close on tearDown
+    """
+    path: Path = tmp_path / "app.log"
+    handler = MmapRotatingFileHandler(path, maxBytes=4096, delay=True)
+    handlers.append(handler)
+    assert not path.exists()
+
+    for i in range(3):
+        handler.emit(make_record(f"record {i} äöü"))
+    assert path.stat().st_size == 4096
+    # records are visible to readers before close #
+    assert path.read_bytes().rstrip(b"\0").decode() == "record 0 äöü\nrecord 1 äöü\nrecord 2 äöü\n"
+
+    handler.close()
+    assert path.read_text() == "record 0 äöü\nrecord 1 äöü\nrecord 2 äöü\n"
+
+
+def test_rotation(tmp_path: Path, handlers: list[logging.Handler]):
+    """test that full segments are rotated like by RotatingFileHandler, oversized records fit
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        handlers (list[logging.Handler]): handlers to close on tearDown
+    """
+    path: Path = tmp_path / "app.log"
+    handler = MmapRotatingFileHandler(path, maxBytes=100, backupCount=10)
+    handlers.append(handler)
+    records: list[str] = [f"record {i:02d} " + "x" * 20 for i in range(20)] + ["y" * 300]
+
+    for msg in records:
+        handler.emit(make_record(msg))
+    handler.close()
+
+    # 3 records of 31 bytes per segment #
+    files: list[Path] = [tmp_path / f"app.log.{i}" for i in range(7, 0, -1)] + [path]
+    assert all(f.stat().st_size == 93 for f in files[:-2])
+    assert "".join(f.read_text() for f in files) == "".join(f"{r}\n" for r in records)
+    assert not (tmp_path / "app.log.8").exists()
+    assert path.read_text() == "y" * 300 + "\n"
+
+
+def test_no_rotation_without_backups(tmp_path: Path, handlers: list[logging.Handler], mocker: MockerFixture):
+    """test that a full segment grows instead of being rotated (remapped) for every record if backupCount is 0
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        handlers (list[logging.Handler]): handlers to close on tearDown
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    path: Path = tmp_path / "app.log"
+    handler = MmapRotatingFileHandler(path, maxBytes=100)
+    handlers.append(handler)
+    rotate = mocker.spy(mmap_handler.Segment, "rotate")
+
+    for i in range(20):
+        handler.emit(make_record(f"record {i:02d} " + "x" * 20))
+    assert path.stat().st_size == 700
+
+    handler.close()
+    rotate.assert_not_called()
+    assert path.stat().st_size == 20 * 31
+    assert not (tmp_path / "app.log.1").exists()
+
+
+def test_handlers_of_same_file_share_segment(tmp_path: Path, handlers: list[logging.Handler]):
+    """test that handlers of the same file write into one segment, also when rotated by one of them
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        handlers (list[logging.Handler]): handlers to close on tearDown
+    """
+    path: Path = tmp_path / "app.log"
+    handlers.extend(MmapRotatingFileHandler(path, maxBytes=1000, backupCount=100) for _ in range(2))
+
+    def log_records(handler: logging.Handler, name: str):
+        for i in range(200):
+            handler.handle(make_record(f"{name} {i:03d}"))
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=log_records, args=(h, f"handler-{n}")) for n, h in enumerate(handlers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert handlers[0].stream is handlers[1].stream
+    handlers[0].close()
+    handlers[1].handle(make_record("last"))
+    handlers[1].close()
+
+    lines: list[str] = []
+    for f in sorted(tmp_path.glob("app.log.*"), key=lambda f: -int(f.suffix[1:])) + [path]:
+        lines.extend(f.read_text().splitlines())
+    assert lines[-1] == "last"
+    for n in range(2):
+        assert [l for l in lines if l.startswith(f"handler-{n}")] == [f"handler-{n} {i:03d}" for i in range(200)]
+
+
+def test_reopen_after_crash(tmp_path: Path, handlers: list[logging.Handler]):
+    """test that records are appended behind the records of a segment that was not truncated
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        handlers (list[logging.Handler]): handlers to close on tearDown
+    """
+    path: Path = tmp_path / "app.log"
+    path.write_bytes(b"before crash\n" + b"\0" * (mmap_handler._SCAN_BLOCK * 2))
+    handler = MmapRotatingFileHandler(path, maxBytes=1024)
+    handlers.append(handler)
+
+    handler.emit(make_record("after crash"))
+    handler.close()
+
+    assert path.read_text() == "before crash\nafter crash\n"
@@ -0,0 +1,193 @@
+import io
+import logging
+import queue
+import logging.handlers
+import threading
+import pytest
+from pytest_mock import MockerFixture
+
+from src.log import overload
+from src.log import queued
+from src.utils import exception_handling as exc
+
+
+@pytest.fixture
+def policy() -> overload.OverloadPolicy:
+    """return policy without cooldown and without smoothing
+    """
+    return overload.OverloadPolicy(
+        latency_high=0.01,
+        latency_low=0.001,
+        backlog_high=100,
+        backlog_low=10,
+        max_shed_level=logging.WARNING,
+        cooldown=0,
+        smoothing=1.0,
+    )
+
+
+def _record(level: int) -> logging.LogRecord:
+    """return a log record of passed level
+    """
+    return logging.LogRecord("test-logger", level, __file__, 1, "test msg", None, None)
+
+
+def test_get_backlog():
+    """test function get_backlog for handlers with backlog, with queue and without both
+    """
+    class BacklogHandler(logging.Handler):
+        backlog: int = 5
+
+    q: queue.Queue = queue.Queue()
+    q.put(1)
+    q.put(2)
+
+    assert overload.get_backlog(BacklogHandler()) == 5
+    assert overload.get_backlog(logging.handlers.QueueHandler(q)) == 2
+    assert overload.get_backlog(logging.StreamHandler(io.StringIO())) == 0
+
+
+def test_policy_invalid_max_shed_level():
+    """test that ERROR records can never be configured to be shed
+    """
+    with pytest.raises(ValueError, match="Invalid max_shed_level"):
+        overload.OverloadPolicy(max_shed_level=logging.ERROR)
+
+
+def test_policy_escalates_and_restores(policy: overload.OverloadPolicy):
+    """test that shedding escalates step by step under pressure and relaxes afterwards
+
+    Args:
+        policy (overload.OverloadPolicy): policy
+    """
+    assert policy.shed_level == logging.NOTSET
+
+    # escalate via latency and via backlog #
+    policy.observe(latency=0.1)
+    assert policy.shed_level == logging.DEBUG
+    policy.observe(latency=0.0, backlog=1000)
+    assert policy.shed_level == logging.INFO
+    policy.observe(latency=0.1)
+    policy.observe(latency=0.1)
+    assert policy.shed_level == logging.WARNING, "shedding must stop at max_shed_level"
+
+    # relax #
+    for exp_level in (logging.INFO, logging.DEBUG, logging.NOTSET, logging.NOTSET):
+        policy.observe(latency=0.0)
+        assert policy.shed_level == exp_level
+
+
+def test_policy_cooldown():
+    """test that level changes are limited by cooldown
+    """
+    policy = overload.OverloadPolicy(latency_high=0.01, cooldown=60, smoothing=1.0)
+    policy.observe(latency=0.1)
+    policy.observe(latency=0.1)
+    assert policy.shed_level == logging.DEBUG
+
+
+def test_policy_filter_counts_shed_records(policy: overload.OverloadPolicy, mocker: MockerFixture):
+    """test that filter sheds records up to shed level, counts them and never sheds ERROR
+    - the summary is registered once the first record is shed
+
+    Args:
+        policy (overload.OverloadPolicy): policy
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(exc, "SUMMARIES", [])
+    mocker.patch.object(overload, "_SUMMARY_REGISTERED", False)
+    policy.filter(_record(logging.DEBUG))
+    assert exc.SUMMARIES == []
+    policy.cooldown = 60
+    policy._change_step(+2, now=overload.time.monotonic())
+
+    results: dict[int, bool] = {
+        level: policy.filter(_record(level))
+        for level in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL)
+    }
+
+    assert results == {
+        logging.DEBUG: False,
+        logging.INFO: False,
+        logging.WARNING: True,
+        logging.ERROR: True,
+        logging.CRITICAL: True,
+    }
+    assert policy.get_shed_counts() == {"DEBUG": 1, "INFO": 1, "WARNING": 0}
+    assert policy.total_shed == 2
+    assert exc.SUMMARIES == [overload.get_summary]
+
+
+def test_policy_filter_relaxes_without_observations(policy: overload.OverloadPolicy):
+    """test that shedding relaxes via filter if handlers are not observed anymore
+
+    Args:
+        policy (overload.OverloadPolicy): policy
+    """
+    policy.observe(latency=0.1)
+    assert policy.shed_level == logging.DEBUG
+    policy.latency = 0.0
+
+    assert policy.filter(_record(logging.DEBUG))
+    assert policy.shed_level == logging.NOTSET
+    assert policy.total_shed == 0
+
+
+def test_policy_install(policy: overload.OverloadPolicy):
+    """test that installed policy filters logger and observes its handlers
+
+    Args:
+        policy (overload.OverloadPolicy): policy
+    """
+    stream = io.StringIO()
+    logger = logging.getLogger("test-overload-logger")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.StreamHandler(stream))
+    policy.latency_high = -1.0  # every observed emit counts as overloaded
+    policy.cooldown = 60
+
+    policy.install(logger)
+    logger.debug("first")
+    logger.debug("second")
+    logger.error("third")
+
+    assert policy in logger.filters
+    assert stream.getvalue() == "first\nthird\n"
+    assert policy.get_shed_counts()["DEBUG"] == 1
+    del logging.root.manager.loggerDict["test-overload-logger"]
+
+
+def test_policy_sheds_on_queue_backlog():
+    """test that a backed-up queue escalates shedding while handler latency is low
+    - the handler behind the queue blocks until released, so records pile up in the queue
+    """
+    release = threading.Event()
+    stream = io.StringIO()
+
+    class BlockingHandler(logging.StreamHandler):
+        def emit(self, record: logging.LogRecord) -> None:
+            release.wait(5)
+            super().emit(record)
+
+    logger = logging.getLogger("test-overload-queue-logger")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(BlockingHandler(stream))
+    queued.enqueue_handlers(logger)
+    policy = overload.OverloadPolicy(latency_high=60, queue_high=20, queue_low=5, cooldown=60)
+    policy.install(logger)
+
+    for i in range(50):
+        logger.debug(f"debug {i}")
+    logger.error("error")
+    release.set()
+    logger.handlers[0].close()
+
+    assert policy.queue_depth > policy.queue_high
+    assert policy.shed_level >= logging.DEBUG
+    assert policy.get_shed_counts()["DEBUG"] > 0
+    assert stream.getvalue().endswith("error\n")
+    assert stream.getvalue().count("debug") == 50 - policy.get_shed_counts()["DEBUG"]
+    logger.handlers.clear()
+    del logging.root.manager.loggerDict["test-overload-queue-logger"]
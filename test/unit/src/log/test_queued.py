@@ -0,0 +1,90 @@
+import logging
+import threading
+import pytest
+
+from src.log import queued
+
+
+class SlowHandler(logging.Handler):
+    """handler that blocks in emit until it is released
+    """
+    def __init__(self, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.unblock: threading.Event = threading.Event()
+        self.records: list[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.unblock.wait(timeout=5)
+        self.records.append(record.getMessage())
+
+
+@pytest.fixture
+def logger():
+    """yield logger with name 'test-logger', remove it on tearDown
+    """
+    logger: logging.Logger = logging.getLogger("test-logger")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+
+    yield logger
+
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
+    del logging.root.manager.loggerDict["test-logger"]
+
+
+def test_enqueue_handlers_does_not_block(logger: logging.Logger):
+    """test that logging does not wait for a blocking handler and records are written on stop
+
+    Args:
+        logger (logging.Logger): Logger object
+    """
+    slow: SlowHandler = SlowHandler()
+    logger.addHandler(slow)
+
+    queued.enqueue_handlers(logger)
+    for i in range(3):
+        logger.warning("record %d", i)
+
+    assert slow.records == []
+    slow.unblock.set()
+    logger.handlers[0].close()
+    assert slow.records == ["record 0", "record 1", "record 2"]
+    assert logger.handlers[0].listener not in queued.LISTENERS
+
+
+def test_enqueue_handlers_respects_handler_levels(logger: logging.Logger):
+    """test that every handler behind the queue keeps its own level
+
+    Args:
+        logger (logging.Logger): Logger object
+    """
+    debug_handler, error_handler = SlowHandler(logging.DEBUG), SlowHandler(logging.ERROR)
+    for h in (debug_handler, error_handler):
+        h.unblock.set()
+        logger.addHandler(h)
+
+    queued.enqueue_handlers(logger)
+    logger.info("info")
+    logger.error("error")
+    queued.stop_all()
+
+    assert debug_handler.records == ["info", "error"]
+    assert error_handler.records == ["error"]
+    assert queued.LISTENERS == []
+
+
+def test_enqueue_handlers_twice(logger: logging.Logger):
+    """test that handlers are only moved behind a queue once
+
+    Args:
+        logger (logging.Logger): Logger object
+    """
+    logger.addHandler(SlowHandler())
+
+    queued.enqueue_handlers(logger)
+    queued.enqueue_handlers(logger)
+
+    assert len(logger.handlers) == 1
+    assert [type(h) for h in queued.iter_handlers(logger)].count(SlowHandler) == 1
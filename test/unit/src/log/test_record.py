@@ -0,0 +1,100 @@
+import copy
+import logging
+import pickle
+import threading
+import pytest
+
+from src.log import record as log_record
+
+
+BASIC_FORMAT: str = '%(asctime)s [%(levelname)-8s] %(name)s%(trace)s: %(message)s'
+
+
+def make_record(fields: frozenset[str] = frozenset(), **extra) -> log_record.CompactLogRecord:
+    """return compact record of logger 'test-logger'
+    """
+    record = log_record.CompactLogRecord(
+        "test-logger", logging.WARNING, "/src/mod.py", 7, "value %s", (1,), None, "func",
+        fields=fields,
+    )
+    if extra:
+        record.set_extra(extra)
+    return record
+
+
+def test_record_fields():
+    """test that optional fields are only populated if asked for, derived fields are computed
+    """
+    record = make_record()
+    populated = make_record(frozenset({"threadName", "module"}))
+
+    assert record.getMessage() == "value 1"
+    assert not hasattr(record, "trace")
+    assert (record.filename, record.module) == ("mod.py", "mod")
+    assert record.threadName is None
+    assert populated.threadName == threading.current_thread().name
+    assert populated.module == "mod"
+    assert record._optional is None
+
+
+def test_record_compatibility():
+    """test that records are formatted, copied and pickled like stock records
+    """
+    record = make_record(user="alice")
+    stock = logging.makeLogRecord(record.__dict__)
+    formatter = logging.Formatter(BASIC_FORMAT + " %(user)s", defaults={"trace": ""})
+
+    assert formatter.format(record) == formatter.format(stock)
+    assert record.__dict__["user"] == "alice"
+    assert copy.copy(record).__dict__ == record.__dict__
+    assert type(pickle.loads(pickle.dumps(record))) == logging.LogRecord
+    assert pickle.loads(pickle.dumps(record)).user == "alice"
+    with pytest.raises(KeyError):
+        record.set_extra({"msg": "overwritten"})
+
+
+def test_compact_formatter():
+    """test that CompactFormatter formats like the stock formatter, incl. defaults
+    """
+    formatter = logging.Formatter(BASIC_FORMAT, defaults={"trace": ""})
+    compact = log_record.compact_formatter(formatter)
+    record = make_record()
+    traced = make_record()
+    traced.trace = " [trace:span]"
+
+    assert type(compact) == log_record.CompactFormatter
+    # asctime of the same record is equal #
+    assert compact.format(record) == formatter.format(record)
+    assert compact.format(traced) == formatter.format(traced)
+    assert compact.format(traced).endswith("test-logger [trace:span]: value 1")
+    assert log_record.compact_formatter(logging.Formatter("{message}", style="{")).__class__ == logging.Formatter
+
+
+def test_required_fields():
+    """test that optional fields are found in format strings of all styles
+    """
+    assert log_record.required_fields([
+        logging.Formatter(BASIC_FORMAT),
+        logging.Formatter("{threadName} {message}", style="{"),
+        logging.Formatter("${process} %%(module)s", style="$"),
+    ]) == {"threadName", "process"}
+    assert log_record.required_fields([None]) == frozenset()
+
+
+def test_install():
+    """test that an installed logger creates compact records and stock records once uninstalled
+    """
+    logger = logging.getLogger("test-logger")
+    records: list[logging.LogRecord] = []
+    logger.addFilter(records.append)
+    logger.propagate = False
+
+    log_record.install(logger, frozenset({"thread"}))
+    logger.warning("compact", extra={"user": "alice"})
+    log_record.uninstall(logger)
+    logger.warning("stock")
+
+    assert [type(r) for r in records] == [log_record.CompactLogRecord, logging.LogRecord]
+    assert records[0].thread == threading.get_ident()
+    assert records[0].user == "alice"
+    del logging.root.manager.loggerDict["test-logger"]
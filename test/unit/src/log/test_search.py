@@ -0,0 +1,93 @@
+import gzip
+import logging
+import re
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+
+from src.log import search
+from src.utils import exception_handling as exc
+
+
+def write_rotated_set(log_dir: Path) -> list[str]:
+    """write app.log with a plain and a compressed backup, return all lines in chronological order
+    """
+    lines: list[str] = [
+        f"2026-10-19 18:00:{i:02d},000 [{'ERROR' if i % 3 else 'INFO':<8}] x: record {i}" for i in range(60)
+    ]
+    (log_dir / "app.log.2.gz").write_bytes(gzip.compress(("\n".join(lines[:20]) + "\n").encode()))
+    (log_dir / "app.log.1").write_text("\n".join(lines[20:40]) + "\n")
+    # live file may end without line break #
+    (log_dir / "app.log").write_text("\n".join(lines[40:]))
+    (log_dir / "app.log.x").write_text("not a backup\n")
+    return lines
+
+
+def test_rotated_set(tmp_path: Path):
+    """test that backups are ordered from oldest to newest, followed by the live file
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    write_rotated_set(tmp_path)
+    (tmp_path / "app.log.10").write_text("")
+
+    assert [p.name for p in search.rotated_set(tmp_path / "app.log")] == [
+        "app.log.10", "app.log.2.gz", "app.log.1", "app.log",
+    ]
+    assert search.rotated_set(tmp_path / "missing.log") == []
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_search(tmp_path: Path, pool: str):
+    """test that matching lines of all files and chunks are found once and in chronological order
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        pool (str): pool kind
+    """
+    lines: list[str] = write_rotated_set(tmp_path)
+
+    matches: list[search.Match] = list(search.search(
+        r"error.*record \d*[05]$", [tmp_path / "app.log"],
+        ignore_case=True, chunk_size=100, workers=3, pool=pool,
+    ))
+    fixed: list[search.Match] = list(search.search(
+        "record 1", [tmp_path / "app.log"], fixed=True, chunk_size=7, pool=pool,
+    ))
+
+    assert [m.line for m in matches] == [l for l in lines if re.search(r"ERROR.*record \d*[05]$", l)]
+    assert [Path(m.path).name for m in matches] == ["app.log.2.gz"] * 2 + ["app.log.1"] * 3 + ["app.log"] * 3
+    assert [m.line for m in fixed] == [l for l in lines if "record 1" in l]
+    with open(matches[2].path, "rb") as f:
+        f.seek(matches[2].offset)
+        assert f.readline().decode().rstrip() == matches[2].line
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test exit codes and output of the command
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        capsys (pytest.CaptureFixture): pytest capsys fixture
+        mocker (MockerFixture): pytest mocker
+    """
+    write_rotated_set(tmp_path)
+    log_file: str = str(tmp_path / "app.log")
+
+    assert search.main(["--workers=2", "record 59", log_file]) == 0
+    assert capsys.readouterr().out == f"{log_file}:2026-10-19 18:00:59,000 [ERROR   ] x: record 59\n"
+    assert search.main(["--fixed", "record 5.", log_file]) == 1
+    capsys.readouterr()
+    assert search.main(["record (", log_file]) == 2
+    assert capsys.readouterr().err == "Invalid pattern 'record (': missing ), unterminated subpattern at position 7\n"
+
+    # files that vanish by rotation fail their chunks #
+    mocker.patch.object(exc, "logger", logging.getLogger("test-logger"))
+    mocker.patch.object(search, "_plan_chunks", return_value=iter([
+        (str(tmp_path / "app.log.3"), 0, 10, 10), (log_file, 0, 10, 10),
+    ]))
+    assert search.main(["--workers=1", "record", log_file]) == 2
+    assert len(exc.EXC) == 1
+    exc.clear_catched_exceptions()
+    del logging.root.manager.loggerDict["test-logger"]
@@ -0,0 +1,225 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import sys
+import pytest
+from pytest_mock import MockerFixture
+
+from src.log import shm_transport
+from src.utils import metrics
+
+
+class ListHandler(logging.Handler):
+    """handler that keeps its records
+    """
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+@pytest.fixture
+def logger():
+    """yield logger with name 'test-logger' and a ListHandler, remove it on tearDown
+    """
+    logger: logging.Logger = logging.getLogger("test-logger")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(ListHandler())
+
+    yield logger
+
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
+    del logging.root.manager.loggerDict["test-logger"]
+
+
+@pytest.fixture
+def transport():
+    """yield transport with 2 small rings, remove its shared memory on tearDown
+    """
+    transport: shm_transport.ShmTransport = shm_transport.ShmTransport(rings=2, ring_size=256)
+
+    yield transport
+
+    transport.close()
+
+
+def log_in_worker(n: int) -> int:
+    """log n records and an exception in a worker process, return its pid
+    """
+    logger: logging.Logger = logging.getLogger("test-worker")
+    for i in range(n):
+        logger.warning("record %d: %s", i, "ü")
+    try:
+        raise ValueError("worker failed")
+    except ValueError:
+        logger.exception("failed")
+    return os.getpid()
+
+
+def test_encode_decode_record():
+    """test that encoded records are decoded with their fields, message and exception
+    """
+    try:
+        raise KeyError("key")
+    except KeyError:
+        record: logging.LogRecord = logging.getLogger("test").makeRecord(
+            "a.b", logging.ERROR, "/x.py", 42, "value %s: %d%%", ("ü", 5), sys.exc_info(), "func",
+        )
+    record.trace_id = ""
+
+    decoded: logging.LogRecord = shm_transport.decode_record(shm_transport.encode_record(record))
+
+    assert decoded.getMessage() == "value ü: 5%"
+    for field in ("name", "levelno", "levelname", "pathname", "lineno", "funcName", "created",
+                  "msecs", "process", "processName", "threadName", "stack_info"):
+        assert getattr(decoded, field) == getattr(record, field)
+    assert decoded.exc_text.startswith("Traceback") and "KeyError: 'key'" in decoded.exc_text
+    assert decoded.exc_info is None
+    # fields of tracing are only set if they were set before #
+    assert decoded.trace_id == ""
+    assert not hasattr(decoded, "span_id")
+
+
+def test_ring_wraps_around_and_drops_records(transport: shm_transport.ShmTransport):
+    """test that records wrap around the end of the ring and records that do not fit are dropped
+
+    Args:
+        transport (shm_transport.ShmTransport): transport
+    """
+    ring: shm_transport.Ring = transport.claim()
+    assert ring.owner == os.getpid()
+
+    got: list[bytes] = []
+    for i in range(20):
+        assert ring.put(bytes([i]) * 50)
+        assert ring.put(bytes([i]) * 50)
+        got.extend(transport.drain())
+    assert got == [bytes([i]) * 50 for i in range(20) for _ in range(2)]
+    assert ring.backlog == 0
+
+    assert [ring.put(b"x" * 100) for _ in range(3)] == [True, True, False]
+    assert ring.put(b"x" * 300) is False
+    assert transport.dropped == 2
+    assert len(list(transport.drain())) == 2
+
+    transport.release(ring)
+    assert ring.owner == 0
+
+
+def test_ring_does_not_yield_uncommitted_records(transport: shm_transport.ShmTransport):
+    """test that a record whose bytes are not visible yet (commit word does not match) is not consumed
+    - e.g. head is seen before the record on a weakly ordered CPU, or the slot holds a stale record
+
+    Args:
+        transport (shm_transport.ShmTransport): transport
+    """
+    ring: shm_transport.Ring = transport.claim()
+    assert ring.put(b"abc")
+    pos: int = shm_transport._SLOT.size
+    ring._data[pos] = ord("x")
+
+    assert list(transport.drain()) == []
+    assert ring.backlog == shm_transport._SLOT.size + 3
+
+    ring._data[pos] = ord("a")
+    assert list(transport.drain()) == [b"abc"]
+    assert ring.backlog == 0
+
+
+def test_is_alive_windows(mocker: MockerFixture):
+    """test that processes are not signalled on Windows (signal 0 is CTRL_C_EVENT there)
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    import ctypes
+    mocker.patch.object(shm_transport.sys, "platform", "win32")
+    kernel32 = mocker.patch.object(ctypes, "windll", create=True).kernel32
+    kernel32.GetExitCodeProcess.side_effect = lambda handle, code: setattr(code._obj, "value", 259) or 1
+    kill = mocker.patch.object(shm_transport.os, "kill")
+
+    assert shm_transport._is_alive(1234)
+    kernel32.OpenProcess.return_value = 0
+    mocker.patch.object(ctypes, "GetLastError", return_value=87, create=True)
+    assert not shm_transport._is_alive(1234)
+    kill.assert_not_called()
+
+
+def test_claim_rings(transport: shm_transport.ShmTransport):
+    """test that a process keeps its ring, rings of dead processes are free and claims fail if all are taken
+
+    Args:
+        transport (shm_transport.ShmTransport): transport
+    """
+    ring: shm_transport.Ring = transport.claim()
+    assert transport.claim() is ring
+
+    process: multiprocessing.Process = multiprocessing.Process(target=os.getpid)
+    process.start()
+    process.join()
+    other: shm_transport.Ring = transport._rings[1]
+    other.claim(process.pid)
+    assert transport.claim() is ring
+    transport.release(ring)
+    ring.claim(os.getppid())
+    assert transport.claim() is other
+    ring.claim(1)
+    other.claim(1)
+    with pytest.raises(RuntimeError):
+        transport.claim()
+
+
+def test_listener_drains_worker_processes(logger: logging.Logger):
+    """test that records of a process pool reach the handlers of the logger, overflow is counted
+
+    Args:
+        logger (logging.Logger): Logger object
+    """
+    metrics.reset()
+    context: multiprocessing.context.BaseContext = multiprocessing.get_context("spawn")
+    transport: shm_transport.ShmTransport = shm_transport.ShmTransport(
+        rings=2, ring_size=4096, mp_context=context
+    )
+    listener: shm_transport.ShmListener = shm_transport.ShmListener(transport, logger).start()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            2, mp_context=context,
+            initializer=shm_transport.init_worker, initargs=(transport,),
+        ) as pool:
+            pids: list[int] = list(pool.map(log_in_worker, [10, 10, 10]))
+        listener.stop()
+    finally:
+        transport.close()
+
+    records: list[logging.LogRecord] = logger.handlers[0].records
+    assert len(records) == listener.records == 33
+    assert {r.process for r in records} == set(pids)
+    assert {r.name for r in records} == {"test-worker"}
+    assert sorted(r.getMessage() for r in records if r.levelno == logging.WARNING) == sorted(
+        f"record {i}: ü" for i in range(10) for _ in range(3)
+    )
+    assert all("ValueError: worker failed" in r.exc_text for r in records if r.levelno == logging.ERROR)
+
+    # records of a burst that exceed the ring are dropped and counted #
+    transport = shm_transport.ShmTransport(rings=1, ring_size=4096)
+    listener = shm_transport.ShmListener(transport, logger)
+    handler: shm_transport.ShmHandler = shm_transport.ShmHandler(transport)
+    worker: logging.Logger = logging.getLogger("test-worker")
+    worker.propagate = False
+    worker.addHandler(handler)
+    try:
+        for i in range(100):
+            worker.warning("burst %d", i)
+        assert listener.drain() == 100 - transport.dropped
+        assert metrics.REGISTRY["log_transport_dropped_total"].get()[None] == transport.dropped > 0
+    finally:
+        worker.removeHandler(handler)
+        handler.close()
+        transport.close()
+        del logging.root.manager.loggerDict["test-worker"]
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import MagicMock
+
+from src.utils import async_runner
+from src.utils import commands
+from src.utils import exception_handling as exc
+from src.utils.cli_input_args import CLI
+from src.utils import tracing
+
+TEST_LOGGER_NAME: str = "test-logger"
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown(mocker: MockerFixture):
+    """setUp and tearDown
+    - patch the logger object of exception_handling
+    - yield the test
+    - delete logger objects that have been created during testing
+    - reset CLI and catched exceptions
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(exc, "logger", logging.getLogger(TEST_LOGGER_NAME))
+
+    yield
+
+    del logging.root.manager.loggerDict[TEST_LOGGER_NAME]
+    exc.clear_catched_exceptions()
+    CLI.set_cli_input_args()
+
+
+async def square(x: int) -> int:
+    """return x squared after yielding to the loop, raise ValueError for negative x
+    """
+    await asyncio.sleep(0.001 * (x % 3))
+    if x < 0:
+        raise ValueError(f"negative: {x}")
+    return x * x
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_run_tasks(ordered: bool):
+    """test that all results are yielded (in task order if wanted) and failures are rounded up
+
+    Args:
+        ordered (bool): yield results in task order
+    """
+    async def collect() -> list:
+        return [r async for r in async_runner.run_tasks(
+            square, [(x,) for x in (0, 1, -2, 3, 4)], limit=2, ordered=ordered
+        )]
+
+    results: list = asyncio.run(collect())
+
+    if ordered:
+        assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert {r.index: r.value for r in results if r.ok} == {0: 0, 1: 1, 3: 9, 4: 16}
+    assert len(exc.EXC) == 1
+    assert exc.EXC[0][0].startswith("Task 2 (square) failed.")
+
+
+def test_run_tasks_limit():
+    """test that at most limit tasks run at once and tasks are consumed lazily
+    """
+    running: list[int] = [0, 0]  # [current, max]
+
+    async def track(_: int) -> None:
+        running[0] += 1
+        running[1] = max(running)
+        await asyncio.sleep(0.001)
+        running[0] -= 1
+
+    def tasks():
+        for i in range(20):
+            assert running[0] <= 3
+            yield (i,)
+
+    results: list = asyncio.run(async_runner.gather_tasks(track, tasks(), limit=3))
+
+    assert len(results) == 20 and all(r.ok for r in results)
+    assert running[1] == 3
+
+
+def test_run_tasks_timeout():
+    """test that timed out tasks are cancelled and fail with TimeoutError
+    """
+    cancelled: list[bool] = []
+
+    async def sleep_for(seconds: float) -> float:
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return seconds
+
+    results: list = asyncio.run(async_runner.gather_tasks(sleep_for, [(0.0,), (5.0,)], timeout=0.05))
+
+    assert results[0].ok and not results[1].ok
+    assert isinstance(results[1].error, TimeoutError)
+    assert cancelled == [True]
+
+
+def test_run_tasks_invalid_limit():
+    """test that limit must be at least 1
+    """
+    with pytest.raises(ValueError):
+        asyncio.run(async_runner.gather_tasks(square, [(1,)], limit=-1))
+
+
+def test_run_commands(mocker: MockerFixture):
+    """test that sync commands run in a thread and async commands are awaited
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    sync_cmd: MagicMock = MagicMock(return_value="sync")
+    awaited: list[str] = []
+
+    async def async_cmd() -> None:
+        awaited.append("async")
+
+    mocker.patch.object(
+        commands, "get_func", side_effect=lambda name: {"a": sync_cmd, "b": async_cmd}[name]
+    )
+
+    spans: list[str] = []
+    span = tracing.span
+    mocker.patch.object(tracing, "span", side_effect=lambda name: spans.append(name) or span(name))
+    mock_run: MagicMock = mocker.patch.object(commands, "run", wraps=commands.run)
+
+    asyncio.run(async_runner.run_commands(["a", "b"]))
+
+    sync_cmd.assert_called_once_with()
+    assert awaited == ["async"]
+    # sync commands run via commands.run, async commands get the same span as them #
+    mock_run.assert_called_once_with("a")
+    assert spans == ["command a", "command b"]
@@ -0,0 +1,115 @@
+import io
+import json
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import MagicMock
+
+from src.utils import batch
+from src.utils import exception_handling as exc
+from src.utils.jobs import JobResult
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown(mocker: MockerFixture):
+    """setUp and tearDown
+    - patch registered summaries of exception_handling with a copy
+    - reset batch statistics
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(exc, "SUMMARIES", list(exc.SUMMARIES))
+
+    yield
+
+    batch.BatchStats.reset()
+
+
+@pytest.fixture
+def mock_run_job(mocker: MockerFixture) -> MagicMock:
+    """return mocked function run_job, jobs with arg --fail fail
+    """
+    return mocker.patch.object(
+        batch,
+        "run_job",
+        side_effect=lambda argv, parse_args: JobResult(argv, "--fail" not in argv, 0, 1.0),
+    )
+
+
+def test_read_jobs():
+    """test that empty lines and comments are skipped and args are split like a shell does
+    """
+    source = io.StringIO('--hello -v\n\n   \n# comment\n--batch="a b"\n')
+
+    assert list(batch.read_jobs(source)) == [["--hello", "-v"], ["--batch=a b"]]
+
+
+def test_read_jobs_is_lazy():
+    """test that jobs are read line by line
+    """
+    source = io.StringIO("-v\n-q\n")
+    jobs = batch.read_jobs(source)
+
+    assert next(jobs) == ["-v"]
+    assert source.read() == "-q\n"
+
+
+def test_run_batch(mock_run_job: MagicMock):
+    """test that results are streamed as JSON lines and statistics are summarised
+
+    Args:
+        mock_run_job (MagicMock): mocked function run_job
+    """
+    out = io.StringIO()
+
+    batch.run_batch(io.StringIO("--hello\n--fail\n-v\n"), lambda argv: None, out)
+
+    results: list[dict] = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["argv"] for r in results] == [["--hello"], ["--fail"], ["-v"]]
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert batch.BatchStats.jobs == 3 and batch.BatchStats.failed == 1
+    assert batch.BatchStats.get_summary in exc.SUMMARIES
+    assert "Batch: 3 jobs" in batch.BatchStats.get_summary()
+    assert "2 succeeded, 1 failed." in batch.BatchStats.get_summary()
+
+
+def test_run_batch_malformed_line(mock_run_job: MagicMock):
+    """test that a line that cannot be split fails on its own and the batch goes on
+
+    Args:
+        mock_run_job (MagicMock): mocked function run_job
+    """
+    out = io.StringIO()
+
+    batch.run_batch(io.StringIO('--hello\n--batch="a b\n-v\n'), lambda argv: None, out)
+
+    results: list[dict] = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["argv"] for r in results] == [["--hello"], ['--batch="a b'], ["-v"]]
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert results[1]["error"] == "Cannot split line: No closing quotation"
+    assert mock_run_job.call_count == 2
+    assert batch.BatchStats.jobs == 3 and batch.BatchStats.failed == 1
+
+
+def test_get_summary_without_jobs():
+    """test that nothing is reported if no batch ran
+    """
+    assert batch.BatchStats.get_summary() is None
+
+
+def test_run_batch_from_path(mock_run_job: MagicMock, tmp_path: Path, capsys: pytest.CaptureFixture):
+    """test that jobs are read from file and results written to stdout
+
+    Args:
+        mock_run_job (MagicMock): mocked function run_job
+        tmp_path (Path): pytest tmp path fixture
+        capsys (pytest.CaptureFixture): pytest capture fixture
+    """
+    jobs_file: Path = tmp_path / "jobs.txt"
+    jobs_file.write_text("--hello\n-q\n")
+
+    batch.run_batch_from_path(str(jobs_file), lambda argv: None)
+
+    assert len(capsys.readouterr().out.splitlines()) == 2
+    assert mock_run_job.call_count == 2
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+from src.utils import build
+from src.vars import paths
+
+
+def test_build(tmp_path: Path):
+    """test that the built zipapp ships bytecode of every module and runs with ROOT next to it
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    archive: Path = build.build(tmp_path, name="test.pyz")
+
+    names: set[str] = set(zipfile.ZipFile(archive).namelist())
+    sources: set[str] = {n for n in names if n.endswith(".py")}
+    assert {"__main__.py", "src/vars/paths.py", "docopt.py"} <= sources
+    assert {s + "c" for s in sources} <= names
+    assert not any(n.endswith("log.conf") for n in names)
+    assert (tmp_path / "src" / "log" / "log.conf").exists()
+
+    proc = subprocess.run(
+        [sys.executable, str(archive), "--hello", "-V"],
+        cwd=tmp_path / "log",
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "Hello World!" in (tmp_path / "log" / "app.log").read_text()
+    assert paths.ARCHIVE is None
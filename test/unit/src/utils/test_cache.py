@@ -0,0 +1,141 @@
+import threading
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import cache
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown():
+    """setUp and tearDown
+    - yield the test
+    - unregister all caches
+    """
+    yield
+
+    cache.CACHES.clear()
+
+
+def test_lru_eviction():
+    """test that the least recently used entry is evicted once maxsize is reached
+    """
+    c: cache.Cache = cache.Cache("test", maxsize=3, stripes=1)
+    for key in "abc":
+        c.set(key, key.upper())
+    assert c.get("a") == "A"
+    c.set("d", "D")
+
+    assert c.get("b") is None
+    assert [c.get(key) for key in "acd"] == ["A", "C", "D"]
+    # overwriting a key does not evict #
+    c.set("d", "E")
+    assert len(c) == 3
+    assert c.stats() == cache.CacheStats("test", 4, 1, 1, 0, 3, c.stats().bytes)
+    assert c.pop("d") == "E" and c.pop("d", 0) == 0
+
+
+def test_max_bytes():
+    """test that entries are evicted to respect max_bytes and too large entries are not cached
+    """
+    c: cache.Cache = cache.Cache("test", maxsize=None, max_bytes=10, stripes=1, sizeof=len)
+    c.set("a", "xxxx")
+    c.set("b", "xxxx")
+    c.set("c", "xxxx")
+
+    assert c.get("a") is None
+    assert c.stats().bytes == 8
+    c.set("d", "x" * 11)
+    assert c.get("d") is None
+    assert c.stats().evictions == 1
+    with pytest.raises(ValueError):
+        cache.Cache("test", max_bytes=0)
+
+
+def test_ttl(mocker: MockerFixture):
+    """test that entries expire after ttl
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    now: list[float] = [100.0]
+    mocker.patch.object(cache, "time", mocker.Mock(monotonic=lambda: now[0]))
+    c: cache.Cache = cache.Cache("test", maxsize=2, ttl=5, stripes=1)
+    c.set("a", 1)
+    now[0] = 103.0
+    c.set("b", 2)
+    now[0] = 105.0
+    assert c.get("b") == 2
+
+    # expired entries are dropped before valid ones are evicted #
+    c.set("c", 3)
+    assert (c.stats().expirations, c.stats().evictions) == (1, 0)
+    c.set("d", 4)
+    assert (c.stats().expirations, c.stats().evictions) == (1, 1)
+    assert [c.get(key) for key in "abcd"] == [None, None, 3, 4]
+    now[0] = 110.0
+    assert c.get("c") is None
+    assert c.stats().expirations == 2
+
+
+def test_memoize():
+    """test that return values are cached per arguments, exceptions are not cached
+    """
+    calls: list[tuple] = []
+
+    @cache.memoize(maxsize=8)
+    def square(x: int, fail: bool = False) -> int:
+        calls.append((x, fail))
+        if fail:
+            raise ValueError("test error")
+        return x * x
+
+    assert [square(2), square(2), square(x=2), square(3)] == [4, 4, 4, 9]
+    assert calls == [(2, False), (2, False), (3, False)]
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            square(4, fail=True)
+
+    assert square.cache.stats().hits == 1
+    assert square.__name__ == "square"
+    assert square.cache is cache.CACHES[f"{__name__}.test_memoize.<locals>.square"]
+
+
+def test_concurrent_access():
+    """test that concurrent threads keep the bounds and statistics consistent
+    """
+    c: cache.Cache = cache.Cache("test", maxsize=64, stripes=8)
+
+    def work(offset: int):
+        for i in range(2000):
+            key: int = (i + offset) % 100
+            if c.get(key) is None:
+                c.set(key, key)
+
+    threads: list[threading.Thread] = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats: cache.CacheStats = c.stats()
+    assert stats.hits + stats.misses == 8 * 2000
+    assert stats.entries == len(c) <= 64
+    # all 100 keys were set, at most 64 fit (the hit rate depends on scheduling) #
+    assert stats.evictions >= 100 - 64
+
+
+def test_get_summary():
+    """test that only used caches are summarised
+    """
+    assert cache.get_summary() is None
+    c: cache.Cache = cache.Cache("test-cache")
+    cache.Cache("unused")
+    assert cache.get_summary() is None
+    c.get("a")
+    c.set("a", 1)
+    c.get("a")
+
+    summary: str = cache.get_summary()
+    assert summary.splitlines()[0] == "Caches:"
+    assert "test-cache: hits=1 misses=1 hit_rate=50.0% evictions=0" in summary
+    assert "unused" not in summary
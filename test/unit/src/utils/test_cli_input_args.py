@@ -137,3 +137,18 @@ def test_get_wanted_log_level(test_case: str, cli_args: dict, expected_log_level
     # Assert: Verify the expected log level #
     assert log_level == expected_log_level, \
         f"'{test_case}' failed. Expected log level {expected_log_level}, got {log_level}."
+
+
+def test_get_cli_input_args():
+    """test that current class vars are returned as kwargs of set_cli_input_args
+    """
+    CLI.set_cli_input_args(V=True, hello=True)
+
+    cli_args: dict = CLI.get_cli_input_args()
+    CLI.set_cli_input_args()
+    CLI.set_cli_input_args(**cli_args)
+
+    assert cli_args["V"] == True
+    assert cli_args["hello"] == True
+    assert cli_args["q"] == False
+    assert CLI.get_cli_input_args() == cli_args
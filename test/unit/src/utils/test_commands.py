@@ -0,0 +1,95 @@
+import sys
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import commands
+from src.utils.cli_input_args import CLI
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown(mocker: MockerFixture):
+    """setUp and tearDown
+    - patch registry of commands with a copy, so registered test commands are removed
+    - reset class args of class CLI
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(commands, "COMMANDS", dict(commands.COMMANDS))
+
+    yield
+
+    CLI.set_cli_input_args()
+
+
+def test_hello_is_registered():
+    """test that hello command is registered as default command
+    """
+    assert commands.COMMANDS["hello"] == commands.Command(
+        "hello", "src.hello_world", "hello", "hello", commands.COMMANDS["hello"].description
+    )
+    assert commands.DEFAULT_COMMAND == "hello"
+
+
+def test_register_duplicate():
+    """test that a command name can only be registered once
+    """
+    with pytest.raises(ValueError, match="Command 'hello' is already registered."):
+        commands.register("hello", "src.hello_world", "hello")
+
+
+def test_get_func_unknown():
+    """test that unknown commands raise KeyError
+    """
+    with pytest.raises(KeyError, match="Command 'unknown' is not registered."):
+        commands.get_func("unknown")
+
+
+def test_run_imports_module_lazily(mocker: MockerFixture):
+    """test that the module of a command is only imported when it is run
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    import_module = mocker.patch.object(commands.importlib, "import_module")
+    commands.register("test-cmd", "test.fake.module", "func")
+    import_module.assert_not_called()
+
+    res = commands.run("test-cmd", 1, key="value")
+
+    import_module.assert_called_once_with("test.fake.module")
+    import_module.return_value.func.assert_called_once_with(1, key="value")
+    assert res == import_module.return_value.func.return_value
+
+
+def test_run_real_module():
+    """test that a real module function is run and its module is imported
+    """
+    sys.modules.pop("json.tool", None)
+    commands.register("test-cmd", "json.tool", "main")
+
+    assert commands.get_func("test-cmd") is sys.modules["json.tool"].main
+
+
+@pytest.mark.parametrize(
+    "test_case, cli_args, exp_selected",
+    [
+        ("test case 1: no command selected", {}, ["hello"]),
+        ("test case 2: hello selected", {"hello": True}, ["hello"]),
+        ("test case 3: test-cmd selected", {"V": True}, ["test-cmd"]),
+        ("test case 4: both selected", {"hello": True, "V": True}, ["hello", "test-cmd"]),
+    ]
+)
+def test_select(test_case: str, cli_args: dict, exp_selected: list[str]):
+    """test that commands are selected via their cli flag
+
+    Args:
+        test_case (str): test case name
+        cli_args (dict): cli input args
+        exp_selected (list[str]): expected selected commands
+    """
+    commands.register("test-cmd", "test.fake.module", "func", cli_flag="V")
+    commands.register("test-cmd-no-flag", "test.fake.module", "func")
+    CLI.set_cli_input_args(**cli_args)
+
+    assert commands.select() == exp_selected, f"{test_case} failed."
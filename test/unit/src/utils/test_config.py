@@ -0,0 +1,120 @@
+import logging
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import config
+from src.utils.cli_input_args import CLI
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    """reset CLI and snapshot before and after every test
+    """
+    CLI.set_cli_input_args()
+    config.invalidate()
+    yield
+    CLI.set_cli_input_args()
+    config.invalidate()
+
+
+def test_compile_config_layers(tmp_path: Path):
+    """test that log.conf overrides defaults, environment overrides log.conf and cli input args override all
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    conf: Path = tmp_path / "log.conf"
+    conf.write_text(
+        "log_level: INFO\n"
+        "# log_level: DEBUG\n"
+        "log_max_bytes: 1024  \n"
+        "log_file: log/other.log\n"
+        "mmap_log: true\n"
+    )
+    environ: dict[str, str] = {"APP_LOG_MAX_BYTES": "2048", "APP_RUN_ASYNC": "1", "OTHER": "x"}
+
+    assert config.compile_config(tmp_path / "missing.conf", {}) == config.DEFAULTS
+
+    cfg: config.Config = config.compile_config(conf, environ)
+    assert cfg.log_level == logging.INFO
+    assert cfg.log_max_bytes == 2048
+    assert cfg.log_file == config.ROOT / "log" / "other.log"
+    assert cfg.mmap_log and cfg.run_async and not cfg.compact_records
+    assert cfg.log_backup_count == config.DEFAULTS.log_backup_count
+
+    # flags that are not passed do not override lower layers #
+    CLI.set_cli_input_args(q=True, compact_records=True)
+    cfg = config.compile_config(conf, environ)
+    assert cfg.log_level == logging.ERROR
+    assert cfg.compact_records and cfg.mmap_log
+
+    with pytest.raises(AttributeError):
+        cfg.log_level = logging.DEBUG
+
+
+def test_compile_config_process_settings(tmp_path: Path):
+    """test that options override lower layers if they are passed, paths of cli input args are kept relative
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    conf: Path = tmp_path / "log.conf"
+    conf.write_text("pool: process\nworkers: 4\nmetrics_file: log/metrics.prom\n")
+    environ: dict[str, str] = {"APP_CONCURRENCY": "8", "APP_INTROSPECT": "0"}
+
+    cfg: config.Config = config.compile_config(conf, environ)
+    assert (cfg.concurrency, cfg.pool, cfg.workers, cfg.introspect) == (8, "process", 4, 0)
+    assert cfg.metrics_file == config.ROOT / "log" / "metrics.prom"
+    assert cfg.trace_file is None
+
+    CLI.set_cli_input_args(pool="thread", concurrency=2, trace_file="t.jsonl")
+    cfg = config.compile_config(conf, environ)
+    assert (cfg.concurrency, cfg.pool, cfg.workers, cfg.introspect) == (2, "thread", 4, 0)
+    assert cfg.trace_file == Path("t.jsonl")
+
+
+@pytest.mark.parametrize(
+    "file_content, environ, exp_err_msg",
+    [
+        ("log_levels: INFO", {}, "Unknown config key 'log_levels'"),
+        ("log_level: LOUD", {}, "Invalid value of config key 'log_level' in .*log.conf: .*'LOUD'"),
+        ("", {"APP_LOG_MAX_BYTES": "0"}, "Invalid value of config key 'log_max_bytes' in environment"),
+        ("", {"APP_MMAP_LOG": "maybe"}, "Invalid value of config key 'mmap_log'"),
+        ("pool: fiber", {}, "Invalid value of config key 'pool'"),
+        ("", {"APP_INTROSPECT": "70000"}, "Invalid value of config key 'introspect' in environment"),
+    ]
+)
+def test_compile_config_ValueError(tmp_path: Path, file_content: str, environ: dict, exp_err_msg: str):
+    """test that unknown keys and invalid values raise ValueError naming key and layer
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        file_content (str): content of log.conf
+        environ (dict): environment variables
+        exp_err_msg (str): expected error message
+    """
+    conf: Path = tmp_path / "log.conf"
+    conf.write_text(file_content)
+
+    with pytest.raises(ValueError, match=exp_err_msg):
+        config.compile_config(conf, environ)
+
+
+def test_get_compiles_once(mocker: MockerFixture):
+    """test that the snapshot is compiled on first use only and again after invalidate
+
+    Args:
+        mocker (MockerFixture): pytest mocker
+    """
+    compile_config = mocker.spy(config, "compile_config")
+
+    cfg: config.Config = config.get()
+    assert config.get() is cfg
+    assert compile_config.call_count == 1
+
+    CLI.set_cli_input_args(V=True)
+    assert config.get().log_level == cfg.log_level
+    config.invalidate()
+    assert config.get().log_level == logging.DEBUG
+    assert compile_config.call_count == 2
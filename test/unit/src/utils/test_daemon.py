@@ -0,0 +1,121 @@
+import json
+import socket
+import threading
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import daemon
+from src.utils import daemon_client
+from src.utils.jobs import JobResult
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Path:
+    """return path of Unix socket in tmp dir
+    """
+    return tmp_path / "test.sock"
+
+
+@pytest.fixture
+def running_daemon(socket_path: Path, mocker: MockerFixture):
+    """yield a daemon running in a thread, whose jobs are mocked
+    - shut daemon down on tearDown
+
+    Args:
+        socket_path (Path): path of Unix socket
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mock_run_job = mocker.patch.object(
+        daemon,
+        "run_job",
+        side_effect=lambda argv, parse_args: JobResult(argv, True, 0, 1.0, None, {"hello": None}),
+    )
+    t = threading.Thread(target=daemon.serve, args=(lambda argv: None, socket_path))
+    t.start()
+    while not socket_path.exists():
+        t.join(0.01)
+
+    yield mock_run_job
+
+    if socket_path.exists():
+        daemon_client.shutdown(socket_path)
+    t.join(timeout=5)
+    assert not t.is_alive()
+
+
+def test_submit(running_daemon, socket_path: Path):
+    """test that submitted jobs are run by the daemon and their results returned
+
+    Args:
+        running_daemon: mocked function run_job of the running daemon
+        socket_path (Path): path of Unix socket
+    """
+    res: dict = daemon_client.submit(["--hello", "-v"], socket_path)
+
+    assert res == JobResult(["--hello", "-v"], True, 0, 1.0, None, {"hello": None}).to_dict()
+    assert running_daemon.call_args.args[0] == ["--hello", "-v"]
+
+
+def test_multiple_requests_per_connection(running_daemon, socket_path: Path):
+    """test that one connection can send multiple requests, incl. invalid ones
+
+    Args:
+        running_daemon: mocked function run_job of the running daemon
+        socket_path (Path): path of Unix socket
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall(b'{"argv": ["--hello"]}\n\nnot json\n{"argv": ["-q"]}\n')
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            responses: list[dict] = [json.loads(line) for line in f]
+
+    assert [r["ok"] for r in responses] == [True, False, True]
+    assert responses[1]["error"].startswith("Invalid request")
+
+
+def test_shutdown(running_daemon, socket_path: Path):
+    """test that daemon stops and removes its socket file on shutdown request
+
+    Args:
+        running_daemon: mocked function run_job of the running daemon
+        socket_path (Path): path of Unix socket
+    """
+    assert daemon_client.shutdown(socket_path) == {"ok": True, "shutdown": True}
+
+    for _ in range(500):
+        if not socket_path.exists():
+            break
+        threading.Event().wait(0.01)
+    assert not socket_path.exists()
+
+
+def test_client_main(running_daemon, socket_path: Path, capsys: pytest.CaptureFixture):
+    """test cli of thin client
+
+    Args:
+        running_daemon: mocked function run_job of the running daemon
+        socket_path (Path): path of Unix socket
+        capsys (pytest.CaptureFixture): pytest capture fixture
+    """
+    rc: int = daemon_client.main([f"--socket={socket_path}", "--hello"])
+
+    assert rc == 0
+    assert json.loads(capsys.readouterr().out)["argv"] == ["--hello"]
+
+
+def test_stale_socket_file_is_replaced(socket_path: Path):
+    """test that a stale socket file does not prevent the daemon from starting
+
+    Args:
+        socket_path (Path): path of Unix socket
+    """
+    socket_path.write_text("stale")
+
+    with daemon.DaemonServer(socket_path, lambda argv: None) as server:
+        assert server.socket_path == socket_path
+    assert not socket_path.exists()
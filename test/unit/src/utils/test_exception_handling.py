@@ -2,10 +2,16 @@
 TODO: improve testing
 """
 
+import json
+from pathlib import Path
 import pytest
 from pytest_mock import MockerFixture
 from pytest import LogCaptureFixture
 import logging
+import asyncio
+import gc
+import sys
+import threading
 
 from src.utils import exception_handling as exc
 
@@ -13,21 +19,24 @@ TEST_LOGGER_NAME: str = "test-logger"
 
 
 @pytest.fixture(autouse=True)
-def setUp_tearDown(mocker: MockerFixture):
+def setUp_tearDown(mocker: MockerFixture, tmp_path: Path):
     """setUp and tearDown
-    - patch the logger object
+    - patch the logger object and the report file
     - yield the test
     - delete logger objects that have been created during testing
     - clear catched Exceptions
 
     Args:
         mocker (MockerFixture): pytest mocker fixture
+        tmp_path (Path): pytest tmp path fixture
     """
     mocker.patch.object(
         exc,
         "logger",
         logging.getLogger(TEST_LOGGER_NAME)
     )
+    mocker.patch.object(exc, "REPORT_FILE", tmp_path / "exceptions.jsonl")
+    mocker.patch.object(exc, "_PROGRAM_ENDED", False)
 
     yield
 
@@ -49,8 +58,9 @@ def test_log_exc(caplog: LogCaptureFixture):
     assert f"{exc_msg}" in caplog.text
     assert f"{err_msg}" in caplog.text
 
-def test_program_end_without_exceptions(caplog: LogCaptureFixture):
+def test_program_end_without_exceptions(caplog: LogCaptureFixture, mocker: MockerFixture):
     caplog.set_level(logging.WARNING)
+    mocker.patch.object(exc, "SUMMARIES", [])
     exc.program_end()
     assert caplog.text.strip().endswith("Program ends..")
     
@@ -64,4 +74,150 @@ def test_program_end_with_exception(caplog: pytest.LogCaptureFixture):
     assert "Program ends.." in caplog.text
     assert "Roundup of catched exceptions" in caplog.text
     assert f"{exc_msg}" in caplog.text
+    assert "Exception report written to" in caplog.text
     assert exc.EXC == [[exc_msg, exc_info]]
+
+def test_roundup(caplog: pytest.LogCaptureFixture):
+    caplog.set_level(logging.WARNING)
+    exc.EXC.append(["Test Exception", (ValueError, ValueError("Test Error"), None)])
+    exc.roundup()
+    assert "Roundup of catched exceptions" in caplog.text
+    assert "Program ends.." not in caplog.text
+
+def test_program_end_with_summaries(caplog: pytest.LogCaptureFixture, mocker: MockerFixture):
+    caplog.set_level(logging.WARNING)
+    mocker.patch.object(exc, "SUMMARIES", [])
+    exc.register_summary(lambda: "Test Summary")
+    exc.register_summary(lambda: None)
+    exc.program_end()
+    assert caplog.text.strip().endswith("Test Summary")
+    assert len(caplog.records) == 2
+
+def test_install_hooks():
+    """test that uncaught exceptions of threads are recorded and the original hooks are restored
+    """
+    original_hooks: tuple = (sys.excepthook, threading.excepthook)
+    exc.install_hooks()
+    try:
+        thread = threading.Thread(target=lambda: 1 / 0, name="test-thread")
+        thread.start()
+        thread.join()
+        assert sys.excepthook is exc._excepthook
+    finally:
+        exc.uninstall_hooks()
+
+    assert (sys.excepthook, threading.excepthook) == original_hooks
+    assert exc.EXC[0][0] == "Uncaught exception in thread 'test-thread'."
+    assert exc.EXC[0][1][0] is ZeroDivisionError
+
+def test_threading_excepthook_after_program_end(mocker: MockerFixture):
+    """test that uncaught exceptions of threads are passed on to the original hook once the roundup was output
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    original_hook = mocker.MagicMock()
+    mocker.patch.dict(exc._ORIGINAL_HOOKS, {"threading": original_hook})
+    exc.program_end()
+    args = threading.ExceptHookArgs((ValueError, ValueError("Test Value Error"), None, None))
+
+    exc._threading_excepthook(args)
+
+    original_hook.assert_called_once_with(args)
+    assert exc.EXC == []
+
+def test_excepthook(mocker: MockerFixture):
+    mock_program_end = mocker.patch.object(exc, "program_end")
+    error = ValueError("Test Value Error")
+    exc._excepthook(ValueError, error, None)
+    assert exc.EXC[0][:2] == ["Uncaught exception in main thread.", (ValueError, error, None)]
+    mock_program_end.assert_called_once()
+
+def test_loop_exception_handler():
+    """test that an exception of a task that is never awaited is recorded
+    """
+    async def fail():
+        raise ValueError("Test Value Error")
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(exc.loop_exception_handler)
+        asyncio.get_running_loop().create_task(fail())
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    gc.collect()
+
+    assert exc.EXC[0][0].startswith("Uncaught exception in event loop: Task exception was never retrieved")
+    assert exc.EXC[0][1][0] is ValueError
+
+def test_write_report():
+    """test that exceptions are grouped by type and location, but not by message
+    """
+    def fail(msg: str):
+        raise ValueError(msg)
+
+    for i in range(3):
+        try:
+            fail(f"Test Error {i}")
+        except ValueError:
+            exc.record_exc(f"Test Exception {i}", sys.exc_info())
+    exc.EXC.append(["Test Exception", (KeyError, KeyError("key"), None)])
+
+    assert exc.write_report() == 2
+
+    entries: list[dict] = [json.loads(line) for line in exc.REPORT_FILE.read_text().splitlines()]
+    assert [(e["type"], e["count"]) for e in entries] == [("builtins.ValueError", 3), ("builtins.KeyError", 1)]
+    assert entries[0]["message"] == "Test Error 0"
+    assert entries[0]["context"] == "Test Exception 0"
+    assert entries[0]["location"].endswith(":" + str(fail.__code__.co_firstlineno + 1) + " (fail)")
+    assert entries[0]["first"] <= entries[0]["last"]
+    assert entries[1]["location"] == ""
+    assert len({e["fingerprint"] for e in entries}) == 2
+
+    assert {(e["run_id"], e["pid"], e["run_start"]) for e in entries} == \
+        {(exc.RUN_ID, exc.os.getpid(), exc.RUN_START)}
+
+    # report of next run is appended, runs without exceptions do not touch it #
+    exc.clear_catched_exceptions()
+    assert exc.write_report() == 0
+    exc.record_exc("Test Exception", (KeyError, KeyError("key"), None))
+    assert exc.write_report() == 1
+    assert len(exc.REPORT_FILE.read_text().splitlines()) == 3
+
+
+def test_write_report_rotates(mocker: MockerFixture):
+    """test that the report is rotated instead of growing beyond REPORT_MAX_BYTES
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(exc, "REPORT_MAX_BYTES", 1)
+    mocker.patch.object(exc, "REPORT_BACKUP_COUNT", 2)
+    exc.record_exc("Test Exception", (KeyError, KeyError("key"), None))
+
+    for _ in range(4):
+        exc.write_report()
+
+    assert [p.name for p in sorted(exc.REPORT_FILE.parent.iterdir())] == \
+        ["exceptions.jsonl", "exceptions.jsonl.1", "exceptions.jsonl.2"]
+    assert len(exc.REPORT_FILE.read_text().splitlines()) == 1
+
+
+def test_message_only_entry(caplog: LogCaptureFixture):
+    """test that an event loop context without exception is stored, output and reported without exc_info
+
+    Args:
+        caplog (LogCaptureFixture): pytest log capture fixture
+    """
+    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    exc.loop_exception_handler(loop, {"message": "Test Message"})
+    loop.close()
+
+    assert exc.EXC[0][:2] == ["Uncaught exception in event loop: Test Message", None]
+    exc.roundup()
+    assert caplog.records[-1].exc_info is None
+    assert "Test Message" in caplog.records[-1].getMessage()
+    exc.write_report()
+    entry: dict = json.loads(exc.REPORT_FILE.read_text())
+    assert (entry["type"], entry["message"], entry["location"]) == (None, "", "")
+    assert entry["context"] == "Uncaught exception in event loop: Test Message"
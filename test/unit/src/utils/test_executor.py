@@ -0,0 +1,179 @@
+import logging
+import time
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import executor
+from src.utils import exception_handling as exc
+from src.utils.cli_input_args import CLI
+from src.utils import tracing
+
+TEST_LOGGER_NAME: str = "test-logger"
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown(mocker: MockerFixture):
+    """setUp and tearDown
+    - patch the logger object of exception_handling
+    - yield the test
+    - delete logger objects that have been created during testing
+    - reset CLI and catched exceptions
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(exc, "logger", logging.getLogger(TEST_LOGGER_NAME))
+
+    yield
+
+    del logging.root.manager.loggerDict[TEST_LOGGER_NAME]
+    exc.clear_catched_exceptions()
+    CLI.set_cli_input_args()
+
+
+def square(x: int) -> int:
+    """return x squared, raise ValueError for negative x (module level to be picklable)
+    """
+    if x < 0:
+        raise ValueError(f"negative: {x}")
+    return x * x
+
+
+def sleep_for(seconds: float) -> float:
+    """sleep and return seconds (module level to be picklable)
+    """
+    time.sleep(seconds)
+    return seconds
+
+
+def test_chunked():
+    """test that tasks are chunked together with their index
+    """
+    assert list(executor._chunked([(1,), (2,), (3,)], 2)) == [[(0, (1,)), (1, (2,))], [(2, (3,))]]
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_run_tasks_ordered(pool: str, chunksize: int):
+    """test that results are yielded in task order and failures are routed into roundup
+
+    Args:
+        pool (str): pool kind
+        chunksize (int): tasks per chunk
+    """
+    tasks: list[tuple] = [(x,) for x in [1, 2, -3, 4, 5, -6, 7]]
+
+    results = list(executor.run_tasks(square, tasks, pool=pool, max_workers=2, chunksize=chunksize))
+
+    assert [r.index for r in results] == list(range(len(tasks)))
+    assert [r.value for r in results if r.ok] == [1, 4, 16, 25, 49]
+    assert [str(r.error) for r in results if not r.ok] == ["negative: -3", "negative: -6"]
+    # failures are routed in order of completion #
+    exc_msgs: list[str] = sorted(e[0] for e in exc.EXC)
+    assert len(exc_msgs) == 2
+    assert exc_msgs[0].startswith("Task 2 (square) failed.")
+    assert exc_msgs[1].startswith("Task 5 (square) failed.")
+    assert ("Remote traceback" in exc_msgs[0]) == (pool == "process")
+
+
+def test_run_tasks_as_completed():
+    """test that results are yielded as they complete
+    """
+    results = list(executor.run_tasks(
+        sleep_for, [(0.3,), (0.0,)], pool="thread", max_workers=2, ordered=False
+    ))
+
+    assert [r.index for r in results] == [1, 0]
+
+
+def test_run_tasks_timeout():
+    """test that tasks exceeding their timeout fail with TimeoutError
+    """
+    results = list(executor.run_tasks(
+        sleep_for, [(0.0,), (1.0,)], pool="thread", max_workers=2, timeout=0.2
+    ))
+
+    assert results[0].ok
+    assert isinstance(results[1].error, TimeoutError)
+    assert len(exc.EXC) == 1
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_run_tasks_timeout_does_not_block(pool: str):
+    """test that chunks do not queue behind a timed out chunk and timed out chunks are not waited for
+
+    Args:
+        pool (str): pool kind
+    """
+    start: float = time.monotonic()
+    results = list(executor.run_tasks(
+        sleep_for, [(1.5,), (0.0,), (1.5,), (1.5,)], pool=pool, max_workers=1, timeout=0.2
+    ))
+
+    assert time.monotonic() - start < 1.4
+    assert [r.ok for r in results] == [False, True, False, False]
+    assert all(isinstance(r.error, TimeoutError) for r in results if not r.ok)
+
+
+def test_run_tasks_ordered_caps_ready(mocker: MockerFixture):
+    """test that no further tasks are consumed while results wait behind a slow head task
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(executor, "READY_PER_WORKER", 2)
+    consumed: list[int] = []
+
+    def tasks():
+        for i in range(50):
+            consumed.append(i)
+            yield (0.5 if i == 0 else 0.0,)
+
+    results = executor.run_tasks(sleep_for, tasks(), max_workers=2)
+
+    assert next(results).value == 0.5
+    assert len(consumed) <= 6
+    assert len(list(results)) == 49
+
+
+def test_run_tasks_defaults(mocker: MockerFixture):
+    """test that tasks run on a thread pool with one worker per CPU by default
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(executor.os, "cpu_count", return_value=3)
+    spy = mocker.MagicMock(wraps=executor.cf.ThreadPoolExecutor)
+    mocker.patch.dict(executor.POOL_KINDS, {"thread": spy})
+
+    assert [r.value for r in executor.run_tasks(square, [(2,)])] == [4]
+    spy.assert_called_once_with(max_workers=3)
+
+
+@pytest.mark.parametrize(
+    "kwargs, exp_err_msg",
+    [
+        ({"pool": "invalid"}, "Unknown pool kind 'invalid'."),
+        ({"chunksize": 0}, "chunksize must be at least 1, but is 0."),
+    ]
+)
+def test_run_tasks_ValueError(kwargs: dict, exp_err_msg: str):
+    """test invalid arguments
+
+    Args:
+        kwargs (dict): kwargs of run_tasks
+        exp_err_msg (str): expected error message
+    """
+    with pytest.raises(ValueError, match=exp_err_msg):
+        list(executor.run_tasks(square, [(1,)], **kwargs))
+
+
+def test_run_tasks_propagates_span():
+    """test that tasks on thread pools run within the tracing span of the caller
+    """
+    with tracing.span("outer") as outer:
+        results: list = list(executor.run_tasks(
+            lambda _: tracing.get_current(), [(i,) for i in range(4)], pool="thread", max_workers=2
+        ))
+
+    assert [r.value for r in results] == [outer] * 4
@@ -0,0 +1,99 @@
+import threading
+import time
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import instrument
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown():
+    """setUp and tearDown
+    - yield the test
+    - clear aggregates of all sections
+    """
+    yield
+
+    instrument.clear()
+
+
+@pytest.fixture
+def enabled(mocker: MockerFixture):
+    """enable instrumentation
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(instrument, "ENABLED", True)
+
+
+def test_timed(enabled):
+    """test that every call of a decorated function is aggregated, incl. failing calls
+    """
+    @instrument.timed()
+    def work(fail: bool = False) -> str:
+        if fail:
+            raise ValueError("test error")
+        return "done"
+
+    assert work() == "done"
+    with pytest.raises(ValueError):
+        work(fail=True)
+
+    stats: instrument.SectionStats = instrument.SECTIONS[
+        f"{__name__}.test_timed.<locals>.work"
+    ]
+    assert stats.calls == 2
+    assert work.__name__ == "work"
+
+
+def test_section(enabled):
+    """test that nested and concurrent sections are timed independently
+    """
+    def sleep_in_section():
+        with instrument.section("outer"):
+            time.sleep(0.01)
+            with instrument.section("outer"):
+                pass
+
+    threads: list[threading.Thread] = [threading.Thread(target=sleep_in_section) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats: instrument.SectionStats = instrument.SECTIONS["outer"]
+    assert stats.calls == 6
+    assert stats.max_wall >= 0.01
+    assert stats.cpu < stats.wall
+
+
+def test_disabled():
+    """test that disabled instrumentation leaves functions undecorated and records nothing
+    """
+    def work():
+        pass
+
+    assert instrument.timed("work")(work) is work
+    with instrument.section("noop") as s:
+        pass
+
+    assert s is None
+    assert instrument.section("noop") is instrument.section("other")
+    assert instrument.SECTIONS == {}
+    assert instrument.get_summary() is None
+
+
+def test_get_summary(enabled):
+    """test that sections are ranked by total wall time
+    """
+    instrument.get_stats("fast").add(0.001, 0.001)
+    instrument.get_stats("slow").add(0.5, 0.1)
+    instrument.get_stats("slow").add(0.5, 0.1)
+    instrument.get_stats("never")
+
+    lines: list[str] = instrument.get_summary().splitlines()
+
+    assert lines[0] == "Hot sections (top 2 of 2, by wall time):"
+    assert lines[2].split()[:4] == ["slow", "2", "1000.000", "200.000"]
+    assert lines[3].split()[0] == "fast"
@@ -0,0 +1,151 @@
+import json
+import logging
+import threading
+import tracemalloc
+import urllib.error
+import urllib.request
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import exception_handling as exc
+from src.utils import introspect
+from src.utils import metrics
+
+
+@pytest.fixture
+def server():
+    """setUp and tearDown
+    - start server on a free port
+    - yield the server
+    - stop server and tracing of allocations
+
+    Yields:
+        introspect.IntrospectionServer: server
+    """
+    srv: introspect.IntrospectionServer = introspect.IntrospectionServer()
+
+    yield srv
+
+    srv.stop()
+    tracemalloc.stop()
+
+
+def _get(srv: introspect.IntrospectionServer, path: str) -> tuple[int, str]:
+    """return status and body of GET request
+    """
+    try:
+        with urllib.request.urlopen(f"{srv.url}{path}", timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def test_logging(server: introspect.IntrospectionServer):
+    """test that loggers with handlers and their handlers are returned
+
+    Args:
+        server (introspect.IntrospectionServer): server fixture
+    """
+    test_logger: logging.Logger = logging.getLogger("test-logger")
+    handler: logging.Handler = logging.NullHandler()
+    handler.setLevel(logging.ERROR)
+    test_logger.addHandler(handler)
+    try:
+        status, body = _get(server, "/logging")
+    finally:
+        test_logger.removeHandler(handler)
+        del logging.root.manager.loggerDict["test-logger"]
+
+    assert status == 200
+    state: dict = json.loads(body)
+    assert state["loggers"]["test-logger"]["handlers"] == [
+        {"type": "NullHandler", "level": "ERROR", "backlog": 0}
+    ]
+    assert "shed" in state["overload"]
+
+
+def test_exceptions(server: introspect.IntrospectionServer, mocker: MockerFixture):
+    """test that the number of catched exceptions and the most recent ones are returned
+
+    Args:
+        server (introspect.IntrospectionServer): server fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    error: ValueError = ValueError("test error")
+    catched: list[list] = [[f"msg {i}", (ValueError, error, None), float(i)] for i in range(25)]
+    mocker.patch.object(exc, "EXC", catched)
+
+    status, body = _get(server, "/exceptions")
+
+    assert status == 200
+    state: dict = json.loads(body)
+    assert state["count"] == 25
+    assert len(state["recent"]) == introspect.RECENT_EXCEPTIONS
+    assert state["recent"][-1] == {"message": "msg 24", "type": "ValueError", "error": "test error", "time": 24.0}
+
+
+def test_exceptions_without_timestamp_or_exc_info(server: introspect.IntrospectionServer, mocker: MockerFixture):
+    """test that entries without timestamp and message-only entries are returned
+
+    Args:
+        server (introspect.IntrospectionServer): server fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    error: KeyError = KeyError("key")
+    mocker.patch.object(exc, "EXC", [["msg 0", (KeyError, error, None)], ["msg 1", None, 1.0]])
+
+    status, body = _get(server, "/exceptions")
+
+    assert status == 200
+    assert json.loads(body)["recent"] == [
+        {"message": "msg 0", "type": "KeyError", "error": "'key'", "time": None},
+        {"message": "msg 1", "type": None, "error": None, "time": 1.0},
+    ]
+
+
+def test_threads(server: introspect.IntrospectionServer):
+    """test that the stacks of all threads are returned
+
+    Args:
+        server (introspect.IntrospectionServer): server fixture
+    """
+    status, body = _get(server, "/threads")
+
+    assert status == 200
+    names: list[str] = [t["name"] for t in json.loads(body)]
+    assert threading.current_thread().name in names
+    assert "introspect" in names
+
+
+def test_memory(server: introspect.IntrospectionServer):
+    """test that allocation sites are only returned once tracing was started
+
+    Args:
+        server (introspect.IntrospectionServer): server fixture
+    """
+    tracemalloc.stop()
+    assert json.loads(_get(server, "/memory")[1]) == {"tracing": False}
+
+    _get(server, "/memory?start=1")
+    data: list[bytes] = [bytes(1000) for _ in range(100)]
+    state: dict = json.loads(_get(server, "/memory?top=3")[1])
+
+    assert state["tracing"] and state["current_bytes"] > 0
+    assert 0 < len(state["top"]) <= 3
+    assert len(data) == 100
+
+
+def test_metrics_and_unknown_path(server: introspect.IntrospectionServer):
+    """test that metrics are returned in Prometheus text format and unknown paths are answered with 404
+
+    Args:
+        server (introspect.IntrospectionServer): server fixture
+    """
+    status, body = _get(server, "/metrics")
+    assert status == 200
+    assert body == metrics.to_prometheus()
+
+    status, body = _get(server, "/unknown")
+    assert status == 404
+    assert "/threads" in json.loads(body)["error"]
+    assert _get(server, "/memory?top=x")[0] == 500
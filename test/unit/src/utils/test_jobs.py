@@ -0,0 +1,122 @@
+import logging
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import MagicMock
+
+from src.utils import jobs
+from src.utils import commands
+from src.utils import exception_handling as exc
+from src.utils.cli_input_args import CLI
+
+TEST_LOGGER_NAME: str = "test-logger"
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown(mocker: MockerFixture):
+    """setUp and tearDown
+    - patch the logger object of exception_handling
+    - yield the test
+    - delete logger objects that have been created during testing
+    - reset CLI and catched exceptions
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(exc, "logger", logging.getLogger(TEST_LOGGER_NAME))
+
+    yield
+
+    del logging.root.manager.loggerDict[TEST_LOGGER_NAME]
+    exc.clear_catched_exceptions()
+    CLI.set_cli_input_args()
+
+
+def _parse_args(argv: list[str]):
+    """minimal parser: every arg "--<name>" sets CLI.<name> to True, "--bad" exits
+    """
+    if "--bad" in argv:
+        raise SystemExit("Usage: test")
+    CLI.set_cli_input_args(**{arg.lstrip("-"): True for arg in argv})
+
+
+@pytest.fixture
+def mock_run_command(mocker: MockerFixture) -> MagicMock:
+    """return mocked function run of module commands
+    """
+    return mocker.patch.object(commands, "run", return_value="done")
+
+
+def test_run_job_success(mock_run_command: MagicMock):
+    """test a job that runs without exceptions and restores CLI state afterwards
+
+    Args:
+        mock_run_command (MagicMock): mocked function run of module commands
+    """
+    CLI.set_cli_input_args(q=True)
+
+    res: jobs.JobResult = jobs.run_job(["--hello", "--v"], _parse_args)
+
+    mock_run_command.assert_called_once_with("hello")
+    assert res.ok and res.exceptions == 0 and res.error is None
+    assert res.results == {"hello": "done"}
+    assert CLI.q == True and CLI.hello == False and CLI.v == False
+
+
+def test_run_job_failing_command(mock_run_command: MagicMock, caplog: pytest.LogCaptureFixture):
+    """test that exceptions of a job are counted, rounded up and do not leak into the process
+
+    Args:
+        mock_run_command (MagicMock): mocked function run of module commands
+        caplog (pytest.LogCaptureFixture): pytest log fixture
+    """
+    mock_run_command.side_effect = ValueError("test error")
+    process_exc: list = ["process exception", (ValueError, ValueError(), None)]
+    exc.EXC.append(process_exc)
+
+    res: jobs.JobResult = jobs.run_job(["--hello"], _parse_args)
+
+    assert not res.ok and res.exceptions == 1
+    assert "Command 'hello' of job ['--hello'] failed." in caplog.text
+    assert "Roundup of catched exceptions" in caplog.text
+    assert "Program ends.." not in caplog.text
+    assert exc.EXC == [process_exc]
+
+
+def test_run_job_invalid_args(mock_run_command: MagicMock):
+    """test that invalid cli input args are reported and no command runs
+
+    Args:
+        mock_run_command (MagicMock): mocked function run of module commands
+    """
+    res: jobs.JobResult = jobs.run_job(["--bad"], _parse_args)
+
+    assert not res.ok and res.error == "Usage: test"
+    mock_run_command.assert_not_called()
+
+
+@pytest.mark.parametrize("argv, exp_changed", [
+    (["--serve"], ["serve"]),
+    (["--hello", "--batch"], ["batch"]),
+    (["--loadgen", "--run_async"], ["run_async", "loadgen"]),
+])
+def test_run_job_process_level_args(mock_run_command: MagicMock, argv: list[str], exp_changed: list[str]):
+    """test that a job cannot set process-level cli input args
+
+    Args:
+        mock_run_command (MagicMock): mocked function run of module commands
+        argv (list[str]): cli input args of job
+        exp_changed (list[str]): expected rejected cli input args
+    """
+    res: jobs.JobResult = jobs.run_job(argv, _parse_args)
+
+    assert not res.ok and res.error == f"Jobs cannot set process-level cli input args: {exp_changed}."
+    mock_run_command.assert_not_called()
+    assert CLI.serve == False and CLI.batch is None and CLI.loadgen == False
+
+
+def test_job_result_to_dict():
+    """test that non-serialisable return values of commands are represented by their repr
+    """
+    res = jobs.JobResult(["--hello"], True, 0, 1.0, None, {"a": 1, "b": {1, 2}})
+
+    assert res.to_dict()["results"] == {"a": 1, "b": "{1, 2}"}
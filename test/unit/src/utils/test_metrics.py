@@ -0,0 +1,163 @@
+import threading
+from pathlib import Path
+import pytest
+
+from src.utils import exception_handling as exc
+from src.utils import metrics
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown():
+    """setUp and tearDown
+    - yield the test
+    - remove metrics that have been registered during testing, reset the others
+    """
+    registered_initial: set[str] = set(metrics.REGISTRY)
+
+    yield
+
+    for name in set(metrics.REGISTRY) - registered_initial:
+        del metrics.REGISTRY[name]
+    metrics.reset()
+
+
+def test_counter_merges_threads():
+    """test that increments of all threads are merged on read, incl. threads that ended
+    """
+    c: metrics.Counter = metrics.counter("test_total", label="kind")
+
+    def work():
+        for _ in range(1000):
+            c.inc(label_value="a")
+        c.inc(2.5, label_value="b")
+
+    threads: list[threading.Thread] = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert c.get() == {"a": 4000, "b": 10.0}
+
+
+def test_summary_registered_on_first_update(mocker):
+    """test that the summary is registered for program end on the first update of a metric
+    """
+    mocker.patch.object(exc, "SUMMARIES", [])
+    mocker.patch.object(metrics, "_SUMMARY_REGISTERED", False)
+    c: metrics.Counter = metrics.counter("test_total")
+    assert exc.SUMMARIES == []
+
+    c.inc()
+
+    assert exc.SUMMARIES == [metrics.get_summary]
+
+
+def test_cells_of_ended_threads_are_dropped():
+    """test that cells of threads that ended are folded into one cell and dropped
+    """
+    c: metrics.Counter = metrics.counter("test_total")
+    h: metrics.Histogram = metrics.histogram("test_seconds", buckets=(1.0,))
+    for _ in range(20):
+        t = threading.Thread(target=lambda: (c.inc(), h.observe(2.0)))
+        t.start()
+        t.join()
+
+    assert c.get() == {None: 20}
+    assert h.get() == ([0, 20], 40.0)
+    assert c._cells == [] and h._cells == []
+
+
+def test_gauge():
+    """test that set overrides increments of all threads and inc/dec keep working afterwards
+    """
+    g: metrics.Gauge = metrics.gauge("test_gauge")
+    g.inc(5)
+    t = threading.Thread(target=g.dec, args=(2,))
+    t.start()
+    t.join()
+    assert g.get() == {None: 3}
+
+    g.set(10)
+    g.inc()
+
+    assert g.get() == {None: 11}
+
+
+def test_histogram():
+    """test that values are counted in the first bucket whose upper bound is not smaller
+    """
+    h: metrics.Histogram = metrics.histogram("test_seconds", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        h.observe(value)
+
+    counts, total = h.get()
+
+    assert counts == [2, 1, 1]
+    assert total == pytest.approx(2.65)
+
+
+def test_histogram_unsorted_buckets():
+    """test that buckets must be sorted
+    """
+    with pytest.raises(ValueError):
+        metrics.Histogram("test_unsorted", buckets=(1.0, 0.1))
+
+
+def test_registry_returns_same_metric():
+    """test that metrics are registered once per name and type
+    """
+    assert metrics.counter("test_total") is metrics.counter("test_total")
+    with pytest.raises(ValueError):
+        metrics.gauge("test_total")
+
+
+def test_to_prometheus(tmp_path: Path, mocker):
+    """test Prometheus text format of all metric types
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(metrics, "REGISTRY", {})
+    metrics.counter("test_total", "test counter", label="level").inc(label_value='IN"FO')
+    metrics.gauge("test_gauge").set(1.5)
+    metrics.histogram("test_seconds", buckets=(0.1,)).observe(0.5)
+
+    metrics.write_prometheus(tmp_path / "metrics.prom")
+
+    assert (tmp_path / "metrics.prom").read_text() == (
+        "# HELP test_total test counter\n"
+        "# TYPE test_total counter\n"
+        'test_total{level="IN\\"FO"} 1\n'
+        "# TYPE test_gauge gauge\n"
+        "test_gauge 1.5\n"
+        "# TYPE test_seconds histogram\n"
+        'test_seconds_bucket{le="0.1"} 0\n'
+        'test_seconds_bucket{le="+Inf"} 1\n'
+        "test_seconds_sum 0.5\n"
+        "test_seconds_count 1\n"
+    )
+    assert list(tmp_path.iterdir()) == [tmp_path / "metrics.prom"]
+
+
+def test_get_summary(mocker):
+    """test that summary only includes updated metrics and is None if there are none
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(metrics, "REGISTRY", {})
+    c: metrics.Counter = metrics.counter("test_total", label="level")
+    h: metrics.Histogram = metrics.histogram("test_seconds")
+    assert metrics.get_summary() is None
+
+    c.inc(label_value="INFO")
+    h.observe(1.0)
+    h.observe(3.0)
+
+    assert metrics.get_summary() == (
+        "Metrics:\n"
+        '  test_total{level="INFO"}: 1\n'
+        "  test_seconds: count=2 sum=4 mean=2"
+    )
@@ -0,0 +1,81 @@
+import pstats
+import time
+import tracemalloc
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import profiling
+from src.utils import exception_handling as exc
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown(mocker: MockerFixture):
+    """setUp and tearDown
+    - patch summaries of profiling and exception_handling
+    - yield the test
+    """
+    mocker.patch.object(profiling, "SUMMARIES", [])
+    mocker.patch.object(exc, "SUMMARIES", [])
+
+    yield
+
+
+def busy_work(seconds: float) -> list[bytes]:
+    """burn CPU and allocate memory for seconds
+    """
+    blocks: list[bytes] = []
+    end: float = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        blocks.append(b"x" * 1024)
+    return blocks
+
+
+def test_profile_cpu_and_mem(tmp_path: Path):
+    """test that CPU and memory profiles are written and summarised
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    with profiling.profile(cpu=True, mem=True, output_dir=tmp_path):
+        blocks: list[bytes] = busy_work(0.05)
+
+    assert not tracemalloc.is_tracing()
+    assert any(
+        func == "busy_work" for _, _, func in pstats.Stats(str(tmp_path / "profile_cpu.pstats")).stats
+    )
+    assert len(tracemalloc.Snapshot.load(str(tmp_path / "profile_mem.tracemalloc")).traces) > 0
+    cpu_summary, mem_summary = profiling.SUMMARIES
+    assert cpu_summary.startswith("CPU profile (top ")
+    assert "busy_work (" in cpu_summary
+    assert mem_summary.startswith("Memory profile (peak")
+    assert exc.SUMMARIES == [profiling._get_summary]
+    assert len(blocks) > 0
+
+
+def test_profile_sample(tmp_path: Path):
+    """test that the sampler collects collapsed stacks of other threads
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    with profiling.profile(sample_interval=0.001, output_dir=tmp_path):
+        busy_work(0.1)
+
+    lines: list[str] = (tmp_path / "profile_samples.collapsed").read_text().splitlines()
+    assert any(f"{__name__}.busy_work" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert profiling.SUMMARIES[0].startswith("Sampling profile (")
+
+
+def test_profile_nothing(tmp_path: Path):
+    """test that nothing is profiled and written if no profiler is selected
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    with profiling.profile(output_dir=tmp_path / "log"):
+        pass
+
+    assert not (tmp_path / "log").exists()
+    assert profiling._get_summary() is None
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import commands
+from src.utils import config
+from src.utils import metrics
+from src.utils import result_cache
+from src.utils.cli_input_args import CLI
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown(tmp_path: Path, mocker: MockerFixture):
+    """setUp and tearDown
+    - let the result cache write to tmp dir, reset its metrics
+    - patch registry of commands with a copy, so registered test commands are removed
+    - reset class args of class CLI
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(result_cache, "DEFAULT_DIR", tmp_path / "results")
+    mocker.patch.object(result_cache, "_CACHES", {})
+    mocker.patch.object(commands, "COMMANDS", dict(commands.COMMANDS))
+    result_cache.RESULT_CACHE.reset()
+
+    yield
+
+    result_cache.RESULT_CACHE.reset()
+    CLI.set_cli_input_args()
+
+
+class Point():
+    """argument type with default repr (module level to be picklable)
+    """
+    def __init__(self, x: int, y: int):
+        self.x: int = x
+        self.y: int = y
+
+
+def test_make_key(tmp_path: Path):
+    """test that the key depends on command, version, args, relevant CLI and content of passed files,
+    but not on other CLI or ids of objects
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    input_file: Path = tmp_path / "input.txt"
+    input_file.write_text("a")
+    key: str = result_cache.make_key("cmd", (input_file, 1), {"x": "y"})
+
+    assert result_cache.make_key("cmd", (input_file, 1), {"x": "y"}) == key
+    assert len({
+        key,
+        result_cache.make_key("other", (input_file, 1), {"x": "y"}),
+        result_cache.make_key("cmd", (input_file, 2), {"x": "y"}),
+        result_cache.make_key("cmd", (input_file, 1), {"x": "z"}),
+    }) == 4
+    input_file.write_text("b")
+    assert result_cache.make_key("cmd", (input_file, 1), {"x": "y"}) != key
+    input_file.write_text("a")
+    assert result_cache.make_key("cmd", (input_file, 1), {"x": "y"}, version="2") != key
+    CLI.set_cli_input_args(v=True)
+    assert result_cache.make_key("cmd", (input_file, 1), {"x": "y"}) == key
+    assert result_cache.make_key("cmd", (input_file, 1), {"x": "y"}, cli_args=("v",)) != \
+        result_cache.make_key("cmd", (input_file, 1), {"x": "y"}, cli_args=("q",))
+
+    # objects with default repr are fingerprinted by state, not by id #
+    assert result_cache.make_key("cmd", (Point(1, 2),)) == result_cache.make_key("cmd", (Point(1, 2),))
+    assert result_cache.make_key("cmd", (Point(1, 2),)) != result_cache.make_key("cmd", (Point(1, 3),))
+    assert result_cache.make_key("cmd", (1,)) != result_cache.make_key("cmd", ("1",))
+    with pytest.raises(TypeError):
+        result_cache.make_key("cmd", (lambda: None,))
+
+
+def test_result_cache(tmp_path: Path):
+    """test that entries are read back, broken ones are misses and least recently used ones are evicted
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    cache: result_cache.ResultCache = result_cache.ResultCache(tmp_path / "results", max_bytes=2500)
+
+    assert cache.get("a") == (False, None)
+    assert cache.set("a", {"value": b"x" * 1000})
+    assert cache.get("a") == (True, {"value": b"x" * 1000})
+    assert not cache.set("b", lambda: None)
+    assert not cache.set("b", b"x" * 3000)
+
+    # a is older than b, but was used last #
+    assert cache.set("b", b"x" * 1000)
+    past: float = time.time() - 60
+    os.utime(tmp_path / "results" / "a.pickle", (past, past))
+    os.utime(tmp_path / "results" / "b.pickle", (past - 10, past - 10))
+    cache.get("a")
+    assert cache.set("c", b"x" * 1000)
+    assert sorted(p.name for p in (tmp_path / "results").iterdir()) == ["a.pickle", "c.pickle"]
+
+    (tmp_path / "results" / "c.pickle").write_bytes(b"broken")
+    assert cache.get("c") == (False, None)
+    assert not (tmp_path / "results" / "c.pickle").exists()
+    assert result_cache.RESULT_CACHE.get() == {"miss": 2, "hit": 2, "store": 3, "evict": 1}
+    cache.clear()
+    assert list((tmp_path / "results").iterdir()) == []
+
+
+def test_result_cache_concurrent_writes(tmp_path: Path):
+    """test that threads writing the same key do not fail
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    cache: result_cache.ResultCache = result_cache.ResultCache(tmp_path / "results")
+    stored: list[bool] = []
+
+    def work(n: int):
+        for i in range(100):
+            stored.append(cache.set("k", (n, i)))
+
+    threads: list[threading.Thread] = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert stored == [True] * 400
+    assert result_cache.RESULT_CACHE.get() == {"store": 400}
+    assert [p.name for p in (tmp_path / "results").iterdir()] == ["k.pickle"]
+
+
+def test_result_cache_write_error(tmp_path: Path, mocker: MockerFixture):
+    """test that a failed write is not raised, neither by set nor by a cached call
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(result_cache.os, "replace", side_effect=OSError("disk full"))
+    cache: result_cache.ResultCache = result_cache.ResultCache(tmp_path / "results")
+
+    assert not cache.set("k", 1)
+    assert result_cache.call("cmd", lambda: 2) == 2
+    assert list((tmp_path / "results").iterdir()) == []
+
+
+def test_run_cacheable_command(mocker: MockerFixture):
+    """test that a cacheable command is only run on a miss and its module is not imported on a hit
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    import_module = mocker.patch.object(commands.importlib, "import_module")
+    import_module.return_value.func.side_effect = lambda x: {"result": x}
+    commands.register("test-cmd", "test.fake.module", "func", cacheable=True)
+
+    assert commands.run("test-cmd", 1) == {"result": 1}
+    assert commands.run("test-cmd", 1) == {"result": 1}
+    assert commands.run("test-cmd", 2) == {"result": 2}
+    assert import_module.return_value.func.call_count == 2
+
+    summary: str = result_cache.get_summary()
+    assert summary == "Result cache: hits=1 misses=2 hit_rate=33.3% stores=2 evictions=0"
+
+    # caching can be switched off #
+    mocker.patch.object(config, "get", return_value=config.DEFAULTS._replace(result_cache=False))
+    commands.run("test-cmd", 1)
+    assert import_module.return_value.func.call_count == 3
+
+
+def test_result_cache_running_total(tmp_path: Path, mocker: MockerFixture):
+    """test that the dir is only scanned on the first write and once the running total exceeds max_bytes
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    scandir = mocker.spy(result_cache.os, "scandir")
+    cache: result_cache.ResultCache = result_cache.ResultCache(tmp_path / "results", max_bytes=5500)
+
+    for key in "abcde":
+        assert cache.set(key, b"x" * 1000)
+    assert scandir.call_count == 1
+    cache.set("a", b"x" * 1000)
+    assert scandir.call_count == 1
+
+    # exceeds max_bytes, evicted down to EVICT_TO of it #
+    cache.set("f", b"x" * 1000)
+    assert scandir.call_count == 2
+    assert len(list((tmp_path / "results").iterdir())) == 4
+    assert cache._total == sum(p.stat().st_size for p in (tmp_path / "results").iterdir())
+
+
+def test_run_cacheable_real_command(mocker: MockerFixture):
+    """test that a cacheable command of a real module is cached through commands.run
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    commands.register("test-fraction", "fractions", "Fraction", cacheable=True, cli_args=("v",))
+    import_module = mocker.spy(commands.importlib, "import_module")
+
+    assert commands.run("test-fraction", 1, 3) == commands.run("test-fraction", 1, 3)
+    assert import_module.call_count == 1
+    CLI.set_cli_input_args(v=True)
+    commands.run("test-fraction", 1, 3)
+    assert import_module.call_count == 2
+    assert result_cache.RESULT_CACHE.get() == {"miss": 2, "hit": 1, "store": 2}
+    assert commands.get_code_version("fractions") != ""
+
+
+def test_get_summary_unused():
+    """test that there is no summary if the result cache was not used
+    """
+    metrics.reset()
+    assert result_cache.get_summary() is None
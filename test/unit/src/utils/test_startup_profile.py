@@ -0,0 +1,95 @@
+import threading
+import time
+import pytest
+from pytest_mock import MockerFixture
+
+from src.utils import startup_profile
+
+
+@pytest.fixture(autouse=True)
+def tearDown():
+    """yield test and restore measured phases of the actual program startup
+    """
+    phases: dict[str, float] = dict(startup_profile.PHASES)
+    startup_profile.clear()
+
+    yield
+
+    startup_profile.clear()
+    startup_profile.PHASES.update(phases)
+
+
+def test_phase_self_time(mocker: MockerFixture):
+    """test that nested phases are only charged with their self time
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    # perf_counter ticks: outer start, inner start, inner end, outer end #
+    mocker.patch.object(
+        startup_profile.time,
+        "perf_counter",
+        side_effect=[0.0, 1.0, 3.0, 10.0],
+    )
+
+    with startup_profile.phase("outer"):
+        with startup_profile.phase("inner"):
+            pass
+
+    assert startup_profile.PHASES == {"outer": 8.0, "inner": 2.0}
+    assert startup_profile._stack() == []
+
+
+def test_phase_accumulates():
+    """test that repeated phases with the same name are summed up
+    """
+    for _ in range(3):
+        with startup_profile.phase("repeated"):
+            pass
+
+    assert list(startup_profile.PHASES) == ["repeated"]
+    assert startup_profile.PHASES["repeated"] >= 0
+
+
+def test_phase_exception():
+    """test that a phase is recorded even if the wrapped code raises
+    """
+    with pytest.raises(ValueError):
+        with startup_profile.phase("failing"):
+            raise ValueError("test")
+
+    assert "failing" in startup_profile.PHASES
+    assert startup_profile._stack() == []
+
+
+def test_phase_per_thread():
+    """test that a phase of another thread is not charged as child of a phase of this thread
+    """
+    def load():
+        with startup_profile.phase("thread"):
+            time.sleep(0.05)
+
+    with startup_profile.phase("main"):
+        t = threading.Thread(target=load)
+        t.start()
+        t.join()
+
+    assert startup_profile.PHASES["thread"] >= 0.05
+    assert startup_profile.PHASES["main"] >= 0.05
+
+
+def test_get_report(mocker: MockerFixture):
+    """test that report includes all phases, uncovered time as 'other' and the total
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+    """
+    mocker.patch.object(startup_profile, "START", 0.0)
+    startup_profile.PHASES.update({"imports": 0.06, "rotation": 0.01})
+
+    report: list[str] = startup_profile.get_report(end=0.1).splitlines()
+
+    assert [line.split()[2] for line in report] == ["imports", "rotation", "other", "total"]
+    assert report[0].split()[3:] == ["60.000", "ms", "60.0", "%"]
+    assert report[2].split()[3:] == ["30.000", "ms", "30.0", "%"]
+    assert report[3].split()[3:] == ["100.000", "ms", "100.0", "%"]
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+
+from src.utils import tracing
+
+
+@pytest.fixture(autouse=True)
+def setUp_tearDown():
+    """setUp and tearDown
+    - yield the test
+    - stop exporting spans
+    """
+    yield
+
+    tracing.set_export_path(None)
+
+
+def test_span_nesting():
+    """test that nested spans share the trace and the current span is restored afterwards
+    """
+    assert tracing.get_current() is None
+
+    with tracing.span("outer") as outer:
+        with tracing.span("inner") as inner:
+            assert tracing.get_current() is inner
+        with tracing.span("other", new_trace=True) as other:
+            pass
+        assert tracing.get_current() is outer
+
+    assert tracing.get_current() is None
+    assert inner.trace_id == outer.trace_id and inner.parent_id == outer.span_id
+    assert other.trace_id != outer.trace_id and other.parent_id is None
+    assert outer.duration_ms >= inner.duration_ms >= 0
+
+
+def test_span_propagation():
+    """test that the current span propagates into thread pools (via wrap) and asyncio tasks
+    """
+    async def in_task() -> tracing.Span | None:
+        return tracing.get_current()
+
+    async def in_loop() -> list:
+        return await asyncio.gather(in_task(), asyncio.to_thread(tracing.get_current))
+
+    with tracing.span("outer") as outer:
+        with ThreadPoolExecutor(2) as pool:
+            in_pool: list = list(pool.map(tracing.wrap(lambda _: tracing.get_current()), range(4)))
+        in_asyncio: list = asyncio.run(in_loop())
+
+    assert in_pool == [outer] * 4
+    assert in_asyncio == [outer, outer]
+
+
+def test_export(tmp_path: Path):
+    """test that finished spans are exported as JSON lines incl. their status
+
+    Args:
+        tmp_path (Path): pytest tmp path fixture
+    """
+    tracing.set_export_path(tmp_path / "spans.jsonl")
+
+    with tracing.span("outer", attr=1):
+        with pytest.raises(ValueError):
+            with tracing.span("inner"):
+                raise ValueError("test error")
+    summary: str = tracing.get_summary()
+    tracing.set_export_path(None)
+
+    spans: list[dict] = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [(s["name"], s["status"]) for s in spans] == [("inner", "error"), ("outer", "ok")]
+    assert spans[1]["attributes"] == {"attr": 1}
+    assert spans[0]["parent_id"] == spans[1]["span_id"]
+    assert summary == f"Tracing: 2 spans exported to '{tmp_path / 'spans.jsonl'}'."
+    assert tracing.get_summary() is None
+
+
+def test_trace_context_filter():
+    """test that ids of the current span are injected into records
+    """
+    def make_record() -> logging.LogRecord:
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+        tracing.TRACE_CONTEXT_FILTER.filter(record)
+        return record
+
+    with tracing.span("outer") as outer:
+        record: logging.LogRecord = make_record()
+    no_span_record: logging.LogRecord = make_record()
+
+    assert (record.trace_id, record.span_id) == (outer.trace_id, outer.span_id)
+    assert record.trace == f" [{outer.trace_id}:{outer.span_id}]"
+    assert no_span_record.trace == ""
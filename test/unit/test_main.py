@@ -11,7 +11,7 @@ from typing import Any
 import logging
 
 import main
-from main import exc, log, CLI, SEPARATOR
+from main import exc, log, CLI, SEPARATOR, commands, config
 
 
 TEST_LOGGER_NAME: str = "test-logger"
@@ -21,6 +21,7 @@ TEST_LOGGER_NAME: str = "test-logger"
 def setUp_tearDown(mocker: MockerFixture):
     """setUp and tearDown
     - patch the logger object
+    - let main compile the config snapshot of the cli input args that are patched by the test
     - yield the test
     - delete logger objects that have been created during testing
 
@@ -33,8 +34,11 @@ def setUp_tearDown(mocker: MockerFixture):
         logging.getLogger(TEST_LOGGER_NAME)
     )
 
+    config.invalidate()
+
     yield
 
+    config.invalidate()
     del logging.root.manager.loggerDict[TEST_LOGGER_NAME]
 
 ## TODO: to prevent actual log file creation ##
@@ -61,13 +65,25 @@ def mock_rotate_logs_of_all_rotating_file_handlers(mocker: MockerFixture) -> Mag
     )
 
 
+@pytest.fixture(autouse=True)
+def mock_install_hooks(mocker: MockerFixture) -> MagicMock:
+    """return function install_hooks
+    - to prevent replacing the exception hooks of the test process
+    """
+    return mocker.patch.object(
+        exc,
+        "install_hooks",
+    )
+
+
 @pytest.fixture
-def mock_hello(mocker: MockerFixture) -> MagicMock:
-    """return function hello
+def mock_run_command(mocker: MockerFixture) -> MagicMock:
+    """return function run of module commands
+    - to prevent actual import and run of commands
     """
     return mocker.patch.object(
-        main,
-        "hello",
+        commands,
+        "run",
     )
 
 
@@ -89,6 +105,15 @@ def mock_program_end(mocker: MockerFixture) -> MagicMock:
         (r'.\main.py -v -Q'),
         (r'.\main.py -V --dummy'),
         (r'.\main.py -'),
+        (r'.\main.py --hello --async --concurrency=x'),
+        (r'.\main.py --concurrency=0'),
+        (r'.\main.py --workers=1.5'),
+        (r'.\main.py --pool=fiber'),
+        (r'.\main.py --loadgen --rate=fast'),
+        (r'.\main.py --loadgen --rate=0'),
+        (r'.\main.py --loadgen --duration=-1'),
+        (r'.\main.py --introspect=port'),
+        (r'.\main.py --profile-sample=x'),
     ]
 )
 def test__evaluate_cli_input_args_fail(
@@ -117,16 +142,47 @@ def test__evaluate_cli_input_args_fail(
 
 
 
+DEFAULT_CLI_INPUT_ARGS: dict[str, Any] = {
+    "v": False, "V": False, "q": False, "Q": False, "hello": False, "buffered_console": False,
+    "shed_on_overload": False, "profile_startup": False,
+    "serve": False, "socket": None, "batch": None,
+    "run_async": False, "concurrency": None, "metrics_file": None,
+    "trace_file": None,
+    "profile_cpu": False, "profile_mem": False, "profile_sample": None,
+    "compact_records": False,
+    "loadgen": False, "replay": None, "load_rate": None, "load_duration": 10.0, "load_threads": 1,
+    "load_levels": "DEBUG:10,INFO:60,WARNING:25,ERROR:5", "load_sizes": "64,256,1024",
+    "replay_speed": 1.0, "mmap_log": False, "introspect": None, "pool": None, "workers": None,
+}
+"""expected kwargs of CLI.set_cli_input_args if no cli input arg is passed"""
+
+
 @pytest.mark.parametrize(
     "cli_cmd, exp_res", [
-        (r'.\main.py', {"v": False, "V": False, "q": False, "Q": False, "hello": False}),
-        (r'.\main.py -v', {"v": True, "V": False, "q": False, "Q": False, "hello": False}),
-        (r'.\main.py -V', {"v": False, "V": True, "q": False, "Q": False, "hello": False}),
-        (r'.\main.py -q', {"v": False, "V": False, "q": True, "Q": False, "hello": False}),
-        (r'.\main.py -Q', {"v": False, "V": False, "q": False, "Q": True, "hello": False}),
-        (r'.\main.py --hello', {"v": False, "V": False, "q": False, "Q": False, "hello": True}),
-        (r'.\main.py -v --hello', {"v": True, "V": False, "q": False, "Q": False, "hello": True}),
-        (r'.\main.py -q --hello', {"v": False, "V": False, "q": True, "Q": False, "hello": True}),
+        (r'.\main.py', {**DEFAULT_CLI_INPUT_ARGS}),
+        (r'.\main.py -v', {**DEFAULT_CLI_INPUT_ARGS, "v": True}),
+        (r'.\main.py -V', {**DEFAULT_CLI_INPUT_ARGS, "V": True}),
+        (r'.\main.py -q', {**DEFAULT_CLI_INPUT_ARGS, "q": True}),
+        (r'.\main.py -Q', {**DEFAULT_CLI_INPUT_ARGS, "Q": True}),
+        (r'.\main.py --hello', {**DEFAULT_CLI_INPUT_ARGS, "hello": True}),
+        (r'.\main.py -v --hello', {**DEFAULT_CLI_INPUT_ARGS, "v": True, "hello": True}),
+        (r'.\main.py -q --hello', {**DEFAULT_CLI_INPUT_ARGS, "q": True, "hello": True}),
+        (r'.\main.py --buffered-console', {**DEFAULT_CLI_INPUT_ARGS, "buffered_console": True}),
+        (r'.\main.py --shed-on-overload', {**DEFAULT_CLI_INPUT_ARGS, "shed_on_overload": True}),
+        (r'.\main.py --profile-startup', {**DEFAULT_CLI_INPUT_ARGS, "profile_startup": True}),
+        (r'.\main.py --serve', {**DEFAULT_CLI_INPUT_ARGS, "serve": True}),
+        (r'.\main.py -q --serve --socket=/tmp/test.sock', {**DEFAULT_CLI_INPUT_ARGS, "q": True, "serve": True, "socket": "/tmp/test.sock"}),
+        (r'.\main.py --batch=-', {**DEFAULT_CLI_INPUT_ARGS, "batch": "-"}),
+        (r'.\main.py --hello --async --concurrency=8', {**DEFAULT_CLI_INPUT_ARGS, "hello": True, "run_async": True, "concurrency": 8}),
+        (r'.\main.py --metrics-file=log/metrics.prom', {**DEFAULT_CLI_INPUT_ARGS, "metrics_file": "log/metrics.prom"}),
+        (r'.\main.py --trace-file=log/spans.jsonl', {**DEFAULT_CLI_INPUT_ARGS, "trace_file": "log/spans.jsonl"}),
+        (r'.\main.py --compact-records', {**DEFAULT_CLI_INPUT_ARGS, "compact_records": True}),
+        (r'.\main.py --mmap-log', {**DEFAULT_CLI_INPUT_ARGS, "mmap_log": True}),
+        (r'.\main.py --introspect=0', {**DEFAULT_CLI_INPUT_ARGS, "introspect": 0}),
+        (r'.\main.py --hello --pool=process --workers=2', {**DEFAULT_CLI_INPUT_ARGS, "hello": True, "pool": "process", "workers": 2}),
+        (r'.\main.py --loadgen --rate=500 --duration=2 --threads=4 --levels=INFO:1 --sizes=32', {**DEFAULT_CLI_INPUT_ARGS, "loadgen": True, "load_rate": 500.0, "load_duration": 2.0, "load_threads": 4, "load_levels": "INFO:1", "load_sizes": "32"}),
+        (r'.\main.py --replay=log/app.log --speed=0', {**DEFAULT_CLI_INPUT_ARGS, "replay": "log/app.log", "replay_speed": 0.0}),
+        (r'.\main.py --profile-cpu --profile-mem --profile-sample=0.5', {**DEFAULT_CLI_INPUT_ARGS, "profile_cpu": True, "profile_mem": True, "profile_sample": 0.5}),
     ]
 )
 def test__evaluate_cli_input_args_success(
@@ -152,13 +208,51 @@ def test__evaluate_cli_input_args_success(
 
     # act and assert #
     main._evaluate_cli_input_args()
-    mocked_set_cli_input_args.assert_called_once_with(
-        v=exp_res["v"],
-        V=exp_res["V"],
-        q=exp_res["q"],
-        Q=exp_res["Q"],
-        hello=exp_res["hello"],
-    )
+    mocked_set_cli_input_args.assert_called_once_with(**exp_res)
+
+
+def test__evaluate_job_args():
+    """test that a job sets verbosity and commands only, process-level cli input args are kept
+    - parsed argv are cached
+    """
+    main._parse_job_argv.cache_clear()
+    CLI.set_cli_input_args(serve=True, q=True, metrics_file="log/metrics.prom")
+    try:
+        main._evaluate_job_args(["-v", "--hello"])
+        assert (CLI.v, CLI.q, CLI.hello) == (True, False, True)
+        assert CLI.serve and CLI.metrics_file == "log/metrics.prom"
+
+        main._evaluate_job_args(["-v", "--hello"])
+        assert main._parse_job_argv.cache_info().hits == 1
+        with pytest.raises(DocoptExit):
+            main._evaluate_job_args(["--hello", "--unknown"])
+    finally:
+        CLI.set_cli_input_args()
+
+
+@pytest.mark.parametrize("argv", [
+    ["--loadgen"], ["--replay=log/app.log"], ["--async"], ["--profile-cpu"], ["--profile-sample=1"],
+    ["--introspect=0"], ["--metrics-file=m.prom"], ["--trace-file=t.jsonl"], ["--mmap-log"],
+    ["--compact-records"], ["--buffered-console"], ["--serve"], ["--batch=-"],
+])
+def test_run_job_rejects_process_level_args(mocker: MockerFixture, argv: list[str]):
+    """test that jobs with process-level cli input args fail without running a command
+
+    Args:
+        mocker (MockerFixture): pytest mocker
+        argv (list[str]): cli input args of job
+    """
+    from src.utils import jobs
+    mock_run_command: MagicMock = mocker.patch.object(commands, "run")
+    CLI.set_cli_input_args(serve=True)
+    try:
+        res: jobs.JobResult = jobs.run_job(["--hello", *argv], main._evaluate_job_args)
+
+        assert not res.ok
+        assert res.error == f"Jobs cannot set process-level cli input args: {argv}."
+        mock_run_command.assert_not_called()
+    finally:
+        CLI.set_cli_input_args()
 
 
 @pytest.mark.parametrize(
@@ -172,7 +266,8 @@ def test__evaluate_cli_input_args_success(
 )
 def test_main(
         caplog: LogCaptureFixture,
-        mock_hello: MagicMock,
+        mock_install_hooks: MagicMock,
+        mock_run_command: MagicMock,
         mock_program_end: MagicMock,
         test_case: str,
         log_level: int,
@@ -185,7 +280,8 @@ def test_main(
 
     Args:
         caplog (LogCaptureFixture): pytest log fixture
-        mock_hello (MagicMock): mocked function hello
+        mock_install_hooks (MagicMock): mocked function install_hooks
+        mock_run_command (MagicMock): mocked function run of module commands
         mock_program_end (MagicMock): mocked function program_end
         test_case (str): test case name
         log_level (int): Logging level to test
@@ -213,5 +309,114 @@ def test_main(
             f"test case '{test_case}' failed."
 
     # assert that mocked functions are called #
-    mock_hello.assert_called_once()
+    mock_install_hooks.assert_called_once()
+    mock_run_command.assert_called_once_with("hello")
+    mock_program_end.assert_called_once()
+
+
+def test_main_profile_startup(
+        mocker: MockerFixture,
+        capsys: pytest.CaptureFixture,
+        mock_run_command: MagicMock,
+        mock_program_end: MagicMock,
+    ):
+    """test that main outputs the startup report to stderr if --profile-startup is passed
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+        capsys (pytest.CaptureFixture): pytest capture fixture
+        mock_run_command (MagicMock): mocked function run of module commands
+        mock_program_end (MagicMock): mocked function program_end
+    """
+    mocker.patch.object(CLI, "profile_startup", True)
+
+    main.main()
+
+    assert "startup phase total" in capsys.readouterr().err
+    mock_run_command.assert_called_once_with("hello")
+
+
+def test_main_async(
+        mocker: MockerFixture,
+        mock_program_end: MagicMock,
+    ):
+    """test that main runs the selected commands on an event loop if --async is passed
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+        mock_program_end (MagicMock): mocked function program_end
+    """
+    mocker.patch.object(CLI, "run_async", True)
+    mock_hello: MagicMock = MagicMock()
+    mock_get_func: MagicMock = mocker.patch.object(commands, "get_func", return_value=mock_hello)
+
+    main.main()
+
+    mock_get_func.assert_called_with("hello")
+    mock_hello.assert_called_once_with()
     mock_program_end.assert_called_once()
+
+
+def test_main_pool(
+        mocker: MockerFixture,
+        mock_program_end: MagicMock,
+    ):
+    """test that main runs the selected commands on a pool of executor if --pool is passed
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+        mock_program_end (MagicMock): mocked function program_end
+    """
+    mocker.patch.object(CLI, "pool", "thread")
+    mocker.patch.object(CLI, "workers", 2)
+    from src.utils import executor
+    mock_run_tasks: MagicMock = mocker.patch.object(executor, "run_tasks", return_value=iter([]))
+
+    main.main()
+
+    mock_run_tasks.assert_called_once_with(commands.run, [("hello",)], pool="thread", max_workers=2)
+    mock_program_end.assert_called_once()
+
+
+def test_main_metrics_file(
+        mocker: MockerFixture,
+        tmp_path,
+        mock_run_command: MagicMock,
+        mock_program_end: MagicMock,
+    ):
+    """test that main writes metrics to file if --metrics-file is passed
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+        tmp_path (Path): pytest tmp path fixture
+        mock_run_command (MagicMock): mocked function run of module commands
+        mock_program_end (MagicMock): mocked function program_end
+    """
+    mocker.patch.object(CLI, "metrics_file", str(tmp_path / "metrics.prom"))
+
+    main.main()
+
+    assert "# TYPE log_records_total counter" in (tmp_path / "metrics.prom").read_text()
+
+
+def test_main_profile(
+        mocker: MockerFixture,
+        mock_run_command: MagicMock,
+        mock_program_end: MagicMock,
+    ):
+    """test that main runs commands under the profilers that are selected via cli input args
+
+    Args:
+        mocker (MockerFixture): pytest mocker fixture
+        mock_run_command (MagicMock): mocked function run of module commands
+        mock_program_end (MagicMock): mocked function program_end
+    """
+    from src.utils import profiling
+    mock_profile: MagicMock = mocker.patch.object(profiling, "profile")
+    mocker.patch.object(CLI, "profile_cpu", True)
+    mocker.patch.object(CLI, "profile_sample", 2.0)
+
+    main.main()
+
+    mock_profile.assert_called_once_with(cpu=True, mem=False, sample_interval=0.002)
+    mock_run_command.assert_called_once_with("hello")